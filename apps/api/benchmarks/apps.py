@@ -0,0 +1,17 @@
+# KapwaNet - Community Platform for Dignified Mutual Aid
+# SPDX-License-Identifier: AGPL-3.0-or-later
+
+"""
+App configuration for API benchmarks.
+
+This module replays scripted member journeys against the API and
+reports latency percentiles and queries per request.
+"""
+
+from django.apps import AppConfig
+
+
+class BenchmarksConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'benchmarks'
+    verbose_name = 'Benchmarks'
@@ -0,0 +1,167 @@
+# KapwaNet - Community Platform for Dignified Mutual Aid
+# SPDX-License-Identifier: AGPL-3.0-or-later
+
+"""
+Scripted member journeys for the benchmark runner.
+
+A journey is a function taking a runner Session, registered with a
+weight that sets how often virtual users pick it:
+
+    @journey(weight=3)
+    def browse(session):
+        member = session.member()
+        member.get('/api/help-posts/', {'org': session.org.id})
+
+Requests are recorded under their route template, so use placeholders
+('/api/help-posts/{id}/', id=...) rather than formatted paths.
+Journeys write data (posts, matches, messages), so run them against a
+benchmark database.
+"""
+
+_journeys = {}
+
+
+def journey(weight=1):
+    """Register a journey function under its name."""
+    def decorator(func):
+        _journeys[func.__name__] = (func, weight)
+        return func
+    return decorator
+
+
+def get_journeys():
+    """Get the registered journeys as {name: (func, weight)}."""
+    return dict(_journeys)
+
+
+def rows(data):
+    """Get the rows of a list response, paginated or not."""
+    if isinstance(data, dict) and 'results' in data:
+        return data['results']
+    return data
+
+
+@journey(weight=5)
+def browse(session):
+    """A member looks through open requests and available items."""
+    member = session.member()
+    org = str(session.org.id)
+
+    posts = rows(member.get('/api/help-posts/', {'org': org, 'status': 'open'}))
+    if posts:
+        member.get('/api/help-posts/{id}/', id=session.rng.choice(posts)['id'])
+    member.get('/api/help-posts/', {'org': org, 'status': 'open', 'urgency': 'high'})
+    member.get('/api/help-posts/categories/')
+
+    items = rows(member.get('/api/item-posts/', {'org': org, 'status': 'available'}))
+    if items:
+        member.get('/api/item-posts/{id}/', id=session.rng.choice(items)['id'])
+    member.get('/api/threads/unread_counts/')
+
+
+@journey(weight=2)
+def help_exchange(session):
+    """A member asks for help, a neighbour offers, and they arrange it."""
+    requester = session.member()
+    helper = session.member(exclude=[requester.user])
+    org = str(session.org.id)
+
+    post = requester.post('/api/help-posts/', {
+        'org': org,
+        'type': 'request',
+        'category': session.rng.choice(['transportation', 'errands', 'household']),
+        'title': 'Ride to the clinic on Thursday',
+        'description': 'I have an appointment at 10am and no car this week.',
+        'urgency': session.rng.choice(['normal', 'high']),
+    })
+    helper.get('/api/help-posts/', {'org': org, 'status': 'open'})
+    helper.get('/api/help-posts/{id}/', id=post['id'])
+    match = helper.post(
+        '/api/help-posts/{id}/express-interest/',
+        {'message': 'I can drive you.'},
+        id=post['id'],
+    )
+    requester.get('/api/help-posts/{id}/matches/', id=post['id'])
+    match = requester.post(
+        '/api/help-posts/{id}/accept-match/', {'match_id': str(match['id'])}, id=post['id']
+    )
+    chat(session, match['thread'], [requester, helper])
+
+
+@journey(weight=2)
+def item_exchange(session):
+    """A member offers an item, another reserves it, and they arrange pickup."""
+    owner = session.member()
+    requester = session.member(exclude=[owner.user])
+    org = str(session.org.id)
+
+    item = owner.post('/api/item-posts/', {
+        'org': org,
+        'type': 'offer',
+        'category': session.rng.choice(['clothing', 'household', 'baby_kids']),
+        'title': 'Winter coat, size M',
+        'description': 'Warm and clean, worn for one season.',
+        'quantity': 1,
+        'condition': 'good',
+    })
+    requester.get('/api/item-posts/', {'org': org, 'status': 'available'})
+    reservation = requester.post(
+        '/api/item-posts/{id}/reserve/', {'message': 'Could I pick it up tomorrow?'}, id=item['id']
+    )
+    owner.get('/api/item-posts/{id}/reservations/', id=item['id'])
+    reservation = owner.post(
+        '/api/item-posts/{id}/approve-reservation/',
+        {'reservation_id': str(reservation['id'])},
+        id=item['id'],
+    )
+    chat(session, reservation['thread'], [owner, requester])
+
+
+def chat(session, thread_id, actors):
+    """Participants trade a few messages, reading as they go."""
+    for turn in range(session.rng.randint(2, 6)):
+        actor = actors[turn % len(actors)]
+        actor.post('/api/threads/{id}/messages/', {'body': 'Sounds good, see you then.'}, id=thread_id)
+        other = actors[(turn + 1) % len(actors)]
+        other.get('/api/threads/unread_counts/')
+        other.get('/api/threads/{id}/messages/', {'limit': 50}, id=thread_id)
+        other.post('/api/threads/{id}/mark-read/', id=thread_id)
+
+
+@journey(weight=4)
+def inbox(session):
+    """A member checks their messages."""
+    member = session.member()
+    member.get('/api/threads/unread_counts/')
+    threads = rows(member.get('/api/threads/'))
+    if threads:
+        thread_id = session.rng.choice(threads)['id']
+        member.get('/api/threads/{id}/messages/', {'limit': 50}, id=thread_id)
+        member.post('/api/threads/{id}/mark-read/', id=thread_id)
+
+
+@journey(weight=1)
+def moderate(session):
+    """A member reports a post and a moderator works the queue."""
+    moderator = session.moderator()
+    reporter = session.member(exclude=[moderator.user])
+    org = str(session.org.id)
+
+    posts = rows(reporter.get('/api/help-posts/', {'org': org}))
+    if posts:
+        reporter.post('/api/reports/', {
+            'org': org,
+            'target_type': 'help_post',
+            'target_id': str(session.rng.choice(posts)['id']),
+            'reason': 'spam',
+            'details': 'Looks like an advert.',
+        })
+
+    reports = rows(moderator.get('/api/reports/', {'org': org, 'status': 'open'}))
+    if reports:
+        report_id = session.rng.choice(reports)['id']
+        moderator.get('/api/reports/{id}/', id=report_id)
+        moderator.post('/api/reports/{id}/start-review/', id=report_id)
+        moderator.post(
+            '/api/reports/{id}/resolve/', {'resolution_notes': 'Reviewed.'}, id=report_id
+        )
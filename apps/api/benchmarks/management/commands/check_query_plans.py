@@ -0,0 +1,131 @@
+# KapwaNet - Community Platform for Dignified Mutual Aid
+# SPDX-License-Identifier: AGPL-3.0-or-later
+
+"""
+Management command to check the query plans of hot list endpoints.
+
+Runs every plan case (benchmarks/plans.py) against the largest org of a
+synthetic community on Postgres and reports sequential scans, sorts
+spilling to disk and plan changes against benchmarks/plans.json:
+
+    DATABASE_URL=postgres://localhost/kapwanet_bench python manage.py check_query_plans
+    python manage.py check_query_plans --save-baseline   # first run, or after an intended change
+
+The baseline has to be recorded on Postgres with --save-baseline and
+committed. Until then the command fails, unless --no-compare is given to
+only look for plan problems.
+"""
+
+import os
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from benchmarks.plans import (
+    PlanContext, check_plans, compare_plans, get_plan_cases, load_plans, save_plans
+)
+from benchmarks.runner import load_community
+from organizations.synthetic import CommunityGenerator, flush
+
+
+class Command(BaseCommand):
+    help = 'EXPLAIN ANALYZE hot list queries and flag seq scans, disk spills and plan changes'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--case',
+            action='append',
+            dest='cases',
+            choices=sorted(get_plan_cases()),
+            help='Only check this case (repeatable)',
+        )
+        parser.add_argument(
+            '--prefix',
+            default='bench',
+            help='Synthetic community to run against (default: bench)',
+        )
+        parser.add_argument('--orgs', type=int, default=5, help='Orgs to generate if none exist')
+        parser.add_argument(
+            '--regenerate',
+            action='store_true',
+            help='Rebuild the synthetic community first',
+        )
+        parser.add_argument(
+            '--seq-scan-rows',
+            type=int,
+            default=1000,
+            help='Flag sequential scans reading at least this many rows (default: 1000)',
+        )
+        parser.add_argument(
+            '--baseline',
+            default=os.path.join(settings.BASE_DIR, 'benchmarks', 'plans.json'),
+            help='Baseline plans file',
+        )
+        parser.add_argument(
+            '--save-baseline',
+            action='store_true',
+            help='Store these plans as the new baseline',
+        )
+        parser.add_argument(
+            '--no-compare',
+            action='store_true',
+            help='Only flag plan problems, without comparing against a baseline',
+        )
+        parser.add_argument('--verbose-plans', action='store_true', help='Print every plan')
+
+    def handle(self, *args, **options):
+        compare_baseline = not (options['save_baseline'] or options['no_compare'])
+        if compare_baseline and not os.path.exists(options['baseline']):
+            raise CommandError(
+                f'No baseline at {options["baseline"]}. Record one with --save-baseline '
+                f'and commit it, or pass --no-compare.'
+            )
+        if connection.vendor != 'postgresql':
+            raise CommandError('Query plans can only be checked on PostgreSQL.')
+
+        if options['regenerate']:
+            flush(options['prefix'])
+        community = load_community(options['prefix'])
+        if not community:
+            self.stdout.write(f'Generating synthetic community "{options["prefix"]}"...')
+            CommunityGenerator(orgs=options['orgs'], prefix=options['prefix']).generate()
+            community = load_community(options['prefix'])
+        if not community:
+            raise CommandError('No usable organizations to check against.')
+
+        # Bulk-loaded tables may not have statistics yet
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+
+        org, members, moderators = max(community, key=lambda entry: len(entry[1]))
+        self.stdout.write(f'Checking query plans against {org.slug} ({len(members)} members)...')
+        results = check_plans(
+            PlanContext(org, members, moderators),
+            cases=options['cases'],
+            seq_scan_rows=options['seq_scan_rows'],
+        )
+
+        flagged = 0
+        for key, result in results.items():
+            self.stdout.write(f'\n{key}  {result["execution_ms"]:.2f}ms  {result["shared_read"]} blocks read')
+            if options['verbose_plans']:
+                self.stdout.write('\n'.join(f'    {line}' for line in result['shape']))
+            for problem in result['problems']:
+                flagged += 1
+                self.stdout.write(self.style.WARNING(f'    {problem}'))
+
+        if options['save_baseline']:
+            save_plans(options['baseline'], results)
+            self.stdout.write(self.style.SUCCESS(f'\nDone! Baseline saved to {options["baseline"]}.'))
+            return
+
+        changes = []
+        if compare_baseline:
+            changes = compare_plans(results, load_plans(options['baseline']))
+        for change in changes:
+            self.stdout.write(self.style.ERROR(f'\n{change}'))
+
+        if flagged or changes:
+            raise CommandError(f'{flagged} plan problems, {len(changes)} plan changes')
+        self.stdout.write(self.style.SUCCESS('\nDone! No plan problems or changes.'))
@@ -0,0 +1,166 @@
+# KapwaNet - Community Platform for Dignified Mutual Aid
+# SPDX-License-Identifier: AGPL-3.0-or-later
+
+"""
+Management command to benchmark the API with scripted member journeys.
+
+Run against a dedicated database, since journeys create posts, matches
+and messages. A synthetic community is generated on first use; pass
+--regenerate to start from the same data each time when comparing
+against a baseline:
+
+    DATABASE_URL=postgres://localhost/kapwanet_bench python manage.py run_benchmarks --regenerate
+
+Latency depends on the machine, so the baseline is not shipped: record
+one on the reference machine with --save-baseline (the run options are
+stored with it) and commit it. Without a baseline the command fails,
+unless --no-compare is given for an exploratory run.
+"""
+
+import logging
+import os
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from benchmarks.journeys import get_journeys
+from benchmarks.runner import compare, load_baseline, load_community, run, save_results, summarize
+from organizations.synthetic import CommunityGenerator, flush
+
+
+class Command(BaseCommand):
+    help = 'Replay member journeys with concurrent virtual users and report latency percentiles'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=10, help='Concurrent virtual users')
+        parser.add_argument('--duration', type=float, default=60, help='Seconds to run (default: 60)')
+        parser.add_argument(
+            '--iterations',
+            type=int,
+            help='Journeys per virtual user, instead of --duration',
+        )
+        parser.add_argument(
+            '--journey',
+            action='append',
+            dest='journeys',
+            choices=sorted(get_journeys()),
+            help='Only run this journey (repeatable)',
+        )
+        parser.add_argument('--seed', type=int, default=1, help='Random seed')
+        parser.add_argument(
+            '--prefix',
+            default='bench',
+            help='Synthetic community to run against (default: bench)',
+        )
+        parser.add_argument('--orgs', type=int, default=5, help='Orgs to generate if none exist')
+        parser.add_argument(
+            '--regenerate',
+            action='store_true',
+            help='Rebuild the synthetic community first, discarding earlier runs\' writes',
+        )
+        parser.add_argument(
+            '--baseline',
+            default=os.path.join(settings.BASE_DIR, 'benchmarks', 'baseline.json'),
+            help='Baseline results file',
+        )
+        parser.add_argument(
+            '--save-baseline',
+            action='store_true',
+            help='Store these results as the new baseline',
+        )
+        parser.add_argument(
+            '--no-compare',
+            action='store_true',
+            help='Only report results, without comparing against a baseline',
+        )
+        parser.add_argument('--output', help='Also write results to this JSON file')
+        parser.add_argument(
+            '--threshold',
+            type=float,
+            default=0.25,
+            help='Allowed p95 growth over the baseline (default: 0.25)',
+        )
+
+    def handle(self, *args, **options):
+        compare_baseline = not (options['save_baseline'] or options['no_compare'])
+        if compare_baseline and not os.path.exists(options['baseline']):
+            raise CommandError(
+                f'No baseline at {options["baseline"]}. Record one with --save-baseline '
+                f'on the reference machine, or pass --no-compare.'
+            )
+
+        if settings.DEBUG:
+            self.stdout.write(self.style.WARNING(
+                'DEBUG is on: query logging adds overhead. Set DEBUG=False for representative numbers.'
+            ))
+
+        # One log line per request would drown the report
+        logging.getLogger('observability').setLevel(logging.ERROR)
+
+        if options['regenerate']:
+            flush(options['prefix'])
+        community = load_community(options['prefix'])
+        if not community:
+            self.stdout.write(f'Generating synthetic community "{options["prefix"]}"...')
+            CommunityGenerator(
+                orgs=options['orgs'], prefix=options['prefix'], seed=options['seed']
+            ).generate()
+            community = load_community(options['prefix'])
+        if not community:
+            raise CommandError('No usable organizations to benchmark against.')
+
+        if options['iterations']:
+            label = f'{options["iterations"]} journeys each'
+        else:
+            label = f'{options["duration"]:g}s'
+        self.stdout.write(
+            f'Running {options["users"]} virtual users for {label} '
+            f'across {len(community)} orgs...'
+        )
+        recorder = run(
+            community,
+            users=options['users'],
+            duration=None if options['iterations'] else options['duration'],
+            iterations=options['iterations'],
+            seed=options['seed'],
+            journeys=options['journeys'],
+        )
+        results = summarize(recorder)
+
+        self.stdout.write(
+            f'\n{"endpoint":<52} {"count":>6} {"err":>4} {"p50":>8} {"p95":>8} {"p99":>8} {"queries":>8}'
+        )
+        for name, stats in results.items():
+            self.stdout.write(
+                f'{name:<52} {stats["count"]:>6} {stats["errors"]:>4} '
+                f'{stats["p50"]:>8.1f} {stats["p95"]:>8.1f} {stats["p99"]:>8.1f} {stats["queries"]:>8g}'
+            )
+        for journey, error in recorder.failures[:10]:
+            self.stdout.write(self.style.WARNING(f'{journey} failed: {error}'))
+
+        run_options = {
+            key: options[key] for key in ('users', 'duration', 'iterations', 'seed', 'prefix', 'journeys')
+        }
+        if options['output']:
+            save_results(options['output'], results, run_options)
+
+        if options['save_baseline']:
+            save_results(options['baseline'], results, run_options)
+            self.stdout.write(self.style.SUCCESS(f'\nDone! Baseline saved to {options["baseline"]}.'))
+            return
+
+        if not compare_baseline:
+            self.stdout.write(self.style.SUCCESS('\nDone!'))
+            return
+
+        baseline, baseline_options = load_baseline(options['baseline'])
+        if baseline_options and baseline_options != run_options:
+            self.stdout.write(self.style.WARNING(
+                f'The baseline was recorded with different options: {baseline_options}'
+            ))
+        regressions = compare(results, baseline, options['threshold'])
+        if regressions:
+            for regression in regressions:
+                self.stdout.write(self.style.ERROR(f'Regression: {regression}'))
+            raise CommandError(f'{len(regressions)} regressions against {options["baseline"]}')
+        self.stdout.write(self.style.SUCCESS('\nDone! No regressions against the baseline.'))
@@ -0,0 +1,118 @@
+# KapwaNet - Community Platform for Dignified Mutual Aid
+# SPDX-License-Identifier: AGPL-3.0-or-later
+
+"""
+Management command to measure memory per row of list endpoints.
+
+Generates one synthetic org per dataset size (reused on later runs),
+requests each memory case (benchmarks/memory.py) under tracemalloc and
+reports peak and retained memory per size with the per-row slope:
+
+    DATABASE_URL=postgres://localhost/kapwanet_bench python manage.py run_memory_benchmarks --sizes 100 500 2000
+"""
+
+import json
+import logging
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from benchmarks.memory import get_memory_cases, run_memory
+from benchmarks.plans import PlanContext
+from benchmarks.runner import load_community
+from organizations.synthetic import CommunityGenerator, flush
+
+
+class Command(BaseCommand):
+    help = 'Measure peak and retained memory of list endpoints across dataset sizes'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--sizes',
+            type=int,
+            nargs='+',
+            default=[100, 400, 1600],
+            help='Posts and reports per org for each dataset (default: 100 400 1600)',
+        )
+        parser.add_argument(
+            '--case',
+            action='append',
+            dest='cases',
+            choices=sorted(get_memory_cases()),
+            help='Only measure this case (repeatable)',
+        )
+        parser.add_argument('--repeat', type=int, default=3, help='Measured requests per size')
+        parser.add_argument(
+            '--prefix',
+            default='memory',
+            help='Prefix for the synthetic orgs; the size is appended (default: memory)',
+        )
+        parser.add_argument(
+            '--regenerate',
+            action='store_true',
+            help='Rebuild the synthetic orgs first',
+        )
+        parser.add_argument(
+            '--max-bytes-per-row',
+            type=int,
+            default=32 * 1024,
+            help='Fail when an endpoint needs more memory per row (default: 32768)',
+        )
+        parser.add_argument('--output', help='Also write results to this JSON file')
+
+    def handle(self, *args, **options):
+        if settings.DEBUG:
+            self.stdout.write(self.style.WARNING(
+                'DEBUG is on: the query log is counted as retained memory. Set DEBUG=False.'
+            ))
+
+        # One log line per request would drown the report
+        logging.getLogger('observability').setLevel(logging.ERROR)
+
+        contexts = []
+        for size in sorted(set(options['sizes'])):
+            prefix = f'{options["prefix"]}{size}'
+            if options['regenerate']:
+                flush(prefix)
+            community = load_community(prefix)
+            if not community:
+                self.stdout.write(f'Generating a synthetic org with {size} posts...')
+                CommunityGenerator(
+                    orgs=1, members=max(10, size // 4), help_posts=size, item_posts=size,
+                    reports=size, seed=size, prefix=prefix,
+                ).generate()
+                community = load_community(prefix)
+            if not community:
+                raise CommandError(f'No usable organization for size {size}.')
+            contexts.append(PlanContext(*community[0]))
+
+        results = run_memory(contexts, cases=options['cases'], repeat=options['repeat'])
+
+        failures = []
+        for name, result in results.items():
+            self.stdout.write(f'\n{name}')
+            self.stdout.write(f'    {"rows":>8} {"peak KB":>10} {"retained KB":>12} {"objects":>8}')
+            for point in result['points']:
+                self.stdout.write(
+                    f'    {point["rows"]:>8} {point["peak"] / 1024:>10.1f} '
+                    f'{point["retained"] / 1024:>12.1f} {point["objects"]:>8}'
+                )
+            per_row = result['bytes_per_row']
+            line = f'    {per_row / 1024:.2f} KB per row'
+            if per_row > options['max_bytes_per_row']:
+                failures.append(f'{name}: {per_row / 1024:.2f} KB per row')
+                self.stdout.write(self.style.ERROR(line))
+            else:
+                self.stdout.write(line)
+
+        if options['output']:
+            with open(options['output'], 'w') as f:
+                json.dump(results, f, indent=2, sort_keys=True)
+                f.write('\n')
+
+        if failures:
+            raise CommandError(
+                f'{len(failures)} endpoints over {options["max_bytes_per_row"]} bytes per row: '
+                + '; '.join(failures)
+            )
+        self.stdout.write(self.style.SUCCESS('\nDone! Memory per row is within the threshold.'))
@@ -0,0 +1,154 @@
+# KapwaNet - Community Platform for Dignified Mutual Aid
+# SPDX-License-Identifier: AGPL-3.0-or-later
+
+"""
+Memory benchmarks for list endpoints.
+
+Unpaginated lists build every row in memory (model instances, serializer
+output, the rendered JSON), so a worker's peak memory grows with the
+largest org it serves. For each memory case, measure() requests the list
+under tracemalloc and records:
+
+- peak: the most memory allocated at once while handling the request,
+- retained: memory still allocated after the response is dropped and
+  garbage collected (caches, leaks),
+- objects: the change in the number of objects tracked by the collector.
+
+Run against synthetic orgs of increasing size, the peaks give a scaling
+curve; its slope (least squares over the sizes) is the memory cost per
+row, which should stay flat as orgs grow.
+
+Cases use the same PlanContext as the query plan checks:
+
+    @memory_case
+    def help_posts(ctx):
+        return ctx.member, '/api/help-posts/', {'org': ctx.org_id}
+"""
+
+import gc
+import tracemalloc
+
+from rest_framework.test import APIClient
+
+from .journeys import rows
+from .runner import HOST, JourneyError
+
+_cases = {}
+
+
+def memory_case(func):
+    """Register a memory case function under its name."""
+    _cases[func.__name__] = func
+    return func
+
+
+def get_memory_cases():
+    """Get the registered memory cases as {name: func}."""
+    return dict(_cases)
+
+
+@memory_case
+def help_posts(ctx):
+    return ctx.member, '/api/help-posts/', {'org': ctx.org_id}
+
+
+@memory_case
+def item_posts(ctx):
+    return ctx.member, '/api/item-posts/', {'org': ctx.org_id, 'show_expired': 'true'}
+
+
+@memory_case
+def reports(ctx):
+    return ctx.moderator, '/api/reports/', {'org': ctx.org_id}
+
+
+@memory_case
+def threads(ctx):
+    return ctx.member, '/api/threads/', {'org': ctx.org_id}
+
+
+@memory_case
+def help_matches(ctx):
+    return ctx.member, '/api/help-matches/', {'org': ctx.org_id}
+
+
+def measure(case, ctx, repeat=3):
+    """
+    Measure one request of a memory case; tracemalloc must be tracing.
+
+    The request is made once to warm caches and then `repeat` times,
+    keeping the smallest figures, which are the least disturbed by
+    unrelated allocations.
+
+    Returns:
+        {'rows', 'peak', 'retained', 'objects'}, sizes in bytes
+    """
+    user, path, query = case(ctx)
+    client = APIClient(SERVER_NAME=HOST)
+    client.force_authenticate(user=user)
+    client.get(path, query)
+
+    best = None
+    for _ in range(repeat):
+        gc.collect()
+        objects_before = len(gc.get_objects())
+        tracemalloc.reset_peak()
+        before = tracemalloc.get_traced_memory()[0]
+
+        response = client.get(path, query)
+        if response.status_code != 200:
+            raise JourneyError(f'GET {path} returned {response.status_code}')
+        count = len(rows(response.data))
+        peak = tracemalloc.get_traced_memory()[1] - before
+
+        del response
+        gc.collect()
+        retained = tracemalloc.get_traced_memory()[0] - before
+        objects = len(gc.get_objects()) - objects_before
+
+        result = {'rows': count, 'peak': peak, 'retained': max(retained, 0), 'objects': objects}
+        if best is None:
+            best = result
+        else:
+            best = {key: min(best[key], value) for key, value in result.items()}
+    return best
+
+
+def bytes_per_row(points):
+    """
+    Memory cost per row from (rows, bytes) points: the least-squares slope,
+    or bytes/rows when there is only one distinct row count.
+    """
+    points = [(count, size) for count, size in points if count]
+    if not points:
+        return 0.0
+    if len({count for count, _ in points}) < 2:
+        return max(size / count for count, size in points)
+
+    mean_rows = sum(count for count, _ in points) / len(points)
+    mean_size = sum(size for _, size in points) / len(points)
+    covariance = sum((count - mean_rows) * (size - mean_size) for count, size in points)
+    variance = sum((count - mean_rows) ** 2 for count, _ in points)
+    return covariance / variance
+
+
+def run_memory(contexts, cases=None, repeat=3):
+    """
+    Measure every memory case against each context (one per dataset size).
+
+    Returns:
+        {case: {'points': [measure() results], 'bytes_per_row': float}}
+    """
+    registered = get_memory_cases()
+    results = {}
+    tracemalloc.start()
+    try:
+        for name in sorted(cases or registered):
+            points = [measure(registered[name], ctx, repeat) for ctx in contexts]
+            results[name] = {
+                'points': points,
+                'bytes_per_row': bytes_per_row([(point['rows'], point['peak']) for point in points]),
+            }
+    finally:
+        tracemalloc.stop()
+    return results
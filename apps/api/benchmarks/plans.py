@@ -0,0 +1,283 @@
+# KapwaNet - Community Platform for Dignified Mutual Aid
+# SPDX-License-Identifier: AGPL-3.0-or-later
+
+"""
+EXPLAIN-plan checks for hot list queries.
+
+A plan case is a GET request for one list/filter combination, registered
+as a function of a PlanContext (the largest org of a synthetic
+community, its busiest member and thread, and a moderator):
+
+    @plan_case
+    def help_posts_open(ctx):
+        return ctx.member, '/api/help-posts/', {'org': ctx.org_id, 'status': 'open'}
+
+Each case's request runs through the API while its SELECT statements are
+captured, so the checked SQL is exactly what the endpoint issues. Every
+distinct statement is then run again under
+EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) and checked for:
+
+- sequential scans reading at least seq_scan_rows rows,
+- sorts and hashes spilling to disk,
+- a plan shape (node types, tables and indexes) different from the
+  baseline recorded with `check_query_plans --save-baseline`
+  (benchmarks/plans.json, committed with the code).
+
+Requires Postgres; EXPLAIN options differ on other databases.
+"""
+
+import difflib
+import json
+
+from django.db import connection
+from django.db.models import Count
+from rest_framework.test import APIClient
+
+from kapwanet.querybudget import fingerprint
+from messaging.models import Thread, ThreadParticipant
+from .runner import HOST
+
+_cases = {}
+
+
+class PlanError(Exception):
+    """A plan case request failed."""
+
+
+def plan_case(func):
+    """Register a plan case function under its name."""
+    _cases[func.__name__] = func
+    return func
+
+
+def get_plan_cases():
+    """Get the registered plan cases as {name: func}."""
+    return dict(_cases)
+
+
+class PlanContext:
+    """The org, users and thread plan cases run against."""
+
+    def __init__(self, org, members, moderators):
+        self.org = org
+        self.org_id = str(org.id)
+        self.moderator = moderators[0]
+
+        # The member in the most threads, and the thread with the most messages
+        busiest = ThreadParticipant.objects.filter(
+            thread__org=org, user__in=members
+        ).values('user_id').annotate(threads=Count('id')).order_by('-threads', 'user_id').first()
+        by_id = {user.pk: user for user in members}
+        self.member = by_id[busiest['user_id']] if busiest else members[0]
+        self.thread = Thread.objects.filter(
+            org=org, participants__user=self.member
+        ).annotate(size=Count('messages')).order_by('-size', 'id').first()
+
+
+@plan_case
+def help_posts_open(ctx):
+    return ctx.member, '/api/help-posts/', {'org': ctx.org_id, 'status': 'open'}
+
+
+@plan_case
+def help_posts_urgent(ctx):
+    return ctx.member, '/api/help-posts/', {'org': ctx.org_id, 'status': 'open', 'urgency': 'high'}
+
+
+@plan_case
+def help_posts_category(ctx):
+    return ctx.member, '/api/help-posts/', {
+        'org': ctx.org_id, 'type': 'request', 'category': 'transportation'
+    }
+
+
+@plan_case
+def help_posts_mine(ctx):
+    return ctx.member, '/api/help-posts/', {'org': ctx.org_id, 'mine': 'true'}
+
+
+@plan_case
+def help_matches_pending(ctx):
+    return ctx.member, '/api/help-matches/', {'org': ctx.org_id, 'status': 'pending'}
+
+
+@plan_case
+def item_posts_available(ctx):
+    return ctx.member, '/api/item-posts/', {'org': ctx.org_id, 'status': 'available'}
+
+
+@plan_case
+def item_reservations_pending(ctx):
+    return ctx.member, '/api/item-reservations/', {'org': ctx.org_id, 'status': 'pending'}
+
+
+@plan_case
+def threads(ctx):
+    return ctx.member, '/api/threads/', {'org': ctx.org_id}
+
+
+@plan_case
+def thread_messages(ctx):
+    return ctx.member, f'/api/threads/{ctx.thread.id}/messages/', {'limit': 50}
+
+
+@plan_case
+def unread_counts(ctx):
+    return ctx.member, '/api/threads/unread_counts/', {}
+
+
+@plan_case
+def message_search(ctx):
+    return ctx.member, '/api/messages/search/', {'org': ctx.org_id, 'q': 'weekend'}
+
+
+@plan_case
+def reports_open(ctx):
+    return ctx.moderator, '/api/reports/', {'org': ctx.org_id, 'status': 'open'}
+
+
+@plan_case
+def sync(ctx):
+    return ctx.member, '/api/sync/', {'org': ctx.org_id}
+
+
+class QueryCapture:
+    """Database execute wrapper keeping each distinct SELECT with its parameters."""
+
+    def __init__(self):
+        self.queries = {}
+
+    def __call__(self, execute, sql, params, many, context):
+        statement = sql.lstrip().upper()
+        if not many and statement.startswith(('SELECT', 'WITH')):
+            self.queries.setdefault(fingerprint(sql), (sql, params))
+        return execute(sql, params, many, context)
+
+
+def capture(case, ctx):
+    """
+    Run a plan case's request and capture its queries.
+
+    Returns:
+        A list of (sql, params) in the order first run
+    """
+    user, path, query = case(ctx)
+    client = APIClient(SERVER_NAME=HOST)
+    client.force_authenticate(user=user)
+    recorder = QueryCapture()
+    with connection.execute_wrapper(recorder):
+        response = client.get(path, query)
+    if response.status_code != 200:
+        raise PlanError(f'GET {path} returned {response.status_code}')
+    return list(recorder.queries.values())
+
+
+def explain(sql, params):
+    """Run a statement under EXPLAIN ANALYZE and return its root plan node."""
+    with connection.cursor() as cursor:
+        cursor.execute(f'EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) {sql}', params)
+        output = cursor.fetchone()[0]
+    if isinstance(output, str):
+        output = json.loads(output)
+    return output[0]
+
+
+def walk(node):
+    """Yield a plan node and all nodes below it."""
+    yield node
+    for child in node.get('Plans', []):
+        yield from walk(child)
+
+
+def shape(node, depth=0):
+    """
+    Describe a plan's structure, one line per node, ignoring costs and timings.
+
+    Returns:
+        A list like ['Sort', '  Index Scan using help_posts_org_id_ab12cd_idx on help_posts']
+    """
+    label = node['Node Type']
+    if node.get('Index Name'):
+        label += f' using {node["Index Name"]}'
+    if node.get('Relation Name'):
+        label += f' on {node["Relation Name"]}'
+    lines = ['  ' * depth + label]
+    for child in node.get('Plans', []):
+        lines.extend(shape(child, depth + 1))
+    return lines
+
+
+def problems(node, seq_scan_rows=1000):
+    """List sequential scans over seq_scan_rows rows and operations spilling to disk."""
+    found = []
+    for child in walk(node):
+        kind = child['Node Type']
+        if kind == 'Seq Scan':
+            loops = child.get('Actual Loops', 1)
+            scanned = (child.get('Actual Rows', 0) + child.get('Rows Removed by Filter', 0)) * loops
+            if scanned >= seq_scan_rows:
+                found.append(f'Seq Scan on {child.get("Relation Name")} read {scanned} rows')
+        if child.get('Sort Space Type') == 'Disk' or 'external' in child.get('Sort Method', ''):
+            found.append(f'{kind} spilled to disk ({child.get("Sort Space Used")} kB)')
+        if child.get('Hash Batches', 1) > 1:
+            found.append(f'{kind} spilled to disk in {child["Hash Batches"]} batches')
+    return found
+
+
+def check_plans(ctx, cases=None, seq_scan_rows=1000):
+    """
+    Capture and explain every query of the given plan cases.
+
+    Returns:
+        {'<case> #<n>': {'sql', 'shape', 'problems', 'execution_ms', 'shared_read'}}
+    """
+    registered = get_plan_cases()
+    results = {}
+    for name in sorted(cases or registered):
+        for index, (sql, params) in enumerate(capture(registered[name], ctx), start=1):
+            plan = explain(sql, params)
+            root = plan['Plan']
+            results[f'{name} #{index}'] = {
+                'sql': fingerprint(sql),
+                'shape': shape(root),
+                'problems': problems(root, seq_scan_rows),
+                'execution_ms': plan.get('Execution Time'),
+                'shared_read': sum(node.get('Shared Read Blocks', 0) for node in walk(root)),
+            }
+    return results
+
+
+def compare_plans(results, baseline):
+    """
+    Find plan changes against a baseline.
+
+    Returns:
+        A list of human-readable change descriptions, with a diff of the
+        plan shape where the query is unchanged
+    """
+    changes = []
+    for key, current in sorted(results.items()):
+        previous = baseline.get(key)
+        if previous is None:
+            continue
+        if current['sql'] != previous['sql']:
+            changes.append(f'{key}: query changed')
+        elif current['shape'] != previous['shape']:
+            diff = difflib.unified_diff(previous['shape'], current['shape'], lineterm='', n=1)
+            changes.append(f'{key}: plan changed\n' + '\n'.join(list(diff)[2:]))
+    return changes
+
+
+def load_plans(path):
+    with open(path) as f:
+        return json.load(f)['plans']
+
+
+def save_plans(path, results):
+    stored = {
+        key: {'sql': result['sql'], 'shape': result['shape']}
+        for key, result in results.items()
+    }
+    with open(path, 'w') as f:
+        json.dump({'plans': stored}, f, indent=2, sort_keys=True)
+        f.write('\n')
@@ -0,0 +1,301 @@
+# KapwaNet - Community Platform for Dignified Mutual Aid
+# SPDX-License-Identifier: AGPL-3.0-or-later
+
+"""
+Benchmark runner.
+
+Virtual users run in threads, each with its own database connection,
+and replay journeys (journeys.py) through the full Django request stack
+using DRF's APIClient. Every request is timed and its database queries
+are counted with a per-connection execute wrapper. Requests go through
+the middleware, routing, permissions and serializers but not a network
+socket or a WSGI server, so the numbers measure the application.
+
+Results are keyed by method and route, e.g. "POST /api/help-posts/{id}/reserve/":
+
+    {
+        "GET /api/help-posts/": {
+            "count": 120, "errors": 0,
+            "p50": 11.2, "p95": 19.8, "p99": 31.0,   # milliseconds
+            "queries": 4.0, "max_queries": 4
+        },
+        ...
+    }
+"""
+
+import json
+import math
+import random
+import threading
+import time
+import traceback
+from collections import defaultdict
+
+from django.db import connection
+from rest_framework.test import APIClient
+
+from organizations.models import Membership
+from organizations.synthetic import synthetic_orgs
+from .journeys import get_journeys
+
+# Host for benchmark requests; must be in ALLOWED_HOSTS
+HOST = 'localhost'
+
+
+class JourneyError(Exception):
+    """A journey request returned an unexpected status."""
+
+
+class QueryCounter:
+    """Database execute wrapper counting queries on one connection."""
+
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+class Recorder:
+    """Thread-safe collection of request samples."""
+
+    def __init__(self):
+        self.samples = defaultdict(list)
+        self.errors = defaultdict(int)
+        self.failures = []
+        self._lock = threading.Lock()
+
+    def add(self, name, seconds, queries, ok):
+        with self._lock:
+            self.samples[name].append((seconds, queries))
+            if not ok:
+                self.errors[name] += 1
+
+    def fail(self, journey, error):
+        with self._lock:
+            self.failures.append((journey, error))
+
+
+class Actor:
+    """An API client authenticated as one member, recording its requests."""
+
+    def __init__(self, user, recorder, counter):
+        self.user = user
+        self.recorder = recorder
+        self.counter = counter
+        self.client = APIClient(SERVER_NAME=HOST)
+        self.client.force_authenticate(user=user)
+
+    def request(self, method, route, data=None, query=None, expect=(200, 201), **params):
+        """
+        Send a request and record it under "<METHOD> <route>".
+
+        Args:
+            method: 'get' or 'post'
+            route: Path template, e.g. '/api/help-posts/{id}/'
+            data: JSON body for POST
+            query: Query string parameters
+            expect: Status codes that count as success
+            **params: Values for the route's placeholders
+
+        Returns:
+            The response data
+        """
+        path = route.format(**params)
+        self.counter.count = 0
+        started = time.perf_counter()
+        if method == 'get':
+            response = self.client.get(path, query)
+        else:
+            response = self.client.post(path, data, format='json')
+        elapsed = time.perf_counter() - started
+
+        ok = response.status_code in expect
+        self.recorder.add(f'{method.upper()} {route}', elapsed, self.counter.count, ok)
+        if not ok:
+            raise JourneyError(f'{method.upper()} {path} returned {response.status_code}')
+        return response.data
+
+    def get(self, route, query=None, **params):
+        return self.request('get', route, query=query, **params)
+
+    def post(self, route, data=None, **params):
+        return self.request('post', route, data=data, **params)
+
+
+class Session:
+    """What a journey sees: one org, its members and a random generator."""
+
+    def __init__(self, org, members, moderators, rng, recorder, counter):
+        self.org = org
+        self.members = members
+        self.moderators = moderators
+        self.rng = rng
+        self._recorder = recorder
+        self._counter = counter
+
+    def actor(self, user):
+        return Actor(user, self._recorder, self._counter)
+
+    def member(self, exclude=()):
+        """A random active member other than those in exclude."""
+        excluded = {user.pk for user in exclude}
+        candidates = [user for user in self.members if user.pk not in excluded]
+        return self.actor(self.rng.choice(candidates))
+
+    def moderator(self):
+        return self.actor(self.rng.choice(self.moderators))
+
+
+def load_community(prefix):
+    """
+    Load the orgs to benchmark against with their active members.
+
+    Returns:
+        A list of (org, members, moderators), skipping orgs too small to use
+    """
+    memberships = Membership.objects.filter(
+        org__in=synthetic_orgs(prefix),
+        org__is_active=True,
+        status='active',
+    ).select_related('org', 'user').order_by('org__slug', 'created_at')
+
+    orgs = {}
+    for membership in memberships:
+        org, members, moderators = orgs.setdefault(membership.org_id, (membership.org, [], []))
+        members.append(membership.user)
+        if membership.role in ('org_admin', 'moderator'):
+            moderators.append(membership.user)
+    return [entry for entry in orgs.values() if len(entry[1]) >= 3 and entry[2]]
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile of a non-empty list."""
+    ordered = sorted(values)
+    index = max(0, math.ceil(pct / 100 * len(ordered)) - 1)
+    return ordered[index]
+
+
+def summarize(recorder):
+    """Reduce recorded samples to per-endpoint statistics."""
+    results = {}
+    for name, samples in sorted(recorder.samples.items()):
+        latencies = [seconds * 1000 for seconds, _ in samples]
+        queries = [count for _, count in samples]
+        results[name] = {
+            'count': len(samples),
+            'errors': recorder.errors.get(name, 0),
+            'p50': round(percentile(latencies, 50), 2),
+            'p95': round(percentile(latencies, 95), 2),
+            'p99': round(percentile(latencies, 99), 2),
+            'queries': round(sum(queries) / len(queries), 2),
+            'max_queries': max(queries),
+        }
+    return results
+
+
+def compare(results, baseline, latency_threshold=0.25, min_latency_delta=2.0, min_samples=20):
+    """
+    Find regressions against a baseline.
+
+    An endpoint regresses if:
+
+    - its p95 grew by more than latency_threshold and by at least
+      min_latency_delta ms (checked only with min_samples requests in
+      both runs, to ignore noise), or
+    - it makes more queries per request on average, by more than 10%
+      and half a query (list sizes vary a little between runs).
+
+    Returns:
+        A list of human-readable regression descriptions
+    """
+    regressions = []
+    for name, current in sorted(results.items()):
+        previous = baseline.get(name)
+        if previous is None:
+            continue
+        limit = max(previous['p95'] * (1 + latency_threshold), previous['p95'] + min_latency_delta)
+        sampled = min(current['count'], previous['count']) >= min_samples
+        if sampled and current['p95'] > limit:
+            regressions.append(
+                f'{name}: p95 {current["p95"]:.1f}ms (baseline {previous["p95"]:.1f}ms)'
+            )
+        if current['queries'] > max(previous['queries'] * 1.1, previous['queries'] + 0.5):
+            regressions.append(
+                f'{name}: {current["queries"]:g} queries/request (baseline {previous["queries"]:g})'
+            )
+    return regressions
+
+
+def load_baseline(path):
+    """
+    Read a baseline written by save_results().
+
+    Returns:
+        A tuple of (endpoint results, run options)
+    """
+    with open(path) as f:
+        data = json.load(f)
+    return data['endpoints'], data.get('options', {})
+
+
+def save_results(path, results, options=None):
+    with open(path, 'w') as f:
+        json.dump({'options': options or {}, 'endpoints': results}, f, indent=2, sort_keys=True)
+        f.write('\n')
+
+
+def run(community, users=10, duration=None, iterations=None, seed=1, journeys=None):
+    """
+    Run virtual users until duration seconds pass or each has run iterations journeys.
+
+    Args:
+        community: Output of load_community()
+        users: Number of concurrent virtual users
+        duration: Seconds to run for
+        iterations: Journeys per virtual user (used when duration is None)
+        seed: Random seed; virtual user i uses seed + i
+        journeys: Journey names to run (default: all)
+
+    Returns:
+        The Recorder
+    """
+    registered = get_journeys()
+    names = sorted(journeys or registered)
+    weights = [registered[name][1] for name in names]
+    recorder = Recorder()
+    deadline = time.monotonic() + duration if duration else None
+
+    def virtual_user(index):
+        rng = random.Random(seed + index)
+        counter = QueryCounter()
+        done = 0
+        try:
+            with connection.execute_wrapper(counter):
+                while True:
+                    if deadline is not None and time.monotonic() >= deadline:
+                        break
+                    if deadline is None and done >= iterations:
+                        break
+                    name = rng.choices(names, weights)[0]
+                    org, members, moderators = rng.choice(community)
+                    session = Session(org, members, moderators, rng, recorder, counter)
+                    try:
+                        registered[name][0](session)
+                    except Exception as e:
+                        detail = str(e) if isinstance(e, JourneyError) else traceback.format_exc(limit=3)
+                        recorder.fail(name, detail)
+                    done += 1
+        finally:
+            connection.close()
+
+    threads = [
+        threading.Thread(target=virtual_user, args=(index,), name=f'vu-{index}')
+        for index in range(users)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return recorder
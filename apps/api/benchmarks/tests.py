@@ -0,0 +1,225 @@
+# KapwaNet - Community Platform for Dignified Mutual Aid
+# SPDX-License-Identifier: AGPL-3.0-or-later
+
+"""
+Tests for the API benchmark harness.
+"""
+
+import os
+import tempfile
+from unittest import skipUnless
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection
+from django.test import SimpleTestCase, TestCase, TransactionTestCase
+
+from organizations.synthetic import CommunityGenerator
+from .memory import bytes_per_row, get_memory_cases, run_memory
+from .plans import PlanContext, capture, check_plans, compare_plans, get_plan_cases, problems, shape
+from .runner import (
+    compare, load_baseline, load_community, percentile, run, save_results, summarize
+)
+
+# A trimmed EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) plan
+PLAN = {
+    'Node Type': 'Sort',
+    'Sort Method': 'external merge',
+    'Sort Space Type': 'Disk',
+    'Sort Space Used': 2048,
+    'Plans': [{
+        'Node Type': 'Hash Join',
+        'Plans': [
+            {
+                'Node Type': 'Seq Scan', 'Relation Name': 'help_posts',
+                'Actual Rows': 40, 'Rows Removed by Filter': 4960, 'Actual Loops': 1,
+            },
+            {
+                'Node Type': 'Hash', 'Hash Batches': 4,
+                'Plans': [{
+                    'Node Type': 'Index Scan', 'Relation Name': 'users',
+                    'Index Name': 'users_pkey', 'Actual Rows': 40, 'Actual Loops': 1,
+                }],
+            },
+        ],
+    }],
+}
+
+
+class StatisticsTests(SimpleTestCase):
+    """Tests for percentiles and baseline comparison."""
+
+    def test_percentile(self):
+        """Test nearest-rank percentiles."""
+        values = list(range(1, 101))
+        self.assertEqual(percentile(values, 50), 50)
+        self.assertEqual(percentile(values, 95), 95)
+        self.assertEqual(percentile(values, 99), 99)
+        self.assertEqual(percentile([7], 99), 7)
+
+    def test_compare_flags_regressions(self):
+        """Test latency and query-count regressions against a baseline."""
+        baseline = {
+            'GET /api/help-posts/': {'count': 100, 'p95': 20.0, 'queries': 3},
+            'GET /api/threads/': {'count': 100, 'p95': 20.0, 'queries': 4},
+            'GET /api/reports/': {'count': 5, 'p95': 10.0, 'queries': 4},
+        }
+        results = {
+            'GET /api/help-posts/': {'count': 100, 'p95': 30.0, 'queries': 3},
+            'GET /api/threads/': {'count': 100, 'p95': 21.0, 'queries': 9},
+            # Too few samples to judge latency
+            'GET /api/reports/': {'count': 5, 'p95': 50.0, 'queries': 4},
+            'GET /api/item-posts/': {'count': 100, 'p95': 500.0, 'queries': 40},
+        }
+        self.assertEqual(compare(results, baseline), [
+            'GET /api/help-posts/: p95 30.0ms (baseline 20.0ms)',
+            'GET /api/threads/: 9 queries/request (baseline 4)',
+        ])
+
+
+class BaselineTests(SimpleTestCase):
+    """Tests for storing and requiring baselines."""
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.missing = os.path.join(directory.name, 'missing.json')
+        self.path = os.path.join(directory.name, 'baseline.json')
+
+    def test_results_round_trip_with_options(self):
+        """Test that a baseline keeps the options it was recorded with."""
+        results = {'GET /api/threads/': {'count': 40, 'p95': 20.0, 'queries': 4}}
+        save_results(self.path, results, {'users': 10, 'seed': 1})
+        self.assertEqual(load_baseline(self.path), (results, {'users': 10, 'seed': 1}))
+
+    def test_missing_benchmark_baseline_fails(self):
+        """Test that benchmarks refuse to pass without a baseline to compare with."""
+        with self.assertRaisesMessage(CommandError, 'No baseline'):
+            call_command('run_benchmarks', '--baseline', self.missing)
+
+    def test_missing_plan_baseline_fails(self):
+        """Test that plan checks refuse to pass without a baseline to compare with."""
+        with self.assertRaisesMessage(CommandError, 'No baseline'):
+            call_command('check_query_plans', '--baseline', self.missing)
+
+
+class PlanAnalysisTests(SimpleTestCase):
+    """Tests for reading EXPLAIN output."""
+
+    def test_shape(self):
+        """Test that the shape names node types, indexes and tables."""
+        self.assertEqual(shape(PLAN), [
+            'Sort',
+            '  Hash Join',
+            '    Seq Scan on help_posts',
+            '    Hash',
+            '      Index Scan using users_pkey on users',
+        ])
+
+    def test_problems(self):
+        """Test that large seq scans and disk spills are flagged."""
+        self.assertEqual(problems(PLAN, seq_scan_rows=1000), [
+            'Sort spilled to disk (2048 kB)',
+            'Seq Scan on help_posts read 5000 rows',
+            'Hash spilled to disk in 4 batches',
+        ])
+        self.assertNotIn(
+            'Seq Scan on help_posts read 5000 rows', problems(PLAN, seq_scan_rows=10000)
+        )
+
+    def test_compare_plans(self):
+        """Test that changed shapes and queries are reported, with a diff."""
+        baseline = {
+            'help_posts_open #1': {'sql': 'SELECT a', 'shape': ['Index Scan on help_posts']},
+            'threads #1': {'sql': 'SELECT b', 'shape': ['Seq Scan on threads']},
+            'threads #2': {'sql': 'SELECT c', 'shape': ['Result']},
+        }
+        results = {
+            'help_posts_open #1': {'sql': 'SELECT a', 'shape': ['Seq Scan on help_posts']},
+            'threads #1': {'sql': 'SELECT b2', 'shape': ['Seq Scan on threads']},
+            'threads #2': {'sql': 'SELECT c', 'shape': ['Result']},
+            'sync #1': {'sql': 'SELECT d', 'shape': ['Result']},
+        }
+        changes = compare_plans(results, baseline)
+        self.assertEqual(len(changes), 2)
+        self.assertIn('-Index Scan on help_posts\n+Seq Scan on help_posts', changes[0])
+        self.assertEqual(changes[1], 'threads #1: query changed')
+
+
+class PlanCaptureTests(TestCase):
+    """Tests for capturing the queries behind each plan case."""
+
+    def setUp(self):
+        CommunityGenerator(
+            orgs=1, members=12, help_posts=5, item_posts=5, messages=3, reports=2, prefix='bench'
+        ).generate()
+        self.context = PlanContext(*load_community('bench')[0])
+
+    def test_cases_capture_selects(self):
+        """Test that every case's request succeeds and issues SELECTs."""
+        for name, case in get_plan_cases().items():
+            if name == 'message_search' and connection.vendor != 'postgresql':
+                continue
+            with self.subTest(case=name):
+                queries = capture(case, self.context)
+                self.assertTrue(queries)
+                self.assertTrue(all(sql.lstrip().upper().startswith(('SELECT', 'WITH')) for sql, _ in queries))
+
+    @skipUnless(connection.vendor == 'postgresql', 'EXPLAIN options are PostgreSQL-specific')
+    def test_check_plans(self):
+        """Test explaining the captured queries."""
+        results = check_plans(self.context, cases=['help_posts_open', 'thread_messages'])
+        self.assertTrue(results)
+        for result in results.values():
+            self.assertTrue(result['shape'])
+
+
+class MemoryTests(TestCase):
+    """Tests for the list endpoint memory benchmarks."""
+
+    def test_bytes_per_row(self):
+        """Test the per-row slope, with a single size and without rows."""
+        self.assertAlmostEqual(bytes_per_row([(10, 2000), (20, 3000), (40, 5000)]), 100.0)
+        self.assertEqual(bytes_per_row([(10, 2000), (10, 4000)]), 400.0)
+        self.assertEqual(bytes_per_row([(0, 1000)]), 0.0)
+
+    def test_run_memory(self):
+        """Test measuring every case against two dataset sizes."""
+        contexts = []
+        for size in (4, 12):
+            prefix = f'memory{size}'
+            CommunityGenerator(
+                orgs=1, members=10, help_posts=size, item_posts=size, messages=2,
+                reports=size, seed=size, prefix=prefix
+            ).generate()
+            contexts.append(PlanContext(*load_community(prefix)[0]))
+
+        results = run_memory(contexts, repeat=1)
+
+        self.assertEqual(set(results), set(get_memory_cases()))
+        small, large = results['help_posts']['points']
+        self.assertLess(small['rows'], large['rows'])
+        self.assertGreater(large['peak'], 0)
+        self.assertGreater(results['help_posts']['bytes_per_row'], 0)
+
+
+class BenchmarkRunTests(TransactionTestCase):
+    """Tests for running journeys (in a thread, hence TransactionTestCase)."""
+
+    def test_journeys_run_cleanly(self):
+        """Test that every journey completes against a synthetic community."""
+        CommunityGenerator(
+            orgs=1, members=12, help_posts=5, item_posts=5, messages=3, reports=2, prefix='bench'
+        ).generate()
+        community = load_community('bench')
+
+        recorder = run(community, users=1, iterations=15, seed=3)
+        results = summarize(recorder)
+
+        self.assertEqual(recorder.failures, [])
+        self.assertIn('POST /api/help-posts/{id}/accept-match/', results)
+        self.assertIn('POST /api/item-posts/{id}/approve-reservation/', results)
+        stats = results['GET /api/threads/unread_counts/']
+        self.assertEqual(stats['errors'], 0)
+        self.assertGreater(stats['queries'], 0)
+        self.assertLessEqual(stats['p50'], stats['p95'])
@@ -0,0 +1,43 @@
+# KapwaNet - Community Platform for Dignified Mutual Aid
+# SPDX-License-Identifier: AGPL-3.0-or-later
+
+"""
+Admin configuration for domain events.
+"""
+
+from django.contrib import admin
+
+from .models import ConsumerOffset, OutboxEvent, SkippedEvent
+
+
+@admin.register(OutboxEvent)
+class OutboxEventAdmin(admin.ModelAdmin):
+    """Admin configuration for OutboxEvent model."""
+
+    list_display = ['id', 'event_type', 'org', 'aggregate_type', 'aggregate_id', 'txid', 'created_at']
+    list_filter = ['event_type', 'org']
+    search_fields = ['aggregate_id']
+    readonly_fields = [
+        'id', 'event_type', 'org', 'aggregate_type', 'aggregate_id', 'payload', 'txid', 'created_at'
+    ]
+
+
+@admin.register(ConsumerOffset)
+class ConsumerOffsetAdmin(admin.ModelAdmin):
+    """Admin configuration for ConsumerOffset model."""
+
+    list_display = ['name', 'last_txid', 'last_event_id', 'failures', 'updated_at']
+    readonly_fields = ['updated_at']
+
+
+@admin.register(SkippedEvent)
+class SkippedEventAdmin(admin.ModelAdmin):
+    """Admin configuration for SkippedEvent model."""
+
+    list_display = ['consumer', 'event_id', 'event_type', 'aggregate_id', 'created_at']
+    list_filter = ['consumer', 'event_type']
+    search_fields = ['aggregate_id']
+    readonly_fields = [
+        'consumer', 'event_id', 'event_type', 'org_id', 'aggregate_type', 'aggregate_id',
+        'payload', 'error', 'created_at',
+    ]
@@ -0,0 +1,22 @@
+# KapwaNet - Community Platform for Dignified Mutual Aid
+# SPDX-License-Identifier: AGPL-3.0-or-later
+
+"""
+App configuration for domain events.
+
+This module records state changes in a transactional outbox and relays
+them to in-process consumers.
+"""
+
+from django.apps import AppConfig
+from django.utils.module_loading import autodiscover_modules
+
+
+class EventsConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'events'
+    verbose_name = 'Domain Events'
+
+    def ready(self):
+        # Register the @consumer functions in each app's consumers.py
+        autodiscover_modules('consumers')
@@ -0,0 +1,77 @@
+# KapwaNet - Community Platform for Dignified Mutual Aid
+# SPDX-License-Identifier: AGPL-3.0-or-later
+
+"""
+Management command to relay outbox events to consumers.
+"""
+
+import signal
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from events.outbox import prune_events, relay, relay_forever
+
+
+class Command(BaseCommand):
+    help = 'Deliver outbox events to registered consumers'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            help='Events per consumer batch (default: EVENTS_BATCH_SIZE)',
+        )
+        parser.add_argument(
+            '--poll-interval',
+            type=float,
+            default=1.0,
+            help='Seconds to wait when no events are pending',
+        )
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Relay until every consumer is caught up, then exit',
+        )
+        parser.add_argument(
+            '--prune-days',
+            type=int,
+            help='Delete processed events older than this many days, then exit',
+        )
+
+    def handle(self, *args, **options):
+        if options['prune_days'] is not None:
+            before = timezone.now() - timedelta(days=options['prune_days'])
+            deleted = prune_events(before)
+            self.stdout.write(self.style.SUCCESS(f'Deleted {deleted} events.'))
+            return
+
+        if options['once']:
+            totals = {}
+            while True:
+                counts = relay(options['batch_size'])
+                for name, count in counts.items():
+                    totals[name] = totals.get(name, 0) + count
+                if not any(counts.values()):
+                    break
+            for name, count in totals.items():
+                self.stdout.write(self.style.SUCCESS(f'{name}: {count} events'))
+            return
+
+        # Finish the current batch on SIGTERM/SIGINT, then exit
+        stopping = []
+
+        def stop(signum, frame):
+            stopping.append(signum)
+
+        signal.signal(signal.SIGTERM, stop)
+        signal.signal(signal.SIGINT, stop)
+
+        self.stdout.write(self.style.SUCCESS('Event relay started.'))
+        relay_forever(
+            batch_size=options['batch_size'],
+            poll_interval=options['poll_interval'],
+            should_stop=lambda: bool(stopping),
+        )
+        self.stdout.write(self.style.SUCCESS('Event relay stopped.'))
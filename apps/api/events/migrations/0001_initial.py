@@ -0,0 +1,52 @@
+# KapwaNet - Community Platform for Dignified Mutual Aid
+# SPDX-License-Identifier: AGPL-3.0-or-later
+
+import django.core.serializers.json
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('organizations', '0007_add_membership_is_banned'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ConsumerOffset',
+            fields=[
+                ('name', models.CharField(help_text='Registered consumer name', max_length=100, primary_key=True, serialize=False)),
+                ('last_event_id', models.BigIntegerField(default=0, help_text='Id of the last event processed')),
+                ('last_error', models.TextField(blank=True, help_text='Error from the last failed batch, cleared on success')),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'consumer offset',
+                'verbose_name_plural': 'consumer offsets',
+                'db_table': 'event_consumer_offsets',
+            },
+        ),
+        migrations.CreateModel(
+            name='OutboxEvent',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('event_type', models.CharField(help_text="Event name, e.g. 'help_match.accepted'", max_length=100)),
+                ('aggregate_type', models.CharField(help_text="Model the event is about, e.g. 'help.helpmatch'", max_length=100)),
+                ('aggregate_id', models.CharField(help_text='Primary key of the record the event is about', max_length=64)),
+                ('payload', models.JSONField(default=dict, encoder=django.core.serializers.json.DjangoJSONEncoder, help_text='Event details')),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('org', models.ForeignKey(blank=True, help_text='The organization the event belongs to', null=True, on_delete=django.db.models.deletion.CASCADE, related_name='outbox_events', to='organizations.organization')),
+            ],
+            options={
+                'verbose_name': 'outbox event',
+                'verbose_name_plural': 'outbox events',
+                'db_table': 'outbox_events',
+                'ordering': ['id'],
+                'indexes': [models.Index(fields=['created_at'], name='outbox_even_created_dc5a3b_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,58 @@
+# KapwaNet - Community Platform for Dignified Mutual Aid
+# SPDX-License-Identifier: AGPL-3.0-or-later
+
+import django.core.serializers.json
+import events.models
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SkippedEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('consumer', models.CharField(help_text='Consumer that skipped the event', max_length=100)),
+                ('event_id', models.BigIntegerField(help_text='Id of the skipped event')),
+                ('event_type', models.CharField(max_length=100)),
+                ('org_id', models.UUIDField(blank=True, null=True)),
+                ('aggregate_type', models.CharField(max_length=100)),
+                ('aggregate_id', models.CharField(max_length=64)),
+                ('payload', models.JSONField(default=dict, encoder=django.core.serializers.json.DjangoJSONEncoder)),
+                ('error', models.TextField(help_text='Error from the last attempt')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'verbose_name': 'skipped event',
+                'verbose_name_plural': 'skipped events',
+                'db_table': 'event_skipped',
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.AddField(
+            model_name='consumeroffset',
+            name='failures',
+            field=models.PositiveIntegerField(default=0, help_text='Consecutive failed attempts, reset on success'),
+        ),
+        migrations.AddField(
+            model_name='consumeroffset',
+            name='last_txid',
+            field=models.BigIntegerField(default=0, help_text='Transaction id of the last event processed'),
+        ),
+        migrations.AddField(
+            model_name='outboxevent',
+            name='txid',
+            field=models.BigIntegerField(db_default=events.models.TransactionId(), help_text='Id of the transaction that published the event (PostgreSQL)'),
+        ),
+        # Existing events keep their id order behind offsets at txid 0
+        migrations.RunSQL('UPDATE outbox_events SET txid = 0', migrations.RunSQL.noop),
+        migrations.AddIndex(
+            model_name='outboxevent',
+            index=models.Index(fields=['txid', 'id'], name='outbox_even_txid_3205c4_idx'),
+        ),
+    ]
@@ -0,0 +1,183 @@
+# KapwaNet - Community Platform for Dignified Mutual Aid
+# SPDX-License-Identifier: AGPL-3.0-or-later
+
+"""
+Models for the domain event outbox.
+"""
+
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connections, models
+from django.utils import timezone
+
+
+class TransactionId(models.Func):
+    """
+    Id of the inserting transaction on PostgreSQL (pg_current_xact_id()),
+    0 on other databases.
+    """
+
+    output_field = models.BigIntegerField()
+
+    def as_sql(self, compiler, connection, **extra_context):
+        return '0', []
+
+    def as_postgresql(self, compiler, connection, **extra_context):
+        return '(pg_current_xact_id()::text::bigint)', []
+
+
+class OutboxEventQuerySet(models.QuerySet):
+    """QuerySet for outbox events."""
+
+    def visible(self, now=None):
+        """
+        Filter to events whose position can no longer be taken by a
+        transaction that has not committed yet.
+
+        Event ids are allocated when rows are inserted, not when they
+        commit, so a slow transaction can commit a lower id after a higher
+        one. Consumers therefore read in (txid, id) order, and on
+        PostgreSQL only events of transactions older than every running
+        one (pg_snapshot_xmin) are visible: any event committed later has
+        a txid at least that high, so it sorts after everything already
+        relayed. Other databases serialize writes, so ids follow commit
+        order; events younger than EVENTS_RELAY_LAG seconds are still held
+        back there.
+        """
+        if connections[self.db].vendor == 'postgresql':
+            return self.extra(where=[
+                'outbox_events.txid < pg_snapshot_xmin(pg_current_snapshot())::text::bigint'
+            ])
+        now = now or timezone.now()
+        return self.filter(created_at__lte=now - timedelta(seconds=settings.EVENTS_RELAY_LAG))
+
+    def after(self, txid, event_id):
+        """Filter to events after a (txid, id) position, in relay order."""
+        return self.filter(
+            models.Q(txid__gt=txid) | models.Q(txid=txid, id__gt=event_id)
+        ).order_by('txid', 'id')
+
+
+class OutboxEvent(models.Model):
+    """
+    A domain event, written in the same transaction as the change it records.
+
+    Unlike most models this uses an auto-incrementing primary key: the id
+    gives events a total order, and consumers track their position by it.
+    """
+
+    id = models.BigAutoField(primary_key=True)
+    event_type = models.CharField(
+        max_length=100,
+        help_text="Event name, e.g. 'help_match.accepted'"
+    )
+    org = models.ForeignKey(
+        'organizations.Organization',
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name='outbox_events',
+        help_text="The organization the event belongs to"
+    )
+    aggregate_type = models.CharField(
+        max_length=100,
+        help_text="Model the event is about, e.g. 'help.helpmatch'"
+    )
+    aggregate_id = models.CharField(
+        max_length=64,
+        help_text="Primary key of the record the event is about"
+    )
+    payload = models.JSONField(
+        default=dict,
+        encoder=DjangoJSONEncoder,
+        help_text="Event details"
+    )
+    created_at = models.DateTimeField(default=timezone.now)
+    txid = models.BigIntegerField(
+        db_default=TransactionId(),
+        help_text="Id of the transaction that published the event (PostgreSQL)"
+    )
+
+    objects = OutboxEventQuerySet.as_manager()
+
+    class Meta:
+        db_table = 'outbox_events'
+        ordering = ['id']
+        verbose_name = 'outbox event'
+        verbose_name_plural = 'outbox events'
+        indexes = [
+            models.Index(fields=['created_at']),
+            models.Index(fields=['txid', 'id']),
+        ]
+
+    def __str__(self):
+        return f"{self.event_type} #{self.id}"
+
+
+class ConsumerOffset(models.Model):
+    """
+    The (txid, id) position of the last outbox event a consumer has processed.
+    """
+
+    name = models.CharField(
+        max_length=100,
+        primary_key=True,
+        help_text="Registered consumer name"
+    )
+    last_txid = models.BigIntegerField(
+        default=0,
+        help_text="Transaction id of the last event processed"
+    )
+    last_event_id = models.BigIntegerField(
+        default=0,
+        help_text="Id of the last event processed"
+    )
+    last_error = models.TextField(
+        blank=True,
+        help_text="Error from the last failed batch, cleared on success"
+    )
+    failures = models.PositiveIntegerField(
+        default=0,
+        help_text="Consecutive failed attempts, reset on success"
+    )
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'event_consumer_offsets'
+        verbose_name = 'consumer offset'
+        verbose_name_plural = 'consumer offsets'
+
+    def __str__(self):
+        return f"{self.name} at #{self.last_event_id}"
+
+
+class SkippedEvent(models.Model):
+    """
+    An event a consumer gave up on after EVENTS_MAX_ATTEMPTS failures.
+
+    The event is copied, since processed events are pruned from the outbox.
+    """
+
+    consumer = models.CharField(
+        max_length=100,
+        help_text="Consumer that skipped the event"
+    )
+    event_id = models.BigIntegerField(help_text="Id of the skipped event")
+    event_type = models.CharField(max_length=100)
+    org_id = models.UUIDField(null=True, blank=True)
+    aggregate_type = models.CharField(max_length=100)
+    aggregate_id = models.CharField(max_length=64)
+    payload = models.JSONField(default=dict, encoder=DjangoJSONEncoder)
+    error = models.TextField(help_text="Error from the last attempt")
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = 'event_skipped'
+        ordering = ['-created_at']
+        verbose_name = 'skipped event'
+        verbose_name_plural = 'skipped events'
+
+    def __str__(self):
+        return f"{self.consumer} skipped {self.event_type} #{self.event_id}"
@@ -0,0 +1,231 @@
+# KapwaNet - Community Platform for Dignified Mutual Aid
+# SPDX-License-Identifier: AGPL-3.0-or-later
+
+"""
+Transactional outbox for domain events.
+
+State transitions publish an event in the same transaction as the change:
+
+    with transaction.atomic():
+        match.status = 'accepted'
+        match.save()
+        publish('help_match.accepted', match, {'helper_user_id': ...})
+
+so an event exists if and only if the change committed. Consumers
+register in an app's consumers.py:
+
+    from events.outbox import consumer
+
+    @consumer('analytics', event_types=['help_post.created'])
+    def record(events):
+        ...
+
+and are called by the relay (`manage.py relay_events`) with batches of
+events in (txid, id) order; see OutboxEventQuerySet.visible for why that
+order cannot skip an event committed late. Each batch runs in one
+transaction together with the update of the consumer's offset, and the
+offset row is locked with SKIP LOCKED, so with any number of relay
+processes each event's effects are committed once per consumer.
+
+A failing batch rolls back and is retried on the next pass, one event at
+a time, so a single bad event is isolated. An event that still fails
+after EVENTS_MAX_ATTEMPTS attempts is copied to SkippedEvent and the
+consumer moves past it, rather than stalling forever. Effects are
+therefore at most once for skipped events and exactly once otherwise.
+PostgreSQL holds events back while any transaction older than theirs is
+running, so a long-running write transaction delays the relay.
+"""
+
+import logging
+import time
+import traceback
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F, Q
+
+from .models import ConsumerOffset, OutboxEvent, SkippedEvent
+
+logger = logging.getLogger(__name__)
+
+# Event types published by the apps
+EVENT_TYPES = [
+    'help_post.created',
+    'help_match.accepted',
+    'item_post.created',
+    'item_reservation.approved',
+    'item_reservation.completed',
+    'report.filed',
+    'membership.suspended',
+]
+
+_consumers = {}
+
+
+def publish(event_type, instance, payload=None):
+    """
+    Record a domain event about a model instance.
+
+    Call inside the transaction that makes the change.
+
+    Args:
+        event_type: Event name, e.g. 'help_match.accepted'
+        instance: The record the event is about (its org_id is recorded)
+        payload: JSON-serializable event details
+
+    Returns:
+        The created OutboxEvent
+    """
+    return OutboxEvent.objects.create(
+        event_type=event_type,
+        org_id=getattr(instance, 'org_id', None),
+        aggregate_type=instance._meta.label_lower,
+        aggregate_id=str(instance.pk),
+        payload=payload or {},
+    )
+
+
+def consumer(name, event_types=None):
+    """
+    Register a function as an event consumer.
+
+    Args:
+        name: Unique consumer name, used for its offset
+        event_types: Event types to receive (default: all)
+    """
+    def decorator(func):
+        _consumers[name] = (func, set(event_types) if event_types else None)
+        return func
+    return decorator
+
+
+def get_consumers():
+    """Get the registered consumers as {name: (func, event_types)}."""
+    return dict(_consumers)
+
+
+def relay_consumer(name, batch_size=None):
+    """
+    Deliver the next batch of events to one consumer.
+
+    Returns:
+        The number of events the consumer's offset advanced by, or 0 if
+        another relay holds the consumer or it is up to date
+    """
+    func, event_types = _consumers[name]
+    batch_size = batch_size or settings.EVENTS_BATCH_SIZE
+    ConsumerOffset.objects.get_or_create(name=name)
+    events = []
+
+    try:
+        with transaction.atomic():
+            offset = ConsumerOffset.objects.select_for_update(
+                skip_locked=True
+            ).filter(name=name).first()
+            if offset is None:
+                return 0
+            if offset.failures:
+                # Retry one event at a time to isolate the one failing
+                batch_size = 1
+
+            events = list(
+                OutboxEvent.objects.visible()
+                .after(offset.last_txid, offset.last_event_id)[:batch_size]
+            )
+            if not events:
+                return 0
+
+            matching = [e for e in events if event_types is None or e.event_type in event_types]
+            if matching:
+                func(matching)
+
+            offset.last_txid = events[-1].txid
+            offset.last_event_id = events[-1].id
+            offset.last_error = ''
+            offset.failures = 0
+            offset.save(update_fields=[
+                'last_txid', 'last_event_id', 'last_error', 'failures', 'updated_at',
+            ])
+            return len(events)
+    except Exception:
+        error = traceback.format_exc(limit=5)
+        logger.error('Event consumer %s failed: %s', name, error)
+        ConsumerOffset.objects.filter(name=name).update(
+            last_error=error, failures=F('failures') + 1
+        )
+        if len(events) == 1:
+            return skip_failing_event(name, events[0], error)
+        return 0
+
+
+def skip_failing_event(name, event, error):
+    """
+    Move a consumer past an event once it has failed EVENTS_MAX_ATTEMPTS times.
+
+    Returns:
+        1 if the event was skipped, else 0
+    """
+    with transaction.atomic():
+        moved = ConsumerOffset.objects.filter(
+            name=name, failures__gte=settings.EVENTS_MAX_ATTEMPTS
+        ).filter(
+            # Unless another relay moved the offset meanwhile
+            last_txid__lte=event.txid
+        ).exclude(last_txid=event.txid, last_event_id__gte=event.id).update(
+            last_txid=event.txid, last_event_id=event.id, failures=0
+        )
+        if not moved:
+            return 0
+        SkippedEvent.objects.create(
+            consumer=name,
+            event_id=event.id,
+            event_type=event.event_type,
+            org_id=event.org_id,
+            aggregate_type=event.aggregate_type,
+            aggregate_id=event.aggregate_id,
+            payload=event.payload,
+            error=error,
+        )
+    logger.error('Event consumer %s skipped event %s after repeated failures', name, event.id)
+    return 1
+
+
+def relay(batch_size=None):
+    """
+    Deliver one batch of events to every consumer.
+
+    Returns:
+        {consumer name: events advanced}
+    """
+    return {name: relay_consumer(name, batch_size) for name in sorted(_consumers)}
+
+
+def relay_forever(batch_size=None, poll_interval=1.0, should_stop=lambda: False):
+    """Relay events until should_stop() returns True, sleeping when idle."""
+    while not should_stop():
+        if not any(relay(batch_size).values()):
+            time.sleep(poll_interval)
+
+
+def prune_events(before):
+    """
+    Delete events created before a time that every consumer has processed.
+
+    Returns:
+        The number of events deleted
+    """
+    names = list(_consumers)
+    positions = list(
+        ConsumerOffset.objects.filter(name__in=names).values_list('last_txid', 'last_event_id')
+    )
+    events = OutboxEvent.objects.filter(created_at__lt=before)
+    if names:
+        if len(positions) < len(names):
+            # A consumer that has never run has processed nothing
+            return 0
+        txid, event_id = min(positions)
+        events = events.filter(
+            Q(txid__lt=txid) | Q(txid=txid, id__lte=event_id)
+        )
+    deleted, _ = events.delete()
+    return deleted
@@ -0,0 +1,167 @@
+# KapwaNet - Community Platform for Dignified Mutual Aid
+# SPDX-License-Identifier: AGPL-3.0-or-later
+
+"""
+Tests for the domain event outbox.
+"""
+
+from datetime import timedelta
+
+from django.db import transaction
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from help.models import HelpPost, HelpMatch
+from moderation.models import ModerationAction
+from organizations.models import Organization, Membership
+from users.models import User
+from .models import ConsumerOffset, OutboxEvent, SkippedEvent
+from .outbox import _consumers, consumer, prune_events, relay, relay_consumer
+
+received = []
+
+
+@override_settings(EVENTS_RELAY_LAG=0)
+class OutboxTests(TestCase):
+    """Tests for publishing and relaying events."""
+
+    def setUp(self):
+        received.clear()
+        self.registered = dict(_consumers)
+        _consumers.clear()
+
+        self.requester = User.objects.create_user(email='requester@example.com', password='testpass123')
+        self.helper = User.objects.create_user(email='helper@example.com', password='testpass123')
+        self.org = Organization.objects.create(name='Test Organization', slug='test-org')
+        for user in (self.requester, self.helper):
+            Membership.objects.create(org=self.org, user=user, role='member', status='active')
+
+    def tearDown(self):
+        _consumers.clear()
+        _consumers.update(self.registered)
+
+    def create_post(self):
+        return HelpPost.objects.create(
+            org=self.org, type='request', category='transportation', urgency='high',
+            title='Need a ride', description='To the clinic', created_by=self.requester
+        )
+
+    def test_transitions_publish_events(self):
+        """Test that state transitions write events in order."""
+        post = self.create_post()
+        match = HelpMatch.objects.create(org=self.org, help_post=post, helper_user=self.helper)
+        match.accept()
+        ModerationAction.suspend_user(self.org, self.requester, self.helper, 'spam')
+
+        events = list(OutboxEvent.objects.values_list('event_type', 'aggregate_id'))
+        self.assertEqual(events, [
+            ('help_post.created', str(post.id)),
+            ('help_match.accepted', str(match.id)),
+            ('membership.suspended', str(Membership.objects.get(user=self.helper).id)),
+        ])
+        self.assertEqual(OutboxEvent.objects.first().payload['urgency'], 'high')
+
+    def test_rolled_back_change_has_no_event(self):
+        """Test that an event is only kept if its transaction commits."""
+        try:
+            with transaction.atomic():
+                self.create_post()
+                raise RuntimeError('abort')
+        except RuntimeError:
+            pass
+        self.assertFalse(OutboxEvent.objects.exists())
+
+    def test_relay_delivers_each_event_once(self):
+        """Test ordered batches, event type filtering and offsets."""
+        @consumer('test-posts', event_types=['help_post.created'])
+        def handle(events):
+            received.extend(event.aggregate_id for event in events)
+
+        posts = [self.create_post() for _ in range(3)]
+        HelpMatch.objects.create(org=self.org, help_post=posts[0], helper_user=self.helper).accept()
+
+        self.assertEqual(relay_consumer('test-posts', batch_size=2), 2)
+        self.assertEqual(relay(batch_size=2), {'test-posts': 2})
+        self.assertEqual(relay(), {'test-posts': 0})
+
+        self.assertEqual(received, [str(post.id) for post in posts])
+        self.assertEqual(
+            ConsumerOffset.objects.get(name='test-posts').last_event_id,
+            OutboxEvent.objects.latest('id').id
+        )
+
+    def test_failed_batch_is_retried(self):
+        """Test that a failing consumer does not advance its offset."""
+        failures = ['boom']
+
+        @consumer('test-flaky')
+        def handle(events):
+            if failures:
+                raise RuntimeError(failures.pop())
+            received.extend(events)
+
+        self.create_post()
+        self.assertEqual(relay(), {'test-flaky': 0})
+        self.assertIn('boom', ConsumerOffset.objects.get(name='test-flaky').last_error)
+
+        self.assertEqual(relay(), {'test-flaky': 1})
+        self.assertEqual(len(received), 1)
+        self.assertEqual(ConsumerOffset.objects.get(name='test-flaky').last_error, '')
+
+    def test_relay_follows_transaction_order(self):
+        """Test that an event with a lower id from a later transaction is not skipped."""
+        consumer('test-order')(lambda events: received.extend(event.id for event in events))
+        self.create_post()
+        self.create_post()
+        late, early = OutboxEvent.objects.order_by('id')
+        # The lower id was inserted by a transaction that committed later
+        OutboxEvent.objects.filter(pk=late.pk).update(txid=20)
+        OutboxEvent.objects.filter(pk=early.pk).update(txid=10)
+
+        self.assertEqual(relay_consumer('test-order', batch_size=1), 1)
+        self.assertEqual(relay_consumer('test-order', batch_size=1), 1)
+        self.assertEqual(received, [early.id, late.id])
+        offset = ConsumerOffset.objects.get(name='test-order')
+        self.assertEqual((offset.last_txid, offset.last_event_id), (20, late.id))
+
+    @override_settings(EVENTS_MAX_ATTEMPTS=3)
+    def test_failing_event_is_skipped(self):
+        """Test that a consumer isolates and skips an event that keeps failing."""
+        @consumer('test-poison')
+        def handle(events):
+            if any(event.aggregate_id == str(bad.id) for event in events):
+                raise RuntimeError('bad event')
+            received.extend(event.aggregate_id for event in events)
+
+        bad = self.create_post()
+        good = self.create_post()
+
+        self.assertEqual(relay(), {'test-poison': 0})
+        self.assertEqual(relay(), {'test-poison': 0})
+        # Third failure: the event is recorded and skipped
+        self.assertEqual(relay(), {'test-poison': 1})
+        self.assertEqual(relay(), {'test-poison': 1})
+
+        self.assertEqual(received, [str(good.id)])
+        skipped = SkippedEvent.objects.get()
+        self.assertEqual((skipped.consumer, skipped.aggregate_id), ('test-poison', str(bad.id)))
+        self.assertIn('bad event', skipped.error)
+        offset = ConsumerOffset.objects.get(name='test-poison')
+        self.assertEqual((offset.failures, offset.last_error), (0, ''))
+
+    @override_settings(EVENTS_RELAY_LAG=60)
+    def test_recent_events_are_held_back(self):
+        """Test that events younger than the relay lag are not delivered yet."""
+        consumer('test-lag')(received.extend)
+        self.create_post()
+        self.assertEqual(relay(), {'test-lag': 0})
+
+    def test_prune_keeps_unprocessed_events(self):
+        """Test that pruning only removes events every consumer has seen."""
+        consumer('test-prune')(received.extend)
+        self.create_post()
+        later = timezone.now() + timedelta(days=1)
+
+        self.assertEqual(prune_events(later), 0)
+        relay()
+        self.assertEqual(prune_events(later), 1)
@@ -0,0 +1,29 @@
+# KapwaNet - Community Platform for Dignified Mutual Aid
+# SPDX-License-Identifier: AGPL-3.0-or-later
+
+"""
+Gunicorn configuration, loaded automatically from the working directory.
+
+Workers share Prometheus counters through files in
+PROMETHEUS_MULTIPROC_DIR (see observability/metrics.py). The directory is
+emptied when gunicorn starts, and a worker's live gauges are dropped when
+it exits.
+"""
+
+import os
+import shutil
+import tempfile
+
+multiproc_dir = os.environ.setdefault(
+    'PROMETHEUS_MULTIPROC_DIR', os.path.join(tempfile.gettempdir(), 'kapwanet-metrics')
+)
+
+
+def on_starting(server):
+    shutil.rmtree(multiproc_dir, ignore_errors=True)
+    os.makedirs(multiproc_dir)
+
+
+def child_exit(server, worker):
+    from prometheus_client import multiprocess
+    multiprocess.mark_process_dead(worker.pid)
@@ -0,0 +1,22 @@
+# KapwaNet - Community Platform for Dignified Mutual Aid
+# SPDX-License-Identifier: AGPL-3.0-or-later
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('help', '0002_add_helpmatch'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='helpmatch',
+            index=models.Index(fields=['org', 'updated_at'], name='help_matche_org_id_63bf28_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='helppost',
+            index=models.Index(fields=['org', 'updated_at'], name='help_posts_org_id_53fb17_idx'),
+        ),
+    ]
@@ -0,0 +1,26 @@
+# KapwaNet - Community Platform for Dignified Mutual Aid
+# SPDX-License-Identifier: AGPL-3.0-or-later
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('help', '0003_add_org_updated_at_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='helpmatch',
+            index=models.Index(condition=models.Q(('status', 'pending')), fields=['status'], name='help_matches_pending_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='helpmatch',
+            index=models.Index(fields=['created_at'], name='help_matche_created_ebbd42_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='helppost',
+            index=models.Index(fields=['created_at'], name='help_posts_created_47afe7_idx'),
+        ),
+    ]
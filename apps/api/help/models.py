@@ -12,7 +12,20 @@ import uuid
 
 from django.conf import settings
 from django.core.exceptions import ValidationError
-from django.db import models
+from django.db import models, transaction
+from django.db.models import Count, Q
+
+from events.outbox import publish
+
+
+class HelpPostQuerySet(models.QuerySet):
+    """QuerySet for help posts."""
+
+    def with_pending_match_count(self):
+        """Annotate each post with its number of pending matches."""
+        return self.annotate(
+            pending_match_count=Count('matches', filter=Q(matches__status='pending'))
+        )
 
 
 class HelpPost(models.Model):
@@ -128,6 +141,8 @@ class HelpPost(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = HelpPostQuerySet.as_manager()
+
     class Meta:
         db_table = 'help_posts'
         ordering = ['-created_at']
@@ -137,11 +152,29 @@ class HelpPost(models.Model):
             models.Index(fields=['org', 'status']),
             models.Index(fields=['org', 'type']),
             models.Index(fields=['org', 'category']),
+            # Delta sync scans changes per org in updated_at order
+            models.Index(fields=['org', 'updated_at']),
+            # Metrics: recent activity across orgs
+            models.Index(fields=['created_at']),
         ]
 
     def __str__(self):
         return f"{self.get_type_display()}: {self.title}"
 
+    def save(self, *args, **kwargs):
+        """Save the post, publishing help_post.created for new posts."""
+        is_new = self._state.adding
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            if is_new:
+                publish('help_post.created', self, {
+                    'type': self.type,
+                    'category': self.category,
+                    'urgency': self.urgency,
+                    'title': self.title,
+                    'created_by_id': self.created_by_id,
+                })
+
     def clean(self):
         """Validate the help post data."""
         super().clean()
@@ -288,6 +321,12 @@ class HelpMatch(models.Model):
         indexes = [
             models.Index(fields=['org', 'status']),
             models.Index(fields=['help_post', 'status']),
+            models.Index(fields=['org', 'updated_at']),
+            # Metrics: pending matches across orgs, and recent activity
+            models.Index(
+                fields=['status'], condition=Q(status='pending'), name='help_matches_pending_idx'
+            ),
+            models.Index(fields=['created_at']),
         ]
         # Prevent duplicate matches from same helper
         unique_together = [['help_post', 'helper_user']]
@@ -295,6 +334,14 @@ class HelpMatch(models.Model):
     def __str__(self):
         return f"Match: {self.helper_user.email} -> {self.help_post.title}"
 
+    def save(self, *args, **kwargs):
+        """Save the match and bump the post's updated_at."""
+        super().save(*args, **kwargs)
+        # The post's pending_match_count may have changed, so mark the post
+        # changed for list ETags and delta sync
+        from django.utils import timezone
+        HelpPost.objects.filter(pk=self.help_post_id).update(updated_at=timezone.now())
+
     @property
     def requester_user(self):
         """Get the user who created the help post."""
@@ -310,11 +357,13 @@ class HelpMatch(models.Model):
         """Check if the match is accepted."""
         return self.status == 'accepted'
 
+    @transaction.atomic
     def accept(self):
         """
         Accept this match request.
 
-        This creates a messaging thread and updates the help post status.
+        This creates a messaging thread, updates the help post status and
+        publishes help_match.accepted.
         """
         from django.utils import timezone
         from messaging.models import Thread, Message
@@ -323,10 +372,11 @@ class HelpMatch(models.Model):
             raise ValidationError(f"Cannot accept a match in '{self.status}' status.")
 
         # Decline all other pending matches for this post
+        # (bulk update bypasses auto_now, so bump updated_at for delta sync)
         HelpMatch.objects.filter(
             help_post=self.help_post,
             status='pending'
-        ).exclude(pk=self.pk).update(status='declined')
+        ).exclude(pk=self.pk).update(status='declined', updated_at=timezone.now())
 
         # Update this match
         self.status = 'accepted'
@@ -346,11 +396,18 @@ class HelpMatch(models.Model):
         self.help_post.mark_matched()
 
         # Send system message about the match
-        Message.send_system_message(
+        Message.queue_system_message(
             thread=thread,
-            body=f"Match accepted! You can now discuss the details of '{self.help_post.title}'."
+            body=f"Match accepted! You can now discuss the details of '{self.help_post.title}'.",
+            key=f'help_match:{self.id}:{thread.id}:accepted',
         )
 
+        publish('help_match.accepted', self, {
+            'help_post_id': self.help_post_id,
+            'helper_user_id': self.helper_user_id,
+            'thread_id': thread.id,
+        })
+
         return thread
 
     def decline(self):
@@ -376,9 +433,10 @@ class HelpMatch(models.Model):
             # Send system message if there's a thread
             if self.thread:
                 from messaging.models import Message
-                Message.send_system_message(
+                Message.queue_system_message(
                     thread=self.thread,
-                    body=f"{self.helper_user.get_full_name() or self.helper_user.email} has withdrawn from this match."
+                    body=f"{self.helper_user.get_full_name() or self.helper_user.email} has withdrawn from this match.",
+                    key=f'help_match:{self.id}:{self.thread_id}:withdrawn',
                 )
             # Reopen the help post
             self.help_post.reopen()
@@ -402,9 +460,10 @@ class HelpMatch(models.Model):
 
         if completed and self.thread:
             from messaging.models import Message
-            Message.send_system_message(
+            Message.queue_system_message(
                 thread=self.thread,
-                body="This help request has been marked as complete. Thank you for participating in bayanihan!"
+                body="This help request has been marked as complete. Thank you for participating in bayanihan!",
+                key=f'help_match:{self.id}:{self.thread_id}:closed',
             )
             self.help_post.mark_completed()
 
@@ -7,17 +7,32 @@ Serializers for help models.
 
 from rest_framework import serializers
 
+from kapwanet.fieldsets import SparseFieldsetMixin
+from kapwanet.projections import ValuesProjection
 from organizations.models import Membership, Organization
+from organizations.serializers import OrganizationListSerializer
 from .models import HelpPost, HelpMatch
 
 
-class HelpPostSerializer(serializers.ModelSerializer):
+def _pending_match_count(post):
+    """Read the with_pending_match_count() annotation, or count if absent."""
+    count = getattr(post, 'pending_match_count', None)
+    if count is None:
+        count = post.matches.filter(status='pending').count()
+    return count
+
+
+class HelpPostSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """
     Serializer for HelpPost model.
 
     Handles creation, updates, and validation of help posts.
     """
 
+    expandable_fields = {
+        'org': (OrganizationListSerializer, {}),
+    }
+
     # Read-only fields for display
     created_by_name = serializers.SerializerMethodField()
     type_display = serializers.CharField(source='get_type_display', read_only=True)
@@ -27,6 +42,7 @@ class HelpPostSerializer(serializers.ModelSerializer):
 
     # Computed fields
     can_edit = serializers.SerializerMethodField()
+    pending_match_count = serializers.SerializerMethodField()
     valid_status_transitions = serializers.SerializerMethodField()
 
     class Meta:
@@ -52,6 +68,7 @@ class HelpPostSerializer(serializers.ModelSerializer):
             'updated_at',
             'can_edit',
             'valid_status_transitions',
+            'pending_match_count',
         ]
         read_only_fields = [
             'id',
@@ -73,16 +90,20 @@ class HelpPostSerializer(serializers.ModelSerializer):
             return False
 
         # Author can always edit
-        if obj.created_by == request.user:
+        if obj.created_by_id == request.user.pk:
             return True
 
         # Moderators and admins can edit
-        return Membership.has_role(request.user, obj.org, ['org_admin', 'moderator'])
+        return Membership.has_role(request.user, obj.org_id, ['org_admin', 'moderator'])
 
     def get_valid_status_transitions(self, obj):
         """Get the valid status transitions for this post."""
         return HelpPost.VALID_STATUS_TRANSITIONS.get(obj.status, [])
 
+    def get_pending_match_count(self, obj):
+        """Get the number of pending matches."""
+        return _pending_match_count(obj)
+
     def validate_org(self, value):
         """Validate that the user is a member of the organization."""
         request = self.context.get('request')
@@ -134,14 +155,19 @@ class HelpPostSerializer(serializers.ModelSerializer):
         return super().create(validated_data)
 
 
-class HelpPostListSerializer(serializers.ModelSerializer):
+class HelpPostListSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """
     Simplified serializer for listing help posts.
 
     Contains less detail than the full serializer for better performance.
     """
 
+    expandable_fields = {
+        'org': (OrganizationListSerializer, {}),
+    }
+
     created_by_name = serializers.SerializerMethodField()
+    pending_match_count = serializers.SerializerMethodField()
     type_display = serializers.CharField(source='get_type_display', read_only=True)
     category_display = serializers.CharField(source='get_category_display', read_only=True)
     urgency_display = serializers.CharField(source='get_urgency_display', read_only=True)
@@ -163,6 +189,7 @@ class HelpPostListSerializer(serializers.ModelSerializer):
             'status',
             'status_display',
             'created_by_name',
+            'pending_match_count',
             'created_at',
         ]
 
@@ -172,6 +199,31 @@ class HelpPostListSerializer(serializers.ModelSerializer):
             return obj.created_by.get_full_name() or obj.created_by.email
         return None
 
+    def get_pending_match_count(self, obj):
+        """Get the number of pending matches."""
+        return _pending_match_count(obj)
+
+
+def _user_name(display_name, email):
+    """Mirror User.get_full_name() over projected values."""
+    return display_name or email
+
+
+class HelpPostListProjection(ValuesProjection):
+    """Values-based projection rendering HelpPostListSerializer output."""
+
+    serializer_class = HelpPostListSerializer
+    display_fields = {
+        'type_display': 'type',
+        'category_display': 'category',
+        'urgency_display': 'urgency',
+        'status_display': 'status',
+    }
+    annotation_fields = ('pending_match_count',)
+    computed_fields = {
+        'created_by_name': (('created_by__display_name', 'created_by__email'), _user_name),
+    }
+
 
 class HelpPostStatusUpdateSerializer(serializers.Serializer):
     """
@@ -201,7 +253,7 @@ class HelpPostStatusUpdateSerializer(serializers.Serializer):
         return value
 
 
-class HelpMatchSerializer(serializers.ModelSerializer):
+class HelpMatchSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """
     Serializer for HelpMatch model.
     """
@@ -275,7 +327,7 @@ class HelpMatchSerializer(serializers.ModelSerializer):
         return obj.status in ('pending', 'accepted') and obj.helper_user == request.user
 
 
-class HelpMatchListSerializer(serializers.ModelSerializer):
+class HelpMatchListSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """
     Simplified serializer for listing help matches.
     """
@@ -303,6 +355,18 @@ class HelpMatchListSerializer(serializers.ModelSerializer):
         return None
 
 
+class HelpMatchListProjection(ValuesProjection):
+    """Values-based projection rendering HelpMatchListSerializer output."""
+
+    serializer_class = HelpMatchListSerializer
+    display_fields = {
+        'status_display': 'status',
+    }
+    computed_fields = {
+        'helper_name': (('helper_user__display_name', 'helper_user__email'), _user_name),
+    }
+
+
 class ExpressInterestSerializer(serializers.Serializer):
     """
     Serializer for expressing interest in a help post.
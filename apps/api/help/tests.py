@@ -5,14 +5,24 @@
 Tests for help posts functionality.
 """
 
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 from django.core.exceptions import ValidationError
 from rest_framework.test import APITestCase
 from rest_framework import status
+from rest_framework_simplejwt.tokens import RefreshToken
 
+from kapwanet.querybudget import QueryBudgetTestMixin
 from users.models import User
 from organizations.models import Organization, Membership
 from .models import HelpPost, HelpMatch
+from .serializers import (
+    HelpPostListSerializer,
+    HelpPostListProjection,
+    HelpMatchListSerializer,
+    HelpMatchListProjection,
+)
 
 
 class HelpPostModelTests(TestCase):
@@ -451,6 +461,140 @@ class HelpPostAPITests(APITestCase):
         self.assertEqual(len(response.data), 1)
         self.assertEqual(response.data[0]['title'], 'Post in org 2')
 
+    def test_conditional_get_list(self):
+        """Test that an unchanged list answers If-None-Match with 304."""
+        post = HelpPost.objects.create(
+            org=self.org,
+            type='request',
+            category='transportation',
+            title='Need a ride',
+            description='Test',
+            created_by=self.user
+        )
+
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {self.get_token(self.user)}')
+        url = f'/api/help-posts/?org={self.org.id}'
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        etag = response['ETag']
+
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        # Changing a post changes the validator
+        post.title = 'Need a ride downtown'
+        post.save()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_conditional_get_detail(self):
+        """Test ETag and Last-Modified on help post detail."""
+        post = HelpPost.objects.create(
+            org=self.org,
+            type='request',
+            category='transportation',
+            title='Need a ride',
+            description='Test',
+            created_by=self.user
+        )
+
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {self.get_token(self.user)}')
+        response = self.client.get(f'/api/help-posts/{post.id}/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn('Last-Modified', response)
+
+        response = self.client.get(
+            f'/api/help-posts/{post.id}/', HTTP_IF_NONE_MATCH=response['ETag']
+        )
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        # ETags are per user, since fields like can_edit differ
+        etag = response['ETag']
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {self.get_token(self.other_user)}')
+        response = self.client.get(f'/api/help-posts/{post.id}/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_conditional_get_detail_tracks_derived_fields(self):
+        """Test that the detail ETag changes with the caller's role and the creator's name."""
+        post = HelpPost.objects.create(
+            org=self.org,
+            type='request',
+            category='transportation',
+            title='Need a ride',
+            description='Test',
+            created_by=self.user
+        )
+        url = f'/api/help-posts/{post.id}/'
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {self.get_token(self.other_user)}')
+        response = self.client.get(url)
+        self.assertFalse(response.data['can_edit'])
+
+        self.other_membership.role = 'moderator'
+        self.other_membership.save()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.data['can_edit'])
+
+        self.user.display_name = 'Renamed'
+        self.user.save()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['created_by_name'], 'Renamed')
+
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_conditional_get_list_tracks_author_name(self):
+        """Test that renaming an author refreshes list ETags showing their name."""
+        HelpPost.objects.create(
+            org=self.org,
+            type='request',
+            category='transportation',
+            title='Need a ride',
+            description='Test',
+            created_by=self.user
+        )
+        url = f'/api/help-posts/?org={self.org.id}'
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {self.get_token(self.other_user)}')
+        etag = self.client.get(url)['ETag']
+
+        self.user.display_name = 'Renamed'
+        self.user.save()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data[0]['created_by_name'], 'Renamed')
+
+
+    def test_sparse_fieldsets(self):
+        """Test that ?fields= trims the response and ?expand= nests relations."""
+        post = HelpPost.objects.create(
+            org=self.org,
+            type='request',
+            category='transportation',
+            title='Need a ride',
+            description='Test',
+            created_by=self.user
+        )
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {self.get_token(self.user)}')
+
+        response = self.client.get(f'/api/help-posts/?org={self.org.id}&fields=id,title')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(set(response.data[0]), {'id', 'title'})
+
+        response = self.client.get(f'/api/help-posts/?org={self.org.id}&fields=id&expand=org')
+        self.assertEqual(set(response.data[0]), {'id', 'org'})
+        self.assertEqual(response.data[0]['org']['slug'], 'test-org')
+
+        # Unrequested method fields (can_edit) are not computed
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {self.get_token(self.other_user)}')
+        with CaptureQueriesContext(connection) as full:
+            self.client.get(f'/api/help-posts/{post.id}/')
+        with CaptureQueriesContext(connection) as sparse:
+            response = self.client.get(f'/api/help-posts/{post.id}/?fields=id,title,status')
+        self.assertEqual(set(response.data), {'id', 'title', 'status'})
+        self.assertLess(len(sparse), len(full))
+
 
 class HelpMatchModelTests(TestCase):
     """Tests for HelpMatch model."""
@@ -784,3 +928,110 @@ class HelpMatchAPITests(APITestCase):
 
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(response.data['status'], 'closed')
+
+    def test_pending_match_count(self):
+        """Test that post lists carry the pending match count and refresh their ETag."""
+        post = HelpPost.objects.create(
+            org=self.org,
+            type='request',
+            category='transportation',
+            title='Need a ride',
+            description='Test',
+            created_by=self.user1
+        )
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {self.get_token(self.user1)}')
+        response = self.client.get(f'/api/help-posts/?org={self.org.id}')
+        self.assertEqual(response.data[0]['pending_match_count'], 0)
+        etag = response['ETag']
+
+        HelpMatch.express_interest(help_post=post, helper_user=self.user2)
+
+        response = self.client.get(f'/api/help-posts/?org={self.org.id}', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data[0]['pending_match_count'], 1)
+
+        response = self.client.get(f'/api/help-posts/{post.id}/')
+        self.assertEqual(response.data['pending_match_count'], 1)
+
+    def test_list_projections_match_serializers(self):
+        """Test that the values-based projections render the same output as the serializers."""
+        self.user2.display_name = 'Helper'
+        self.user2.save()
+        post = HelpPost.objects.create(
+            org=self.org,
+            type='request',
+            category='transportation',
+            title='Need a ride',
+            description='Test',
+            urgency='high',
+            created_by=self.user1
+        )
+        HelpMatch.express_interest(help_post=post, helper_user=self.user2)
+
+        posts = HelpPost.objects.with_pending_match_count()
+        projection = HelpPostListProjection()
+        self.assertEqual(
+            projection.render(projection.project(posts)),
+            list(HelpPostListSerializer(posts, many=True).data)
+        )
+
+        matches = HelpMatch.objects.all()
+        projection = HelpMatchListProjection()
+        data = projection.render(projection.project(matches))
+        self.assertEqual(data, list(HelpMatchListSerializer(matches, many=True).data))
+        self.assertEqual(data[0]['helper_name'], 'Helper')
+        self.assertEqual(data[0]['status_display'], 'Pending')
+
+
+class HelpQueryBudgetTests(QueryBudgetTestMixin, APITestCase):
+    """Tests that help endpoints stay within their query budgets."""
+
+    def setUp(self):
+        self.org = Organization.objects.create(name='Test Organization', slug='test-org')
+        self.user = User.objects.create_user(email='user@example.com', password='testpass123')
+        Membership.objects.create(org=self.org, user=self.user, role='member', status='active')
+        self.helpers = 0
+        self.posts = []
+        self.add_posts()
+        token = RefreshToken.for_user(self.user).access_token
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+
+    def add_posts(self, count=3):
+        """Add posts by the user, each with a pending match from a new helper."""
+        for _ in range(count):
+            self.helpers += 1
+            helper = User.objects.create_user(
+                email=f'helper{self.helpers}@example.com', password='testpass123'
+            )
+            Membership.objects.create(org=self.org, user=helper, role='member', status='active')
+            post = HelpPost.objects.create(
+                org=self.org, type='request', category='errands', title='Groceries',
+                description='Weekly shop', created_by=self.user
+            )
+            HelpMatch.objects.create(org=self.org, help_post=post, helper_user=helper)
+            self.posts.append(post)
+
+    def add_matches(self):
+        """Add helpers to the first post."""
+        for _ in range(3):
+            self.helpers += 1
+            helper = User.objects.create_user(
+                email=f'helper{self.helpers}@example.com', password='testpass123'
+            )
+            HelpMatch.objects.create(org=self.org, help_post=self.posts[0], helper_user=helper)
+
+    def test_post_endpoints(self):
+        """Test the help post list, detail and per-user endpoints."""
+        self.assertConstantQueries(f'/api/help-posts/?org={self.org.id}', grow=self.add_posts)
+        self.assertConstantQueries('/api/help-posts/my_posts/', grow=self.add_posts)
+        self.assertConstantQueries(
+            f'/api/help-posts/{self.posts[0].id}/matches/', grow=self.add_matches
+        )
+        self.request_within_budget('get', f'/api/help-posts/{self.posts[0].id}/')
+        self.request_within_budget('get', '/api/help-posts/categories/')
+
+    def test_match_endpoints(self):
+        """Test the help match list and detail."""
+        self.assertConstantQueries(f'/api/help-matches/?org={self.org.id}', grow=self.add_posts)
+        match = HelpMatch.objects.first()
+        self.request_within_budget('get', f'/api/help-matches/{match.id}/')
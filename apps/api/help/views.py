@@ -9,6 +9,9 @@ from rest_framework import viewsets, status, filters
 from rest_framework.decorators import action
 from rest_framework.response import Response
 
+from kapwanet.fieldsets import get_sparse_fieldset, wants_field
+from kapwanet.mixins import ConditionalGetMixin, ProjectedListMixin
+from organizations.cache import filter_by_org
 from organizations.models import Membership
 from organizations.permissions import OrgMembershipPermission, IsOwnerOrModerator
 
@@ -16,20 +19,23 @@ from .models import HelpPost, HelpMatch
 from .serializers import (
     HelpPostSerializer,
     HelpPostListSerializer,
+    HelpPostListProjection,
     HelpPostStatusUpdateSerializer,
     HelpMatchSerializer,
     HelpMatchListSerializer,
+    HelpMatchListProjection,
     ExpressInterestSerializer,
     AcceptMatchSerializer,
 )
 
 
-class HelpPostViewSet(viewsets.ModelViewSet):
+class HelpPostViewSet(ConditionalGetMixin, ProjectedListMixin, viewsets.ModelViewSet):
     """
     ViewSet for managing help posts.
 
     Provides CRUD operations and status management for help posts.
-    All queries are filtered by organization.
+    All queries are filtered by organization. List and detail GETs support
+    conditional requests (ETag / If-None-Match).
 
     Endpoints:
         GET /api/help-posts/ - List help posts
@@ -42,10 +48,23 @@ class HelpPostViewSet(viewsets.ModelViewSet):
     """
 
     permission_classes = [OrgMembershipPermission]
+    list_projection_class = HelpPostListProjection
     filter_backends = [filters.SearchFilter, filters.OrderingFilter]
     search_fields = ['title', 'description']
     ordering_fields = ['created_at', 'urgency', 'status']
     ordering = ['-created_at']
+    query_budgets = {'list': 4, 'retrieve': 3, 'my_posts': 2, 'matches': 4, 'categories': 1}
+    conditional_list_fields = ['created_by__updated_at']
+    conditional_detail_fields = ['created_by.updated_at', 'pending_match_count']
+
+    def get_conditional_extra(self, request, instance=None):
+        """Include the caller's membership in the post's org, which decides can_edit."""
+        if instance is None or instance.created_by_id == request.user.pk:
+            return []
+        membership = Membership.objects.filter(
+            user=request.user, org_id=instance.org_id
+        ).values_list('role', 'status', 'updated_at').first()
+        return [membership]
 
     def get_queryset(self):
         """
@@ -59,18 +78,14 @@ class HelpPostViewSet(viewsets.ModelViewSet):
         - urgency: Urgency level
         - created_by: User ID who created the post
         """
-        queryset = HelpPost.objects.select_related('org', 'created_by')
+        queryset = HelpPost.objects.select_related(*self.get_select_related())
+        if wants_field(self.request, 'pending_match_count'):
+            queryset = queryset.with_pending_match_count()
 
         # Get org filter from query params
         org_param = self.request.query_params.get('org')
         if org_param:
-            # Try to match by ID first, then by slug
-            try:
-                from uuid import UUID
-                UUID(org_param)
-                queryset = queryset.filter(org_id=org_param)
-            except (ValueError, AttributeError):
-                queryset = queryset.filter(org__slug=org_param)
+            queryset = filter_by_org(queryset, org_param)
         else:
             # If no org specified, filter by user's memberships
             user_orgs = Membership.objects.filter(
@@ -106,6 +121,16 @@ class HelpPostViewSet(viewsets.ModelViewSet):
 
         return queryset
 
+    def get_select_related(self):
+        """Get the relations the requested fields read (see ?fields= / ?expand=)."""
+        _, expand = get_sparse_fieldset(self.request)
+        related = []
+        if 'org' in expand:
+            related.append('org')
+        if wants_field(self.request, 'created_by_name'):
+            related.append('created_by')
+        return related
+
     def get_serializer_class(self):
         """Return appropriate serializer class based on action."""
         if self.action == 'list':
@@ -293,11 +318,9 @@ class HelpPostViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_403_FORBIDDEN
             )
 
-        matches = HelpMatch.objects.filter(help_post=help_post).select_related(
-            'helper_user', 'help_post'
-        )
-        serializer = HelpMatchListSerializer(matches, many=True, context={'request': request})
-        return Response(serializer.data)
+        projection = HelpMatchListProjection(context={'request': request})
+        matches = projection.project(HelpMatch.objects.filter(help_post=help_post))
+        return Response(projection.render(matches))
 
     @action(detail=True, methods=['post'], url_path='accept-match')
     def accept_match(self, request, pk=None):
@@ -346,7 +369,7 @@ class HelpPostViewSet(viewsets.ModelViewSet):
         )
 
 
-class HelpMatchViewSet(viewsets.ReadOnlyModelViewSet):
+class HelpMatchViewSet(ProjectedListMixin, viewsets.ReadOnlyModelViewSet):
     """
     ViewSet for viewing help matches.
 
@@ -361,9 +384,11 @@ class HelpMatchViewSet(viewsets.ReadOnlyModelViewSet):
     """
 
     permission_classes = [OrgMembershipPermission]
+    list_projection_class = HelpMatchListProjection
     filter_backends = [filters.OrderingFilter]
     ordering_fields = ['created_at', 'status']
     ordering = ['-created_at']
+    query_budgets = {'list': 3, 'retrieve': 3}
 
     def get_queryset(self):
         """
@@ -384,12 +409,7 @@ class HelpMatchViewSet(viewsets.ReadOnlyModelViewSet):
         # Filter by org if specified
         org_param = self.request.query_params.get('org')
         if org_param:
-            try:
-                from uuid import UUID
-                UUID(org_param)
-                queryset = queryset.filter(org_id=org_param)
-            except (ValueError, AttributeError):
-                queryset = queryset.filter(org__slug=org_param)
+            queryset = filter_by_org(queryset, org_param)
 
         # Filter by status
         status_filter = self.request.query_params.get('status')
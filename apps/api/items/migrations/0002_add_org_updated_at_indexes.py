@@ -0,0 +1,22 @@
+# KapwaNet - Community Platform for Dignified Mutual Aid
+# SPDX-License-Identifier: AGPL-3.0-or-later
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('items', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='itempost',
+            index=models.Index(fields=['org', 'updated_at'], name='item_posts_org_id_6a00fe_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='itemreservation',
+            index=models.Index(fields=['org', 'updated_at'], name='item_reserv_org_id_b1429a_idx'),
+        ),
+    ]
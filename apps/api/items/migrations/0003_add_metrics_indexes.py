@@ -0,0 +1,26 @@
+# KapwaNet - Community Platform for Dignified Mutual Aid
+# SPDX-License-Identifier: AGPL-3.0-or-later
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('items', '0002_add_org_updated_at_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='itempost',
+            index=models.Index(fields=['created_at'], name='item_posts_created_a397d4_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='itemreservation',
+            index=models.Index(condition=models.Q(('status', 'pending')), fields=['status'], name='item_reservations_pending_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='itemreservation',
+            index=models.Index(fields=['created_at'], name='item_reserv_created_16bc51_idx'),
+        ),
+    ]
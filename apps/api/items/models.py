@@ -6,10 +6,25 @@ Models for item sharing.
 """
 
 import uuid
-from django.db import models
+from django.db import models, transaction
 from django.conf import settings
 from django.core.exceptions import ValidationError
 from django.utils import timezone
+from django.db.models import Count, Q
+
+from events.outbox import publish
+
+
+class ItemPostQuerySet(models.QuerySet):
+    """QuerySet for item posts."""
+
+    def with_pending_reservation_count(self):
+        """Annotate each post with its number of pending reservations."""
+        return self.annotate(
+            pending_reservation_count=Count(
+                'reservations', filter=Q(reservations__status='pending')
+            )
+        )
 
 
 class ItemPost(models.Model):
@@ -146,6 +161,8 @@ class ItemPost(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = ItemPostQuerySet.as_manager()
+
     class Meta:
         db_table = 'item_posts'
         ordering = ['-created_at']
@@ -153,6 +170,10 @@ class ItemPost(models.Model):
             models.Index(fields=['org', 'status']),
             models.Index(fields=['org', 'category']),
             models.Index(fields=['org', 'type', 'status']),
+            # Delta sync scans changes per org in updated_at order
+            models.Index(fields=['org', 'updated_at']),
+            # Metrics: recent activity across orgs
+            models.Index(fields=['created_at']),
         ]
 
     def __str__(self):
@@ -176,9 +197,19 @@ class ItemPost(models.Model):
                 })
 
     def save(self, *args, **kwargs):
-        """Save the item post after validation."""
+        """Save the item post after validation, publishing item_post.created for new posts."""
         self.full_clean()
-        super().save(*args, **kwargs)
+        is_new = self._state.adding
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            if is_new:
+                publish('item_post.created', self, {
+                    'type': self.type,
+                    'category': self.category,
+                    'title': self.title,
+                    'quantity': self.quantity,
+                    'created_by_id': self.created_by_id,
+                })
 
     def can_transition_to(self, new_status):
         """Check if transitioning to the new status is allowed."""
@@ -305,6 +336,12 @@ class ItemReservation(models.Model):
         indexes = [
             models.Index(fields=['org', 'status']),
             models.Index(fields=['item_post', 'status']),
+            models.Index(fields=['org', 'updated_at']),
+            # Metrics: pending reservations across orgs, and recent activity
+            models.Index(
+                fields=['status'], condition=Q(status='pending'), name='item_reservations_pending_idx'
+            ),
+            models.Index(fields=['created_at']),
         ]
         constraints = [
             # One pending/approved reservation per user per item
@@ -318,6 +355,13 @@ class ItemReservation(models.Model):
     def __str__(self):
         return f"Reservation by {self.requester} for {self.item_post}"
 
+    def save(self, *args, **kwargs):
+        """Save the reservation and bump the item post's updated_at."""
+        super().save(*args, **kwargs)
+        # The post's pending_reservation_count may have changed, so mark the
+        # post changed for list ETags and delta sync
+        ItemPost.objects.filter(pk=self.item_post_id).update(updated_at=timezone.now())
+
     @property
     def owner(self):
         """Get the item post owner."""
@@ -376,11 +420,13 @@ class ItemReservation(models.Model):
 
         return reservation
 
+    @transaction.atomic
     def approve(self):
         """
         Approve the reservation.
 
-        Creates a messaging thread and updates item status.
+        Creates a messaging thread, updates item status and publishes
+        item_reservation.approved.
         """
         from messaging.models import Thread, Message
 
@@ -400,10 +446,11 @@ class ItemReservation(models.Model):
         thread.add_participant(self.owner)
 
         # Send system message
-        Message.send_system_message(
+        Message.queue_system_message(
             thread=thread,
             body=f"Reservation approved! {self.requester.display_name} will pick up "
-                 f"{self.quantity_requested}x {self.item_post.title}."
+                 f"{self.quantity_requested}x {self.item_post.title}.",
+            key=f'item_reservation:{self.id}:{thread.id}:approved',
         )
 
         # Update reservation
@@ -423,6 +470,13 @@ class ItemReservation(models.Model):
         for res in other_pending:
             res.reject()
 
+        publish('item_reservation.approved', self, {
+            'item_post_id': self.item_post_id,
+            'requester_id': self.requester_id,
+            'quantity_requested': self.quantity_requested,
+            'thread_id': thread.id,
+        })
+
         return thread
 
     def reject(self):
@@ -457,16 +511,18 @@ class ItemReservation(models.Model):
             # Send system message
             if self.thread:
                 from messaging.models import Message
-                Message.send_system_message(
+                Message.queue_system_message(
                     thread=self.thread,
-                    body=f"Reservation cancelled by {self.requester.display_name}."
+                    body=f"Reservation cancelled by {self.requester.display_name}.",
+                    key=f'item_reservation:{self.id}:{self.thread_id}:cancelled',
                 )
 
+    @transaction.atomic
     def complete(self):
         """
         Complete the reservation (item picked up).
 
-        Both parties can mark as complete.
+        Both parties can mark as complete. Publishes item_reservation.completed.
         """
         from messaging.models import Message
 
@@ -484,7 +540,14 @@ class ItemReservation(models.Model):
 
         # Send system message
         if self.thread:
-            Message.send_system_message(
+            Message.queue_system_message(
                 thread=self.thread,
-                body=f"Pickup confirmed! Thank you for sharing with the community."
+                body=f"Pickup confirmed! Thank you for sharing with the community.",
+                key=f'item_reservation:{self.id}:{self.thread_id}:completed',
             )
+
+        publish('item_reservation.completed', self, {
+            'item_post_id': self.item_post_id,
+            'requester_id': self.requester_id,
+            'quantity_requested': self.quantity_requested,
+        })
@@ -8,16 +8,33 @@ Serializers for item sharing API.
 from rest_framework import serializers
 from django.utils import timezone
 
+from kapwanet.fieldsets import SparseFieldsetMixin
+from kapwanet.projections import ValuesProjection
 from organizations.models import Membership
+from organizations.serializers import OrganizationListSerializer
 from .models import ItemPost, ItemReservation
 
 
-class ItemPostSerializer(serializers.ModelSerializer):
+def _pending_reservation_count(post):
+    """Read the with_pending_reservation_count() annotation, or count if absent."""
+    count = getattr(post, 'pending_reservation_count', None)
+    if count is None:
+        count = post.reservations.filter(status='pending').count()
+    return count
+
+
+class ItemPostSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """Full serializer for item posts."""
 
+    expandable_fields = {
+        'org': (OrganizationListSerializer, {}),
+    }
+
     created_by_name = serializers.SerializerMethodField()
     org_name = serializers.SerializerMethodField()
-    reservation_count = serializers.SerializerMethodField()
+    pending_reservation_count = serializers.SerializerMethodField()
+    # Older name for pending_reservation_count
+    reservation_count = serializers.SerializerMethodField(method_name='get_pending_reservation_count')
     is_owner = serializers.SerializerMethodField()
     is_expired = serializers.BooleanField(read_only=True)
     is_food = serializers.BooleanField(read_only=True)
@@ -51,6 +68,7 @@ class ItemPostSerializer(serializers.ModelSerializer):
             # Metadata
             'created_by',
             'created_by_name',
+            'pending_reservation_count',
             'reservation_count',
             'is_owner',
             'created_at',
@@ -66,15 +84,15 @@ class ItemPostSerializer(serializers.ModelSerializer):
         """Get the organization name."""
         return obj.org.name
 
-    def get_reservation_count(self, obj):
+    def get_pending_reservation_count(self, obj):
         """Get the count of pending reservations."""
-        return obj.reservations.filter(status='pending').count()
+        return _pending_reservation_count(obj)
 
     def get_is_owner(self, obj):
         """Check if current user is the owner."""
         request = self.context.get('request')
         if request and request.user:
-            return obj.created_by == request.user
+            return obj.created_by_id == request.user.pk
         return False
 
     def validate(self, data):
@@ -118,12 +136,17 @@ class ItemPostSerializer(serializers.ModelSerializer):
         return super().create(validated_data)
 
 
-class ItemPostListSerializer(serializers.ModelSerializer):
+class ItemPostListSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """Lightweight serializer for listing item posts."""
 
+    expandable_fields = {
+        'org': (OrganizationListSerializer, {}),
+    }
+
     created_by_name = serializers.SerializerMethodField()
     is_expired = serializers.BooleanField(read_only=True)
     photo_count = serializers.SerializerMethodField()
+    pending_reservation_count = serializers.SerializerMethodField()
 
     class Meta:
         model = ItemPost
@@ -142,6 +165,7 @@ class ItemPostListSerializer(serializers.ModelSerializer):
             'photo_count',
             'created_by',
             'created_by_name',
+            'pending_reservation_count',
             'created_at',
         ]
 
@@ -153,8 +177,29 @@ class ItemPostListSerializer(serializers.ModelSerializer):
         """Get the number of photos."""
         return len(obj.photos) if obj.photos else 0
 
+    def get_pending_reservation_count(self, obj):
+        """Get the count of pending reservations."""
+        return _pending_reservation_count(obj)
+
+
+def _is_expired(expiry_date):
+    """Mirror ItemPost.is_expired over a projected expiry date."""
+    return bool(expiry_date) and expiry_date < timezone.now().date()
 
-class ItemReservationSerializer(serializers.ModelSerializer):
+
+class ItemPostListProjection(ValuesProjection):
+    """Values-based projection rendering ItemPostListSerializer output."""
+
+    serializer_class = ItemPostListSerializer
+    annotation_fields = ('pending_reservation_count',)
+    computed_fields = {
+        'is_expired': (('expiry_date',), _is_expired),
+        'photo_count': (('photos',), lambda photos: len(photos) if photos else 0),
+        'created_by_name': (('created_by__display_name',), lambda name: name),
+    }
+
+
+class ItemReservationSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """Full serializer for item reservations."""
 
     requester_name = serializers.SerializerMethodField()
@@ -222,7 +267,7 @@ class ItemReservationSerializer(serializers.ModelSerializer):
         return False
 
 
-class ItemReservationListSerializer(serializers.ModelSerializer):
+class ItemReservationListSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """Lightweight serializer for listing reservations."""
 
     requester_name = serializers.SerializerMethodField()
@@ -250,6 +295,16 @@ class ItemReservationListSerializer(serializers.ModelSerializer):
         return obj.item_post.title
 
 
+class ItemReservationListProjection(ValuesProjection):
+    """Values-based projection rendering ItemReservationListSerializer output."""
+
+    serializer_class = ItemReservationListSerializer
+    computed_fields = {
+        'item_title': (('item_post__title',), lambda title: title),
+        'requester_name': (('requester__display_name',), lambda name: name),
+    }
+
+
 class ReserveItemSerializer(serializers.Serializer):
     """Serializer for reserve item request."""
 
@@ -6,14 +6,24 @@ Tests for item sharing functionality.
 """
 
 from datetime import date, timedelta
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 from django.core.exceptions import ValidationError
 from rest_framework.test import APITestCase
 from rest_framework import status as http_status
+from rest_framework_simplejwt.tokens import RefreshToken
 
+from kapwanet.querybudget import QueryBudgetTestMixin
 from organizations.models import Organization, Membership
 from users.models import User
 from .models import ItemPost, ItemReservation
+from .serializers import (
+    ItemPostListSerializer,
+    ItemPostListProjection,
+    ItemReservationListSerializer,
+    ItemReservationListProjection,
+)
 
 
 class ItemPostModelTests(TestCase):
@@ -579,6 +589,31 @@ class ItemPostAPITests(APITestCase):
         self.assertEqual(data[0]['title'], 'Org1 Item')
 
 
+    def test_sparse_fieldsets(self):
+        """Test that ?fields= skips unrequested count annotations and joins."""
+        item = ItemPost.objects.create(
+            org=self.org,
+            type='offer',
+            category='clothing',
+            title='Jacket',
+            description='Test',
+            created_by=self.user,
+        )
+
+        self.client.force_authenticate(user=self.user)
+        with CaptureQueriesContext(connection) as full:
+            response = self.client.get(f'/api/item-posts/{item.id}/')
+        self.assertIn('reservation_count', response.data)
+        with CaptureQueriesContext(connection) as sparse:
+            response = self.client.get(f'/api/item-posts/{item.id}/?fields=id,title')
+        self.assertEqual(response.data, {'id': str(item.id), 'title': 'Jacket'})
+
+        def sql(context):
+            return ' '.join(query['sql'] for query in context.captured_queries)
+        self.assertIn('item_reservations', sql(full))
+        self.assertNotIn('item_reservations', sql(sparse))
+
+
 class ItemReservationAPITests(APITestCase):
     """Tests for the ItemReservation API endpoints."""
 
@@ -737,3 +772,106 @@ class ItemReservationAPITests(APITestCase):
         self.assertEqual(response.status_code, http_status.HTTP_200_OK)
         data = response.data.get('results', response.data) if isinstance(response.data, dict) else response.data
         self.assertEqual(len(data), 1)
+
+    def test_pending_reservation_count(self):
+        """Test that item post lists carry the pending reservation count."""
+        reservation = ItemReservation.create_reservation(
+            item_post=self.item,
+            requester=self.requester,
+        )
+
+        self.client.force_authenticate(user=self.owner)
+        response = self.client.get('/api/item-posts/')
+        self.assertEqual(response.data[0]['pending_reservation_count'], 1)
+
+        reservation.reject()
+        response = self.client.get(f'/api/item-posts/{self.item.id}/')
+        self.assertEqual(response.data['pending_reservation_count'], 0)
+        self.assertEqual(response.data['reservation_count'], 0)
+
+    def test_list_projections_match_serializers(self):
+        """Test that the values-based projections render the same output as the serializers."""
+        bread = ItemPost.objects.create(
+            org=self.org,
+            type='offer',
+            category='food',
+            title='Bread',
+            description='Fresh bread',
+            photos=['a.jpg', 'b.jpg'],
+            expiry_date=date.today() + timedelta(days=1),
+            created_by=self.owner,
+        )
+        # Expire it without going through model validation
+        ItemPost.objects.filter(pk=bread.pk).update(expiry_date=date.today() - timedelta(days=1))
+        ItemReservation.create_reservation(
+            item_post=self.item,
+            requester=self.requester,
+        )
+
+        posts = ItemPost.objects.with_pending_reservation_count()
+        projection = ItemPostListProjection()
+        data = projection.render(projection.project(posts))
+        self.assertEqual(data, list(ItemPostListSerializer(posts, many=True).data))
+        self.assertEqual(sorted((p['photo_count'], p['is_expired']) for p in data), [(0, False), (2, True)])
+
+        reservations = ItemReservation.objects.all()
+        projection = ItemReservationListProjection()
+        self.assertEqual(
+            projection.render(projection.project(reservations)),
+            list(ItemReservationListSerializer(reservations, many=True).data)
+        )
+
+
+class ItemQueryBudgetTests(QueryBudgetTestMixin, APITestCase):
+    """Tests that item endpoints stay within their query budgets."""
+
+    def setUp(self):
+        self.org = Organization.objects.create(name='Test Org', slug='test-org')
+        self.user = User.objects.create_user(email='owner@example.com', password='testpass123')
+        Membership.objects.create(org=self.org, user=self.user, role='member', status='active')
+        self.requesters = 0
+        self.items = []
+        self.add_items()
+        token = RefreshToken.for_user(self.user).access_token
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+
+    def new_requester(self):
+        self.requesters += 1
+        requester = User.objects.create_user(
+            email=f'requester{self.requesters}@example.com', password='testpass123'
+        )
+        Membership.objects.create(org=self.org, user=requester, role='member', status='active')
+        return requester
+
+    def add_items(self, count=3):
+        """Add items by the user, each with a pending reservation."""
+        for _ in range(count):
+            item = ItemPost.objects.create(
+                org=self.org, type='offer', category='clothing', title='Coat',
+                description='Warm coat', quantity=5, created_by=self.user
+            )
+            ItemReservation.objects.create(org=self.org, item_post=item, requester=self.new_requester())
+            self.items.append(item)
+
+    def add_reservations(self):
+        """Add reservations to the first item."""
+        for _ in range(3):
+            ItemReservation.objects.create(
+                org=self.org, item_post=self.items[0], requester=self.new_requester()
+            )
+
+    def test_item_endpoints(self):
+        """Test the item list, detail and per-user endpoints."""
+        self.assertConstantQueries(f'/api/item-posts/?org={self.org.id}', grow=self.add_items)
+        self.assertConstantQueries('/api/item-posts/my_posts/', grow=self.add_items)
+        self.assertConstantQueries(
+            f'/api/item-posts/{self.items[0].id}/reservations/', grow=self.add_reservations
+        )
+        self.request_within_budget('get', f'/api/item-posts/{self.items[0].id}/')
+        self.request_within_budget('get', '/api/item-posts/categories/')
+
+    def test_reservation_endpoints(self):
+        """Test the reservation list and detail."""
+        self.assertConstantQueries(f'/api/item-reservations/?org={self.org.id}', grow=self.add_items)
+        reservation = ItemReservation.objects.first()
+        self.request_within_budget('get', f'/api/item-reservations/{reservation.id}/')
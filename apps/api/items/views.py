@@ -9,6 +9,9 @@ from rest_framework import viewsets, status, filters
 from rest_framework.decorators import action
 from rest_framework.response import Response
 
+from kapwanet.fieldsets import get_sparse_fieldset, wants_field
+from kapwanet.mixins import ConditionalGetMixin, ProjectedListMixin
+from organizations.cache import filter_by_org
 from organizations.models import Membership
 from organizations.permissions import OrgMembershipPermission, IsOwnerOrModerator
 
@@ -16,18 +19,21 @@ from .models import ItemPost, ItemReservation
 from .serializers import (
     ItemPostSerializer,
     ItemPostListSerializer,
+    ItemPostListProjection,
     ItemReservationSerializer,
     ItemReservationListSerializer,
+    ItemReservationListProjection,
     ReserveItemSerializer,
 )
 
 
-class ItemPostViewSet(viewsets.ModelViewSet):
+class ItemPostViewSet(ConditionalGetMixin, ProjectedListMixin, viewsets.ModelViewSet):
     """
     ViewSet for managing item posts.
 
     Provides CRUD operations and status management for item sharing posts.
-    All queries are filtered by organization.
+    All queries are filtered by organization. List and detail GETs support
+    conditional requests (ETag / If-None-Match).
 
     Endpoints:
         GET /api/item-posts/ - List item posts
@@ -47,10 +53,14 @@ class ItemPostViewSet(viewsets.ModelViewSet):
     """
 
     permission_classes = [OrgMembershipPermission]
+    list_projection_class = ItemPostListProjection
     filter_backends = [filters.SearchFilter, filters.OrderingFilter]
     search_fields = ['title', 'description']
     ordering_fields = ['created_at', 'expiry_date', 'status']
     ordering = ['-created_at']
+    query_budgets = {'list': 4, 'retrieve': 3, 'my_posts': 2, 'reservations': 4, 'categories': 1}
+    conditional_list_fields = ['created_by__updated_at']
+    conditional_detail_fields = ['created_by.updated_at', 'org.updated_at', 'pending_reservation_count']
 
     def get_queryset(self):
         """
@@ -63,18 +73,15 @@ class ItemPostViewSet(viewsets.ModelViewSet):
         - status: Post status
         - created_by: User ID who created the post
         """
-        queryset = ItemPost.objects.select_related('org', 'created_by')
+        queryset = ItemPost.objects.select_related(*self.get_select_related())
+        if (wants_field(self.request, 'pending_reservation_count') or
+                wants_field(self.request, 'reservation_count')):
+            queryset = queryset.with_pending_reservation_count()
 
         # Get org filter from query params
         org_param = self.request.query_params.get('org')
         if org_param:
-            # Try to match by ID first, then by slug
-            try:
-                from uuid import UUID
-                UUID(org_param)
-                queryset = queryset.filter(org_id=org_param)
-            except (ValueError, AttributeError):
-                queryset = queryset.filter(org__slug=org_param)
+            queryset = filter_by_org(queryset, org_param)
         else:
             # If no org specified, filter by user's memberships
             user_orgs = Membership.objects.filter(
@@ -118,6 +125,16 @@ class ItemPostViewSet(viewsets.ModelViewSet):
 
         return queryset
 
+    def get_select_related(self):
+        """Get the relations the requested fields read (see ?fields= / ?expand=)."""
+        _, expand = get_sparse_fieldset(self.request)
+        related = []
+        if 'org' in expand or wants_field(self.request, 'org_name'):
+            related.append('org')
+        if wants_field(self.request, 'created_by_name'):
+            related.append('created_by')
+        return related
+
     def get_serializer_class(self):
         """Return appropriate serializer class based on action."""
         if self.action == 'list':
@@ -277,13 +294,9 @@ class ItemPostViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_403_FORBIDDEN
             )
 
-        reservations = ItemReservation.objects.filter(item_post=item_post).select_related(
-            'requester', 'item_post'
-        )
-        serializer = ItemReservationListSerializer(
-            reservations, many=True, context={'request': request}
-        )
-        return Response(serializer.data)
+        projection = ItemReservationListProjection(context={'request': request})
+        reservations = projection.project(ItemReservation.objects.filter(item_post=item_post))
+        return Response(projection.render(reservations))
 
     @action(detail=True, methods=['post'], url_path='approve-reservation')
     def approve_reservation(self, request, pk=None):
@@ -441,7 +454,7 @@ class ItemPostViewSet(viewsets.ModelViewSet):
         )
 
 
-class ItemReservationViewSet(viewsets.ReadOnlyModelViewSet):
+class ItemReservationViewSet(ProjectedListMixin, viewsets.ReadOnlyModelViewSet):
     """
     ViewSet for viewing item reservations.
 
@@ -454,9 +467,11 @@ class ItemReservationViewSet(viewsets.ReadOnlyModelViewSet):
     """
 
     permission_classes = [OrgMembershipPermission]
+    list_projection_class = ItemReservationListProjection
     filter_backends = [filters.OrderingFilter]
     ordering_fields = ['created_at', 'status']
     ordering = ['-created_at']
+    query_budgets = {'list': 3, 'retrieve': 3}
 
     def get_queryset(self):
         """
@@ -477,12 +492,7 @@ class ItemReservationViewSet(viewsets.ReadOnlyModelViewSet):
         # Filter by org if specified
         org_param = self.request.query_params.get('org')
         if org_param:
-            try:
-                from uuid import UUID
-                UUID(org_param)
-                queryset = queryset.filter(org_id=org_param)
-            except (ValueError, AttributeError):
-                queryset = queryset.filter(org__slug=org_param)
+            queryset = filter_by_org(queryset, org_param)
 
         # Filter by status
         status_filter = self.request.query_params.get('status')
@@ -0,0 +1,22 @@
+# KapwaNet - Community Platform for Dignified Mutual Aid
+# SPDX-License-Identifier: AGPL-3.0-or-later
+
+"""
+App configuration for background jobs.
+
+This module runs side effects (system messages, notifications) outside
+the request path, from a database-backed queue.
+"""
+
+from django.apps import AppConfig
+from django.utils.module_loading import autodiscover_modules
+
+
+class JobsConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'jobs'
+    verbose_name = 'Background Jobs'
+
+    def ready(self):
+        # Register the @task functions in each app's tasks.py
+        autodiscover_modules('tasks')
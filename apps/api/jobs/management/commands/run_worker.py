@@ -0,0 +1,66 @@
+# KapwaNet - Community Platform for Dignified Mutual Aid
+# SPDX-License-Identifier: AGPL-3.0-or-later
+
+"""
+Management command to run a background job worker.
+"""
+
+import signal
+
+from django.core.management.base import BaseCommand
+
+from jobs.queue import default_worker_id, run_pending, run_periodic, work
+
+
+class Command(BaseCommand):
+    help = 'Run queued background jobs'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=10,
+            help='Jobs claimed per batch',
+        )
+        parser.add_argument(
+            '--poll-interval',
+            type=float,
+            help='Seconds to wait when the queue is empty (default: JOBS_POLL_INTERVAL)',
+        )
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Run periodic tasks and due jobs until the queue is empty, then exit',
+        )
+
+    def handle(self, *args, **options):
+        worker_id = default_worker_id()
+
+        if options['once']:
+            run_periodic(force=True)
+            total = 0
+            while True:
+                count = run_pending(worker_id, options['batch_size'])
+                if not count:
+                    break
+                total += count
+            self.stdout.write(self.style.SUCCESS(f'Ran {total} jobs.'))
+            return
+
+        # Finish the current batch on SIGTERM/SIGINT, then exit
+        stopping = []
+
+        def stop(signum, frame):
+            stopping.append(signum)
+
+        signal.signal(signal.SIGTERM, stop)
+        signal.signal(signal.SIGINT, stop)
+
+        self.stdout.write(self.style.SUCCESS(f'Worker {worker_id} started.'))
+        work(
+            worker_id=worker_id,
+            batch_size=options['batch_size'],
+            poll_interval=options['poll_interval'],
+            should_stop=lambda: bool(stopping),
+        )
+        self.stdout.write(self.style.SUCCESS(f'Worker {worker_id} stopped.'))
@@ -0,0 +1,107 @@
+# KapwaNet - Community Platform for Dignified Mutual Aid
+# SPDX-License-Identifier: AGPL-3.0-or-later
+
+"""
+Models for the background job queue.
+"""
+
+import uuid
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import models
+from django.db.models import Q
+from django.utils import timezone
+
+
+class JobQuerySet(models.QuerySet):
+    """QuerySet for jobs."""
+
+    def due(self, now=None):
+        """
+        Filter to jobs ready to run.
+
+        Includes queued jobs whose run_at has passed, and running jobs whose
+        lock is older than JOBS_LOCK_TIMEOUT (their worker died).
+        """
+        now = now or timezone.now()
+        stale = now - timedelta(seconds=settings.JOBS_LOCK_TIMEOUT)
+        return self.filter(
+            Q(status='queued', run_at__lte=now) |
+            Q(status='running', locked_at__lt=stale)
+        )
+
+
+class Job(models.Model):
+    """
+    A unit of background work.
+
+    name identifies a function registered with @jobs.queue.task, which is
+    called with payload as keyword arguments.
+    """
+
+    STATUS_CHOICES = [
+        ('queued', 'Queued'),
+        ('running', 'Running'),
+        ('succeeded', 'Succeeded'),
+        ('failed', 'Failed'),
+    ]
+
+    id = models.UUIDField(
+        primary_key=True,
+        default=uuid.uuid4,
+        editable=False
+    )
+    name = models.CharField(
+        max_length=100,
+        help_text="Registered task name"
+    )
+    payload = models.JSONField(
+        default=dict,
+        help_text="Keyword arguments for the task"
+    )
+    status = models.CharField(
+        max_length=20,
+        choices=STATUS_CHOICES,
+        default='queued'
+    )
+    idempotency_key = models.CharField(
+        max_length=255,
+        null=True,
+        blank=True,
+        unique=True,
+        help_text="Jobs enqueued again with the same key are not duplicated"
+    )
+
+    # Scheduling and retries
+    run_at = models.DateTimeField(
+        default=timezone.now,
+        help_text="Earliest time the job may run"
+    )
+    attempts = models.PositiveIntegerField(default=0)
+    max_attempts = models.PositiveIntegerField(default=3)
+    last_error = models.TextField(blank=True)
+
+    # Worker lock
+    locked_by = models.CharField(max_length=100, blank=True)
+    locked_at = models.DateTimeField(null=True, blank=True)
+
+    # Timestamps
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    objects = JobQuerySet.as_manager()
+
+    class Meta:
+        db_table = 'jobs'
+        ordering = ['run_at']
+        verbose_name = 'job'
+        verbose_name_plural = 'jobs'
+        indexes = [
+            models.Index(fields=['status', 'run_at']),
+            models.Index(fields=['status', 'finished_at']),
+        ]
+
+    def __str__(self):
+        return f"{self.name} ({self.status})"
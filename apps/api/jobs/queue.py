@@ -0,0 +1,285 @@
+# KapwaNet - Community Platform for Dignified Mutual Aid
+# SPDX-License-Identifier: AGPL-3.0-or-later
+
+"""
+Database-backed background job queue.
+
+Register a task in an app's tasks.py:
+
+    from jobs.queue import task
+
+    @task()
+    def send_system_message(thread_id, body):
+        ...
+
+and enqueue it from request code:
+
+    enqueue(send_system_message, {'thread_id': str(thread.pk), 'body': body})
+
+Jobs are rows in the `jobs` table, written in the caller's transaction,
+so a job only becomes visible to workers if the request commits.
+Workers (`manage.py run_worker`) claim due jobs with
+`SELECT ... FOR UPDATE SKIP LOCKED`, so any number of workers can share
+the queue without blocking each other. Failed jobs are retried with
+exponential backoff up to their max_attempts.
+
+With JOBS_SYNC enabled (tests, simple local setups) enqueue() runs the
+task immediately instead.
+
+Housekeeping that should happen on a schedule rather than in response to
+a request (retrying due webhook deliveries, pruning old rows) registers
+with @periodic; workers run each periodic function every `interval`
+seconds between batches:
+
+    @periodic(interval=30)
+    def retry_webhooks():
+        ...
+
+Every worker runs them, so periodic functions must be safe to run
+concurrently. `run_worker --once` runs them once, for cron-driven setups.
+"""
+
+import logging
+import os
+import socket
+import time
+import traceback
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import Job
+
+logger = logging.getLogger(__name__)
+
+_registry = {}
+_periodic = {}
+_last_run = {}
+
+
+def task(name=None, max_attempts=3):
+    """
+    Register a function as a background task.
+
+    Args:
+        name: Task name (default: '<app>.<function name>')
+        max_attempts: Attempts before the job is marked failed
+    """
+    def decorator(func):
+        task_name = name or f"{func.__module__.split('.')[0]}.{func.__name__}"
+        _registry[task_name] = (func, max_attempts)
+        func.task_name = task_name
+        return func
+    return decorator
+
+
+def get_task(name):
+    """Get the (function, max_attempts) registered for a task name."""
+    try:
+        return _registry[name]
+    except KeyError:
+        raise ValueError(f"Unknown task: {name}")
+
+
+def periodic(interval, name=None):
+    """
+    Register a function for workers to run every interval seconds.
+
+    Args:
+        interval: Seconds between runs, per worker process
+        name: Name used in logs (default: '<app>.<function name>')
+    """
+    def decorator(func):
+        periodic_name = name or f"{func.__module__.split('.')[0]}.{func.__name__}"
+        _periodic[periodic_name] = (func, interval)
+        return func
+    return decorator
+
+
+def run_periodic(force=False):
+    """
+    Run the periodic functions that are due in this process.
+
+    A failure is logged and does not stop the others.
+
+    Returns:
+        The names of the functions run
+    """
+    ran = []
+    now = time.monotonic()
+    for name, (func, interval) in sorted(_periodic.items()):
+        last = _last_run.get(name)
+        if not force and last is not None and now - last < interval:
+            continue
+        _last_run[name] = now
+        try:
+            func()
+        except Exception:
+            logger.exception('Periodic task %s failed', name)
+        ran.append(name)
+    return ran
+
+
+def enqueue(task_or_name, payload=None, idempotency_key=None, delay=None):
+    """
+    Queue a task to run in the background.
+
+    Args:
+        task_or_name: A @task function or its registered name
+        payload: JSON-serializable keyword arguments for the task
+        idempotency_key: Optional key; if a job with this key already
+            exists it is returned instead of queuing another
+        delay: Optional timedelta before the job may run
+
+    Returns:
+        The Job, or None when run synchronously (JOBS_SYNC)
+    """
+    name = getattr(task_or_name, 'task_name', task_or_name)
+    func, max_attempts = get_task(name)
+    payload = payload or {}
+
+    if settings.JOBS_SYNC:
+        func(**payload)
+        return None
+
+    fields = {
+        'name': name,
+        'payload': payload,
+        'max_attempts': max_attempts,
+        'run_at': timezone.now() + (delay or timedelta()),
+    }
+    if idempotency_key:
+        job, _ = Job.objects.get_or_create(idempotency_key=idempotency_key, defaults=fields)
+        return job
+    return Job.objects.create(**fields)
+
+
+def default_worker_id():
+    """Identify this worker process in job locks."""
+    return f'{socket.gethostname()}:{os.getpid()}'
+
+
+def claim_jobs(worker_id, limit=10):
+    """
+    Lock up to limit due jobs for a worker.
+
+    Rows locked by another worker's claim are skipped rather than waited
+    on, and the claim transaction only lasts as long as the UPDATE.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        ids = list(
+            Job.objects.due(now)
+            .select_for_update(skip_locked=True)
+            .order_by('run_at')
+            .values_list('id', flat=True)[:limit]
+        )
+        if ids:
+            Job.objects.filter(id__in=ids).update(
+                status='running',
+                locked_by=worker_id,
+                locked_at=now,
+                attempts=F('attempts') + 1,
+                updated_at=now,
+            )
+    return list(Job.objects.filter(id__in=ids).order_by('run_at'))
+
+
+class LeaseLost(Exception):
+    """The job was reclaimed by another worker while this one ran it."""
+
+
+def _finish(job, lease, **fields):
+    """Record a job's outcome if the (locked_by, locked_at) lease still holds."""
+    fields.update(locked_by='', locked_at=None, updated_at=timezone.now())
+    updated = Job.objects.filter(
+        pk=job.pk, status='running', locked_by=lease[0], locked_at=lease[1]
+    ).update(**fields)
+    for field, value in fields.items():
+        setattr(job, field, value)
+    return updated
+
+
+def run_job(job):
+    """
+    Run a claimed job and record the outcome.
+
+    The task runs in its own transaction, so a failure rolls back its
+    writes before the job is rescheduled. The job is marked succeeded in
+    that same transaction, and only while this worker's lease holds: if
+    the lease expired and another worker reclaimed the job, this run's
+    writes are rolled back and the other worker's run counts.
+
+    Returns:
+        True if the job succeeded
+    """
+    lease = (job.locked_by, job.locked_at)
+    try:
+        func, _ = get_task(job.name)
+        with transaction.atomic():
+            func(**job.payload)
+            if not _finish(job, lease, status='succeeded', finished_at=timezone.now(), last_error=''):
+                raise LeaseLost()
+    except LeaseLost:
+        logger.warning('Job %s (%s) was reclaimed by another worker; discarded this run', job.id, job.name)
+        return False
+    except Exception:
+        last_error = traceback.format_exc(limit=5)
+        if job.attempts >= job.max_attempts:
+            _finish(job, lease, status='failed', finished_at=timezone.now(), last_error=last_error)
+            logger.error('Job %s (%s) failed: %s', job.id, job.name, last_error)
+        else:
+            backoff = settings.JOBS_RETRY_DELAY * 2 ** (job.attempts - 1)
+            _finish(
+                job, lease, status='queued', last_error=last_error,
+                run_at=timezone.now() + timedelta(seconds=backoff),
+            )
+            logger.warning('Job %s (%s) will retry in %ss', job.id, job.name, backoff)
+        return False
+    return True
+
+
+def run_pending(worker_id=None, batch_size=10):
+    """
+    Claim and run one batch of due jobs.
+
+    Returns:
+        The number of jobs run
+    """
+    jobs = claim_jobs(worker_id or default_worker_id(), limit=batch_size)
+    for job in jobs:
+        run_job(job)
+    return len(jobs)
+
+
+def prune_finished(limit=None):
+    """
+    Delete one chunk of succeeded and failed jobs that finished more than
+    JOBS_RETENTION_DAYS ago.
+
+    Returns:
+        The number of jobs deleted
+    """
+    cutoff = timezone.now() - timedelta(days=settings.JOBS_RETENTION_DAYS)
+    ids = list(Job.objects.filter(
+        status__in=['succeeded', 'failed'], finished_at__lt=cutoff
+    ).order_by().values_list('pk', flat=True)[:limit or settings.RETENTION_CHUNK_SIZE])
+    if not ids:
+        return 0
+    deleted, _ = Job.objects.filter(pk__in=ids).delete()
+    return deleted
+
+
+def work(worker_id=None, batch_size=10, poll_interval=None, should_stop=lambda: False):
+    """
+    Run jobs until should_stop() returns True, sleeping when idle.
+    """
+    worker_id = worker_id or default_worker_id()
+    poll_interval = settings.JOBS_POLL_INTERVAL if poll_interval is None else poll_interval
+    while not should_stop():
+        run_periodic()
+        if not run_pending(worker_id, batch_size):
+            time.sleep(poll_interval)
@@ -0,0 +1,17 @@
+# KapwaNet - Community Platform for Dignified Mutual Aid
+# SPDX-License-Identifier: AGPL-3.0-or-later
+
+"""
+Background tasks for the job queue itself.
+"""
+
+from django.conf import settings
+
+from .queue import periodic, prune_finished
+
+
+@periodic(interval=settings.JOBS_PRUNE_INTERVAL)
+def prune_jobs():
+    """Delete finished jobs older than JOBS_RETENTION_DAYS, a chunk at a time."""
+    while prune_finished():
+        pass
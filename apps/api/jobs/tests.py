@@ -0,0 +1,186 @@
+# KapwaNet - Community Platform for Dignified Mutual Aid
+# SPDX-License-Identifier: AGPL-3.0-or-later
+
+"""
+Tests for the background job queue.
+"""
+
+from datetime import timedelta
+
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from help.models import HelpPost, HelpMatch
+from messaging.models import Message
+from organizations.models import Organization, Membership
+from users.models import User
+from .models import Job
+from .queue import claim_jobs, enqueue, prune_finished, run_job, run_pending, run_periodic, task
+
+calls = []
+
+
+@task(name='jobs.tests.record')
+def record(value):
+    calls.append(value)
+
+
+@task(name='jobs.tests.create_org')
+def create_org(slug):
+    Organization.objects.create(name=slug, slug=slug)
+
+
+@task(name='jobs.tests.explode', max_attempts=2)
+def explode():
+    raise RuntimeError('boom')
+
+
+@override_settings(JOBS_SYNC=False, JOBS_RETRY_DELAY=10)
+class JobQueueTests(TestCase):
+    """Tests for enqueuing and running jobs."""
+
+    def setUp(self):
+        calls.clear()
+
+    def test_enqueue_and_run(self):
+        """Test that queued jobs run once and are marked succeeded."""
+        job = enqueue(record, {'value': 1})
+        self.assertEqual(job.status, 'queued')
+        self.assertEqual(calls, [])
+
+        self.assertEqual(run_pending('test-worker'), 1)
+        self.assertEqual(calls, [1])
+        job.refresh_from_db()
+        self.assertEqual(job.status, 'succeeded')
+        self.assertEqual(job.attempts, 1)
+        self.assertIsNotNone(job.finished_at)
+
+        self.assertEqual(run_pending('test-worker'), 0)
+
+    def test_idempotency_key(self):
+        """Test that a repeated idempotency key does not queue a second job."""
+        first = enqueue('jobs.tests.record', {'value': 1}, idempotency_key='once')
+        second = enqueue('jobs.tests.record', {'value': 2}, idempotency_key='once')
+        self.assertEqual(first.pk, second.pk)
+        self.assertEqual(Job.objects.count(), 1)
+
+    def test_delayed_job_waits(self):
+        """Test that a job does not run before its run_at."""
+        enqueue(record, {'value': 1}, delay=timedelta(minutes=5))
+        self.assertEqual(run_pending('test-worker'), 0)
+
+    def test_failed_job_retries_then_fails(self):
+        """Test exponential backoff and the final failed state."""
+        job = enqueue(explode)
+
+        run_pending('test-worker')
+        job.refresh_from_db()
+        self.assertEqual(job.status, 'queued')
+        self.assertIn('boom', job.last_error)
+        self.assertGreater(job.run_at, timezone.now() + timedelta(seconds=5))
+
+        Job.objects.filter(pk=job.pk).update(run_at=timezone.now())
+        run_pending('test-worker')
+        job.refresh_from_db()
+        self.assertEqual(job.status, 'failed')
+        self.assertEqual(job.attempts, 2)
+
+    def test_stale_running_job_is_reclaimed(self):
+        """Test that jobs locked by a dead worker run again."""
+        job = enqueue(record, {'value': 1})
+        Job.objects.filter(pk=job.pk).update(
+            status='running', locked_at=timezone.now() - timedelta(hours=1)
+        )
+        self.assertEqual(run_pending('test-worker'), 1)
+        self.assertEqual(calls, [1])
+
+    @override_settings(JOBS_RETENTION_DAYS=7)
+    def test_prune_jobs(self):
+        """Test that only jobs finished before the retention window are deleted."""
+        old = timezone.now() - timedelta(days=8)
+        succeeded = enqueue(record, {'value': 1})
+        failed = enqueue(record, {'value': 2})
+        recent = enqueue(record, {'value': 3})
+        queued = enqueue(record, {'value': 4})
+        Job.objects.filter(pk=succeeded.pk).update(status='succeeded', finished_at=old)
+        Job.objects.filter(pk=failed.pk).update(status='failed', finished_at=old)
+        Job.objects.filter(pk=recent.pk).update(status='succeeded', finished_at=timezone.now())
+        Job.objects.filter(pk=queued.pk).update(run_at=old)
+
+        self.assertIn('jobs.prune_jobs', run_periodic(force=True))
+        self.assertEqual(
+            set(Job.objects.values_list('pk', flat=True)), {recent.pk, queued.pk}
+        )
+        self.assertEqual(prune_finished(limit=1), 0)
+
+    def test_reclaimed_job_discards_stale_run(self):
+        """Test that a worker whose lease was taken over rolls its run back."""
+        job = enqueue(create_org, {'slug': 'from-job'})
+        stale = claim_jobs('worker-a')[0]
+        # The lease expired and worker-b claimed the job while worker-a ran it
+        Job.objects.filter(pk=job.pk).update(locked_by='worker-b', locked_at=timezone.now())
+
+        self.assertFalse(run_job(stale))
+        self.assertFalse(Organization.objects.filter(slug='from-job').exists())
+        job.refresh_from_db()
+        self.assertEqual(job.status, 'running')
+        self.assertEqual(job.locked_by, 'worker-b')
+
+    def test_unknown_task_is_rejected(self):
+        """Test that enqueuing an unregistered task fails fast."""
+        with self.assertRaises(ValueError):
+            enqueue('jobs.tests.missing')
+
+
+class SystemMessageJobTests(TestCase):
+    """Tests for system messages sent from jobs."""
+
+    def setUp(self):
+        self.requester = User.objects.create_user(email='requester@example.com', password='testpass123')
+        self.helper = User.objects.create_user(email='helper@example.com', password='testpass123')
+        self.org = Organization.objects.create(name='Test Organization', slug='test-org')
+        for user in (self.requester, self.helper):
+            Membership.objects.create(org=self.org, user=user, role='member', status='active')
+        post = HelpPost.objects.create(
+            org=self.org, type='request', category='transportation',
+            title='Need a ride', description='To the clinic', created_by=self.requester
+        )
+        self.match = HelpMatch.objects.create(org=self.org, help_post=post, helper_user=self.helper)
+
+    @override_settings(JOBS_SYNC=False)
+    def test_accept_queues_system_message(self):
+        """Test that accepting a match leaves the system message to a worker."""
+        thread = self.match.accept()
+        self.assertFalse(thread.messages.exists())
+        self.assertTrue(Job.objects.filter(idempotency_key=f'help_match:{self.match.id}:{thread.id}:accepted').exists())
+
+        run_pending('test-worker')
+        self.assertEqual(
+            list(thread.messages.values_list('message_type', flat=True)), ['system']
+        )
+
+    @override_settings(JOBS_SYNC=False)
+    def test_reaccepted_match_gets_its_own_notices(self):
+        """Test that withdraw, renewed interest and a second accept notify the new thread."""
+        first = self.match.accept()
+        self.match.withdraw()
+        match = HelpMatch.express_interest(self.match.help_post, self.helper)
+        second = match.accept()
+        match.withdraw()
+        while run_pending('test-worker'):
+            pass
+
+        self.assertNotEqual(first.pk, second.pk)
+        for thread in (first, second):
+            bodies = list(thread.messages.order_by('created_at').values_list('body', flat=True))
+            self.assertEqual(len(bodies), 2)
+            self.assertTrue(bodies[0].startswith('Match accepted!'))
+            self.assertIn('has withdrawn', bodies[1])
+
+    @override_settings(JOBS_SYNC=True)
+    def test_sync_mode_runs_inline(self):
+        """Test that JOBS_SYNC sends the system message immediately."""
+        thread = self.match.accept()
+        self.assertEqual(thread.messages.count(), 1)
+        self.assertFalse(Job.objects.exists())
+        self.assertEqual(Message.objects.get().message_type, 'system')
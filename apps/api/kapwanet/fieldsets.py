@@ -0,0 +1,80 @@
+"""
+Sparse fieldsets and field expansion for API responses.
+
+GET requests may pass:
+
+    ?fields=id,title,status   Only render these fields
+    ?expand=org               Render these relations as nested objects
+                              (only those a serializer declares expandable)
+
+Fields that are not rendered are dropped from the serializer before any
+row is serialized, so their SerializerMethodFields never run, and
+viewsets use `wants_field()` to skip joins and annotations that only
+those fields need. Write requests always use the full field set so
+validation sees every field.
+"""
+
+from rest_framework.permissions import SAFE_METHODS
+
+
+def parse_field_list(value):
+    """Parse a comma-separated field list into a set of names."""
+    return {name.strip() for name in value.split(',') if name.strip()}
+
+
+def get_sparse_fieldset(request):
+    """
+    Get the requested fieldset for a request.
+
+    Returns:
+        A tuple of (fields, expand), where fields is a set of field names or
+        None (all fields), and expand is a set of relation names
+    """
+    if request is None or request.method not in SAFE_METHODS:
+        return None, set()
+
+    params = getattr(request, 'query_params', request.GET)
+    fields = params.get('fields')
+    expand = params.get('expand')
+    return (
+        parse_field_list(fields) if fields else None,
+        parse_field_list(expand) if expand else set(),
+    )
+
+
+def wants_field(request, name):
+    """Check whether a field will be rendered for this request."""
+    fields, expand = get_sparse_fieldset(request)
+    return fields is None or name in fields or name in expand
+
+
+class SparseFieldsetMixin:
+    """
+    Serializer mixin honouring `?fields=` and `?expand=`.
+
+    Declare relations that can be expanded as:
+
+        expandable_fields = {
+            'org': (OrganizationListSerializer, {}),
+        }
+
+    An expanded field replaces the primary key with the nested
+    representation. Expanded fields are always rendered, even when not
+    listed in `?fields=`.
+    """
+
+    expandable_fields = {}
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        fields, expand = get_sparse_fieldset(self.context.get('request'))
+        expand &= set(self.expandable_fields)
+
+        for name in expand:
+            serializer_class, options = self.expandable_fields[name]
+            self.fields[name] = serializer_class(read_only=True, **options)
+
+        if fields is not None:
+            for name in list(self.fields):
+                if name not in fields and name not in expand:
+                    self.fields.pop(name)
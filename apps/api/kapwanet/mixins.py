@@ -0,0 +1,187 @@
+"""
+Shared viewset mixins for KapwaNet API.
+"""
+
+import hashlib
+
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import Count, Max
+from django.utils.cache import get_conditional_response, quote_etag
+from django.utils.http import http_date
+from rest_framework import status
+from rest_framework.response import Response
+
+from .fieldsets import get_sparse_fieldset
+from .signals import cache_lookup
+
+
+class ConditionalGetMixin:
+    """
+    Opt-in conditional GET support (ETag / Last-Modified) for viewsets.
+
+    List responses are validated by the count and max timestamps of the
+    filtered queryset; detail responses by the object's timestamps. A
+    matching If-None-Match (or If-Modified-Since, for details) short-circuits
+    to 304 Not Modified before anything is serialized.
+
+    ETags are weak and include the requesting user and the full request
+    path, since serializers expose per-user fields and query params change
+    filtering and ordering.
+
+    Detail output that does not change with the object's own timestamps
+    must be folded in too, or clients keep getting 304s for stale data:
+    values on loaded relations and annotations (the creator's name, a
+    pending count) through conditional_detail_fields, related timestamps
+    shown in list rows through conditional_list_fields, and state of the
+    caller's (their role in the org) through get_conditional_extra().
+
+    Usage:
+        class MyViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
+            conditional_timestamp_fields = ['updated_at']
+    """
+
+    # Timestamp fields whose max() changes whenever a row's output changes
+    conditional_timestamp_fields = ['updated_at']
+
+    # Related timestamps whose max() changes when a list row's derived
+    # fields do, e.g. 'created_by__updated_at' for created_by_name
+    conditional_list_fields = []
+
+    # Dotted paths read off the detail object, e.g. 'created_by.updated_at'
+    # or an annotation; relations that were not loaded are skipped
+    conditional_detail_fields = []
+
+    def get_conditional_extra(self, request, instance=None):
+        """
+        Return extra values to fold into the ETag.
+
+        Override for per-user state that lives outside the queryset's rows
+        (e.g. read markers, the caller's role). instance is the object for
+        detail requests and None for lists.
+        """
+        return []
+
+    def list(self, request, *args, **kwargs):
+        """List with ETag validation."""
+        queryset = self.filter_queryset(self.get_queryset())
+        fields = self.conditional_timestamp_fields + self.conditional_list_fields
+        aggregates = {f'max_{field}': Max(field) for field in fields}
+        summary = queryset.order_by().aggregate(count=Count('pk', distinct=True), **aggregates)
+        values = [summary['count']] + [summary[f'max_{field}'] for field in fields]
+        etag = self._build_etag(request, values)
+
+        # Last-Modified alone cannot see deletions, so lists validate on ETag only
+        not_modified = self._not_modified_response(request, etag, None)
+        if not_modified is not None:
+            return not_modified
+
+        response = super().list(request, *args, **kwargs)
+        timestamps = values[1:len(self.conditional_timestamp_fields) + 1]
+        return self._set_validators(response, etag, self._latest(timestamps))
+
+    def retrieve(self, request, *args, **kwargs):
+        """Retrieve with ETag / Last-Modified validation."""
+        instance = self.get_object()
+        values = [
+            getattr(instance, field, None) for field in self.conditional_timestamp_fields
+        ]
+        related = [
+            self._read_path(instance, path) for path in self.conditional_detail_fields
+        ]
+        etag = self._build_etag(request, [instance.pk] + values + related, instance)
+        last_modified = self._latest(values)
+
+        not_modified = self._not_modified_response(request, etag, last_modified)
+        if not_modified is not None:
+            return not_modified
+
+        serializer = self.get_serializer(instance)
+        response = Response(serializer.data)
+        return self._set_validators(response, etag, last_modified)
+
+    def _build_etag(self, request, values, instance=None):
+        """Build a weak ETag from the given values and the request identity."""
+        user_id = getattr(request.user, 'pk', None)
+        parts = [self.__class__.__name__, request.get_full_path(), user_id]
+        parts += values
+        parts += self.get_conditional_extra(request, instance)
+        digest = hashlib.md5(
+            '|'.join(str(part) for part in parts).encode(),
+            usedforsecurity=False,
+        ).hexdigest()
+        return 'W/' + quote_etag(digest)
+
+    def _read_path(self, instance, path):
+        """Read a dotted path without loading relations, or None."""
+        value = instance
+        for name in path.split('.'):
+            if value is None:
+                return None
+            try:
+                field = value._meta.get_field(name)
+            except (AttributeError, FieldDoesNotExist):
+                field = None
+            if field is not None and field.is_relation and not field.is_cached(value):
+                # Not select_related, so the output does not read it either
+                return None
+            value = getattr(value, name, None)
+        return value
+
+    def _latest(self, timestamps):
+        """Return the most recent non-null timestamp, or None."""
+        timestamps = [ts for ts in timestamps if ts is not None]
+        return max(timestamps) if timestamps else None
+
+    def _not_modified_response(self, request, etag, last_modified):
+        """Return a 304 response if the client's validators still match."""
+        timestamp = int(last_modified.timestamp()) if last_modified else None
+        conditional = get_conditional_response(
+            request, etag=etag, last_modified=timestamp
+        )
+        hit = conditional is not None and conditional.status_code == status.HTTP_304_NOT_MODIFIED
+        if 'HTTP_IF_NONE_MATCH' in request.META or 'HTTP_IF_MODIFIED_SINCE' in request.META:
+            cache_lookup.send(sender=type(self), cache='conditional_get', hit=hit)
+        if hit:
+            response = Response(status=status.HTTP_304_NOT_MODIFIED)
+            return self._set_validators(response, etag, last_modified)
+        return None
+
+    def _set_validators(self, response, etag, last_modified):
+        """Attach ETag and Last-Modified headers to a response."""
+        if response.status_code in (status.HTTP_200_OK, status.HTTP_304_NOT_MODIFIED):
+            response['ETag'] = etag
+            if last_modified is not None:
+                response['Last-Modified'] = http_date(last_modified.timestamp())
+        return response
+
+
+class ProjectedListMixin:
+    """
+    Render the list action through a values-based projection.
+
+    The filtered queryset is narrowed to `.values()` rows and rendered by
+    `list_projection_class` (a kapwanet.projections.ValuesProjection), so
+    no model instances or per-row serializer fields are built. Other
+    actions, and lists with `?expand=` (projections render flat rows),
+    keep using the regular serializers.
+
+    Usage:
+        class MyViewSet(ProjectedListMixin, viewsets.ModelViewSet):
+            list_projection_class = MyListProjection
+    """
+
+    list_projection_class = None
+
+    def list(self, request, *args, **kwargs):
+        """List using the projection, if one is configured."""
+        _, expand = get_sparse_fieldset(request)
+        if self.list_projection_class is None or expand:
+            return super().list(request, *args, **kwargs)
+
+        projection = self.list_projection_class(context=self.get_serializer_context())
+        rows = projection.project(self.filter_queryset(self.get_queryset()))
+
+        page = self.paginate_queryset(rows)
+        if page is not None:
+            return self.get_paginated_response(projection.render(page))
+        return Response(projection.render(rows))
@@ -0,0 +1,130 @@
+"""
+Values-based read projections for list endpoints.
+
+A ValuesProjection renders the same output as a list serializer, but
+fetches plain `.values()` rows for exactly the columns the serializer
+needs and builds each item without instantiating models or running the
+serializer field machinery per row:
+
+- Plain model fields (and dotted sources such as `help_post.title`) are
+  fetched by column and rendered with the serializer field's own
+  `to_representation`; foreign keys render as their raw primary key, as
+  PrimaryKeyRelatedField would.
+- `*_display` fields resolve labels from precomputed choice dicts.
+- Queryset annotations (e.g. counts) are fetched as columns by name.
+- Derived fields (names, counts, flags) are small functions over the
+  looked-up values.
+
+Projections honour `?fields=` like SparseFieldsetMixin serializers, and
+only fetch the columns the requested fields need. They are read-only; the
+serializer stays the source of truth for field order, and tests assert
+that both render identical output.
+"""
+
+from django.core.exceptions import FieldDoesNotExist, ImproperlyConfigured
+
+from observability.instrumentation import serialization
+
+from .fieldsets import get_sparse_fieldset
+
+
+class ValuesProjection:
+    """
+    Base class for read-only list projections.
+
+    Subclasses set:
+        serializer_class: The list serializer being mirrored
+        display_fields: {output_field: model_choice_field}
+        annotation_fields: Output fields read from same-named queryset
+            annotations
+        computed_fields: {output_field: ((lookup, ...), func)}, where func
+            is called with the looked-up values in order
+
+    Usage:
+        projection = MyListProjection(context={'request': request})
+        rows = projection.project(queryset)
+        data = projection.render(rows)
+    """
+
+    serializer_class = None
+    display_fields = {}
+    annotation_fields = ()
+    computed_fields = {}
+
+    def __init__(self, context=None):
+        self.context = context or {}
+        fields, _ = get_sparse_fieldset(self.context.get('request'))
+        self.steps = [
+            step for step in self.get_plan()
+            if fields is None or step[0] in fields
+        ]
+
+    @classmethod
+    def get_plan(cls):
+        """
+        Build (once per class) the per-field render steps.
+
+        Returns a list of (field_name, kind, lookups, info) entries in
+        serializer field order.
+        """
+        plan = cls.__dict__.get('_plan')
+        if plan is not None:
+            return plan
+
+        serializer = cls.serializer_class()
+        model = serializer.Meta.model
+        plan = []
+
+        for name, field in serializer.fields.items():
+            if name in cls.computed_fields:
+                field_lookups, func = cls.computed_fields[name]
+                plan.append((name, 'computed', tuple(field_lookups), func))
+            elif name in cls.display_fields:
+                choice_field = model._meta.get_field(cls.display_fields[name])
+                labels = {value: str(label) for value, label in choice_field.flatchoices}
+                plan.append((name, 'display', (choice_field.attname,), labels))
+            elif name in cls.annotation_fields:
+                plan.append((name, 'column', (name,), None))
+            elif '.' in field.source:
+                # Related column, e.g. source='help_post.title'
+                lookup = field.source.replace('.', '__')
+                plan.append((name, 'column', (lookup,), field.to_representation))
+            else:
+                try:
+                    model_field = model._meta.get_field(field.source)
+                except FieldDoesNotExist:
+                    raise ImproperlyConfigured(
+                        f"{cls.__name__} cannot project '{name}'; "
+                        f"declare it in computed_fields."
+                    )
+                render = None if model_field.is_relation else field.to_representation
+                plan.append((name, 'column', (model_field.attname,), render))
+
+        cls._plan = plan
+        return plan
+
+    def project(self, queryset):
+        """Narrow a queryset to the values the requested fields need."""
+        lookups = []
+        for _, _, field_lookups, _ in self.steps:
+            lookups += [lookup for lookup in field_lookups if lookup not in lookups]
+        # values() needs at least one column, even for an empty fieldset
+        return queryset.values(*(lookups or ['pk']))
+
+    def render(self, rows):
+        """Render projected rows into a list of dicts (timed as serializer work)."""
+        data = []
+        with serialization():
+            for row in rows:
+                item = {}
+                for name, kind, lookups, info in self.steps:
+                    if kind == 'column':
+                        value = row[lookups[0]]
+                        item[name] = info(value) if (info and value is not None) else value
+                    elif kind == 'display':
+                        value = row[lookups[0]]
+                        item[name] = info.get(value, value)
+                    else:
+                        item[name] = info(*[row[lookup] for lookup in lookups])
+                data.append(item)
+        return data
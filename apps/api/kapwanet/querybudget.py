@@ -0,0 +1,141 @@
+"""
+Query budgets for API endpoints.
+
+Viewsets declare the most database queries each action may run in a
+`query_budgets` class attribute, keyed by action name:
+
+    class ThreadViewSet(viewsets.ModelViewSet):
+        query_budgets = {'list': 5, 'retrieve': 9, 'unread_counts': 2}
+
+A budget is the number of queries the action runs today, not a loose
+ceiling: lower it when an endpoint gets cheaper, and treat raising it as
+a change to review. Actions without a budget fail when a test measures
+them.
+
+Budgets are enforced by the API tests through QueryBudgetTestMixin.
+List budgets are checked with several rows and must not change as rows
+are added, so an N+1 shows up as a failing test rather than a slow page.
+A failure lists the SQL fingerprints that ran more than once and the
+project code that issued them.
+"""
+
+import re
+import traceback
+from collections import defaultdict
+
+from django.conf import settings
+from django.db import connection
+
+# Literals and placeholder lists collapsed when fingerprinting SQL
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r'\b\d+\b')
+_IN_LIST = re.compile(r'\bIN \((?:[^()]*)\)', re.IGNORECASE)
+_SPACE = re.compile(r'\s+')
+
+
+def get_query_budget(view):
+    """Get the query budget declared for a view's current action, or None."""
+    return getattr(view, 'query_budgets', {}).get(getattr(view, 'action', None))
+
+
+def fingerprint(sql):
+    """Normalize SQL so queries differing only in values compare equal."""
+    sql = _STRING.sub('?', sql)
+    sql = _NUMBER.sub('?', sql)
+    sql = _IN_LIST.sub('IN (...)', sql)
+    return _SPACE.sub(' ', sql).strip()
+
+
+def call_sites(limit=3):
+    """The innermost project frames (outside Django and libraries) of the current stack."""
+    base = str(settings.BASE_DIR)
+    sites = []
+    for frame in reversed(traceback.extract_stack()[:-2]):
+        if not frame.filename.startswith(base) or 'site-packages' in frame.filename:
+            continue
+        if frame.filename == __file__:
+            continue
+        sites.append(f'{frame.filename[len(base) + 1:]}:{frame.lineno} in {frame.name}')
+        if len(sites) == limit:
+            break
+    return sites
+
+
+class QueryRecorder:
+    """Database execute wrapper recording each query's SQL and call sites."""
+
+    def __init__(self):
+        self.queries = []
+
+    def __call__(self, execute, sql, params, many, context):
+        self.queries.append((sql, call_sites()))
+        return execute(sql, params, many, context)
+
+    def __len__(self):
+        return len(self.queries)
+
+    def report(self):
+        """Describe the recorded queries, repeated fingerprints first."""
+        groups = defaultdict(list)
+        for sql, sites in self.queries:
+            groups[fingerprint(sql)].append(sites)
+
+        lines = [f'{len(self.queries)} queries:']
+        for sql, site_lists in sorted(groups.items(), key=lambda item: -len(item[1])):
+            lines.append(f'  {len(site_lists)}x {sql[:300]}')
+            if len(site_lists) > 1:
+                for site in dict.fromkeys(tuple(sites) for sites in site_lists):
+                    lines.append('      from ' + ' <- '.join(site or ('<library code>',)))
+        return '\n'.join(lines)
+
+
+class QueryBudgetTestMixin:
+    """
+    Test case helpers enforcing viewset query budgets.
+
+    Usage:
+        class ThreadQueryBudgetTests(QueryBudgetTestMixin, APITestCase):
+            def test_list(self):
+                self.assertConstantQueries('/api/threads/', grow=self.add_thread)
+    """
+
+    def request_within_budget(self, method, path, data=None, **extra):
+        """
+        Make a request and fail if it exceeds its action's query budget.
+
+        Returns:
+            A tuple of (response, QueryRecorder)
+        """
+        recorder = QueryRecorder()
+        with connection.execute_wrapper(recorder):
+            response = getattr(self.client, method)(path, data, **extra)
+
+        view = getattr(response, 'renderer_context', {}).get('view')
+        budget = get_query_budget(view)
+        name = f'{type(view).__name__}.{getattr(view, "action", None)}'
+        if budget is None:
+            self.fail(f'{method.upper()} {path}: {name} has no query budget')
+        if len(recorder) > budget:
+            self.fail(
+                f'{method.upper()} {path}: {name} ran {len(recorder)} queries, '
+                f'budget is {budget}.\n{recorder.report()}'
+            )
+        return response, recorder
+
+    def assertConstantQueries(self, path, grow, **extra):
+        """
+        Assert a GET stays within budget and runs as many queries after grow() adds rows.
+
+        The first request warms per-process caches (e.g. org lookups) and is
+        not measured.
+        """
+        self.client.get(path, **extra)
+        _, before = self.request_within_budget('get', path, **extra)
+        grow()
+        response, after = self.request_within_budget('get', path, **extra)
+        if len(after) != len(before):
+            self.fail(
+                f'GET {path}: {len(before)} queries before adding rows, {len(after)} after.\n'
+                f'{after.report()}'
+            )
+        return response
@@ -3,6 +3,8 @@ Django settings for KapwaNet project.
 """
 
 import os
+import sys
+import tempfile
 from pathlib import Path
 from datetime import timedelta
 
@@ -59,9 +61,18 @@ INSTALLED_APPS = [
     'messaging',
     'items',
     'moderation',
+    'sync',
+    'retention',
+    'jobs',
+    'events',
+    'webhooks',
+    'benchmarks',
+    'observability',
 ]
 
 MIDDLEWARE = [
+    'observability.middleware.RequestMetricsMiddleware',
+    'observability.middleware.ProfilingMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -142,6 +153,118 @@ REST_FRAMEWORK = {
     ),
 }
 
+# Organization slug/ID lookup cache (see organizations/cache.py)
+ORG_LOOKUP_CACHE_MAX_ENTRIES = int(os.environ.get('ORG_LOOKUP_CACHE_MAX_ENTRIES', 1024))
+ORG_LOOKUP_CACHE_TTL = int(os.environ.get('ORG_LOOKUP_CACHE_TTL', 300))
+
+# Delta sync (/api/sync/) page sizes, per collection
+SYNC_PAGE_SIZE = int(os.environ.get('SYNC_PAGE_SIZE', 100))
+SYNC_MAX_PAGE_SIZE = int(os.environ.get('SYNC_MAX_PAGE_SIZE', 500))
+# Seconds a write is held back from sync so that late-committing
+# transactions are not skipped, and days deletions are kept for clients to
+# pick up (older sync tokens must start a full sync)
+SYNC_LAG = float(os.environ.get('SYNC_LAG', 2.0))
+SYNC_TOMBSTONE_DAYS = float(os.environ.get('SYNC_TOMBSTONE_DAYS', 30))
+SYNC_PRUNE_INTERVAL = int(os.environ.get('SYNC_PRUNE_INTERVAL', 3600))
+
+# Data retention (see retention/engine.py): rows per chunk, and seconds to
+# pause between chunks
+RETENTION_CHUNK_SIZE = int(os.environ.get('RETENTION_CHUNK_SIZE', 500))
+RETENTION_CHUNK_PAUSE = float(os.environ.get('RETENTION_CHUNK_PAUSE', 0.1))
+
+# Background jobs (see jobs/queue.py). JOBS_SYNC runs jobs inline when
+# enqueued instead of leaving them for `manage.py run_worker`.
+JOBS_SYNC = os.environ.get('JOBS_SYNC', 'False').lower() in ('true', '1', 'yes')
+JOBS_LOCK_TIMEOUT = int(os.environ.get('JOBS_LOCK_TIMEOUT', 300))
+JOBS_RETRY_DELAY = int(os.environ.get('JOBS_RETRY_DELAY', 10))
+JOBS_POLL_INTERVAL = float(os.environ.get('JOBS_POLL_INTERVAL', 1.0))
+# Succeeded and failed jobs are deleted this long after they finished
+# (checked by workers every JOBS_PRUNE_INTERVAL seconds). An idempotency key
+# can be reused once its job is pruned.
+JOBS_RETENTION_DAYS = float(os.environ.get('JOBS_RETENTION_DAYS', 14))
+JOBS_PRUNE_INTERVAL = int(os.environ.get('JOBS_PRUNE_INTERVAL', 3600))
+
+# Domain event outbox (see events/outbox.py): seconds an event must age
+# before it is relayed (databases other than PostgreSQL), events per
+# consumer batch, and attempts before a consumer skips a failing event
+EVENTS_RELAY_LAG = float(os.environ.get('EVENTS_RELAY_LAG', 2.0))
+EVENTS_BATCH_SIZE = int(os.environ.get('EVENTS_BATCH_SIZE', 100))
+EVENTS_MAX_ATTEMPTS = int(os.environ.get('EVENTS_MAX_ATTEMPTS', 5))
+
+# Outbound webhooks (see webhooks/delivery.py). Workers send due retries
+# every WEBHOOK_RETRY_SWEEP_INTERVAL seconds. WEBHOOK_ALLOW_PRIVATE_URLS
+# permits URLs on loopback/private addresses (local development only).
+WEBHOOK_TIMEOUT = float(os.environ.get('WEBHOOK_TIMEOUT', 10))
+WEBHOOK_CONCURRENCY = int(os.environ.get('WEBHOOK_CONCURRENCY', 8))
+WEBHOOK_MAX_ATTEMPTS = int(os.environ.get('WEBHOOK_MAX_ATTEMPTS', 6))
+WEBHOOK_RETRY_DELAY = int(os.environ.get('WEBHOOK_RETRY_DELAY', 30))
+WEBHOOK_MAX_EVENTS_PER_DELIVERY = int(os.environ.get('WEBHOOK_MAX_EVENTS_PER_DELIVERY', 100))
+WEBHOOK_RETRY_SWEEP_INTERVAL = float(os.environ.get('WEBHOOK_RETRY_SWEEP_INTERVAL', 15))
+WEBHOOK_ALLOW_PRIVATE_URLS = os.environ.get('WEBHOOK_ALLOW_PRIVATE_URLS', 'False').lower() in ('true', '1', 'yes')
+
+# Request instrumentation (see observability/middleware.py). Requests slower
+# than REQUEST_SLOW_MS are logged with the fingerprints of up to
+# REQUEST_SLOW_MAX_QUERIES SQL statements, for a REQUEST_SLOW_SAMPLE_RATE
+# fraction of them.
+REQUEST_SLOW_MS = float(os.environ.get('REQUEST_SLOW_MS', 500))
+REQUEST_SLOW_SAMPLE_RATE = float(os.environ.get('REQUEST_SLOW_SAMPLE_RATE', 0.1))
+REQUEST_SLOW_MAX_QUERIES = int(os.environ.get('REQUEST_SLOW_MAX_QUERIES', 200))
+
+# Append sqlcommenter-style comments (route, viewset, action, org, request ID
+# and calling code) to every query made while serving a request, so
+# pg_stat_statements and slow query logs show where queries come from
+SQL_COMMENTS = os.environ.get('SQL_COMMENTS', 'False').lower() in ('true', '1', 'yes')
+
+# Sampling profiler (see observability/profiling.py). Requests are profiled
+# when they send an X-Profile token from `manage.py profile_token`, or at a
+# per-action rate from PROFILE_SAMPLE_RATES, e.g.
+# "ThreadViewSet.unread_counts=0.01,HelpPostViewSet.list=0.001"
+PROFILE_DIR = os.environ.get('PROFILE_DIR', os.path.join(tempfile.gettempdir(), 'kapwanet-profiles'))
+PROFILE_INTERVAL_MS = float(os.environ.get('PROFILE_INTERVAL_MS', 5))
+# Profiles kept in PROFILE_DIR; older ones are deleted as new ones are saved
+PROFILE_MAX_FILES = int(os.environ.get('PROFILE_MAX_FILES', 200))
+PROFILE_MAX_AGE_HOURS = float(os.environ.get('PROFILE_MAX_AGE_HOURS', 7 * 24))
+PROFILE_SAMPLE_RATES = {
+    endpoint.strip(): float(rate)
+    for endpoint, rate in (
+        item.split('=', 1) for item in os.environ.get('PROFILE_SAMPLE_RATES', '').split(',') if '=' in item
+    )
+}
+
+# Prometheus metrics at /api/metrics/ (see observability/metrics.py). Scrapers
+# must send METRICS_TOKEN as a bearer token or connect from one of
+# METRICS_ALLOWED_IPS (addresses or networks, comma separated).
+# METRICS_ACTIVE_USER_WINDOW is in minutes; the database gauges are reused
+# for METRICS_STATE_TTL seconds between scrapes.
+METRICS_TOKEN = os.environ.get('METRICS_TOKEN', '')
+METRICS_ALLOWED_IPS = os.environ.get('METRICS_ALLOWED_IPS', '127.0.0.1,::1').split(',')
+METRICS_ACTIVE_USER_WINDOW = int(os.environ.get('METRICS_ACTIVE_USER_WINDOW', 15))
+METRICS_STATE_TTL = float(os.environ.get('METRICS_STATE_TTL', 30))
+
+# Readiness probe at /api/ready/ (see observability/readiness.py): seconds a
+# result is reused, and seconds the oldest due job may wait before the pod
+# is reported degraded
+READY_CACHE_SECONDS = float(os.environ.get('READY_CACHE_SECONDS', 5))
+READY_JOBS_MAX_LAG = float(os.environ.get('READY_JOBS_MAX_LAG', 300))
+
+# Logging: one JSON line per request from observability, on stderr. Test
+# runs are silent (tests capture records with assertLogs).
+TESTING = len(sys.argv) > 1 and sys.argv[1] == 'test'
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        'observability': {
+            'handlers': ['console'],
+            'level': os.environ.get('REQUEST_LOG_LEVEL', 'CRITICAL' if TESTING else 'INFO'),
+            'propagate': False,
+        },
+    },
+}
+
 # Simple JWT settings
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(minutes=60),
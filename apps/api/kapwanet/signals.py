@@ -0,0 +1,14 @@
+"""
+Signals for cross-cutting concerns.
+
+Domain code announces what happened here without depending on who
+listens; the observability app turns them into Prometheus counters.
+"""
+
+from django.dispatch import Signal
+
+# A message was created. Sent by Message with message_type ('user' or 'system').
+message_sent = Signal()
+
+# A cache was consulted. Sent with cache (its name) and hit (bool).
+cache_lookup = Signal()
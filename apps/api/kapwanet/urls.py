@@ -16,6 +16,8 @@ from rest_framework_simplejwt.views import (
     TokenRefreshView,
 )
 
+from observability.views import metrics, ready
+
 from .views import health_check
 
 urlpatterns = [
@@ -28,6 +30,8 @@ urlpatterns = [
 
     # API endpoints
     path('api/health/', health_check, name='health_check'),
+    path('api/ready/', ready, name='ready'),
+    path('api/metrics/', metrics, name='metrics'),
     path('api/token/', TokenObtainPairView.as_view(), name='token_obtain_pair'),
     path('api/token/refresh/', TokenRefreshView.as_view(), name='token_refresh'),
     path('api/organizations/', include('organizations.urls')),
@@ -42,6 +46,8 @@ urlpatterns = [
     path('api/item-reservations/', include('items.reservation_urls')),
     path('api/', include('messaging.urls')),
     path('api/', include('moderation.urls')),
+    path('api/sync/', include('sync.urls')),
+    path('api/webhooks/', include('webhooks.urls')),
 
     # Wagtail pages (catch-all, should be last)
     path('', include(wagtail_urls)),
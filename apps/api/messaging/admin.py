@@ -6,6 +6,9 @@ Admin configuration for messaging models.
 """
 
 from django.contrib import admin
+from django.db.models import Q
+
+from users.models import User
 
 from .models import Thread, ThreadParticipant, Message
 
@@ -84,3 +87,20 @@ class MessageAdmin(admin.ModelAdmin):
     def body_preview(self, obj):
         return obj.body[:50] + '...' if len(obj.body) > 50 else obj.body
     body_preview.short_description = 'Message'
+
+    def get_search_results(self, request, queryset, search_term):
+        """Search bodies through the full-text index instead of ILIKE."""
+        search_term = search_term.strip()
+        if not search_term:
+            return queryset, False
+
+        # Resolve senders separately: OR-ing the index match with a
+        # condition across the users join stops the planner using the index
+        matching = Message.objects.matching(search_term).values('id')
+        sender_ids = list(User.objects.filter(
+            email__icontains=search_term
+        ).values_list('id', flat=True))
+        queryset = queryset.filter(
+            Q(id__in=matching) | Q(sender_user_id__in=sender_ids)
+        )
+        return queryset, False
@@ -0,0 +1,64 @@
+# KapwaNet - Community Platform for Dignified Mutual Aid
+# SPDX-License-Identifier: AGPL-3.0-or-later
+
+"""
+Management command to maintain monthly message partitions.
+
+Creates partitions for the coming months and, with --archive, moves
+partitions older than --older-than-months into the archive schema.
+Intended to run daily.
+"""
+
+from datetime import datetime, timezone
+
+from django.core.management.base import BaseCommand
+
+from messaging import partitions
+
+
+class Command(BaseCommand):
+    help = 'Create upcoming message partitions and archive old ones (PostgreSQL only)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--months-ahead',
+            type=int,
+            default=3,
+            help='Months of partitions to create ahead of the current month',
+        )
+        parser.add_argument(
+            '--archive',
+            action='store_true',
+            help='Move old partitions into the archive schema',
+        )
+        parser.add_argument(
+            '--older-than-months',
+            type=int,
+            default=12,
+            help='Archive partitions for months older than this (with --archive)',
+        )
+
+    def handle(self, *args, **options):
+        if not partitions.is_supported():
+            self.stdout.write(
+                self.style.WARNING('Message partitioning requires PostgreSQL; nothing to do.')
+            )
+            return
+
+        created = partitions.ensure_partitions(months_ahead=options['months_ahead'])
+        for name in created:
+            self.stdout.write(self.style.SUCCESS(f'Created partition: {name}'))
+
+        archived = []
+        if options['archive']:
+            current = partitions.month_start(datetime.now(timezone.utc))
+            before = partitions.add_months(current, -options['older_than_months'])
+            archived = partitions.archive_partitions(before)
+            for name in archived:
+                self.stdout.write(self.style.SUCCESS(f'Archived partition: {name}'))
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'\nDone! Created {len(created)}, Archived {len(archived)} partitions.'
+            )
+        )
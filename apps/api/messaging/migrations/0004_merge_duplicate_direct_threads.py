@@ -0,0 +1,70 @@
+# KapwaNet - Community Platform for Dignified Mutual Aid
+# SPDX-License-Identifier: AGPL-3.0-or-later
+
+"""
+Backfill the (user_low, user_high) pair key on direct threads and merge
+duplicate direct threads between the same two users into the oldest one,
+so the unique constraint in 0005 can be added.
+"""
+
+from django.db import migrations
+from django.utils import timezone
+
+
+def merge_direct_threads(apps, schema_editor):
+    Thread = apps.get_model('messaging', 'Thread')
+    ThreadParticipant = apps.get_model('messaging', 'ThreadParticipant')
+    Message = apps.get_model('messaging', 'Message')
+
+    keepers = {}
+    threads = Thread.objects.filter(thread_type='direct').order_by('created_at', 'id')
+    for thread in threads.iterator():
+        # Same ordering as Thread.direct_pair_key
+        user_ids = sorted(
+            {str(user_id) for user_id in ThreadParticipant.objects.filter(
+                thread=thread
+            ).values_list('user_id', flat=True)}
+        )
+        if len(user_ids) != 2:
+            # Not a clean pair; leave it unkeyed
+            continue
+
+        key = (thread.org_id, *user_ids)
+        keeper = keepers.get(key)
+        if keeper is None:
+            thread.user_low_id, thread.user_high_id = user_ids
+            thread.save(update_fields=['user_low', 'user_high'])
+            keepers[key] = thread
+            continue
+
+        # Duplicate: move its messages to the oldest thread and keep the
+        # latest read marker per participant
+        Message.objects.filter(thread=thread).update(thread=keeper)
+        for participant in ThreadParticipant.objects.filter(thread=thread):
+            kept = ThreadParticipant.objects.filter(
+                thread=keeper, user_id=participant.user_id
+            ).first()
+            if kept and participant.last_read_at and (
+                not kept.last_read_at or participant.last_read_at > kept.last_read_at
+            ):
+                kept.last_read_at = participant.last_read_at
+                kept.save(update_fields=['last_read_at'])
+
+        if thread.last_message_at and (
+            not keeper.last_message_at or thread.last_message_at > keeper.last_message_at
+        ):
+            keeper.last_message_at = thread.last_message_at
+        keeper.updated_at = timezone.now()
+        keeper.save(update_fields=['last_message_at', 'updated_at'])
+        thread.delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('messaging', '0003_direct_thread_pair_key'),
+    ]
+
+    operations = [
+        migrations.RunPython(merge_direct_threads, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# KapwaNet - Community Platform for Dignified Mutual Aid
+# SPDX-License-Identifier: AGPL-3.0-or-later
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('messaging', '0004_merge_duplicate_direct_threads'),
+    ]
+
+    operations = [
+        migrations.AddConstraint(
+            model_name='thread',
+            constraint=models.UniqueConstraint(condition=models.Q(('thread_type', 'direct')), fields=('org', 'user_low', 'user_high'), name='unique_direct_thread_pair'),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# KapwaNet - Community Platform for Dignified Mutual Aid
+# SPDX-License-Identifier: AGPL-3.0-or-later
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('messaging', '0005_unique_direct_thread_pair'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='thread',
+            name='thread_type',
+            field=models.CharField(choices=[('help_match', 'Help Match'), ('item_reservation', 'Item Reservation'), ('direct', 'Direct'), ('broadcast', 'Broadcast')], help_text='Type of thread (help_match, item_reservation, direct, or broadcast)', max_length=20),
+        ),
+    ]
@@ -0,0 +1,134 @@
+# KapwaNet - Community Platform for Dignified Mutual Aid
+# SPDX-License-Identifier: AGPL-3.0-or-later
+
+"""
+Convert the messages table into monthly range partitions on created_at.
+
+PostgreSQL only; other databases keep a plain table. The existing rows
+are copied into the new partitioned table, so run this in a maintenance
+window on large installs. The primary key becomes (id, created_at), as
+PostgreSQL requires the partition key in unique constraints.
+
+Also creates the `archive` schema and its `archive.messages` parent, which
+old partitions are moved under by `manage.py message_partitions`.
+"""
+
+from datetime import datetime, timezone
+
+from django.db import migrations, models
+
+# Months of partitions created ahead of the current month
+MONTHS_AHEAD = 3
+
+
+def _month_bounds(month_index):
+    start = datetime(month_index // 12, month_index % 12 + 1, 1, tzinfo=timezone.utc)
+    end_index = month_index + 1
+    end = datetime(end_index // 12, end_index % 12 + 1, 1, tzinfo=timezone.utc)
+    return start, end
+
+
+def partition_messages(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(
+            """
+            SELECT indexname, indexdef FROM pg_indexes
+            WHERE schemaname = current_schema() AND tablename = 'messages'
+            """
+        )
+        indexes = cursor.fetchall()
+        cursor.execute(
+            """
+            SELECT conname, contype, pg_get_constraintdef(oid) FROM pg_constraint
+            WHERE conrelid = 'messages'::regclass AND contype IN ('p', 'f')
+            """
+        )
+        constraints = cursor.fetchall()
+
+        # Free the index and constraint names for the new table
+        cursor.execute('ALTER TABLE messages RENAME TO messages_legacy')
+        for name, _, _ in constraints:
+            cursor.execute(f'ALTER TABLE messages_legacy DROP CONSTRAINT "{name}"')
+        constraint_names = {name for name, _, _ in constraints}
+        for name, _ in indexes:
+            if name not in constraint_names:
+                cursor.execute(f'DROP INDEX "{name}"')
+
+        cursor.execute(
+            """
+            CREATE TABLE messages (LIKE messages_legacy INCLUDING DEFAULTS)
+            PARTITION BY RANGE (created_at)
+            """
+        )
+        cursor.execute('ALTER TABLE messages ADD PRIMARY KEY (id, created_at)')
+        for name, definition in indexes:
+            if name not in constraint_names:
+                cursor.execute(definition)
+        for name, contype, definition in constraints:
+            if contype == 'f':
+                cursor.execute(f'ALTER TABLE messages ADD CONSTRAINT "{name}" {definition}')
+
+        # One partition per month from the oldest message to a few months
+        # ahead, plus a default partition for anything outside them
+        cursor.execute('SELECT min(created_at), now() FROM messages_legacy')
+        oldest, now = cursor.fetchone()
+        oldest = oldest or now
+        first = oldest.year * 12 + oldest.month - 1
+        last = now.year * 12 + now.month - 1 + MONTHS_AHEAD
+        for month_index in range(first, last + 1):
+            start, end = _month_bounds(month_index)
+            cursor.execute(
+                f'CREATE TABLE messages_p{start:%Y%m} PARTITION OF messages '
+                f'FOR VALUES FROM (%s) TO (%s)',
+                [start, end]
+            )
+        cursor.execute('CREATE TABLE messages_default PARTITION OF messages DEFAULT')
+
+        cursor.execute('INSERT INTO messages SELECT * FROM messages_legacy')
+        cursor.execute('DROP TABLE messages_legacy')
+
+        cursor.execute('CREATE SCHEMA IF NOT EXISTS archive')
+        cursor.execute(
+            """
+            CREATE TABLE archive.messages (LIKE messages INCLUDING DEFAULTS)
+            PARTITION BY RANGE (created_at)
+            """
+        )
+        cursor.execute(
+            'CREATE INDEX archive_messages_thread_created_idx '
+            'ON archive.messages (thread_id, created_at)'
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('messaging', '0007_message_body_search_index'),
+    ]
+
+    operations = [
+        # Irreversible in the database; unpartitioning is left to a DBA
+        migrations.RunPython(partition_messages, migrations.RunPython.noop),
+        migrations.CreateModel(
+            name='ArchivedMessage',
+            fields=[
+                ('id', models.UUIDField(editable=False, primary_key=True, serialize=False)),
+                ('message_type', models.CharField(choices=[('user', 'User'), ('system', 'System')], max_length=10)),
+                ('body', models.TextField()),
+                ('is_hidden', models.BooleanField(default=False)),
+                ('hidden_reason', models.CharField(blank=True, max_length=255)),
+                ('created_at', models.DateTimeField()),
+                ('updated_at', models.DateTimeField()),
+            ],
+            options={
+                'verbose_name': 'archived message',
+                'verbose_name_plural': 'archived messages',
+                'db_table': 'archive"."messages',
+                'ordering': ['created_at'],
+                'managed': False,
+            },
+        ),
+    ]
@@ -9,9 +9,70 @@ between users within an organization.
 """
 
 import uuid
+from datetime import datetime, timezone as dt_timezone
 
 from django.conf import settings
-from django.db import models
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVector
+from django.db import IntegrityError, connection, models, transaction
+from django.db.models.functions import Coalesce
+
+from kapwanet.signals import message_sent
+
+# Text search configuration for message bodies. 'simple' does no
+# language-specific stemming, which suits mixed-language messages and
+# addresses.
+MESSAGE_SEARCH_CONFIG = 'simple'
+
+
+class ThreadQuerySet(models.QuerySet):
+    """QuerySet for threads."""
+
+    def with_unread_count(self, user):
+        """Annotate each thread with the user's unread message count."""
+        # Correlated with the message subquery below, hence thread_id
+        last_read = ThreadParticipant.objects.filter(
+            thread=models.OuterRef('thread_id'),
+            user=user
+        ).values('last_read_at')[:1]
+        # Without a read marker every message counts as unread
+        since = Coalesce(
+            models.Subquery(last_read),
+            models.Value(datetime(1970, 1, 1, tzinfo=dt_timezone.utc)),
+            output_field=models.DateTimeField(),
+        )
+        unread = Message.objects.filter(
+            thread=models.OuterRef('pk'),
+            created_at__gt=since,
+        ).exclude(
+            sender_user=user
+        ).order_by().values('thread').annotate(count=models.Count('pk')).values('count')
+        return self.annotate(unread_count=Coalesce(models.Subquery(unread), 0))
+
+    def with_last_message_body(self):
+        """Annotate each thread with the body of its latest message."""
+        latest = Message.objects.filter(
+            thread=models.OuterRef('pk')
+        ).order_by('-created_at').values('body')[:1]
+        return self.annotate(last_message_body=models.Subquery(latest))
+
+    def with_participants(self):
+        """
+        Prefetch participants with their users.
+
+        Broadcast watermark rows are left out (see Thread), so they are
+        neither loaded nor listed.
+        """
+        return self.prefetch_related(models.Prefetch(
+            'participants',
+            queryset=ThreadParticipant.objects.exclude(
+                thread__thread_type='broadcast'
+            ).select_related('user'),
+        ))
+
+    def for_list(self, user):
+        """Load everything ThreadListSerializer reads, in a fixed number of queries."""
+        return self.with_unread_count(user).with_last_message_body().with_participants()
 
 
 class Thread(models.Model):
@@ -20,12 +81,21 @@ class Thread(models.Model):
 
     Threads can be linked to help matches or item reservations,
     or can be direct messages between users.
+
+    Broadcast threads are organization announcements. Every active member
+    of the org can read them without having a participant row. A member's
+    participant row is created on first read and only holds their
+    last_read_at watermark, so sending an announcement costs the same
+    number of writes whatever the size of the org. Watermark rows are not
+    listed as participants (that would reveal who read what) and do not
+    grant access: only an active membership does.
     """
 
     THREAD_TYPE_CHOICES = [
         ('help_match', 'Help Match'),
         ('item_reservation', 'Item Reservation'),
         ('direct', 'Direct'),
+        ('broadcast', 'Broadcast'),
     ]
 
     id = models.UUIDField(
@@ -43,7 +113,7 @@ class Thread(models.Model):
     thread_type = models.CharField(
         max_length=20,
         choices=THREAD_TYPE_CHOICES,
-        help_text="Type of thread (help_match, item_reservation, or direct)"
+        help_text="Type of thread (help_match, item_reservation, direct, or broadcast)"
     )
     ref_id = models.UUIDField(
         null=True,
@@ -56,6 +126,24 @@ class Thread(models.Model):
         help_text="Optional subject/title for the thread"
     )
 
+    # Canonical pair key for direct threads (see direct_pair_key)
+    user_low = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='+',
+        help_text="For direct threads, the participant with the lower ID"
+    )
+    user_high = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='+',
+        help_text="For direct threads, the participant with the higher ID"
+    )
+
     # Timestamps
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -65,6 +153,8 @@ class Thread(models.Model):
         help_text="Timestamp of the most recent message"
     )
 
+    objects = ThreadQuerySet.as_manager()
+
     class Meta:
         db_table = 'threads'
         ordering = ['-last_message_at', '-created_at']
@@ -73,6 +163,16 @@ class Thread(models.Model):
         indexes = [
             models.Index(fields=['org', 'thread_type']),
             models.Index(fields=['org', 'ref_id']),
+            # Delta sync scans changes per org in updated_at order
+            models.Index(fields=['org', 'updated_at']),
+        ]
+        constraints = [
+            # One direct thread per pair of users per org
+            models.UniqueConstraint(
+                fields=['org', 'user_low', 'user_high'],
+                condition=models.Q(thread_type='direct'),
+                name='unique_direct_thread_pair'
+            ),
         ]
 
     def __str__(self):
@@ -93,13 +193,26 @@ class Thread(models.Model):
         ThreadParticipant.objects.filter(thread=self, user=user).delete()
 
     def get_participants(self):
-        """Get all active participants in this thread."""
+        """Get all active participants in this thread (none for broadcasts)."""
+        if self.thread_type == 'broadcast':
+            return ThreadParticipant.objects.none()
         return ThreadParticipant.objects.filter(
             thread=self
         ).select_related('user')
 
+    def visible_participants(self):
+        """The participants to show, using with_participants() when prefetched."""
+        if self.thread_type == 'broadcast':
+            return []
+        return self.participants.all()
+
     def is_participant(self, user):
         """Check if a user is a participant in this thread."""
+        if self.thread_type == 'broadcast':
+            # Every active member of the org receives announcements
+            from organizations.models import Membership
+            return Membership.is_user_member(user, self.org_id)
+
         return ThreadParticipant.objects.filter(
             thread=self,
             user=user
@@ -123,12 +236,62 @@ class Thread(models.Model):
         ).count()
 
     def mark_read(self, user):
-        """Mark all messages as read for a user."""
+        """
+        Mark all messages as read for a user.
+
+        Returns:
+            True if the read watermark moved, False if nothing was new
+        """
+        return Thread.mark_threads_read(user, [self]) > 0
+
+    @classmethod
+    def mark_threads_read(cls, user, threads):
+        """
+        Mark all messages in several threads as read for a user.
+
+        Only watermarks behind their thread's last_message_at are written,
+        in a single UPDATE, so repeated reads of unchanged threads cost no
+        writes. Broadcast threads get the user's watermark row on first
+        read. Callers must only pass threads the user can see.
+
+        Args:
+            user: The reading user
+            threads: Threads (or thread IDs) to mark as read
+
+        Returns:
+            The number of watermarks written
+        """
         from django.utils import timezone
-        ThreadParticipant.objects.filter(
-            thread=self,
-            user=user
-        ).update(last_read_at=timezone.now())
+
+        thread_ids = [getattr(thread, 'pk', thread) for thread in threads]
+        if not thread_ids:
+            return 0
+        now = timezone.now()
+
+        updated = ThreadParticipant.objects.filter(
+            user=user,
+            thread_id__in=thread_ids,
+            thread__last_message_at__isnull=False,
+        ).filter(
+            models.Q(last_read_at__isnull=True) |
+            models.Q(last_read_at__lt=models.F('thread__last_message_at'))
+        ).update(last_read_at=now)
+
+        unread_broadcasts = cls.objects.filter(
+            id__in=thread_ids,
+            thread_type='broadcast',
+            last_message_at__isnull=False,
+        ).exclude(
+            id__in=ThreadParticipant.objects.filter(user=user).values('thread_id')
+        ).values_list('id', 'org_id')
+        created = ThreadParticipant.objects.bulk_create(
+            [
+                ThreadParticipant(thread_id=thread_id, org_id=org_id, user=user, last_read_at=now)
+                for thread_id, org_id in unread_broadcasts
+            ],
+            ignore_conflicts=True,
+        )
+        return updated + len(created)
 
     @classmethod
     def create_for_help_match(cls, org, ref_id, participants, subject=None):
@@ -178,6 +341,54 @@ class Thread(models.Model):
             thread.add_participant(user)
         return thread
 
+    @classmethod
+    def visible_filter(cls, user):
+        """
+        Get a Q matching the threads a user can see.
+
+        That is threads they participate in, plus broadcast threads of
+        organizations they are an active member of. A broadcast read
+        watermark is not participation, so suspended or removed members
+        lose access to announcements.
+        """
+        from organizations.models import Membership
+
+        member_orgs = Membership.objects.filter(
+            user=user,
+            status='active'
+        ).values('org_id')
+        # Subqueries rather than a join, so each thread matches once
+        participating = ThreadParticipant.objects.filter(user=user).values('thread_id')
+        return (
+            (models.Q(id__in=participating) & ~models.Q(thread_type='broadcast')) |
+            models.Q(thread_type='broadcast', org_id__in=member_orgs)
+        )
+
+    @classmethod
+    def create_broadcast(cls, org, sender, body, subject=None):
+        """
+        Send an announcement to all active members of an organization.
+
+        Creates one thread and one message, regardless of member count.
+
+        Args:
+            org: The organization
+            sender: The admin or moderator sending the announcement
+            body: The message content
+            subject: Optional subject line
+
+        Returns:
+            The created Thread
+
+        Raises:
+            ValueError: If the sender cannot post announcements
+        """
+        thread = cls(org=org, thread_type='broadcast', subject=subject or 'Announcement')
+        with transaction.atomic():
+            thread.save()
+            Message.send_user_message(thread=thread, sender=sender, body=body)
+        return thread
+
     @classmethod
     def get_or_create_direct(cls, org, user1, user2, subject=None):
         """
@@ -192,28 +403,39 @@ class Thread(models.Model):
         Returns:
             Tuple of (Thread, created)
         """
-        # Look for existing direct thread with both participants
-        existing = cls.objects.filter(
-            org=org,
-            thread_type='direct',
-            participants__user=user1
-        ).filter(
-            participants__user=user2
-        ).first()
-
+        user_low_id, user_high_id = cls.direct_pair_key(user1, user2)
+        lookup = {
+            'org': org,
+            'thread_type': 'direct',
+            'user_low_id': user_low_id,
+            'user_high_id': user_high_id,
+        }
+
+        # Single lookup on the unique pair key
+        existing = cls.objects.filter(**lookup).first()
         if existing:
             return existing, False
 
-        # Create new thread
-        thread = cls.objects.create(
-            org=org,
-            thread_type='direct',
-            subject=subject or 'Direct Message'
-        )
-        thread.add_participant(user1)
-        thread.add_participant(user2)
+        # Create new thread; if a concurrent call won the race, the unique
+        # constraint rejects ours and we return theirs
+        try:
+            with transaction.atomic():
+                thread = cls.objects.create(subject=subject or 'Direct Message', **lookup)
+                thread.add_participant(user1)
+                thread.add_participant(user2)
+        except IntegrityError:
+            return cls.objects.get(**lookup), False
         return thread, True
 
+    @staticmethod
+    def direct_pair_key(user1, user2):
+        """
+        Get the canonical (user_low_id, user_high_id) key for a pair of users.
+
+        The key is the same whichever order the users are given in.
+        """
+        return tuple(sorted([user1.pk, user2.pk], key=str))
+
 
 class ThreadParticipant(models.Model):
     """
@@ -266,6 +488,37 @@ class ThreadParticipant(models.Model):
         return f"{self.user.email} in {self.thread}"
 
 
+class MessageQuerySet(models.QuerySet):
+    """QuerySet for messages."""
+
+    def matching(self, query):
+        """
+        Filter to messages whose body matches a full-text query.
+
+        On PostgreSQL this uses the GIN index on the body's tsvector and
+        web-search query syntax ("quoted phrases", -excluded words). Other
+        databases fall back to a case-insensitive substring match.
+        """
+        if connection.vendor != 'postgresql':
+            return self.filter(body__icontains=query)
+
+        return self.annotate(
+            search_vector=SearchVector('body', config=MESSAGE_SEARCH_CONFIG)
+        ).filter(search_vector=self._search_query(query))
+
+    def search(self, query):
+        """Full-text search message bodies, best matches first."""
+        if connection.vendor != 'postgresql':
+            return self.matching(query).order_by('-created_at')
+
+        return self.matching(query).annotate(
+            rank=SearchRank(models.F('search_vector'), self._search_query(query))
+        ).order_by('-rank', '-created_at')
+
+    def _search_query(self, query):
+        return SearchQuery(query, config=MESSAGE_SEARCH_CONFIG, search_type='websearch')
+
+
 class Message(models.Model):
     """
     A message within a thread.
@@ -329,6 +582,8 @@ class Message(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = MessageQuerySet.as_manager()
+
     class Meta:
         db_table = 'messages'
         ordering = ['created_at']
@@ -337,6 +592,14 @@ class Message(models.Model):
         indexes = [
             models.Index(fields=['thread', 'created_at']),
             models.Index(fields=['org', 'sender_user']),
+            models.Index(fields=['org', 'updated_at']),
+            # Metrics: recent senders across orgs
+            models.Index(fields=['created_at']),
+            # Full-text search on body (created on PostgreSQL only, see migration 0007)
+            GinIndex(
+                SearchVector('body', config=MESSAGE_SEARCH_CONFIG),
+                name='messages_body_search_idx',
+            ),
         ]
 
     def __str__(self):
@@ -344,12 +607,15 @@ class Message(models.Model):
         return f"Message from {sender} at {self.created_at}"
 
     def save(self, *args, **kwargs):
-        """Update thread's last_message_at on save."""
+        """Update thread's last_message_at (and updated_at) on save."""
         super().save(*args, **kwargs)
-        # Update the thread's last_message_at
+        # Update the thread's last_message_at; bulk updates bypass auto_now,
+        # so bump updated_at too for delta sync
         from django.utils import timezone
+        now = timezone.now()
         Thread.objects.filter(pk=self.thread_id).update(
-            last_message_at=timezone.now()
+            last_message_at=now,
+            updated_at=now,
         )
 
     @classmethod
@@ -368,13 +634,20 @@ class Message(models.Model):
         if not thread.is_participant(sender):
             raise ValueError("User is not a participant in this thread")
 
-        return cls.objects.create(
+        if thread.thread_type == 'broadcast':
+            from organizations.models import Membership
+            if not Membership.has_role(sender, thread.org_id, ['org_admin', 'moderator']):
+                raise ValueError("Only admins and moderators can post announcements")
+
+        message = cls.objects.create(
             org=thread.org,
             thread=thread,
             sender_user=sender,
             message_type='user',
             body=body
         )
+        message_sent.send(sender=cls, message_type='user')
+        return message
 
     @classmethod
     def send_system_message(cls, thread, body):
@@ -388,10 +661,83 @@ class Message(models.Model):
         Returns:
             The created Message
         """
-        return cls.objects.create(
+        message = cls.objects.create(
             org=thread.org,
             thread=thread,
             sender_user=None,
             message_type='system',
             body=body
         )
+        message_sent.send(sender=cls, message_type='system')
+        return message
+
+    @classmethod
+    def queue_system_message(cls, thread, body, key=None):
+        """
+        Send a system message from a background job.
+
+        Args:
+            thread: The Thread to send to
+            body: The message content
+            key: Optional idempotency key, so a retried request does not
+                post the same notice twice. It must name this occurrence
+                of the notice (e.g. include the thread), since a key that
+                was used before returns the old job instead of a new one
+
+        Returns:
+            The queued Job, or None when jobs run synchronously
+        """
+        from jobs.queue import enqueue
+        return enqueue(
+            'messaging.send_system_message',
+            {'thread_id': str(thread.pk), 'body': body},
+            idempotency_key=key,
+        )
+
+
+class ArchivedMessage(models.Model):
+    """
+    A message in an archived monthly partition (PostgreSQL only).
+
+    Read-only view of `archive.messages`, the parent of partitions moved
+    out of the hot messages table by `manage.py message_partitions`.
+    Archived partitions keep no foreign keys, so threads and users they
+    reference may no longer exist. See messaging.partitions.
+    """
+
+    id = models.UUIDField(primary_key=True, editable=False)
+    org = models.ForeignKey(
+        'organizations.Organization',
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+        related_name='+'
+    )
+    thread = models.ForeignKey(
+        Thread,
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+        related_name='+'
+    )
+    sender_user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+        null=True,
+        related_name='+'
+    )
+    message_type = models.CharField(max_length=10, choices=Message.MESSAGE_TYPE_CHOICES)
+    body = models.TextField()
+    is_hidden = models.BooleanField(default=False)
+    hidden_reason = models.CharField(max_length=255, blank=True)
+    created_at = models.DateTimeField()
+    updated_at = models.DateTimeField()
+
+    class Meta:
+        managed = False
+        db_table = 'archive"."messages'
+        ordering = ['created_at']
+        verbose_name = 'archived message'
+        verbose_name_plural = 'archived messages'
+
+    def __str__(self):
+        return f"Archived message {self.id} at {self.created_at}"
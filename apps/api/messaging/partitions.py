@@ -0,0 +1,255 @@
+# KapwaNet - Community Platform for Dignified Mutual Aid
+# SPDX-License-Identifier: AGPL-3.0-or-later
+
+"""
+Monthly partitioning and archival of the messages table (PostgreSQL).
+
+On PostgreSQL, `messages` is range-partitioned on created_at (migration
+0008) into one partition per calendar month named `messages_pYYYYMM`,
+plus a `messages_default` partition catching anything outside them.
+The Message model is unchanged; PostgreSQL routes rows to partitions.
+
+Partitions older than the retention window are moved out of the hot
+table into the `archive` schema, where they are attached to a parallel
+`archive.messages` parent. The hot table's indexes and vacuum work then
+only cover recent months, and read paths fall back to ArchivedMessage
+for threads older than the archive horizon.
+
+Run `manage.py message_partitions` daily (e.g. from cron) to create
+upcoming partitions and archive old ones.
+"""
+
+import threading
+import time
+from datetime import datetime, timezone as dt_timezone
+
+from django.db import connection, transaction
+
+PARENT_TABLE = 'messages'
+DEFAULT_PARTITION = 'messages_default'
+PARTITION_PREFIX = 'messages_p'
+ARCHIVE_SCHEMA = 'archive'
+
+# How long archive_horizon() results are reused before re-reading the catalog
+ARCHIVE_HORIZON_TTL = 300
+
+
+def is_supported():
+    """Check whether the database supports message partitioning."""
+    return connection.vendor == 'postgresql'
+
+
+def month_start(value):
+    """Get the first instant (UTC) of the month containing a datetime."""
+    value = value.astimezone(dt_timezone.utc) if value.tzinfo else value
+    return datetime(value.year, value.month, 1, tzinfo=dt_timezone.utc)
+
+
+def add_months(month, count):
+    """Add a number of months to a month start."""
+    index = month.year * 12 + month.month - 1 + count
+    return datetime(index // 12, index % 12 + 1, 1, tzinfo=dt_timezone.utc)
+
+
+def partition_name(month):
+    """Get the partition table name for a month."""
+    return f'{PARTITION_PREFIX}{month:%Y%m}'
+
+
+def partition_month(name):
+    """Get the month a partition covers from its name, or None."""
+    if not name.startswith(PARTITION_PREFIX):
+        return None
+    try:
+        month = datetime.strptime(name[len(PARTITION_PREFIX):], '%Y%m')
+    except ValueError:
+        return None
+    return month.replace(tzinfo=dt_timezone.utc)
+
+
+def _bounds_sql(month):
+    return (
+        f"FOR VALUES FROM ('{month:%Y-%m-%d} 00:00:00+00') "
+        f"TO ('{add_months(month, 1):%Y-%m-%d} 00:00:00+00')"
+    )
+
+
+def list_partitions(cursor, schema=None):
+    """
+    List the monthly partitions attached to a messages parent table.
+
+    Args:
+        cursor: A database cursor
+        schema: The parent's schema (default: the current schema)
+
+    Returns:
+        A sorted list of (month, table_name) tuples
+    """
+    parent = f'{schema}.{PARENT_TABLE}' if schema else PARENT_TABLE
+    cursor.execute(
+        """
+        SELECT child.relname
+        FROM pg_inherits
+        JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+        WHERE pg_inherits.inhparent = to_regclass(%s)
+        """,
+        [parent]
+    )
+    partitions = []
+    for (name,) in cursor.fetchall():
+        month = partition_month(name)
+        if month is not None:
+            partitions.append((month, name))
+    return sorted(partitions)
+
+
+def ensure_partitions(months_ahead=3, now=None):
+    """
+    Create monthly partitions from the current month up to months_ahead.
+
+    Rows already sitting in the default partition for a new month are
+    moved into it before it is attached.
+
+    Returns:
+        Names of the partitions created
+    """
+    now = now or datetime.now(dt_timezone.utc)
+    first = month_start(now)
+    created = []
+
+    with transaction.atomic(), connection.cursor() as cursor:
+        existing = {name for _, name in list_partitions(cursor)}
+        for offset in range(months_ahead + 1):
+            month = add_months(first, offset)
+            name = partition_name(month)
+            if name in existing:
+                continue
+
+            cursor.execute(
+                f'CREATE TABLE "{name}" (LIKE "{PARENT_TABLE}" INCLUDING DEFAULTS)'
+            )
+            cursor.execute(
+                f"""
+                WITH moved AS (
+                    DELETE FROM "{DEFAULT_PARTITION}"
+                    WHERE created_at >= %s AND created_at < %s
+                    RETURNING *
+                )
+                INSERT INTO "{name}" SELECT * FROM moved
+                """,
+                [month, add_months(month, 1)]
+            )
+            cursor.execute(
+                f'ALTER TABLE "{PARENT_TABLE}" ATTACH PARTITION "{name}" {_bounds_sql(month)}'
+            )
+            created.append(name)
+
+    return created
+
+
+def archive_partitions(before):
+    """
+    Move monthly partitions older than a month into the archive schema.
+
+    Each partition is detached from the hot table, stripped of its
+    foreign keys (threads and users may be deleted later), moved to the
+    archive schema and attached to archive.messages.
+
+    Args:
+        before: Month start; partitions for earlier months are archived
+
+    Returns:
+        Names of the partitions archived
+    """
+    archived = []
+
+    with transaction.atomic(), connection.cursor() as cursor:
+        for month, name in list_partitions(cursor):
+            if month >= before:
+                continue
+
+            cursor.execute(f'ALTER TABLE "{PARENT_TABLE}" DETACH PARTITION "{name}"')
+            cursor.execute(
+                """
+                SELECT conname FROM pg_constraint
+                WHERE conrelid = to_regclass(%s) AND contype = 'f'
+                """,
+                [name]
+            )
+            for (constraint,) in cursor.fetchall():
+                cursor.execute(f'ALTER TABLE "{name}" DROP CONSTRAINT "{constraint}"')
+            cursor.execute(f'ALTER TABLE "{name}" SET SCHEMA "{ARCHIVE_SCHEMA}"')
+            cursor.execute(
+                f'ALTER TABLE "{ARCHIVE_SCHEMA}"."{PARENT_TABLE}" '
+                f'ATTACH PARTITION "{ARCHIVE_SCHEMA}"."{name}" {_bounds_sql(month)}'
+            )
+            archived.append(name)
+
+    reset_archive_horizon()
+    return archived
+
+
+_horizon_lock = threading.Lock()
+_horizon_cache = {}
+
+
+def archive_horizon():
+    """
+    Get the end of the newest archived month, or None if nothing is archived.
+
+    Threads created on or after the horizon cannot have archived messages,
+    so read paths skip the archive for them. Cached per process for
+    ARCHIVE_HORIZON_TTL seconds.
+    """
+    if not is_supported():
+        return None
+
+    with _horizon_lock:
+        cached = _horizon_cache.get('horizon')
+        if cached and cached[1] > time.monotonic():
+            return cached[0]
+
+    with connection.cursor() as cursor:
+        partitions = list_partitions(cursor, schema=ARCHIVE_SCHEMA)
+    horizon = add_months(partitions[-1][0], 1) if partitions else None
+
+    with _horizon_lock:
+        _horizon_cache['horizon'] = (horizon, time.monotonic() + ARCHIVE_HORIZON_TTL)
+    return horizon
+
+
+def reset_archive_horizon():
+    """Forget the cached archive horizon."""
+    with _horizon_lock:
+        _horizon_cache.clear()
+
+
+def paginate_history(archived, recent, offset, limit):
+    """
+    Page through a thread's archived and recent messages as one sequence.
+
+    Archived messages are all older than recent ones, so the combined
+    history is the archived rows followed by the recent rows.
+
+    Args:
+        archived: Queryset of archived messages, oldest first (or None)
+        recent: Queryset of recent messages, oldest first
+        offset: Index of the first message to return
+        limit: Maximum number of messages to return
+
+    Returns:
+        A tuple of (messages, total)
+    """
+    recent_total = recent.count()
+    if archived is None:
+        return list(recent[offset:offset + limit]), recent_total
+
+    archived_total = archived.count()
+    page = []
+    if offset < archived_total:
+        page = list(archived[offset:offset + limit])
+    remaining = limit - len(page)
+    if remaining > 0:
+        start = max(offset - archived_total, 0)
+        page += list(recent[start:start + remaining])
+    return page, archived_total + recent_total
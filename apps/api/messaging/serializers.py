@@ -7,11 +7,12 @@ Serializers for messaging models.
 
 from rest_framework import serializers
 
+from kapwanet.fieldsets import SparseFieldsetMixin
 from organizations.models import Membership
 from .models import Thread, ThreadParticipant, Message
 
 
-class MessageSerializer(serializers.ModelSerializer):
+class MessageSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """
     Serializer for Message model.
     """
@@ -103,12 +104,14 @@ class ThreadParticipantSerializer(serializers.ModelSerializer):
         return obj.user.get_full_name() or obj.user.email
 
 
-class ThreadSerializer(serializers.ModelSerializer):
+class ThreadSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """
     Serializer for Thread model with details.
     """
 
-    participants = ThreadParticipantSerializer(many=True, read_only=True)
+    participants = ThreadParticipantSerializer(
+        source='visible_participants', many=True, read_only=True
+    )
     thread_type_display = serializers.CharField(
         source='get_thread_type_display',
         read_only=True
@@ -151,7 +154,7 @@ class ThreadSerializer(serializers.ModelSerializer):
 
     def get_last_message(self, obj):
         """Get the last message in the thread."""
-        last_msg = obj.messages.order_by('-created_at').first()
+        last_msg = obj.messages.select_related('sender_user').order_by('-created_at').first()
         if last_msg:
             return {
                 'id': str(last_msg.id),
@@ -162,7 +165,7 @@ class ThreadSerializer(serializers.ModelSerializer):
         return None
 
 
-class ThreadListSerializer(serializers.ModelSerializer):
+class ThreadListSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """
     Simplified serializer for listing threads.
     """
@@ -198,11 +201,13 @@ class ThreadListSerializer(serializers.ModelSerializer):
         request = self.context.get('request')
         if not request or not request.user.is_authenticated:
             return 0
-        return obj.get_unread_count(request.user)
+        # Read the for_list() annotation, or count if absent
+        count = getattr(obj, 'unread_count', None)
+        return count if count is not None else obj.get_unread_count(request.user)
 
     def get_participant_count(self, obj):
         """Get the number of participants in the thread."""
-        return obj.participants.count()
+        return len(obj.visible_participants())
 
     def get_other_participant_name(self, obj):
         """Get the name of the other participant (for direct threads)."""
@@ -210,21 +215,22 @@ class ThreadListSerializer(serializers.ModelSerializer):
         if not request or not request.user.is_authenticated:
             return None
 
-        for participant in obj.participants.select_related('user').all():
-            if participant.user != request.user:
+        for participant in obj.visible_participants():
+            if participant.user_id != request.user.pk:
                 return participant.user.get_full_name() or participant.user.email
 
         return None
 
     def get_last_message_preview(self, obj):
         """Get a preview of the last message."""
-        last_msg = obj.messages.order_by('-created_at').first()
-        if last_msg:
-            body = last_msg.body
-            if len(body) > 50:
-                body = body[:50] + '...'
-            return body
-        return None
+        if hasattr(obj, 'last_message_body'):
+            body = obj.last_message_body
+        else:
+            last_msg = obj.messages.order_by('-created_at').first()
+            body = last_msg.body if last_msg else None
+        if body is not None and len(body) > 50:
+            body = body[:50] + '...'
+        return body
 
 
 class DirectThreadCreateSerializer(serializers.Serializer):
@@ -305,3 +311,65 @@ class DirectThreadCreateSerializer(serializers.Serializer):
             )
 
         return thread
+
+
+class MarkReadSerializer(serializers.Serializer):
+    """
+    Serializer for marking several threads as read.
+    """
+
+    thread_ids = serializers.ListField(
+        child=serializers.UUIDField(),
+        allow_empty=False,
+        max_length=500,
+        help_text="UUIDs of the threads to mark as read"
+    )
+
+
+class BroadcastCreateSerializer(serializers.Serializer):
+    """
+    Serializer for sending an announcement to all members of an organization.
+    """
+
+    org_id = serializers.UUIDField(
+        help_text="The organization UUID"
+    )
+    subject = serializers.CharField(
+        max_length=255,
+        required=False,
+        allow_blank=True,
+        help_text="Optional subject line"
+    )
+    body = serializers.CharField(
+        max_length=10000,
+        help_text="The announcement text"
+    )
+
+    def validate(self, data):
+        """Validate that the sender is an admin or moderator of the org."""
+        from organizations.models import Organization
+
+        request = self.context.get('request')
+
+        try:
+            org = Organization.objects.get(id=data['org_id'], is_active=True)
+        except Organization.DoesNotExist:
+            raise serializers.ValidationError({'org_id': 'Organization not found.'})
+
+        if not Membership.has_role(request.user, org, ['org_admin', 'moderator']):
+            raise serializers.ValidationError(
+                {'org_id': 'Only admins and moderators can send announcements.'}
+            )
+
+        data['org'] = org
+        return data
+
+    def create(self, validated_data):
+        """Create the broadcast thread with its first message."""
+        request = self.context.get('request')
+        return Thread.create_broadcast(
+            org=validated_data['org'],
+            sender=request.user,
+            body=validated_data['body'],
+            subject=validated_data.get('subject', '').strip() or None,
+        )
@@ -0,0 +1,18 @@
+# KapwaNet - Community Platform for Dignified Mutual Aid
+# SPDX-License-Identifier: AGPL-3.0-or-later
+
+"""
+Background tasks for messaging.
+"""
+
+from jobs.queue import task
+
+from .models import Thread, Message
+
+
+@task()
+def send_system_message(thread_id, body):
+    """Post a system message, unless the thread has since been deleted."""
+    thread = Thread.objects.filter(pk=thread_id).first()
+    if thread is not None:
+        Message.send_system_message(thread, body)
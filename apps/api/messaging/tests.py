@@ -5,13 +5,24 @@
 Tests for messaging functionality.
 """
 
+from datetime import datetime, timezone as dt_timezone
+from io import StringIO
+from unittest import skipIf
+
+from django.contrib.admin import AdminSite
+from django.core.management import call_command
+from django.db import connection
 from django.test import TestCase
 from rest_framework.test import APITestCase
 from rest_framework import status
+from rest_framework_simplejwt.tokens import RefreshToken
 
+from kapwanet.querybudget import QueryBudgetTestMixin
 from users.models import User
 from organizations.models import Organization, Membership
+from .admin import MessageAdmin
 from .models import Thread, ThreadParticipant, Message
+from . import partitions
 
 
 class ThreadModelTests(TestCase):
@@ -77,6 +88,58 @@ class ThreadModelTests(TestCase):
         self.assertFalse(created2)
         self.assertEqual(thread1.id, thread2.id)
 
+    def test_direct_pair_key_is_order_independent(self):
+        """Test that the DM pair key is the same whichever user starts the thread."""
+        thread1, _ = Thread.get_or_create_direct(self.org, self.user1, self.user2)
+        thread2, created = Thread.get_or_create_direct(self.org, self.user2, self.user1)
+
+        self.assertFalse(created)
+        self.assertEqual(thread1.id, thread2.id)
+        self.assertEqual(
+            (thread1.user_low_id, thread1.user_high_id),
+            Thread.direct_pair_key(self.user2, self.user1)
+        )
+
+    def test_direct_pair_is_unique(self):
+        """Test that a second direct thread for the same pair is rejected."""
+        from django.db import IntegrityError, transaction
+
+        thread, _ = Thread.get_or_create_direct(self.org, self.user1, self.user2)
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            Thread.objects.create(
+                org=self.org,
+                thread_type='direct',
+                user_low_id=thread.user_low_id,
+                user_high_id=thread.user_high_id,
+            )
+
+    def test_merge_duplicate_direct_threads(self):
+        """Test that the migration merges pre-existing duplicate DMs into the oldest."""
+        import importlib
+        from django.apps import apps
+        migration = importlib.import_module(
+            'messaging.migrations.0004_merge_duplicate_direct_threads'
+        )
+
+        # Legacy threads created before the pair key existed
+        threads = []
+        for body in ('First', 'Second'):
+            thread = Thread.objects.create(org=self.org, thread_type='direct')
+            thread.add_participant(self.user1)
+            thread.add_participant(self.user2)
+            Message.send_user_message(thread, self.user1, body)
+            threads.append(thread)
+
+        migration.merge_direct_threads(apps, None)
+
+        remaining = Thread.objects.get(thread_type='direct')
+        self.assertEqual(remaining.id, threads[0].id)
+        self.assertEqual(
+            (remaining.user_low_id, remaining.user_high_id),
+            Thread.direct_pair_key(self.user1, self.user2)
+        )
+        self.assertEqual(remaining.messages.count(), 2)
+
     def test_create_for_help_match(self):
         """Test creating a thread for a help match."""
         import uuid
@@ -162,6 +225,19 @@ class MessageModelTests(TestCase):
         self.thread.refresh_from_db()
         self.assertIsNotNone(self.thread.last_message_at)
 
+    def test_admin_search_by_body_or_sender(self):
+        """Test that admin search matches message bodies and sender emails."""
+        body_match = Message.send_user_message(self.thread, self.user, 'Pickup at noon')
+        sender_match = Message.send_user_message(self.thread, self.user, 'Hello')
+        Message.send_system_message(self.thread, 'Welcome')
+
+        model_admin = MessageAdmin(Message, AdminSite())
+        results, _ = model_admin.get_search_results(None, Message.objects.all(), 'pickup')
+        self.assertEqual(list(results), [body_match])
+
+        results, _ = model_admin.get_search_results(None, Message.objects.all(), 'test@example')
+        self.assertEqual(set(results), {body_match, sender_match})
+
 
 class ThreadUnreadTests(TestCase):
     """Tests for unread message tracking."""
@@ -408,3 +484,254 @@ class ThreadAPITests(APITestCase):
         response = self.client.get(f'/api/threads/?org={other_org.id}')
         self.assertEqual(len(response.data), 1)
         self.assertEqual(response.data[0]['id'], str(thread2.id))
+
+    def test_conditional_get_thread_list(self):
+        """Test that new messages and read markers change the thread list ETag."""
+        thread = Thread.objects.create(
+            org=self.org,
+            thread_type='direct'
+        )
+        thread.add_participant(self.user1)
+        thread.add_participant(self.user2)
+
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {self.get_token(self.user1)}')
+        response = self.client.get('/api/threads/')
+        etag = response['ETag']
+
+        response = self.client.get('/api/threads/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        # A new message only touches last_message_at
+        Message.send_user_message(thread=thread, sender=self.user2, body='Hi')
+        response = self.client.get('/api/threads/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data[0]['unread_count'], 1)
+        etag = response['ETag']
+
+        # Reading the thread changes the caller's unread count
+        thread.mark_read(self.user1)
+        response = self.client.get('/api/threads/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data[0]['unread_count'], 0)
+
+    def test_broadcast_announcement(self):
+        """Test that an announcement reaches every member with O(1) writes."""
+        Membership.objects.filter(org=self.org, user=self.user1).update(role='org_admin')
+
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {self.get_token(self.user1)}')
+        response = self.client.post('/api/threads/broadcast/', {
+            'org_id': str(self.org.id),
+            'subject': 'Distribution day',
+            'body': 'Distribution day moved to Saturday',
+        })
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        thread = Thread.objects.get(id=response.data['id'])
+        self.assertEqual(thread.thread_type, 'broadcast')
+        self.assertEqual(thread.messages.count(), 1)
+        # No per-member rows are written up front
+        self.assertEqual(thread.participants.count(), 0)
+
+        # Members see it as unread, then read it via a watermark row
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {self.get_token(self.user2)}')
+        response = self.client.get('/api/threads/')
+        self.assertEqual([t['id'] for t in response.data], [str(thread.id)])
+        self.assertEqual(response.data[0]['unread_count'], 1)
+
+        response = self.client.get(f'/api/threads/{thread.id}/messages/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['results'][0]['body'], 'Distribution day moved to Saturday')
+        response = self.client.get('/api/threads/')
+        self.assertEqual(response.data[0]['unread_count'], 0)
+        self.assertEqual(thread.participants.count(), 1)
+
+        # Members cannot post into the announcement thread
+        response = self.client.post(f'/api/threads/{thread.id}/messages/', {'body': 'Thanks'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_broadcast_readers_stay_private(self):
+        """Test that read watermarks are not listed as participants or grant access."""
+        Membership.objects.filter(org=self.org, user=self.user1).update(role='org_admin')
+        thread = Thread.create_broadcast(self.org, self.user1, 'Potluck on Sunday')
+        thread.mark_read(self.user2)
+        thread.mark_read(self.user3)
+
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {self.get_token(self.user3)}')
+        response = self.client.get('/api/threads/')
+        self.assertEqual(response.data[0]['participant_count'], 0)
+        self.assertIsNone(response.data[0]['other_participant_name'])
+        response = self.client.get(f'/api/threads/{thread.id}/')
+        self.assertEqual(response.data['participants'], [])
+
+        # A suspended member no longer sees the announcement despite the watermark
+        Membership.objects.filter(org=self.org, user=self.user2).update(status='suspended')
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {self.get_token(self.user2)}')
+        response = self.client.get('/api/threads/')
+        self.assertEqual(response.data, [])
+        response = self.client.get(f'/api/threads/{thread.id}/messages/')
+        self.assertIn(response.status_code, [status.HTTP_403_FORBIDDEN, status.HTTP_404_NOT_FOUND])
+
+    def test_broadcast_requires_moderator(self):
+        """Test that regular members cannot send announcements."""
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {self.get_token(self.user1)}')
+        response = self.client.post('/api/threads/broadcast/', {
+            'org_id': str(self.org.id),
+            'body': 'Hello everyone',
+        })
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(Thread.objects.filter(thread_type='broadcast').exists())
+
+    def test_mark_read_bulk(self):
+        """Test marking several threads read in one request, skipping unchanged ones."""
+        thread_a, _ = Thread.get_or_create_direct(self.org, self.user1, self.user2)
+        thread_b, _ = Thread.get_or_create_direct(self.org, self.user1, self.user3)
+        hidden, _ = Thread.get_or_create_direct(self.org, self.user2, self.user3)
+        for thread, sender in ((thread_a, self.user2), (thread_b, self.user3), (hidden, self.user2)):
+            Message.send_user_message(thread, sender, 'Hello')
+
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {self.get_token(self.user1)}')
+        ids = [str(thread_a.id), str(thread_b.id), str(hidden.id)]
+        response = self.client.post('/api/threads/mark-read/', {'thread_ids': ids}, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['updated'], 2)
+        self.assertEqual(thread_a.get_unread_count(self.user1), 0)
+        self.assertEqual(thread_b.get_unread_count(self.user1), 0)
+        # Not a participant, so untouched
+        self.assertIsNone(
+            ThreadParticipant.objects.filter(thread=hidden, user=self.user1).first()
+        )
+
+        # Nothing new: no watermark is rewritten
+        response = self.client.post('/api/threads/mark-read/', {'thread_ids': ids}, format='json')
+        self.assertEqual(response.data['updated'], 0)
+        self.assertFalse(thread_a.mark_read(self.user1))
+
+    def test_search_messages(self):
+        """Test that message search only covers the caller's threads."""
+        mine, _ = Thread.get_or_create_direct(self.org, self.user1, self.user2)
+        other, _ = Thread.get_or_create_direct(self.org, self.user2, self.user3)
+        Message.send_user_message(mine, self.user2, 'Pickup at 12 Mabini Street')
+        Message.send_user_message(mine, self.user2, 'See you tomorrow')
+        Message.send_user_message(other, self.user2, 'Pickup at the chapel')
+
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {self.get_token(self.user1)}')
+        response = self.client.get('/api/messages/search/?q=pickup')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([m['body'] for m in response.data], ['Pickup at 12 Mabini Street'])
+
+        response = self.client.get('/api/messages/search/')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        response = self.client.get(f'/api/messages/search/?q=pickup&thread={mine.id}')
+        self.assertEqual(len(response.data), 1)
+        response = self.client.get('/api/messages/search/?q=pickup&thread=not-a-uuid')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class MessagePartitionTests(TestCase):
+    """Tests for message partition helpers."""
+
+    def test_month_arithmetic(self):
+        """Test month starts, offsets and partition names."""
+        month = partitions.month_start(datetime(2025, 12, 31, 23, 59, tzinfo=dt_timezone.utc))
+        self.assertEqual(month, datetime(2025, 12, 1, tzinfo=dt_timezone.utc))
+        self.assertEqual(partitions.add_months(month, 1), datetime(2026, 1, 1, tzinfo=dt_timezone.utc))
+        self.assertEqual(partitions.add_months(month, -12), datetime(2024, 12, 1, tzinfo=dt_timezone.utc))
+        self.assertEqual(partitions.partition_name(month), 'messages_p202512')
+        self.assertEqual(partitions.partition_month('messages_p202512'), month)
+        self.assertIsNone(partitions.partition_month('messages_default'))
+
+    def test_paginate_history_spans_archive(self):
+        """Test that pages run through older rows before recent ones."""
+        user = User.objects.create_user(email='user1@example.com', password='testpass123')
+        org = Organization.objects.create(name='Test Organization', slug='test-org')
+        thread = Thread.objects.create(org=org, thread_type='direct')
+        for i in range(5):
+            Message.objects.create(org=org, thread=thread, sender_user=user, body=f'm{i}')
+        messages = Message.objects.order_by('body')
+        # Stand in for the archive with the first two messages
+        older = messages.filter(body__in=['m0', 'm1'])
+        recent = messages.exclude(body__in=['m0', 'm1'])
+
+        page, total = partitions.paginate_history(older, recent, 1, 3)
+        self.assertEqual([m.body for m in page], ['m1', 'm2', 'm3'])
+        self.assertEqual(total, 5)
+
+        page, total = partitions.paginate_history(older, recent, 3, 10)
+        self.assertEqual([m.body for m in page], ['m3', 'm4'])
+
+        page, total = partitions.paginate_history(None, recent, 0, 2)
+        self.assertEqual([m.body for m in page], ['m2', 'm3'])
+        self.assertEqual(total, 3)
+
+    @skipIf(connection.vendor == 'postgresql', 'Partitioning is supported on PostgreSQL')
+    def test_command_requires_postgres(self):
+        """Test that the command is a no-op on other databases."""
+        out = StringIO()
+        call_command('message_partitions', '--archive', stdout=out)
+        self.assertIn('requires PostgreSQL', out.getvalue())
+        self.assertIsNone(partitions.archive_horizon())
+
+
+class MessagingQueryBudgetTests(QueryBudgetTestMixin, APITestCase):
+    """Tests that messaging endpoints stay within their query budgets."""
+
+    def setUp(self):
+        self.user = User.objects.create_user(email='user@example.com', password='testpass123')
+        self.org = Organization.objects.create(name='Test Organization', slug='test-org')
+        Membership.objects.create(org=self.org, user=self.user, role='member', status='active')
+        self.admin = User.objects.create_user(email='admin@example.com', password='testpass123')
+        Membership.objects.create(org=self.org, user=self.admin, role='org_admin', status='active')
+        self.others = []
+        self.threads = []
+        self.add_threads()
+        token = RefreshToken.for_user(self.user).access_token
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+
+    def add_threads(self, count=3):
+        for _ in range(count):
+            other = User.objects.create_user(
+                email=f'other{len(self.others)}@example.com', password='testpass123'
+            )
+            Membership.objects.create(org=self.org, user=other, role='member', status='active')
+            self.others.append(other)
+            thread = Thread.objects.create(org=self.org, thread_type='direct', subject='Hello')
+            thread.add_participant(self.user)
+            thread.add_participant(other)
+            self.add_messages(thread, [other, self.user, other])
+            self.threads.append(thread)
+        broadcast = Thread.create_broadcast(self.org, self.admin, 'Meeting on Friday')
+        self.threads.append(broadcast)
+
+    def add_messages(self, thread, senders):
+        for sender in senders:
+            Message.objects.create(org=self.org, thread=thread, sender_user=sender, body='Hi there')
+
+    def test_thread_list(self):
+        """Test that listing threads does not query per thread."""
+        response = self.assertConstantQueries('/api/threads/', grow=self.add_threads)
+        self.assertEqual(len(response.data), 8)
+        unread = {row['id']: row['unread_count'] for row in response.data}
+        self.assertEqual(unread[str(self.threads[0].id)], 2)
+
+    def test_unread_counts(self):
+        """Test that unread counts are computed in one query."""
+        response = self.assertConstantQueries('/api/threads/unread_counts/', grow=self.add_threads)
+        self.assertEqual(response.data['total'], 14)
+
+    def test_thread_detail_and_messages(self):
+        """Test the thread detail and message history endpoints."""
+        thread = self.threads[0]
+        self.request_within_budget('get', f'/api/threads/{thread.id}/')
+        self.assertConstantQueries(
+            f'/api/threads/{thread.id}/messages/',
+            grow=lambda: self.add_messages(thread, self.others[:1] * 5),
+        )
+
+    def test_message_list_and_search(self):
+        """Test the message list, detail and search endpoints."""
+        self.assertConstantQueries('/api/messages/', grow=self.add_threads)
+        self.assertConstantQueries('/api/messages/search/?q=there', grow=self.add_threads)
+        message = Message.objects.filter(thread=self.threads[0]).first()
+        self.request_within_budget('get', f'/api/messages/{message.id}/')
@@ -5,21 +5,31 @@
 Views for messaging API.
 """
 
+import uuid
+
+from django.db.models import Max
+from django.http import Http404
 from rest_framework import viewsets, status, filters, mixins
 from rest_framework.decorators import action
+from rest_framework.generics import get_object_or_404
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 
+from kapwanet.mixins import ConditionalGetMixin
+from organizations.cache import filter_by_org
 from organizations.models import Membership
 from organizations.permissions import OrgMembershipPermission
 
-from .models import Thread, Message
+from .models import Thread, ThreadParticipant, Message, ArchivedMessage
+from .partitions import archive_horizon, paginate_history
 from .serializers import (
     ThreadSerializer,
     ThreadListSerializer,
     MessageSerializer,
     MessageCreateSerializer,
     DirectThreadCreateSerializer,
+    BroadcastCreateSerializer,
+    MarkReadSerializer,
 )
 
 
@@ -41,6 +51,7 @@ class ThreadParticipantPermission(OrgMembershipPermission):
 
 
 class ThreadViewSet(
+    ConditionalGetMixin,
     mixins.ListModelMixin,
     mixins.RetrieveModelMixin,
     mixins.CreateModelMixin,
@@ -53,35 +64,56 @@ class ThreadViewSet(
         GET /api/threads/ - List threads for the current user
         GET /api/threads/{id}/ - Get a thread
         POST /api/threads/ - Create a direct message thread
+        POST /api/threads/broadcast/ - Send an announcement to all org members
         GET /api/threads/{id}/messages/ - Get messages in a thread
         POST /api/threads/{id}/messages/ - Send a message
         POST /api/threads/{id}/mark-read/ - Mark thread as read
+        POST /api/threads/mark-read/ - Mark several threads as read
+
+    List and detail GETs support conditional requests. New messages only
+    touch last_message_at, and unread counts depend on the caller's read
+    markers, so both are folded into the ETag.
     """
 
     permission_classes = [IsAuthenticated]
     filter_backends = [filters.OrderingFilter]
     ordering_fields = ['last_message_at', 'created_at']
+    query_budgets = {'list': 5, 'retrieve': 9, 'messages': 10, 'unread_counts': 2}
     ordering = ['-last_message_at']
+    conditional_timestamp_fields = ['updated_at', 'last_message_at']
+    conditional_list_fields = ['participants__joined_at', 'participants__user__updated_at']
+
+    def get_conditional_extra(self, request, instance=None):
+        """
+        Include the caller's latest read marker in the ETag, and for a
+        thread its participants (prefetched), whose names it shows.
+        """
+        last_read = ThreadParticipant.objects.filter(
+            user=request.user
+        ).aggregate(last_read=Max('last_read_at'))['last_read']
+        if instance is None:
+            return [last_read]
+        participants = instance.visible_participants()
+        return [last_read, len(participants), max(
+            (participant.user.updated_at for participant in participants), default=None
+        )]
 
     def get_queryset(self):
         """
-        Get threads the current user participates in.
+        Get threads the current user participates in, plus broadcasts to their orgs.
         """
         queryset = Thread.objects.filter(
-            participants__user=self.request.user
-        ).select_related('org').prefetch_related(
-            'participants__user'
-        ).distinct()
+            Thread.visible_filter(self.request.user)
+        ).select_related('org').distinct()
+        if self.action == 'list':
+            queryset = queryset.for_list(self.request.user)
+        else:
+            queryset = queryset.with_participants()
 
         # Filter by org if specified
         org_param = self.request.query_params.get('org')
         if org_param:
-            try:
-                from uuid import UUID
-                UUID(org_param)
-                queryset = queryset.filter(org_id=org_param)
-            except (ValueError, AttributeError):
-                queryset = queryset.filter(org__slug=org_param)
+            queryset = filter_by_org(queryset, org_param)
 
         # Filter by thread type
         thread_type = self.request.query_params.get('type')
@@ -109,15 +141,6 @@ class ThreadViewSet(
             return [ThreadParticipantPermission()]
         return super().get_permissions()
 
-    def get_object(self):
-        """Get the thread object."""
-        thread = super().get_object()
-        # Ensure user is participant (beyond the queryset filter)
-        if not thread.is_participant(self.request.user):
-            from rest_framework.exceptions import PermissionDenied
-            raise PermissionDenied("You are not a participant in this thread.")
-        return thread
-
     def create(self, request, *args, **kwargs):
         """Create a direct message thread."""
         serializer = self.get_serializer(data=request.data)
@@ -128,6 +151,22 @@ class ThreadViewSet(
             status=status.HTTP_201_CREATED
         )
 
+    @action(detail=False, methods=['post'])
+    def broadcast(self, request):
+        """
+        Send an announcement to all active members of an organization.
+
+        Only org admins and moderators can send announcements. A single
+        thread and message are created; members see it in their thread list.
+        """
+        serializer = BroadcastCreateSerializer(data=request.data, context={'request': request})
+        serializer.is_valid(raise_exception=True)
+        thread = serializer.save()
+        return Response(
+            ThreadSerializer(thread, context={'request': request}).data,
+            status=status.HTTP_201_CREATED
+        )
+
     @action(detail=True, methods=['get', 'post'])
     def messages(self, request, pk=None):
         """
@@ -174,11 +213,21 @@ class ThreadViewSet(
         if not is_moderator:
             messages = messages.filter(is_hidden=False)
 
+        # Threads older than the archive horizon may have archived messages,
+        # which come before the recent ones
+        archived = None
+        horizon = archive_horizon()
+        if horizon and thread.created_at < horizon:
+            archived = ArchivedMessage.objects.filter(
+                thread_id=thread.pk
+            ).select_related('sender_user').order_by('created_at')
+            if not is_moderator:
+                archived = archived.filter(is_hidden=False)
+
         # Apply pagination
         limit = int(request.query_params.get('limit', 50))
         offset = int(request.query_params.get('offset', 0))
-        total = messages.count()
-        messages = messages[offset:offset + limit]
+        messages, total = paginate_history(archived, messages, offset, limit)
 
         serializer = MessageSerializer(
             messages,
@@ -200,17 +249,35 @@ class ThreadViewSet(
         thread.mark_read(request.user)
         return Response({'status': 'ok'})
 
+    @action(detail=False, methods=['post'], url_path='mark-read', url_name='mark-read-bulk')
+    def mark_read_bulk(self, request):
+        """
+        Mark several threads as read.
+
+        Expects {"thread_ids": [...]}. Threads the user cannot see are
+        ignored, and threads with nothing new are not written.
+        """
+        serializer = MarkReadSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        visible_ids = Thread.objects.filter(
+            Thread.visible_filter(request.user),
+            id__in=serializer.validated_data['thread_ids'],
+        ).values_list('id', flat=True)
+        updated = Thread.mark_threads_read(request.user, list(visible_ids))
+        return Response({'status': 'ok', 'updated': updated})
+
     @action(detail=False, methods=['get'])
     def unread_counts(self, request):
         """
         Get unread message counts for all threads.
         """
-        threads = self.get_queryset()
-        counts = {}
-        for thread in threads:
-            unread = thread.get_unread_count(request.user)
-            if unread > 0:
-                counts[str(thread.id)] = unread
+        threads = self.get_queryset().prefetch_related(None).with_unread_count(request.user)
+        counts = {
+            str(thread_id): unread
+            for thread_id, unread in threads.values_list('id', 'unread_count')
+            if unread > 0
+        }
 
         total = sum(counts.values())
         return Response({
@@ -229,16 +296,90 @@ class MessageViewSet(
 
     Messages are primarily accessed through the thread endpoint,
     but this provides a fallback for fetching individual messages.
+
+    Endpoints:
+        GET /api/messages/ - List messages in the user's threads
+        GET /api/messages/{id}/ - Get a message
+        GET /api/messages/search/?q= - Search messages in the user's threads
     """
 
     permission_classes = [IsAuthenticated]
     serializer_class = MessageSerializer
+    query_budgets = {'list': 2, 'retrieve': 2, 'search': 2}
 
     def get_queryset(self):
         """
-        Get messages in threads the user participates in.
+        Get messages in threads the user can see.
         """
+        visible_threads = Thread.objects.filter(
+            Thread.visible_filter(self.request.user)
+        ).values('id')
         return Message.objects.filter(
-            thread__participants__user=self.request.user,
+            thread__in=visible_threads,
             is_hidden=False
         ).select_related('thread', 'sender_user')
+
+    def get_object(self):
+        """Get a message, falling back to the archive for old messages."""
+        try:
+            return super().get_object()
+        except Http404:
+            if not archive_horizon():
+                raise
+
+        visible_threads = Thread.objects.filter(
+            Thread.visible_filter(self.request.user)
+        ).values('id')
+        archived = ArchivedMessage.objects.filter(
+            thread_id__in=visible_threads,
+            is_hidden=False,
+        ).select_related('sender_user')
+        return get_object_or_404(archived, pk=self.kwargs['pk'])
+
+    @action(detail=False, methods=['get'])
+    def search(self, request):
+        """
+        Full-text search over messages in the user's threads.
+
+        Query params:
+            q: Search text (required)
+            org: Optional organization ID or slug
+            thread: Optional thread ID
+            limit: Max results (default 20, max 100)
+        """
+        query = request.query_params.get('q', '').strip()
+        if not query:
+            return Response(
+                {'detail': 'The q parameter is required.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        messages = self.get_queryset()
+
+        org_param = request.query_params.get('org')
+        if org_param:
+            messages = filter_by_org(messages, org_param)
+
+        thread_id = request.query_params.get('thread')
+        if thread_id:
+            try:
+                thread_id = uuid.UUID(thread_id)
+            except ValueError:
+                return Response(
+                    {'detail': 'The thread parameter must be a thread ID.'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            messages = messages.filter(thread_id=thread_id)
+
+        try:
+            limit = int(request.query_params.get('limit', 20))
+        except ValueError:
+            limit = 20
+        limit = max(1, min(limit, 100))
+
+        serializer = MessageSerializer(
+            messages.search(query)[:limit],
+            many=True,
+            context={'request': request}
+        )
+        return Response(serializer.data)
@@ -6,11 +6,14 @@ Models for moderation and trust.
 """
 
 import uuid
-from django.db import models
+from django.db import models, transaction
+from django.db.models import Q
 from django.conf import settings
 from django.core.exceptions import ValidationError
 from django.utils import timezone
 
+from events.outbox import publish
+
 
 class Report(models.Model):
     """
@@ -95,17 +98,28 @@ class Report(models.Model):
         indexes = [
             models.Index(fields=['org', 'status']),
             models.Index(fields=['target_type', 'target_id']),
+            # Metrics: open reports across orgs
+            models.Index(fields=['status'], condition=Q(status='open'), name='reports_open_idx'),
         ]
 
     def __str__(self):
         return f"Report {self.reason} on {self.target_type}:{self.target_id}"
 
-    def get_target_object(self):
-        """
-        Get the actual object being reported.
-
-        Returns the target object or None if not found.
-        """
+    def save(self, *args, **kwargs):
+        """Save the report, publishing report.filed for new reports."""
+        is_new = self._state.adding
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            if is_new:
+                publish('report.filed', self, {
+                    'target_type': self.target_type,
+                    'target_id': self.target_id,
+                    'reason': self.reason,
+                })
+
+    @staticmethod
+    def get_target_model(target_type):
+        """Get the model class for a target type, or None."""
         from help.models import HelpPost
         from items.models import ItemPost
         from messaging.models import Message
@@ -117,8 +131,18 @@ class Report(models.Model):
             'item_post': ItemPost,
             'message': Message,
         }
+        return model_map.get(target_type)
+
+    def get_target_object(self):
+        """
+        Get the actual object being reported.
+
+        Returns the target object or None if not found.
+        """
+        if hasattr(self, '_target_object'):
+            return self._target_object
 
-        model_class = model_map.get(self.target_type)
+        model_class = self.get_target_model(self.target_type)
         if not model_class:
             return None
 
@@ -127,6 +151,28 @@ class Report(models.Model):
         except model_class.DoesNotExist:
             return None
 
+    @classmethod
+    def prefetch_targets(cls, reports):
+        """
+        Load the targets of several reports, one query per target type.
+
+        get_target_object() then returns the loaded object without a query.
+        """
+        ids_by_type = {}
+        for report in reports:
+            ids_by_type.setdefault(report.target_type, set()).add(report.target_id)
+
+        targets = {}
+        for target_type, ids in ids_by_type.items():
+            model_class = cls.get_target_model(target_type)
+            if model_class:
+                for target in model_class.objects.filter(id__in=ids):
+                    targets[(target_type, target.pk)] = target
+
+        for report in reports:
+            report._target_object = targets.get((report.target_type, report.target_id))
+        return reports
+
     def start_review(self, moderator):
         """Mark the report as under review."""
         if self.status != 'open':
@@ -302,10 +348,11 @@ class ModerationAction(models.Model):
         return action
 
     @classmethod
+    @transaction.atomic
     def suspend_user(cls, org, moderator, user, reason, duration_days=None,
                      report=None, user_message=''):
         """
-        Suspend a user's membership.
+        Suspend a user's membership and publish membership.suspended.
 
         Args:
             org: The organization
@@ -340,6 +387,12 @@ class ModerationAction(models.Model):
             duration_days=duration_days,
             user_message=user_message,
         )
+        publish('membership.suspended', membership, {
+            'user_id': user.id,
+            'action_id': action.id,
+            'duration_days': duration_days,
+            'expires_at': action.expires_at,
+        })
         return action
 
     @classmethod
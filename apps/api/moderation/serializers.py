@@ -5,12 +5,14 @@
 Serializers for moderation API.
 """
 
+from django.db import models
 from rest_framework import serializers
 
+from kapwanet.fieldsets import SparseFieldsetMixin
 from .models import Report, ModerationAction
 
 
-class ReportSerializer(serializers.ModelSerializer):
+class ReportSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """Full serializer for Report model."""
 
     reporter_email = serializers.EmailField(source='reporter.email', read_only=True)
@@ -81,7 +83,16 @@ class ReportSerializer(serializers.ModelSerializer):
         return super().create(validated_data)
 
 
-class ReportListSerializer(serializers.ModelSerializer):
+class ReportTargetListSerializer(serializers.ListSerializer):
+    """List serializer loading all report targets up front."""
+
+    def to_representation(self, data):
+        reports = list(data.all() if isinstance(data, models.Manager) else data)
+        Report.prefetch_targets(reports)
+        return super().to_representation(reports)
+
+
+class ReportListSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """Lightweight serializer for listing reports."""
 
     reporter_email = serializers.EmailField(source='reporter.email', read_only=True)
@@ -99,6 +110,7 @@ class ReportListSerializer(serializers.ModelSerializer):
             'status',
             'created_at',
         ]
+        list_serializer_class = ReportTargetListSerializer
 
     def get_target_preview(self, obj):
         """Get a brief preview of the target."""
@@ -131,7 +143,7 @@ class ResolveReportSerializer(serializers.Serializer):
     resolution_notes = serializers.CharField(required=False, allow_blank=True)
 
 
-class ModerationActionSerializer(serializers.ModelSerializer):
+class ModerationActionSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """Full serializer for ModerationAction model."""
 
     moderator_email = serializers.EmailField(source='moderator.email', read_only=True)
@@ -193,7 +205,7 @@ class ModerationActionSerializer(serializers.ModelSerializer):
         return {}
 
 
-class ModerationActionListSerializer(serializers.ModelSerializer):
+class ModerationActionListSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """Lightweight serializer for listing moderation actions."""
 
     moderator_email = serializers.EmailField(source='moderator.email', read_only=True)
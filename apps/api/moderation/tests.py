@@ -9,7 +9,9 @@ from django.test import TestCase
 from django.core.exceptions import ValidationError
 from rest_framework.test import APITestCase
 from rest_framework import status as http_status
+from rest_framework_simplejwt.tokens import RefreshToken
 
+from kapwanet.querybudget import QueryBudgetTestMixin
 from organizations.models import Organization, Membership
 from users.models import User
 from help.models import HelpPost
@@ -464,3 +466,47 @@ class ModerationActionAPITests(APITestCase):
         self.assertIn('warn', types)
         self.assertIn('suspend', types)
         self.assertIn('ban', types)
+
+
+class ModerationQueryBudgetTests(QueryBudgetTestMixin, APITestCase):
+    """Tests that moderation endpoints stay within their query budgets."""
+
+    def setUp(self):
+        self.org = Organization.objects.create(name='Test Org', slug='test-org')
+        self.moderator = User.objects.create_user(email='mod@example.com', password='testpass123')
+        Membership.objects.create(org=self.org, user=self.moderator, role='moderator', status='active')
+        self.users = 0
+        self.add_reports()
+        token = RefreshToken.for_user(self.moderator).access_token
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+
+    def add_reports(self):
+        """Add reports against a user and a post, and an action for each."""
+        self.users += 1
+        user = User.objects.create_user(email=f'user{self.users}@example.com', password='testpass123')
+        Membership.objects.create(org=self.org, user=user, role='member', status='active')
+        post = HelpPost.objects.create(
+            org=self.org, type='request', category='errands',
+            title='Suspicious post', description='Buy now', created_by=user
+        )
+        for target_type, target_id in [('user', user.id), ('help_post', post.id), ('item_post', post.id)]:
+            report = Report.objects.create(
+                org=self.org, reporter=self.moderator, target_type=target_type,
+                target_id=target_id, reason='spam'
+            )
+            ModerationAction.warn_user(self.org, self.moderator, user, 'Spam', report=report)
+
+    def test_report_list(self):
+        """Test that listing reports loads targets in bulk."""
+        response = self.assertConstantQueries(f'/api/reports/?org={self.org.id}', grow=self.add_reports)
+        previews = {row['target_preview'] for row in response.data}
+        self.assertEqual(previews, {'user1@example.com', 'user2@example.com', 'Suspicious post', '[Deleted]'})
+
+        report = Report.objects.first()
+        self.request_within_budget('get', f'/api/reports/{report.id}/')
+
+    def test_moderation_action_list(self):
+        """Test the moderation action list and detail."""
+        self.assertConstantQueries(f'/api/moderation-actions/?org={self.org.id}', grow=self.add_reports)
+        action = ModerationAction.objects.first()
+        self.request_within_budget('get', f'/api/moderation-actions/{action.id}/')
@@ -9,6 +9,7 @@ from rest_framework import viewsets, status, filters
 from rest_framework.decorators import action
 from rest_framework.response import Response
 
+from organizations.cache import filter_by_org
 from organizations.models import Membership, Organization
 from organizations.permissions import OrgMembershipPermission, OrgModeratorPermission
 from users.models import User
@@ -45,6 +46,7 @@ class ReportViewSet(viewsets.ModelViewSet):
     filter_backends = [filters.OrderingFilter]
     ordering_fields = ['created_at', 'status']
     ordering = ['-created_at']
+    query_budgets = {'list': 7, 'retrieve': 5}
 
     def get_queryset(self):
         """Get reports filtered by organization."""
@@ -53,12 +55,7 @@ class ReportViewSet(viewsets.ModelViewSet):
         # Filter by org
         org_param = self.request.query_params.get('org')
         if org_param:
-            try:
-                from uuid import UUID
-                UUID(org_param)
-                queryset = queryset.filter(org_id=org_param)
-            except (ValueError, AttributeError):
-                queryset = queryset.filter(org__slug=org_param)
+            queryset = filter_by_org(queryset, org_param)
         else:
             # Filter by user's moderator memberships
             mod_orgs = Membership.objects.filter(
@@ -222,6 +219,7 @@ class ModerationActionViewSet(viewsets.ReadOnlyModelViewSet):
     filter_backends = [filters.OrderingFilter]
     ordering_fields = ['created_at']
     ordering = ['-created_at']
+    query_budgets = {'list': 4, 'retrieve': 5}
 
     def get_queryset(self):
         """Get moderation actions filtered by organization."""
@@ -230,12 +228,7 @@ class ModerationActionViewSet(viewsets.ReadOnlyModelViewSet):
         # Filter by org
         org_param = self.request.query_params.get('org')
         if org_param:
-            try:
-                from uuid import UUID
-                UUID(org_param)
-                queryset = queryset.filter(org_id=org_param)
-            except (ValueError, AttributeError):
-                queryset = queryset.filter(org__slug=org_param)
+            queryset = filter_by_org(queryset, org_param)
         else:
             # Filter by user's moderator memberships
             mod_orgs = Membership.objects.filter(
@@ -0,0 +1,28 @@
+# KapwaNet - Community Platform for Dignified Mutual Aid
+# SPDX-License-Identifier: AGPL-3.0-or-later
+
+"""
+App configuration for observability.
+
+This module instruments API requests: wall, database and serializer
+time, query counts and response sizes per viewset action.
+"""
+
+from django.apps import AppConfig
+
+
+class ObservabilityConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'observability'
+    verbose_name = 'Observability'
+
+    def ready(self):
+        from kapwanet.signals import cache_lookup, message_sent
+        from .instrumentation import instrument_serializers
+        from .metrics import count_cache_lookup, count_message
+
+        # Patches BaseSerializer.data process-wide; it only measures inside
+        # requests handled by RequestMetricsMiddleware
+        instrument_serializers()
+        message_sent.connect(count_message, dispatch_uid='observability.count_message')
+        cache_lookup.connect(count_cache_lookup, dispatch_uid='observability.count_cache_lookup')
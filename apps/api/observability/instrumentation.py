@@ -0,0 +1,124 @@
+# KapwaNet - Community Platform for Dignified Mutual Aid
+# SPDX-License-Identifier: AGPL-3.0-or-later
+
+"""
+Per-request measurements.
+
+RequestMetrics is installed by RequestMetricsMiddleware for the duration
+of a request. It is the database execute wrapper, counting and timing
+every query, and it accumulates serializer time reported by
+serialization() blocks. Serializer time excludes queries run while
+serializing (lazy querysets, prefetches), so the three figures do not
+overlap:
+
+    wall = db + serializer + everything else (routing, auth, views, rendering)
+
+instrument_serializers() wraps DRF's BaseSerializer.data so every
+serializer is measured without changes to the views. The patch is
+process-wide (it also applies to serializers used by jobs, commands and
+tests), but outside a request measured by RequestMetricsMiddleware there
+are no current metrics and the wrapper only calls through.
+"""
+
+import contextvars
+import time
+from contextlib import contextmanager
+
+from rest_framework.serializers import BaseSerializer
+
+_current = contextvars.ContextVar('request_metrics', default=None)
+
+
+class RequestMetrics:
+    """Measurements for one request."""
+
+    def __init__(self, max_queries=200):
+        self.request_id = None
+        self.method = None
+        self.view = None
+        self.action = None
+        self.route = None
+        self.org_id = None
+        self.queries = 0
+        self.db_time = 0.0
+        self.serializer_time = 0.0
+        self.wall_time = 0.0
+        self.status = None
+        self.response_size = None
+        # (sql, seconds) of the first max_queries queries, for slow request samples
+        self.sql = []
+        self.max_queries = max_queries
+        self._serializing = False
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = time.perf_counter() - started
+            self.queries += 1
+            self.db_time += elapsed
+            if len(self.sql) < self.max_queries:
+                self.sql.append((sql, elapsed))
+
+    def activate(self):
+        """Make these the current request's metrics; returns a token for deactivate()."""
+        return _current.set(self)
+
+    @staticmethod
+    def deactivate(token):
+        _current.reset(token)
+
+
+def current_metrics():
+    """The RequestMetrics of the request being handled, or None."""
+    return _current.get()
+
+
+def tag_org(org_id):
+    """Record the organization the current request acts on (for logs and SQL comments)."""
+    metrics = _current.get()
+    if metrics is not None and org_id:
+        metrics.org_id = str(org_id)
+
+
+@contextmanager
+def serialization():
+    """
+    Count the enclosed block as serializer time.
+
+    Nested blocks (a serializer building another) are counted once.
+    """
+    metrics = _current.get()
+    if metrics is None or metrics._serializing:
+        yield
+        return
+
+    metrics._serializing = True
+    started = time.perf_counter()
+    db_before = metrics.db_time
+    try:
+        yield
+    finally:
+        metrics._serializing = False
+        elapsed = time.perf_counter() - started
+        metrics.serializer_time += elapsed - (metrics.db_time - db_before)
+
+
+def instrument_serializers():
+    """
+    Time BaseSerializer.data, which every serializer's .data goes through.
+
+    Replaces the property on the class for the whole process; see the
+    module docstring.
+    """
+    original = BaseSerializer.data.fget
+    if getattr(original, 'instrumented', False):
+        return
+
+    def data(self):
+        with serialization():
+            return original(self)
+
+    data.instrumented = True
+    BaseSerializer.data = property(data)
@@ -0,0 +1,37 @@
+# KapwaNet - Community Platform for Dignified Mutual Aid
+# SPDX-License-Identifier: AGPL-3.0-or-later
+
+"""
+Management command to issue a token for profiling live requests.
+
+Requests sending the token in an X-Profile header are profiled and their
+flamegraph-compatible profiles written to PROFILE_DIR:
+
+    python manage.py profile_token --minutes 30
+    curl -H "X-Profile: <token>" -H "Authorization: Bearer ..." \\
+        "https://api.example.org/api/threads/unread_counts/?org=big-org"
+"""
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from observability.profiling import issue_token
+
+
+class Command(BaseCommand):
+    help = 'Issue a signed X-Profile header value for profiling requests'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--minutes',
+            type=int,
+            default=60,
+            help='Minutes the token stays valid (default: 60)',
+        )
+
+    def handle(self, *args, **options):
+        token = issue_token(minutes=options['minutes'])
+        self.stdout.write(f'X-Profile: {token}')
+        self.stdout.write(self.style.SUCCESS(
+            f'\nDone! Valid for {options["minutes"]} minutes; profiles are written to {settings.PROFILE_DIR}.'
+        ))
@@ -0,0 +1,184 @@
+# KapwaNet - Community Platform for Dignified Mutual Aid
+# SPDX-License-Identifier: AGPL-3.0-or-later
+
+"""
+Prometheus metrics.
+
+Two kinds of metrics are exported at /api/metrics/:
+
+- Counters and histograms updated as requests are served: request
+  latency, queries and database time per viewset action (fed by
+  RequestMetricsMiddleware), and messages sent and cache lookups
+  (received from kapwanet.signals, so the apps sending them do not
+  depend on this module).
+- Gauges read from the database when scraped (AppStateCollector): queue
+  depths and recently active members. These are the same whichever
+  worker answers the scrape.
+
+Under gunicorn each worker keeps its own counters. Set
+PROMETHEUS_MULTIPROC_DIR (gunicorn.conf.py does) and prometheus_client
+stores them in per-process files there, which registry() merges on every
+scrape. Without it (runserver, tests) the in-process registry is used.
+"""
+
+import os
+import threading
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.utils import timezone
+from prometheus_client import REGISTRY, CollectorRegistry, Counter, Histogram, multiprocess
+from prometheus_client.core import GaugeMetricFamily
+
+REQUEST_LATENCY = Histogram(
+    'kapwanet_http_request_duration_seconds',
+    'Request latency by viewset action',
+    ['method', 'view', 'action', 'status'],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10),
+)
+REQUEST_QUERIES = Histogram(
+    'kapwanet_http_request_queries',
+    'Database queries per request',
+    ['view', 'action'],
+    buckets=(1, 2, 3, 5, 8, 13, 21, 34, 55, 89),
+)
+REQUEST_DB_TIME = Histogram(
+    'kapwanet_http_request_db_duration_seconds',
+    'Database time per request',
+    ['view', 'action'],
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5),
+)
+MESSAGES_SENT = Counter(
+    'kapwanet_messages_sent',
+    'Messages sent, by message type',
+    ['type'],
+)
+CACHE_REQUESTS = Counter(
+    'kapwanet_cache_requests',
+    'Cache lookups by cache and result (hit or miss)',
+    ['cache', 'result'],
+)
+
+
+def observe_request(request_metrics):
+    """Record a finished request's RequestMetrics."""
+    view = request_metrics.view or 'unresolved'
+    action = request_metrics.action or ''
+    REQUEST_LATENCY.labels(
+        request_metrics.method, view, action, f'{request_metrics.status // 100}xx'
+    ).observe(request_metrics.wall_time)
+    REQUEST_QUERIES.labels(view, action).observe(request_metrics.queries)
+    REQUEST_DB_TIME.labels(view, action).observe(request_metrics.db_time)
+
+
+def count_message(sender, message_type, **kwargs):
+    """Receiver for kapwanet.signals.message_sent."""
+    MESSAGES_SENT.labels(message_type).inc()
+
+
+def count_cache_lookup(sender, cache, hit, **kwargs):
+    """Receiver for kapwanet.signals.cache_lookup."""
+    CACHE_REQUESTS.labels(cache, 'hit' if hit else 'miss').inc()
+
+
+def active_users(since):
+    """Count members who sent a message, posted, offered help or requested an item since a time."""
+    from help.models import HelpMatch, HelpPost
+    from items.models import ItemPost, ItemReservation
+    from messaging.models import Message
+
+    querysets = [
+        Message.objects.filter(sender_user__isnull=False).values('sender_user_id'),
+        HelpPost.objects.values('created_by_id'),
+        HelpMatch.objects.values('helper_user_id'),
+        ItemPost.objects.values('created_by_id'),
+        ItemReservation.objects.values('requester_id'),
+    ]
+    first, *rest = [queryset.filter(created_at__gte=since).order_by() for queryset in querysets]
+    return first.union(*rest).count()
+
+
+def app_state():
+    """
+    Read the queue depths and active member count from the database.
+
+    Returns:
+        {'queues': {queue: depth}, 'active_users': count}
+    """
+    from help.models import HelpMatch
+    from items.models import ItemReservation
+    from jobs.models import Job
+    from moderation.models import Report
+
+    # Each count is answered from a small partial (or status) index
+    window = settings.METRICS_ACTIVE_USER_WINDOW
+    return {
+        'queues': {
+            'open_reports': Report.objects.filter(status='open').count(),
+            'pending_matches': HelpMatch.objects.filter(status='pending').count(),
+            'pending_reservations': ItemReservation.objects.filter(status='pending').count(),
+            'jobs': Job.objects.filter(status='queued').count(),
+        },
+        'active_users': active_users(timezone.now() - timedelta(minutes=window)),
+    }
+
+
+_state_lock = threading.Lock()
+_state_cache = None
+
+
+def cached_app_state():
+    """app_state(), rerun at most every METRICS_STATE_TTL seconds per process."""
+    global _state_cache
+    with _state_lock:
+        now = time.monotonic()
+        if _state_cache is None or now >= _state_cache[0]:
+            _state_cache = (now + settings.METRICS_STATE_TTL, app_state())
+        return _state_cache[1]
+
+
+def reset_app_state():
+    """Forget the cached app state (tests)."""
+    global _state_cache
+    with _state_lock:
+        _state_cache = None
+
+
+class AppStateCollector:
+    """
+    Gauges computed from the database at scrape time.
+
+    Scrapers poll every few seconds, so the values are cached for
+    METRICS_STATE_TTL rather than recounted on each scrape.
+    """
+
+    def collect(self):
+        state = cached_app_state()
+
+        queues = GaugeMetricFamily(
+            'kapwanet_queue_depth',
+            'Items waiting for someone to act on them',
+            labels=['queue'],
+        )
+        for queue, depth in state['queues'].items():
+            queues.add_metric([queue], depth)
+        yield queues
+
+        yield GaugeMetricFamily(
+            'kapwanet_active_users',
+            f'Members who sent a message, posted or responded in the last '
+            f'{settings.METRICS_ACTIVE_USER_WINDOW} minutes',
+            value=state['active_users'],
+        )
+
+
+def registry():
+    """Build the registry to expose on a scrape."""
+    scrape = CollectorRegistry()
+    if 'PROMETHEUS_MULTIPROC_DIR' in os.environ:
+        multiprocess.MultiProcessCollector(scrape)
+    else:
+        scrape.register(REGISTRY)
+    scrape.register(AppStateCollector())
+    return scrape
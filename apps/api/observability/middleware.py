@@ -0,0 +1,198 @@
+# KapwaNet - Community Platform for Dignified Mutual Aid
+# SPDX-License-Identifier: AGPL-3.0-or-later
+
+"""
+Request instrumentation middleware.
+
+Every request is logged as one JSON line on the `observability.middleware`
+logger, tagged with the viewset (or view function) and action that
+handled it:
+
+    {"request_id": "3b9e...", "method": "GET", "path": "/api/help-posts/",
+     "view": "HelpPostViewSet", "action": "list", "org_id": "6f1c...",
+     "status": 200, "duration_ms": 23.4, "db_ms": 8.1, "queries": 4,
+     "serializer_ms": 6.2, "response_bytes": 5120}
+
+The request ID is taken from an X-Request-ID header set by the proxy (or
+generated) and echoed in the response. With SQL_COMMENTS on, queries are
+tagged with the same context (see sqlcomment.py).
+
+Requests slower than REQUEST_SLOW_MS are additionally logged as warnings
+for a REQUEST_SLOW_SAMPLE_RATE fraction of them, with their SQL grouped by
+fingerprint (literals replaced, so no user data is logged) and the count
+and total time of each, slowest first. With DEBUG on, responses carry a Server-Timing header
+so the breakdown shows in the browser's network panel. The same figures
+feed the Prometheus histograms in metrics.py.
+"""
+
+import json
+import logging
+import random
+import re
+import time
+import uuid
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import connection
+
+from kapwanet.querybudget import fingerprint
+
+from .instrumentation import RequestMetrics
+from .metrics import observe_request
+from .profiling import StackSampler, save_profile, should_profile
+from .sqlcomment import SQLCommenter
+
+logger = logging.getLogger(__name__)
+
+# Accepted X-Request-ID values; anything else is replaced
+_REQUEST_ID = re.compile(r'^[A-Za-z0-9._-]{1,64}$')
+
+
+def get_request_id(request):
+    """The proxy's X-Request-ID if it looks sane, else a new ID."""
+    value = request.META.get('HTTP_X_REQUEST_ID', '')
+    return value if _REQUEST_ID.match(value) else uuid.uuid4().hex
+
+
+def resolve_view(view_func, method):
+    """
+    Name the view and action handling a request.
+
+    Returns:
+        A tuple of (view name, action or None); for viewsets the action is
+        the viewset method the router maps the HTTP method to
+    """
+    cls = getattr(view_func, 'cls', None) or getattr(view_func, 'view_class', None)
+    name = cls.__name__ if cls is not None else getattr(view_func, '__name__', None)
+    actions = getattr(view_func, 'actions', None) or {}
+    return name, actions.get(method.lower())
+
+
+def response_size(response):
+    """Body size in bytes, or None for streaming responses."""
+    if getattr(response, 'streaming', False):
+        return None
+    return len(response.content)
+
+
+def server_timing(metrics):
+    """Build a Server-Timing header value."""
+    other = metrics.wall_time - metrics.db_time - metrics.serializer_time
+    return ', '.join([
+        f'db;dur={metrics.db_time * 1000:.1f};desc="{metrics.queries} queries"',
+        f'serializer;dur={metrics.serializer_time * 1000:.1f}',
+        f'app;dur={max(other, 0) * 1000:.1f}',
+        f'total;dur={metrics.wall_time * 1000:.1f}',
+    ])
+
+
+def sql_summary(queries):
+    """Group (sql, seconds) pairs by fingerprint, slowest total first."""
+    groups = {}
+    for sql, seconds in queries:
+        group = groups.setdefault(fingerprint(sql), {'count': 0, 'seconds': 0.0})
+        group['count'] += 1
+        group['seconds'] += seconds
+    return [
+        {'ms': round(group['seconds'] * 1000, 2), 'count': group['count'], 'sql': sql}
+        for sql, group in sorted(groups.items(), key=lambda item: -item[1]['seconds'])
+    ]
+
+
+class RequestMetricsMiddleware:
+    """
+    Measure each request and log the results.
+
+    Place first in MIDDLEWARE so the timings include the other middleware.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        metrics = RequestMetrics(max_queries=settings.REQUEST_SLOW_MAX_QUERIES)
+        metrics.request_id = get_request_id(request)
+        metrics.method = request.method
+        request.metrics = metrics
+        token = metrics.activate()
+        started = time.perf_counter()
+        try:
+            with ExitStack() as stack:
+                stack.enter_context(connection.execute_wrapper(metrics))
+                if settings.SQL_COMMENTS:
+                    # Inside the metrics wrapper, so logged SQL stays uncommented
+                    stack.enter_context(connection.execute_wrapper(SQLCommenter(metrics)))
+                response = self.get_response(request)
+        finally:
+            metrics.wall_time = time.perf_counter() - started
+            metrics.deactivate(token)
+
+        metrics.status = response.status_code
+        metrics.response_size = response_size(response)
+        self.log(request, metrics)
+        observe_request(metrics)
+        response['X-Request-ID'] = metrics.request_id
+        if settings.DEBUG:
+            response['Server-Timing'] = server_timing(metrics)
+            response['Timing-Allow-Origin'] = '*'
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        metrics = getattr(request, 'metrics', None)
+        if metrics is not None:
+            metrics.view, metrics.action = resolve_view(view_func, request.method)
+            metrics.route = request.resolver_match.route
+
+    def log(self, request, metrics):
+        record = {
+            'request_id': metrics.request_id,
+            'method': request.method,
+            'path': request.path,
+            'view': metrics.view,
+            'action': metrics.action,
+            'org_id': metrics.org_id,
+            'status': metrics.status,
+            'duration_ms': round(metrics.wall_time * 1000, 2),
+            'db_ms': round(metrics.db_time * 1000, 2),
+            'queries': metrics.queries,
+            'serializer_ms': round(metrics.serializer_time * 1000, 2),
+            'response_bytes': metrics.response_size,
+        }
+        logger.info(json.dumps(record))
+
+        slow = metrics.wall_time * 1000 >= settings.REQUEST_SLOW_MS
+        if slow and random.random() < settings.REQUEST_SLOW_SAMPLE_RATE:
+            record['slow'] = True
+            record['sql'] = sql_summary(metrics.sql)
+            logger.warning(json.dumps(record))
+
+
+class ProfilingMiddleware:
+    """
+    Profile opted-in requests with a sampling profiler (see profiling.py).
+
+    Place after RequestMetricsMiddleware so profiles carry the request ID.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        request.profile = None
+        try:
+            response = self.get_response(request)
+        finally:
+            if request.profile is not None:
+                request.profile[0].stop()
+
+        if request.profile is not None:
+            sampler, view, action = request.profile
+            response['X-Profile-Id'] = save_profile(sampler, request, response, view, action)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        view, action = resolve_view(view_func, request.method)
+        if should_profile(request, f'{view}.{action}'):
+            sampler = StackSampler(interval=settings.PROFILE_INTERVAL_MS / 1000).start()
+            request.profile = (sampler, view, action)
@@ -0,0 +1,44 @@
+# KapwaNet - Community Platform for Dignified Mutual Aid
+# SPDX-License-Identifier: AGPL-3.0-or-later
+
+"""
+Permission classes for monitoring endpoints.
+"""
+
+import hmac
+import ipaddress
+
+from django.conf import settings
+from rest_framework import permissions
+
+
+def allowed_networks():
+    """Parse METRICS_ALLOWED_IPS into networks, skipping blank entries."""
+    return [
+        ipaddress.ip_network(value.strip(), strict=False)
+        for value in settings.METRICS_ALLOWED_IPS if value.strip()
+    ]
+
+
+class MetricsPermission(permissions.BasePermission):
+    """
+    Allow scrapers presenting METRICS_TOKEN as a bearer token, or
+    connecting from an address in METRICS_ALLOWED_IPS.
+
+    The address is REMOTE_ADDR; behind a proxy, list the proxy or use the
+    token.
+    """
+
+    message = 'Metrics are restricted to the monitoring system.'
+
+    def has_permission(self, request, view):
+        token = settings.METRICS_TOKEN
+        header = request.META.get('HTTP_AUTHORIZATION', '')
+        if token and hmac.compare_digest(header.encode(), f'Bearer {token}'.encode()):
+            return True
+
+        try:
+            address = ipaddress.ip_address(request.META.get('REMOTE_ADDR', ''))
+        except ValueError:
+            return False
+        return any(address in network for network in allowed_networks())
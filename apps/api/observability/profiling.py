@@ -0,0 +1,202 @@
+# KapwaNet - Community Platform for Dignified Mutual Aid
+# SPDX-License-Identifier: AGPL-3.0-or-later
+
+"""
+On-demand sampling profiler for live requests.
+
+ProfilingMiddleware profiles a request when either:
+
+- it carries an X-Profile header with a token from
+  `manage.py profile_token` (signed with SECRET_KEY, expiring), or
+- its viewset action has a rate in PROFILE_SAMPLE_RATES, e.g.
+  {'ThreadViewSet.unread_counts': 0.01}.
+
+While the view runs, a StackSampler thread records the request thread's
+stack every PROFILE_INTERVAL_MS. The profile is written to PROFILE_DIR in
+the collapsed-stack format read by flamegraph.pl, speedscope and inferno,
+one line per distinct stack with its sample count:
+
+    ...;ThreadViewSet.unread_counts (messaging/views.py:273);QuerySet.__iter__ (django/db/models/query.py:394) 37
+
+next to a JSON file describing the request. Both are named
+<time>-<view>.<action>-<request id>, and the name is returned in the
+X-Profile-Id response header. Each save prunes PROFILE_DIR to the newest
+PROFILE_MAX_FILES profiles, none older than PROFILE_MAX_AGE_HOURS.
+
+Sampling only reads frame objects from another thread, but that thread
+takes the GIL every PROFILE_INTERVAL_MS while it walks the stack. Profiled
+requests slow down by a few percent, and other requests served by the
+same process slow down slightly while a profile runs.
+"""
+
+import json
+import os
+import random
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+
+from django.conf import settings
+from django.core import signing
+from django.utils import timezone
+
+# Salt for X-Profile tokens
+TOKEN_SALT = 'observability.profile'
+
+
+def issue_token(minutes=60):
+    """Create an X-Profile token valid for a number of minutes."""
+    return signing.dumps({'exp': int(time.time()) + minutes * 60}, salt=TOKEN_SALT)
+
+
+def token_is_valid(value):
+    if not value:
+        return False
+    try:
+        payload = signing.loads(value, salt=TOKEN_SALT)
+    except signing.BadSignature:
+        return False
+    return payload.get('exp', 0) > time.time()
+
+
+def should_profile(request, endpoint):
+    """Decide whether to profile a request to an endpoint ('View.action')."""
+    if token_is_valid(request.META.get('HTTP_X_PROFILE')):
+        return True
+    rate = settings.PROFILE_SAMPLE_RATES.get(endpoint, 0)
+    return rate > 0 and random.random() < rate
+
+
+class StackSampler:
+    """
+    Statistical profiler sampling one thread's stack from a background thread.
+
+    Usage:
+        sampler = StackSampler().start()
+        ...
+        sampler.stop()
+        sampler.folded()
+    """
+
+    def __init__(self, thread_id=None, interval=0.005):
+        self.thread_id = thread_id or threading.get_ident()
+        self.interval = interval
+        self.stacks = Counter()
+        self.samples = 0
+        self.duration = 0.0
+        self._labels = {}
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='stack-sampler', daemon=True)
+
+    def start(self):
+        self._started = time.perf_counter()
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+        self.duration = time.perf_counter() - self._started
+
+    def _label(self, code):
+        label = self._labels.get(code)
+        if label is None:
+            filename = code.co_filename
+            base = str(settings.BASE_DIR)
+            if filename.startswith(base):
+                filename = filename[len(base) + 1:]
+            elif 'site-packages' in filename:
+                filename = filename.split('site-packages', 1)[1].lstrip(os.sep)
+            name = getattr(code, 'co_qualname', code.co_name)
+            label = self._labels[code] = f'{name} ({filename}:{code.co_firstlineno})'
+        return label
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                break
+            stack = []
+            while frame is not None:
+                stack.append(self._label(frame.f_code))
+                frame = frame.f_back
+            stack.reverse()
+            self.stacks[tuple(stack)] += 1
+            self.samples += 1
+
+    def folded(self):
+        """The samples in collapsed-stack format."""
+        return ''.join(
+            f'{";".join(stack)} {count}\n' for stack, count in sorted(self.stacks.items())
+        )
+
+
+def save_profile(sampler, request, response, view, action):
+    """
+    Write a finished profile and its description to PROFILE_DIR.
+
+    Returns:
+        The profile's name (file name without extension)
+    """
+    metrics = getattr(request, 'metrics', None)
+    request_id = getattr(metrics, 'request_id', None) or uuid.uuid4().hex
+    now = timezone.now()
+    name = f'{now:%Y%m%dT%H%M%S}-{view}.{action or "-"}-{request_id}'
+
+    os.makedirs(settings.PROFILE_DIR, exist_ok=True)
+    path = os.path.join(settings.PROFILE_DIR, name)
+    with open(f'{path}.folded', 'w') as f:
+        f.write(sampler.folded())
+    with open(f'{path}.json', 'w') as f:
+        json.dump({
+            'request_id': request_id,
+            'method': request.method,
+            'path': request.get_full_path(),
+            'view': view,
+            'action': action,
+            'org_id': getattr(metrics, 'org_id', None),
+            'status': response.status_code,
+            'finished_at': now.isoformat(),
+            'duration_ms': round(sampler.duration * 1000, 2),
+            'interval_ms': sampler.interval * 1000,
+            'samples': sampler.samples,
+        }, f, indent=2)
+    prune_profiles(settings.PROFILE_DIR)
+    return name
+
+
+def prune_profiles(directory):
+    """
+    Delete profiles beyond the newest PROFILE_MAX_FILES or older than
+    PROFILE_MAX_AGE_HOURS.
+
+    Returns:
+        The number of profiles deleted
+    """
+    profiles = {}
+    with os.scandir(directory) as entries:
+        for entry in entries:
+            name, ext = os.path.splitext(entry.name)
+            if ext in ('.folded', '.json') and entry.is_file():
+                try:
+                    mtime = entry.stat().st_mtime
+                except FileNotFoundError:
+                    continue
+                profiles[name] = max(profiles.get(name, 0), mtime)
+
+    cutoff = time.time() - settings.PROFILE_MAX_AGE_HOURS * 3600
+    newest = sorted(profiles, key=profiles.get, reverse=True)
+    expired = [
+        name for rank, name in enumerate(newest)
+        if rank >= settings.PROFILE_MAX_FILES or profiles[name] < cutoff
+    ]
+    for name in expired:
+        for ext in ('.folded', '.json'):
+            try:
+                os.remove(os.path.join(directory, name + ext))
+            except FileNotFoundError:
+                # Pruned concurrently by another process
+                pass
+    return len(expired)
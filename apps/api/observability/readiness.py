@@ -0,0 +1,135 @@
+# KapwaNet - Community Platform for Dignified Mutual Aid
+# SPDX-License-Identifier: AGPL-3.0-or-later
+
+"""
+Readiness checks for load balancers and orchestrators.
+
+/api/health/ only shows that the process answers HTTP (liveness).
+/api/ready/ also checks what a request needs to succeed:
+
+- database: a round trip (SELECT 1) with its latency,
+- migrations: no unapplied migrations (a pod started before `migrate`
+  finished would fail on missing columns),
+- cache: a set/get round trip on the default cache,
+- jobs: the age of the oldest job due to run.
+
+The first three are required: if any fails the endpoint answers 503 so
+traffic is routed elsewhere. Job lag only marks the pod "degraded" with a
+200, since a stalled worker is not fixed by taking web pods out of
+rotation.
+
+Checks run at most once every READY_CACHE_SECONDS per process, so frequent
+probes cost one cached lookup. Errors are logged; the response only names
+the exception type, as the endpoint is unauthenticated.
+"""
+
+import logging
+import threading
+import time
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection
+from django.db.migrations.executor import MigrationExecutor
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+_lock = threading.Lock()
+_cached = None
+
+
+def _timed(name, check):
+    """Run a check, adding ok, latency_ms and (on failure) error to its result."""
+    started = time.perf_counter()
+    try:
+        result = check() or {}
+        result.setdefault('ok', True)
+    except Exception as exc:
+        logger.warning('Readiness check %s failed', name, exc_info=True)
+        result = {'ok': False, 'error': type(exc).__name__}
+    result['latency_ms'] = round((time.perf_counter() - started) * 1000, 2)
+    return result
+
+
+def check_database():
+    with connection.cursor() as cursor:
+        cursor.execute('SELECT 1')
+        cursor.fetchone()
+
+
+def check_migrations():
+    executor = MigrationExecutor(connection)
+    plan = executor.migration_plan(executor.loader.graph.leaf_nodes())
+    return {'ok': not plan, 'pending': len(plan)}
+
+
+def check_cache():
+    key = f'readiness:{uuid.uuid4().hex}'
+    cache.set(key, 1, timeout=10)
+    found = cache.get(key)
+    cache.delete(key)
+    return {'ok': found == 1}
+
+
+def check_jobs():
+    from jobs.models import Job
+
+    oldest = Job.objects.filter(
+        status='queued', run_at__lte=timezone.now()
+    ).order_by('run_at').values_list('run_at', flat=True).first()
+    lag = (timezone.now() - oldest).total_seconds() if oldest else 0.0
+    return {'ok': lag <= settings.READY_JOBS_MAX_LAG, 'lag_seconds': round(lag, 1)}
+
+
+REQUIRED_CHECKS = {
+    'database': check_database,
+    'migrations': check_migrations,
+    'cache': check_cache,
+}
+OPTIONAL_CHECKS = {
+    'jobs': check_jobs,
+}
+
+
+def run_checks():
+    """
+    Run every readiness check.
+
+    Returns:
+        {'status': 'ready'|'degraded'|'unavailable', 'checks': {name: result},
+         'checked_at': ISO timestamp}
+    """
+    checks = {'database': _timed('database', check_database)}
+    if not checks['database']['ok']:
+        # The other checks need the database too; don't wait on it again
+        return {'status': 'unavailable', 'checks': checks, 'checked_at': timezone.now().isoformat()}
+
+    for name, check in {**REQUIRED_CHECKS, **OPTIONAL_CHECKS}.items():
+        if name not in checks:
+            checks[name] = _timed(name, check)
+    if not all(checks[name]['ok'] for name in REQUIRED_CHECKS):
+        status = 'unavailable'
+    elif not all(checks[name]['ok'] for name in OPTIONAL_CHECKS):
+        status = 'degraded'
+    else:
+        status = 'ready'
+    return {'status': status, 'checks': checks, 'checked_at': timezone.now().isoformat()}
+
+
+def readiness():
+    """The latest readiness result, rerunning the checks once it is READY_CACHE_SECONDS old."""
+    global _cached
+    with _lock:
+        now = time.monotonic()
+        if _cached is None or now >= _cached[0]:
+            _cached = (now + settings.READY_CACHE_SECONDS, run_checks())
+        return _cached[1]
+
+
+def reset():
+    """Forget the cached result (tests)."""
+    global _cached
+    with _lock:
+        _cached = None
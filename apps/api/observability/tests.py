@@ -0,0 +1,463 @@
+# KapwaNet - Community Platform for Dignified Mutual Aid
+# SPDX-License-Identifier: AGPL-3.0-or-later
+
+"""
+Tests for request instrumentation.
+"""
+
+import json
+import os
+import tempfile
+import time
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+
+from django.core.management import call_command
+from django.db import OperationalError, connection
+from django.test import SimpleTestCase, override_settings
+from django.utils import timezone
+from prometheus_client import REGISTRY
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from help.models import HelpPost
+from jobs.models import Job
+from messaging.models import Message, Thread
+from moderation.models import Report
+from organizations.models import Organization, Membership
+from users.models import User
+from .instrumentation import RequestMetrics, serialization
+from .metrics import registry, reset_app_state
+from .middleware import sql_summary
+from . import readiness
+from .profiling import StackSampler, issue_token, prune_profiles, token_is_valid
+from .sqlcomment import SQLCommenter, format_comment
+
+
+class SerializationTimingTests(SimpleTestCase):
+    """Tests for serializer time accounting."""
+
+    def test_nested_blocks_count_once_and_exclude_db_time(self):
+        """Test that nested serialization is not double counted and queries are excluded."""
+        metrics = RequestMetrics()
+        token = metrics.activate()
+        try:
+            with serialization():
+                time.sleep(0.02)
+                with serialization():
+                    time.sleep(0.02)
+                # Simulate a query run while serializing
+                metrics.db_time += 0.03
+        finally:
+            metrics.deactivate(token)
+
+        self.assertGreaterEqual(metrics.serializer_time, 0.009)
+        self.assertLess(metrics.serializer_time, 0.03)
+
+    def test_no_request(self):
+        """Test that serialization outside a request is a no-op."""
+        with serialization():
+            pass
+
+
+class RequestMetricsMiddlewareTests(APITestCase):
+    """Tests for the request metrics middleware."""
+
+    def setUp(self):
+        self.user = User.objects.create_user(email='test@example.com', password='testpass123')
+        self.org = Organization.objects.create(name='Test Organization', slug='test-org')
+        Membership.objects.create(org=self.org, user=self.user, role='member', status='active')
+        for index in range(3):
+            HelpPost.objects.create(
+                org=self.org, type='request', category='transportation',
+                title=f'Ride {index}', description='To the clinic', created_by=self.user
+            )
+        token = RefreshToken.for_user(self.user).access_token
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+
+    def get_logged(self, path, level='INFO'):
+        with self.assertLogs('observability.middleware', level) as logs:
+            response = self.client.get(path)
+        return response, [json.loads(record.getMessage()) for record in logs.records]
+
+    def test_request_is_logged_with_view_and_action(self):
+        """Test the structured log line for a viewset list."""
+        response, records = self.get_logged(f'/api/help-posts/?org_id={self.org.id}')
+
+        record = records[0]
+        self.assertEqual(record['view'], 'HelpPostViewSet')
+        self.assertEqual(record['action'], 'list')
+        self.assertEqual(record['org_id'], str(self.org.id))
+        self.assertEqual(record['request_id'], response['X-Request-ID'])
+        self.assertEqual(record['method'], 'GET')
+        self.assertEqual(record['status'], 200)
+        self.assertEqual(record['response_bytes'], len(response.content))
+        self.assertGreater(record['queries'], 0)
+        self.assertGreaterEqual(record['duration_ms'], record['db_ms'] + record['serializer_ms'])
+
+    def test_request_id_from_proxy(self):
+        """Test that a well-formed X-Request-ID is kept and a malformed one replaced."""
+        response = self.client.get('/api/health/', HTTP_X_REQUEST_ID='req-123')
+        self.assertEqual(response['X-Request-ID'], 'req-123')
+        response = self.client.get('/api/health/', HTTP_X_REQUEST_ID="*/ DROP TABLE users; /*")
+        self.assertEqual(len(response['X-Request-ID']), 32)
+
+    def test_extra_action_is_resolved(self):
+        """Test that @action routes are tagged with the action name."""
+        _, records = self.get_logged('/api/help-posts/categories/')
+        self.assertEqual(records[0]['view'], 'HelpPostViewSet')
+        self.assertEqual(records[0]['action'], 'categories')
+
+    def test_function_view(self):
+        """Test that api_view functions are tagged by name."""
+        _, records = self.get_logged('/api/health/')
+        self.assertEqual(records[0]['view'], 'health_check')
+        self.assertIsNone(records[0]['action'])
+
+    @override_settings(REQUEST_SLOW_MS=0, REQUEST_SLOW_SAMPLE_RATE=1.0)
+    def test_slow_request_logs_sql(self):
+        """Test that slow requests are sampled with their queries."""
+        _, records = self.get_logged(f'/api/help-posts/?org_id={self.org.id}', level='WARNING')
+
+        self.assertEqual(len(records), 1)
+        self.assertTrue(records[0]['slow'])
+        self.assertEqual(sum(query['count'] for query in records[0]['sql']), records[0]['queries'])
+        self.assertTrue(any('help_posts' in query['sql'] for query in records[0]['sql']))
+
+    def test_sql_summary_groups_fingerprints(self):
+        """Test that slow request SQL is logged without literals, grouped and slowest first."""
+        summary = sql_summary([
+            ("SELECT * FROM users WHERE email = 'a@example.com'", 0.001),
+            ("SELECT * FROM users WHERE email = 'b@example.com'", 0.002),
+            ('SELECT * FROM help_posts WHERE id IN (%s, %s)', 0.004),
+        ])
+        self.assertEqual(summary, [
+            {'ms': 4.0, 'count': 1, 'sql': 'SELECT * FROM help_posts WHERE id IN (...)'},
+            {'ms': 3.0, 'count': 2, 'sql': 'SELECT * FROM users WHERE email = ?'},
+        ])
+
+    @override_settings(REQUEST_SLOW_MS=0, REQUEST_SLOW_SAMPLE_RATE=0.0)
+    def test_slow_request_sampling(self):
+        """Test that unsampled slow requests only get the regular log line."""
+        _, records = self.get_logged('/api/health/')
+        self.assertEqual(len(records), 1)
+        self.assertNotIn('sql', records[0])
+
+    def test_server_timing_header(self):
+        """Test that Server-Timing is only sent in debug mode."""
+        response = self.client.get('/api/health/')
+        self.assertNotIn('Server-Timing', response)
+
+        with override_settings(DEBUG=True):
+            response = self.client.get(f'/api/help-posts/?org_id={self.org.id}')
+        self.assertIn('db;dur=', response['Server-Timing'])
+        self.assertIn('serializer;dur=', response['Server-Timing'])
+        self.assertIn('total;dur=', response['Server-Timing'])
+
+    def test_execute_wrapper_removed(self):
+        """Test that the query wrapper does not outlive the request."""
+        self.client.get('/api/health/')
+        self.assertFalse(any(isinstance(w, RequestMetrics) for w in connection.execute_wrappers))
+
+
+class RecordingCommenter(SQLCommenter):
+    """SQLCommenter that keeps the statements it passes to the database."""
+
+    executed = []
+
+    def __call__(self, execute, sql, params, many, context):
+        def record(sql, params, many, context):
+            self.executed.append(sql)
+            return execute(sql, params, many, context)
+        return super().__call__(record, sql, params, many, context)
+
+
+class SQLCommentTests(APITestCase):
+    """Tests for sqlcommenter query tagging."""
+
+    def setUp(self):
+        self.user = User.objects.create_user(email='test@example.com', password='testpass123')
+        self.org = Organization.objects.create(name='Test Organization', slug='test-org')
+        Membership.objects.create(org=self.org, user=self.user, role='member', status='active')
+        self.client.force_authenticate(self.user)
+        RecordingCommenter.executed = []
+        patcher = mock.patch('observability.middleware.SQLCommenter', RecordingCommenter)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_format_comment(self):
+        """Test sqlcommenter serialization: sorted keys, URL-encoded values, no empty tags."""
+        self.assertEqual(
+            format_comment({'route': 'api/help-posts/', 'action': 'list', 'org_id': None}),
+            "/*action='list',route='api%2Fhelp-posts%2F'*/"
+        )
+        self.assertNotIn('*/', format_comment({'action': "x'*/ DROP"})[2:-2])
+
+    @override_settings(SQL_COMMENTS=True)
+    def test_queries_are_tagged(self):
+        """Test that queries carry the view, action, org, request ID and calling code."""
+        response = self.client.get(f'/api/help-posts/?org_id={self.org.id}', HTTP_X_REQUEST_ID='req-1')
+        self.assertEqual(response.status_code, 200)
+
+        executed = RecordingCommenter.executed
+        self.assertTrue(executed)
+        self.assertTrue(all(sql.endswith('*/') for sql in executed))
+        membership_check = [sql for sql in executed if 'Membership.is_user_member' in sql]
+        self.assertTrue(membership_check)
+        for fragment in (
+            "controller='HelpPostViewSet'",
+            "action='list'",
+            f"org_id='{self.org.id}'",
+            "request_id='req-1'",
+            "framework='django'",
+            "code='organizations%2Fmodels.py%3A",
+        ):
+            self.assertIn(fragment, membership_check[0])
+
+    def test_disabled_by_default(self):
+        """Test that nothing is appended unless SQL_COMMENTS is on."""
+        self.client.get(f'/api/help-posts/?org_id={self.org.id}')
+        self.assertEqual(RecordingCommenter.executed, [])
+
+
+def busy_work(seconds):
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        sum(range(1000))
+
+
+class StackSamplerTests(SimpleTestCase):
+    """Tests for the sampling profiler."""
+
+    def test_samples_current_thread(self):
+        """Test that samples are folded stacks ending in the busy function."""
+        sampler = StackSampler(interval=0.001).start()
+        busy_work(0.1)
+        sampler.stop()
+
+        self.assertGreater(sampler.samples, 10)
+        lines = sampler.folded().splitlines()
+        stack, count = lines[0].rsplit(' ', 1)
+        self.assertGreater(int(count), 0)
+        self.assertTrue(any('busy_work (observability/tests.py:' in line for line in lines))
+
+    def test_tokens(self):
+        """Test that tokens are signed and expire."""
+        self.assertTrue(token_is_valid(issue_token(minutes=5)))
+        self.assertFalse(token_is_valid(issue_token(minutes=-1)))
+        self.assertFalse(token_is_valid(issue_token(minutes=5) + 'x'))
+        self.assertFalse(token_is_valid('not-a-token'))
+
+
+class ProfilingMiddlewareTests(APITestCase):
+    """Tests for profiling live requests."""
+
+    def setUp(self):
+        self.user = User.objects.create_user(email='test@example.com', password='testpass123')
+        self.org = Organization.objects.create(name='Test Organization', slug='test-org')
+        Membership.objects.create(org=self.org, user=self.user, role='member', status='active')
+        self.client.force_authenticate(self.user)
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.profile_dir = directory.name
+        settings = override_settings(PROFILE_DIR=self.profile_dir, PROFILE_INTERVAL_MS=1)
+        settings.enable()
+        self.addCleanup(settings.disable)
+
+    def test_profile_with_token(self):
+        """Test that a request with a valid X-Profile token is profiled."""
+        response = self.client.get(
+            f'/api/threads/unread_counts/?org_id={self.org.id}',
+            HTTP_X_PROFILE=issue_token(), HTTP_X_REQUEST_ID='req-7'
+        )
+        self.assertEqual(response.status_code, 200)
+
+        name = response['X-Profile-Id']
+        self.assertTrue(name.endswith('-ThreadViewSet.unread_counts-req-7'))
+        self.assertTrue(os.path.exists(os.path.join(self.profile_dir, f'{name}.folded')))
+        with open(os.path.join(self.profile_dir, f'{name}.json')) as f:
+            info = json.load(f)
+        self.assertEqual(info['view'], 'ThreadViewSet')
+        self.assertEqual(info['action'], 'unread_counts')
+        self.assertEqual(info['status'], 200)
+        self.assertEqual(info['request_id'], 'req-7')
+
+    def test_invalid_token_not_profiled(self):
+        """Test that forged tokens are ignored."""
+        response = self.client.get('/api/health/', HTTP_X_PROFILE='forged')
+        self.assertNotIn('X-Profile-Id', response)
+        self.assertEqual(os.listdir(self.profile_dir), [])
+
+    def test_sample_rate(self):
+        """Test per-action sampling rates."""
+        with override_settings(PROFILE_SAMPLE_RATES={'HelpPostViewSet.list': 1.0}):
+            profiled = self.client.get(f'/api/help-posts/?org_id={self.org.id}')
+            other = self.client.get('/api/help-posts/categories/')
+        self.assertIn('X-Profile-Id', profiled)
+        self.assertNotIn('X-Profile-Id', other)
+
+    def test_prune_profiles(self):
+        """Test that saving a profile keeps only the newest, recent ones."""
+        now = time.time()
+        for name, age_hours in [('old', 200), ('a', 3), ('b', 2), ('c', 1)]:
+            for ext in ('.folded', '.json'):
+                path = os.path.join(self.profile_dir, name + ext)
+                open(path, 'w').close()
+                os.utime(path, (now - age_hours * 3600,) * 2)
+
+        with override_settings(PROFILE_MAX_FILES=3, PROFILE_MAX_AGE_HOURS=24):
+            response = self.client.get('/api/health/', HTTP_X_PROFILE=issue_token())
+        kept = {os.path.splitext(name)[0] for name in os.listdir(self.profile_dir)}
+        self.assertEqual(kept, {response['X-Profile-Id'], 'b', 'c'})
+        self.assertEqual(len(os.listdir(self.profile_dir)), 6)
+
+        with override_settings(PROFILE_MAX_FILES=1):
+            self.assertEqual(prune_profiles(self.profile_dir), 2)
+
+    def test_profile_token_command(self):
+        """Test that the command issues a valid header value."""
+        out = StringIO()
+        call_command('profile_token', '--minutes', '5', stdout=out)
+        header = out.getvalue().splitlines()[0]
+        self.assertTrue(token_is_valid(header.split(': ', 1)[1]))
+
+
+class MetricsEndpointTests(APITestCase):
+    """Tests for the Prometheus metrics endpoint."""
+
+    def setUp(self):
+        self.user = User.objects.create_user(email='test@example.com', password='testpass123')
+        self.other = User.objects.create_user(email='other@example.com', password='testpass123')
+        self.org = Organization.objects.create(name='Test Organization', slug='test-org')
+        Membership.objects.create(org=self.org, user=self.user, role='member', status='active')
+        Membership.objects.create(org=self.org, user=self.other, role='member', status='active')
+        reset_app_state()
+        self.addCleanup(reset_app_state)
+
+    def scrape(self, **extra):
+        response = self.client.get('/api/metrics/', **extra)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response['Content-Type'].startswith('text/plain'))
+        return response.content.decode()
+
+    def test_request_histograms(self):
+        """Test that served requests show up by view and action."""
+        self.client.force_authenticate(self.user)
+        self.client.get(f'/api/help-posts/?org_id={self.org.id}')
+        labels = {'method': 'GET', 'view': 'HelpPostViewSet', 'action': 'list', 'status': '2xx'}
+        count = REGISTRY.get_sample_value('kapwanet_http_request_duration_seconds_count', labels)
+        self.client.get(f'/api/help-posts/?org_id={self.org.id}')
+
+        self.assertEqual(
+            REGISTRY.get_sample_value('kapwanet_http_request_duration_seconds_count', labels),
+            count + 1
+        )
+        body = self.scrape()
+        self.assertIn('kapwanet_http_request_queries_bucket{action="list",le="1.0",view="HelpPostViewSet"}', body)
+        self.assertIn('kapwanet_cache_requests_total{cache="org_lookup",result="hit"}', body)
+
+    def test_database_gauges(self):
+        """Test queue depths and active users, read at scrape time."""
+        HelpPost.objects.create(
+            org=self.org, type='request', category='transportation',
+            title='Ride', description='To the clinic', created_by=self.user
+        )
+        Report.objects.create(
+            org=self.org, target_type='user', target_id=self.other.id,
+            reporter=self.user, reason='harassment', details='Rude messages'
+        )
+        thread, _ = Thread.get_or_create_direct(self.org, self.user, self.other)
+        Message.send_user_message(thread, self.other, 'Hello')
+
+        body = self.scrape()
+        self.assertIn('kapwanet_queue_depth{queue="open_reports"} 1.0', body)
+        self.assertIn('kapwanet_queue_depth{queue="pending_matches"} 0.0', body)
+        self.assertIn('kapwanet_active_users 2.0', body)
+
+        # Later scrapes within METRICS_STATE_TTL reuse the counts
+        Report.objects.all().delete()
+        with self.assertNumQueries(0):
+            body = self.scrape()
+        self.assertIn('kapwanet_queue_depth{queue="open_reports"} 1.0', body)
+
+    def test_messages_sent_counter(self):
+        """Test that sending a message increments the throughput counter."""
+        before = REGISTRY.get_sample_value('kapwanet_messages_sent_total', {'type': 'system'}) or 0
+        thread, _ = Thread.get_or_create_direct(self.org, self.user, self.other)
+        Message.send_system_message(thread, 'Welcome')
+        self.assertEqual(
+            REGISTRY.get_sample_value('kapwanet_messages_sent_total', {'type': 'system'}),
+            before + 1
+        )
+
+    @override_settings(METRICS_ALLOWED_IPS=['10.0.0.0/8'], METRICS_TOKEN='scrape-secret')
+    def test_access_restricted(self):
+        """Test that scrapes need an allowed address or the token."""
+        self.client.force_authenticate(self.user)
+        self.assertEqual(self.client.get('/api/metrics/').status_code, 403)
+        response = self.client.get('/api/metrics/', HTTP_AUTHORIZATION='Bearer wrong')
+        self.assertEqual(response.status_code, 403)
+
+        self.client.force_authenticate(None)
+        self.scrape(HTTP_AUTHORIZATION='Bearer scrape-secret')
+        self.scrape(REMOTE_ADDR='10.1.2.3')
+
+    def test_multiprocess_registry(self):
+        """Test that PROMETHEUS_MULTIPROC_DIR switches to the merged per-process files."""
+        with tempfile.TemporaryDirectory() as directory:
+            with mock.patch.dict(os.environ, {'PROMETHEUS_MULTIPROC_DIR': directory}):
+                names = {metric.name for metric in registry().collect()}
+        # No worker has written files, so only the database gauges remain
+        self.assertEqual(names, {'kapwanet_queue_depth', 'kapwanet_active_users'})
+
+
+class ReadinessTests(APITestCase):
+    """Tests for the readiness probe."""
+
+    def setUp(self):
+        readiness.reset()
+        self.addCleanup(readiness.reset)
+
+    def test_ready(self):
+        """Test that a migrated database and working cache are ready without auth."""
+        response = self.client.get('/api/ready/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['status'], 'ready')
+        checks = response.data['checks']
+        self.assertEqual(set(checks), {'database', 'migrations', 'cache', 'jobs'})
+        self.assertEqual(checks['migrations']['pending'], 0)
+        self.assertGreaterEqual(checks['database']['latency_ms'], 0)
+
+    def test_result_is_cached(self):
+        """Test that probes within READY_CACHE_SECONDS reuse the last result."""
+        self.client.get('/api/ready/')
+        with self.assertNumQueries(0):
+            response = self.client.get('/api/ready/')
+        self.assertEqual(response.data['status'], 'ready')
+
+    def test_database_down(self):
+        """Test that a failing database makes the pod unavailable without running other checks."""
+        with mock.patch.object(readiness, 'check_database', side_effect=OperationalError('down')):
+            with self.assertLogs('observability.readiness', 'WARNING'):
+                response = self.client.get('/api/ready/')
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response.data['checks'], {
+            'database': {'ok': False, 'error': 'OperationalError', 'latency_ms': mock.ANY},
+        })
+
+    def test_pending_migrations(self):
+        """Test that unapplied migrations make the pod unavailable."""
+        with mock.patch.dict(readiness.REQUIRED_CHECKS, {'migrations': lambda: {'ok': False, 'pending': 2}}):
+            response = self.client.get('/api/ready/')
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response.data['status'], 'unavailable')
+
+    @override_settings(READY_JOBS_MAX_LAG=60)
+    def test_job_lag_degrades(self):
+        """Test that a backed-up job queue is reported but keeps the pod in rotation."""
+        Job.objects.create(name='send_digest', run_at=timezone.now() - timedelta(minutes=5))
+        response = self.client.get('/api/ready/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['status'], 'degraded')
+        self.assertGreaterEqual(response.data['checks']['jobs']['lag_seconds'], 300)
@@ -0,0 +1,44 @@
+# KapwaNet - Community Platform for Dignified Mutual Aid
+# SPDX-License-Identifier: AGPL-3.0-or-later
+
+"""
+Views for monitoring endpoints.
+"""
+
+from django.http import HttpResponse
+from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
+from rest_framework.decorators import api_view, authentication_classes, permission_classes
+from rest_framework.permissions import AllowAny
+from rest_framework.response import Response
+
+from .metrics import registry
+from .permissions import MetricsPermission
+from .readiness import readiness
+
+
+@api_view(['GET'])
+@authentication_classes([])
+@permission_classes([MetricsPermission])
+def metrics(request):
+    """
+    Prometheus metrics in the text exposition format.
+
+    Endpoints:
+        GET /api/metrics/ - Scrape target
+    """
+    return HttpResponse(generate_latest(registry()), content_type=CONTENT_TYPE_LATEST)
+
+
+@api_view(['GET'])
+@authentication_classes([])
+@permission_classes([AllowAny])
+def ready(request):
+    """
+    Readiness probe: database, migrations, cache and job queue lag.
+
+    Endpoints:
+        GET /api/ready/ - 200 when ready or degraded, 503 when unavailable
+    """
+    result = readiness()
+    status = 503 if result['status'] == 'unavailable' else 200
+    return Response(result, status=status)
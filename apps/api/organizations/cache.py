@@ -0,0 +1,178 @@
+# KapwaNet - Community Platform for Dignified Mutual Aid
+# SPDX-License-Identifier: AGPL-3.0-or-later
+
+"""
+In-process cache for resolving organization identifiers.
+
+API clients refer to organizations by either UUID or slug (the `org`
+query parameter). Resolving a slug used to mean a join to the
+organizations table on every list query, and the permission classes
+looked the organization up once by ID and again by slug.
+
+OrgLookupCache keeps a small, bounded map of slug/ID -> (id, is_active)
+with a TTL so viewsets can always filter on `org_id`. Entries are
+invalidated whenever an Organization is saved or deleted in this
+process; the TTL bounds staleness across worker processes. Each
+invalidation bumps a generation counter, and a database load that
+started before it is not stored, so a lookup racing a save cannot put
+the old row back.
+"""
+
+import threading
+import time
+import uuid
+from collections import OrderedDict, namedtuple
+
+from django.conf import settings
+
+from kapwanet.signals import cache_lookup
+
+
+OrgRef = namedtuple('OrgRef', ['id', 'slug', 'is_active'])
+
+
+class OrgLookupCache:
+    """
+    Bounded LRU cache with TTL mapping org UUIDs and slugs to OrgRefs.
+
+    Both the string UUID and the slug of an organization are stored as
+    keys pointing at the same OrgRef, so a lookup by either form hits.
+    """
+
+    def __init__(self, max_entries=1024, ttl=300):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        # Bumped by invalidate() and clear(); see _store()
+        self._generation = 0
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, value):
+        """
+        Resolve an organization UUID or slug to an OrgRef.
+
+        Returns None if no organization matches.
+        """
+        if value is None or value == '':
+            return None
+        key = str(value)
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                ref, expires_at = entry
+                if expires_at > time.monotonic():
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    cache_lookup.send(sender=type(self), cache='org_lookup', hit=True)
+                    return ref
+                del self._entries[key]
+            self.misses += 1
+            generation = self._generation
+        cache_lookup.send(sender=type(self), cache='org_lookup', hit=False)
+
+        ref = self._load(key)
+        if ref is not None:
+            self._store(ref, generation)
+        return ref
+
+    def invalidate(self, org_id=None, slug=None):
+        """Drop cached entries for an organization ID and/or slug."""
+        keys = {str(k) for k in (org_id, slug) if k}
+        with self._lock:
+            self._generation += 1
+            for key in list(keys):
+                entry = self._entries.get(key)
+                if entry is not None:
+                    ref = entry[0]
+                    keys.update((str(ref.id), ref.slug))
+            for key in keys:
+                self._entries.pop(key, None)
+
+    def clear(self):
+        """Drop all cached entries and reset statistics."""
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def _load(self, key):
+        """Load an organization reference from the database."""
+        from .models import Organization
+
+        try:
+            uuid.UUID(key)
+            lookup = {'id': key}
+        except ValueError:
+            lookup = {'slug': key}
+
+        row = Organization.objects.filter(**lookup).values_list(
+            'id', 'slug', 'is_active'
+        ).first()
+        if row is None:
+            return None
+        return OrgRef(*row)
+
+    def _store(self, ref, generation):
+        """
+        Store a reference under both its ID and slug keys.
+
+        Skipped if the cache was invalidated since the reference was
+        loaded at the given generation: the row may already be stale.
+        """
+        expires_at = time.monotonic() + self.ttl
+        with self._lock:
+            if generation != self._generation:
+                return
+            for key in (str(ref.id), ref.slug):
+                self._entries[key] = (ref, expires_at)
+                self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+
+org_lookup_cache = OrgLookupCache(
+    max_entries=getattr(settings, 'ORG_LOOKUP_CACHE_MAX_ENTRIES', 1024),
+    ttl=getattr(settings, 'ORG_LOOKUP_CACHE_TTL', 300),
+)
+
+
+def resolve_org_id(value, require_active=False):
+    """
+    Resolve an organization UUID or slug to its UUID.
+
+    Args:
+        value: An organization UUID (string or UUID) or slug
+        require_active: If True, inactive organizations resolve to None
+
+    Returns:
+        The organization's UUID, or None if it cannot be resolved
+    """
+    ref = org_lookup_cache.get(value)
+    if ref is None or (require_active and not ref.is_active):
+        return None
+    return ref.id
+
+
+def filter_by_org(queryset, value, field='org_id'):
+    """
+    Filter a queryset to one organization, given its UUID or slug.
+
+    The value is resolved through the shared lookup cache, so the filter
+    is on the foreign key column with no join to organizations.
+
+    Args:
+        queryset: The queryset to filter
+        value: An organization UUID or slug, typically the `org` query parameter
+        field: The foreign key column to filter on
+
+    Returns:
+        The filtered queryset, or an empty one if the value does not resolve
+    """
+    org_id = resolve_org_id(value)
+    if org_id is None:
+        return queryset.none()
+    return queryset.filter(**{field: org_id})
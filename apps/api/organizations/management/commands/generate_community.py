@@ -0,0 +1,91 @@
+# KapwaNet - Community Platform for Dignified Mutual Aid
+# SPDX-License-Identifier: AGPL-3.0-or-later
+
+"""
+Management command to generate a synthetic community for load and scale testing.
+
+Never run this against production data: generated users share one
+password.
+"""
+
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from organizations.models import Organization
+from organizations.synthetic import CommunityGenerator, flush
+
+
+class Command(BaseCommand):
+    help = 'Generate synthetic organizations, members and activity (deterministic per --seed)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--orgs', type=int, default=10, help='Number of organizations')
+        parser.add_argument('--members', type=int, default=200, help='Average members per org')
+        parser.add_argument('--help-posts', type=int, default=100, help='Average help posts per org')
+        parser.add_argument('--item-posts', type=int, default=100, help='Average item posts per org')
+        parser.add_argument(
+            '--match-rate',
+            type=float,
+            default=0.8,
+            help='Share of open help posts with a pending match, doubled (0-1)',
+        )
+        parser.add_argument(
+            '--reservation-rate',
+            type=float,
+            default=0.8,
+            help='Share of available item posts with a pending reservation, doubled (0-1)',
+        )
+        parser.add_argument('--messages', type=int, default=20, help='Average messages per thread')
+        parser.add_argument('--reports', type=int, default=10, help='Average reports per org')
+        parser.add_argument('--months', type=int, default=12, help='Months of history')
+        parser.add_argument('--seed', type=int, default=1, help='Random seed')
+        parser.add_argument(
+            '--prefix',
+            default='synthetic',
+            help='Org slug prefix and email domain label (default: synthetic)',
+        )
+        parser.add_argument('--password', default='password', help='Password for every generated user')
+        parser.add_argument('--batch-size', type=int, default=5000, help='Rows per insert')
+        parser.add_argument(
+            '--flush',
+            action='store_true',
+            help='Delete a previously generated community with the same prefix first',
+        )
+
+    def handle(self, *args, **options):
+        prefix = options['prefix']
+        if options['flush']:
+            deleted = flush(prefix)
+            self.stdout.write(self.style.WARNING(f'Deleted {deleted} organizations'))
+        elif Organization.objects.filter(slug__startswith=f'{prefix}-').exists():
+            raise CommandError(
+                f'Organizations with the prefix "{prefix}" already exist; use --flush or another --prefix.'
+            )
+
+        generator = CommunityGenerator(
+            orgs=options['orgs'],
+            members=options['members'],
+            help_posts=options['help_posts'],
+            item_posts=options['item_posts'],
+            match_rate=options['match_rate'],
+            reservation_rate=options['reservation_rate'],
+            messages=options['messages'],
+            reports=options['reports'],
+            months=options['months'],
+            seed=options['seed'],
+            prefix=prefix,
+            password=options['password'],
+            batch_size=options['batch_size'],
+            log=lambda message: self.stdout.write(self.style.SUCCESS(message)),
+        )
+        started = time.monotonic()
+        counts = generator.generate()
+
+        for table, count in sorted(counts.items()):
+            self.stdout.write(f'  {table}: {count}')
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'\nDone! Created {sum(counts.values())} rows in {time.monotonic() - started:.1f}s.'
+            )
+        )
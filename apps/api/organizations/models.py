@@ -14,6 +14,8 @@ from django.conf import settings
 from django.db import models
 from django.utils.text import slugify
 
+from .cache import org_lookup_cache
+
 
 class Organization(models.Model):
     """
@@ -83,11 +85,23 @@ class Organization(models.Model):
         return self.name
 
     def save(self, *args, **kwargs):
-        """Auto-generate slug from name if not provided."""
+        """
+        Auto-generate slug from name if not provided.
+
+        Also invalidates the cached slug/ID lookup for this organization.
+        """
         if not self.slug:
             self.slug = slugify(self.name)
         super().save(*args, **kwargs)
 
+        # Drop cached slug/ID lookups (covers slug changes and deactivation)
+        org_lookup_cache.invalidate(org_id=self.id, slug=self.slug)
+
+    def delete(self, *args, **kwargs):
+        """Delete the organization and drop its cached lookups."""
+        org_lookup_cache.invalidate(org_id=self.id, slug=self.slug)
+        return super().delete(*args, **kwargs)
+
 
 # Default theme tokens schema
 DEFAULT_THEME = {
@@ -579,7 +593,7 @@ class Membership(models.Model):
 
         Args:
             user: The user to check
-            org: The organization to check
+            org: The organization (or its UUID) to check
             require_active: If True, only active memberships count
 
         Returns:
@@ -597,7 +611,7 @@ class Membership(models.Model):
 
         Args:
             user: The user to check
-            org: The organization to check
+            org: The organization (or its UUID) to check
             roles: A role string or list of role strings to check
 
         Returns:
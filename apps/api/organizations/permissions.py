@@ -10,6 +10,9 @@ within organizations they are members of.
 
 from rest_framework import permissions
 
+from observability.instrumentation import tag_org
+
+from .cache import resolve_org_id
 from .models import Membership, Organization
 
 
@@ -68,17 +71,18 @@ class OrgMembershipPermission(permissions.BasePermission):
         if not org_id:
             return True
 
-        # Check membership
-        try:
-            org = Organization.objects.get(id=org_id, is_active=True)
-        except (Organization.DoesNotExist, ValueError):
-            # Try by slug
-            try:
-                org = Organization.objects.get(slug=org_id, is_active=True)
-            except Organization.DoesNotExist:
-                return False
+        # Resolve the UUID or slug to an active organization
+        org_id = self.resolve_active_org_id(org_id)
+        if not org_id:
+            return False
 
-        return Membership.is_user_member(request.user, org)
+        return Membership.is_user_member(request.user, org_id)
+
+    def resolve_active_org_id(self, org_id):
+        """Resolve an organization UUID or slug to an active org's UUID."""
+        org_id = resolve_org_id(org_id, require_active=True)
+        tag_org(org_id)
+        return org_id
 
     def has_object_permission(self, request, view, obj):
         """Check if the user has permission to access a specific object."""
@@ -86,8 +90,8 @@ class OrgMembershipPermission(permissions.BasePermission):
         if not request.user or not request.user.is_authenticated:
             return False
 
-        # Get the organization from the object
-        org = getattr(obj, 'org', None)
+        # Get the organization (ID, so no join is needed) from the object
+        org = getattr(obj, 'org_id', None)
         if not org:
             # For Organization objects themselves
             if isinstance(obj, Organization):
@@ -95,6 +99,7 @@ class OrgMembershipPermission(permissions.BasePermission):
             else:
                 return False
 
+        tag_org(getattr(org, 'pk', org))
         return Membership.is_user_member(request.user, org)
 
 
@@ -124,15 +129,11 @@ class OrgAdminPermission(OrgMembershipPermission):
             return True  # Object-level check
 
         # Check admin role
-        try:
-            org = Organization.objects.get(id=org_id, is_active=True)
-        except (Organization.DoesNotExist, ValueError):
-            try:
-                org = Organization.objects.get(slug=org_id, is_active=True)
-            except Organization.DoesNotExist:
-                return False
+        org_id = self.resolve_active_org_id(org_id)
+        if not org_id:
+            return False
 
-        return self._check_admin(request.user, org)
+        return self._check_admin(request.user, org_id)
 
     def has_object_permission(self, request, view, obj):
         """Check if the user has admin permission for a specific object."""
@@ -140,8 +141,8 @@ class OrgAdminPermission(OrgMembershipPermission):
         if not super().has_object_permission(request, view, obj):
             return False
 
-        # Get the organization from the object
-        org = getattr(obj, 'org', None)
+        # Get the organization (ID, so no join is needed) from the object
+        org = getattr(obj, 'org_id', None)
         if not org:
             if isinstance(obj, Organization):
                 org = obj
@@ -177,15 +178,11 @@ class OrgModeratorPermission(OrgMembershipPermission):
             return True  # Object-level check
 
         # Check moderator role
-        try:
-            org = Organization.objects.get(id=org_id, is_active=True)
-        except (Organization.DoesNotExist, ValueError):
-            try:
-                org = Organization.objects.get(slug=org_id, is_active=True)
-            except Organization.DoesNotExist:
-                return False
+        org_id = self.resolve_active_org_id(org_id)
+        if not org_id:
+            return False
 
-        return self._check_moderator(request.user, org)
+        return self._check_moderator(request.user, org_id)
 
     def has_object_permission(self, request, view, obj):
         """Check if the user has moderator permission for a specific object."""
@@ -193,8 +190,8 @@ class OrgModeratorPermission(OrgMembershipPermission):
         if not super().has_object_permission(request, view, obj):
             return False
 
-        # Get the organization from the object
-        org = getattr(obj, 'org', None)
+        # Get the organization (ID, so no join is needed) from the object
+        org = getattr(obj, 'org_id', None)
         if not org:
             if isinstance(obj, Organization):
                 org = obj
@@ -226,7 +223,7 @@ class IsOwnerOrModerator(OrgMembershipPermission):
             return True
 
         # Check if user is a moderator
-        org = getattr(obj, 'org', None)
+        org = getattr(obj, 'org_id', None)
         if org:
             return Membership.has_role(request.user, org, ['org_admin', 'moderator'])
 
@@ -0,0 +1,577 @@
+# KapwaNet - Community Platform for Dignified Mutual Aid
+# SPDX-License-Identifier: AGPL-3.0-or-later
+
+"""
+Synthetic community data for load and scale testing.
+
+CommunityGenerator fills the database with organizations that look like
+production ones: a few large orgs and many small ones, a small core of
+very active members, help and item posts in realistic status mixes,
+matches and reservations with their threads, message histories with a
+long tail, and a trickle of reports.
+
+Everything is drawn from one seeded random generator, including the
+UUIDs, so the same options always build the same dataset (with its
+timestamps anchored at the current time). Rows are
+written with COPY on PostgreSQL and a plain INSERT elsewhere, one org per
+transaction, so the backdated created_at/updated_at values are kept
+without touching the auto_now fields. Model save() hooks are bypassed,
+so no outbox events or system messages are produced.
+
+Synthetic users get emails at @<prefix>.example.org and orgs get slugs
+starting with <prefix>-. An org only counts as synthetic (synthetic_orgs)
+when it has members and all of them have such emails, so flush() never
+touches a real org whose slug happens to match, like bench-press-club.
+flush() deletes the generated tables in chunks with raw DELETEs, which
+skip the ORM cascade and its signals (no sync tombstones are recorded
+for a flushed community).
+"""
+
+import io
+import itertools
+import json
+import random
+import uuid
+from datetime import date, datetime, timedelta
+
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.db import connection, transaction
+from django.utils import timezone
+
+from help.models import HelpMatch, HelpPost
+from items.models import ItemPost, ItemReservation
+from messaging import partitions
+from messaging.models import Message, Thread, ThreadParticipant
+from moderation.models import ModerationAction, Report
+from sync.models import SyncTombstone
+from users.models import User
+from .models import Membership, Organization
+
+FIRST_NAMES = [
+    'Maria', 'Jose', 'Ana', 'Juan', 'Rosa', 'Carlos', 'Linh', 'Minh', 'Aisha',
+    'Omar', 'Grace', 'Samuel', 'Mei', 'Wei', 'Priya', 'Arjun', 'Fatima', 'Yusuf',
+    'Elena', 'Dmitri', 'Amara', 'Kwame', 'Sofia', 'Mateo', 'Hana', 'Kenji',
+]
+
+LAST_NAMES = [
+    'Santos', 'Reyes', 'Cruz', 'Garcia', 'Nguyen', 'Tran', 'Khan', 'Ali',
+    'Okafor', 'Mensah', 'Chen', 'Wang', 'Patel', 'Singh', 'Ivanova', 'Haddad',
+    'Silva', 'Torres', 'Tanaka', 'Kim', 'Johnson', 'Brown',
+]
+
+PLACES = [
+    'Northside', 'Eastgate', 'Riverside', 'Old Town', 'Hillcrest', 'Bayview',
+    'Southpark', 'Westfield', 'Lakeshore', 'Midtown', 'Fairview', 'Greenhill',
+]
+
+HELP_TITLES = {
+    'transportation': ['Ride to a medical appointment', 'Lift to the grocery store', 'Airport drop-off'],
+    'errands': ['Pick up a prescription', 'Drop off a parcel', 'Weekly grocery run'],
+    'childcare': ['After-school pickup', 'Evening babysitting', 'Help with homework'],
+    'eldercare': ['Check in on my grandmother', 'Company for a walk', 'Help with meals'],
+    'petcare': ['Dog walking while I recover', 'Feed my cat this weekend', 'Vet visit ride'],
+    'household': ['Fix a leaking tap', 'Move a couch', 'Yard cleanup'],
+    'tech_support': ['Set up a new phone', 'Video call with family', 'Printer not working'],
+    'language': ['Translate a letter', 'Interpreter for a school meeting', 'Practice conversation'],
+    'administrative': ['Fill in a benefits form', 'Write a cover letter', 'Sort out a bill'],
+    'emotional': ['Someone to talk to', 'Company after a loss', 'Support group ride'],
+    'other': ['Odd job this weekend', 'Borrow a ladder', 'Advice on gardening'],
+}
+
+ITEM_TITLES = {
+    'food': ['Rice and canned goods', 'Fresh vegetables', 'Baby formula', 'Homemade bread'],
+    'clothing': ['Winter coats', 'School uniforms', 'Work boots', 'Kids clothes bundle'],
+    'household': ['Pots and pans', 'Bedding set', 'Lamp', 'Cleaning supplies'],
+    'baby_kids': ['Stroller', 'Crib', 'Toys and books', 'Car seat'],
+    'electronics': ['Laptop', 'Phone charger', 'Old tablet', 'Radio'],
+    'furniture': ['Dining table', 'Bookshelf', 'Sofa', 'Desk chair'],
+    'hygiene': ['Toiletries kit', 'Diapers', 'Soap and shampoo', 'Menstrual products'],
+    'medical': ['Crutches', 'Blood pressure monitor', 'Walker', 'First aid kit'],
+    'other': ['Bicycle', 'Garden tools', 'Board games', 'Art supplies'],
+}
+
+SENTENCES = [
+    'Thank you so much for offering to help.',
+    'Would tomorrow afternoon work for you?',
+    'I can be there around 3pm.',
+    'Let me know if anything changes.',
+    'The entrance is around the back of the building.',
+    'I will bring everything with me.',
+    'Sorry for the late reply, it was a long day.',
+    'That works perfectly, see you then.',
+    'Could we move it to the weekend instead?',
+    'My number is in my profile if you need to call.',
+    'All done, thanks again!',
+    'Is there parking nearby?',
+    'No problem at all, happy to help.',
+    'I am running about ten minutes late.',
+    'Please knock loudly, the doorbell is broken.',
+]
+
+# (value, weight) pairs for categorical fields
+HELP_STATUSES = [('open', 40), ('matched', 25), ('completed', 30), ('cancelled', 5)]
+ITEM_STATUSES = [('available', 45), ('reserved', 20), ('completed', 30), ('cancelled', 5)]
+URGENCIES = [('low', 25), ('normal', 55), ('high', 20)]
+REPORT_STATUSES = [('open', 50), ('reviewing', 15), ('resolved', 25), ('dismissed', 10)]
+REPORT_TARGETS = [('help_post', 30), ('item_post', 25), ('message', 35), ('user', 10)]
+
+
+def _copy_value(value):
+    """Render a value in PostgreSQL COPY text format."""
+    if value is None:
+        return '\\N'
+    if isinstance(value, bool):
+        return 't' if value else 'f'
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, (dict, list)):
+        value = json.dumps(value)
+    return (
+        str(value).replace('\\', '\\\\').replace('\t', '\\t')
+        .replace('\n', '\\n').replace('\r', '\\r')
+    )
+
+
+def bulk_insert(model, objs, batch_size=5000):
+    """
+    Insert model instances as they are, with COPY on PostgreSQL and
+    executemany() elsewhere.
+
+    Unlike bulk_create(), field pre_save() hooks are not run, so auto_now
+    and auto_now_add timestamps keep the values set on the instances.
+    """
+    if not objs:
+        return
+    fields = model._meta.concrete_fields
+    if connection.vendor != 'postgresql':
+        columns = ', '.join(connection.ops.quote_name(f.column) for f in fields)
+        placeholders = ', '.join(['%s'] * len(fields))
+        sql = f'INSERT INTO {connection.ops.quote_name(model._meta.db_table)} ({columns}) VALUES ({placeholders})'
+        with connection.cursor() as cursor:
+            for start in range(0, len(objs), batch_size):
+                cursor.executemany(sql, [
+                    [f.get_db_prep_save(getattr(obj, f.attname), connection) for f in fields]
+                    for obj in objs[start:start + batch_size]
+                ])
+        return
+
+    buffer = io.StringIO()
+    for obj in objs:
+        buffer.write('\t'.join(_copy_value(getattr(obj, f.attname)) for f in fields))
+        buffer.write('\n')
+    buffer.seek(0)
+    columns = ', '.join(connection.ops.quote_name(f.column) for f in fields)
+    with connection.cursor() as cursor:
+        cursor.copy_expert(
+            f'COPY {connection.ops.quote_name(model._meta.db_table)} ({columns}) FROM STDIN',
+            buffer
+        )
+
+
+def synthetic_orgs(prefix):
+    """Get the organizations generated with a prefix, excluding real orgs with matching slugs."""
+    domain = f'@{prefix}.example.org'
+    candidates = Organization.objects.filter(slug__startswith=f'{prefix}-')
+    real_members = Membership.objects.filter(
+        org__in=candidates
+    ).exclude(user__email__endswith=domain).values('org_id')
+    generated = Membership.objects.filter(
+        org__in=candidates, user__email__endswith=domain
+    ).values('org_id')
+    return candidates.filter(id__in=generated).exclude(id__in=real_members)
+
+
+# Tables emptied by flush(), each before the tables it references
+FLUSH_MODELS = [
+    ModerationAction, Report, Message, HelpMatch, ItemReservation,
+    ThreadParticipant, Thread, HelpPost, ItemPost, Membership,
+]
+
+
+def delete_chunked(queryset, chunk_size):
+    """Delete a queryset's rows a chunk at a time, without cascades or signals."""
+    model = queryset.model
+    while True:
+        ids = list(queryset.order_by().values_list('pk', flat=True)[:chunk_size])
+        if not ids:
+            return
+        model.objects.filter(pk__in=ids)._raw_delete(model.objects.db)
+
+
+def flush(prefix, chunk_size=None):
+    """
+    Delete a previously generated community.
+
+    The generated tables are emptied with chunked raw DELETEs; only rows
+    added since generation (by load tests, say) are left to the ORM
+    cascade when the orgs and users themselves are deleted.
+
+    Returns:
+        The number of organizations deleted
+    """
+    chunk_size = chunk_size or settings.RETENTION_CHUNK_SIZE
+    org_ids = list(synthetic_orgs(prefix).values_list('id', flat=True))
+    for model in FLUSH_MODELS:
+        delete_chunked(model.objects.filter(org_id__in=org_ids), chunk_size)
+    Organization.objects.filter(id__in=org_ids).delete()
+
+    users = User.objects.filter(email__endswith=f'@{prefix}.example.org')
+    while True:
+        ids = list(users.order_by().values_list('pk', flat=True)[:chunk_size])
+        if not ids:
+            break
+        User.objects.filter(pk__in=ids).delete()
+
+    SyncTombstone.objects.filter(org_id__in=org_ids).delete()
+    return len(org_ids)
+
+
+class CommunityGenerator:
+    """
+    Generate synthetic organizations and their activity.
+
+    Sizes are per-org averages; actual org sizes follow a Pareto
+    distribution and activity scales with the org's member count.
+    """
+
+    def __init__(
+        self,
+        orgs=10,
+        members=200,
+        help_posts=100,
+        item_posts=100,
+        match_rate=0.8,
+        reservation_rate=0.8,
+        messages=20,
+        reports=10,
+        months=12,
+        seed=1,
+        prefix='synthetic',
+        password='password',
+        batch_size=5000,
+        now=None,
+        log=None,
+    ):
+        self.orgs = orgs
+        self.members = members
+        self.help_posts = help_posts
+        self.item_posts = item_posts
+        self.match_rate = match_rate
+        self.reservation_rate = reservation_rate
+        self.messages = messages
+        self.reports = reports
+        self.months = months
+        self.prefix = prefix
+        self.password = password
+        self.batch_size = batch_size
+        self.now = now or timezone.now()
+        self.start = self.now - timedelta(days=30 * months)
+        self.log = log or (lambda message: None)
+        self.rng = random.Random(seed)
+        self.counts = {}
+        self._threads = []
+        self._participants = []
+        self._messages = []
+
+    # Random helpers
+
+    def uuid(self):
+        return uuid.UUID(int=self.rng.getrandbits(128), version=4)
+
+    def pick(self, weighted):
+        values, weights = zip(*weighted)
+        return self.rng.choices(values, weights)[0]
+
+    def moment(self, after=None, within=None):
+        """A random time after `after` (default: the start of history), before now."""
+        after = after or self.start
+        span = (self.now - after).total_seconds()
+        if within is not None:
+            span = min(span, within.total_seconds())
+        return after + timedelta(seconds=self.rng.random() * max(span, 0))
+
+    def long_tail(self, mean):
+        """A count with the given mean and a heavy tail (Pareto, alpha 2)."""
+        return int(mean * self.rng.paretovariate(2) / 2)
+
+    def sentence_body(self, count=None):
+        return ' '.join(self.rng.sample(SENTENCES, count or self.rng.randint(1, 3)))
+
+    def _count(self, name, amount):
+        self.counts[name] = self.counts.get(name, 0) + amount
+
+    def _insert(self, model, objs):
+        bulk_insert(model, objs, self.batch_size)
+        self._count(model._meta.db_table, len(objs))
+
+    # Generation
+
+    def generate(self):
+        """
+        Build the whole dataset.
+
+        Returns:
+            Rows created per table
+        """
+        if partitions.is_supported():
+            # Give the backdated messages monthly partitions like production's
+            partitions.ensure_partitions(months_ahead=self.months + 3, now=self.start)
+
+        weights = [self.rng.paretovariate(1.5) for _ in range(self.orgs)]
+        scale = self.orgs / sum(weights) if weights else 0
+        password = make_password(self.password)
+
+        for index, weight in enumerate(weights):
+            size = weight * scale
+            with transaction.atomic():
+                org = self.generate_org(index, size, password)
+            self.log(f'Generated {org.slug} ({round(self.members * size)} members)')
+        return self.counts
+
+    def generate_org(self, index, size, password):
+        slug = f'{self.prefix}-{index + 1}'
+        place = PLACES[index % len(PLACES)]
+        created = self.start - timedelta(days=self.rng.randint(1, 365))
+        org = Organization(
+            id=self.uuid(), slug=slug, name=f'{place} Mutual Aid {index + 1}',
+            region=place, description=f'Neighbours helping neighbours in {place}.',
+            created_at=created, updated_at=created,
+        )
+        self._insert(Organization, [org])
+
+        members = self.generate_members(org, max(2, round(self.members * size)), password)
+        # A small core of members does most of the posting and helping
+        cumulative = list(itertools.accumulate(1 / rank for rank in range(1, len(members) + 1)))
+
+        def active_member():
+            return self.rng.choices(members, cum_weights=cumulative)[0]
+
+        help_posts = self.generate_help(org, round(self.help_posts * size), active_member)
+        item_posts = self.generate_items(org, round(self.item_posts * size), active_member)
+        self.generate_broadcast(org, members[0])
+        self._flush_messages()
+        self.generate_reports(org, round(self.reports * size), members, help_posts, item_posts)
+        return org
+
+    def generate_members(self, org, count, password):
+        users, memberships = [], []
+        for n in range(count):
+            joined = self.moment()
+            first, last = self.rng.choice(FIRST_NAMES), self.rng.choice(LAST_NAMES)
+            user = User(
+                id=self.uuid(),
+                email=f'{org.slug}-{n + 1}@{self.prefix}.example.org',
+                display_name=f'{first} {last}',
+                password=password,
+                created_at=joined, updated_at=joined,
+            )
+            if n == 0:
+                role = 'org_admin'
+            else:
+                role = 'moderator' if self.rng.random() < 0.02 else 'member'
+            status = 'suspended' if role == 'member' and self.rng.random() < 0.02 else 'active'
+            users.append(user)
+            memberships.append(Membership(
+                id=self.uuid(), org=org, user=user, role=role, status=status,
+                created_at=joined, updated_at=joined,
+            ))
+        self._insert(User, users)
+        self._insert(Membership, memberships)
+        return users
+
+    def generate_help(self, org, count, active_member):
+        posts, matches = [], []
+        for _ in range(count):
+            category = self.rng.choice(list(HELP_TITLES))
+            creator = active_member()
+            created = self.moment(creator.created_at)
+            post = HelpPost(
+                id=self.uuid(), org=org, created_by=creator,
+                type='request' if self.rng.random() < 0.7 else 'offer',
+                category=category,
+                title=self.rng.choice(HELP_TITLES[category]),
+                description=self.sentence_body(),
+                urgency=self.pick(URGENCIES),
+                status=self.pick(HELP_STATUSES),
+                approx_location=self.rng.choice(PLACES),
+                created_at=created, updated_at=created,
+            )
+            posts.append(post)
+
+            has_match = post.status in ('matched', 'completed') or (
+                post.status == 'open' and self.rng.random() < self.match_rate / 2
+            )
+            helper = active_member()
+            if not has_match or helper.pk == creator.pk:
+                continue
+            match_status = {'matched': 'accepted', 'completed': 'closed'}.get(post.status, 'pending')
+            match = HelpMatch(
+                id=self.uuid(), org=org, help_post=post, helper_user=helper,
+                status=match_status, message=self.sentence_body(1),
+                created_at=self.moment(created, timedelta(days=3)),
+            )
+            match.updated_at = match.created_at
+            if match_status != 'pending':
+                match.accepted_at = self.moment(match.created_at, timedelta(days=1))
+                match.updated_at = match.accepted_at
+                match.thread = self.generate_thread(
+                    org, 'help_match', match.id, post.title, [creator, helper], match.accepted_at
+                )
+            if match_status == 'closed':
+                match.closed_at = self.moment(match.accepted_at, timedelta(days=7))
+                match.updated_at = match.closed_at
+            matches.append(match)
+
+        self._insert(HelpPost, posts)
+        self._flush_threads()
+        self._insert(HelpMatch, matches)
+        return posts
+
+    def generate_items(self, org, count, active_member):
+        posts, reservations = [], []
+        for _ in range(count):
+            category = self.rng.choice(list(ITEM_TITLES))
+            owner = active_member()
+            created = self.moment(owner.created_at)
+            post = ItemPost(
+                id=self.uuid(), org=org, created_by=owner,
+                type='offer' if self.rng.random() < 0.8 else 'request',
+                category=category,
+                title=self.rng.choice(ITEM_TITLES[category]),
+                description=self.sentence_body(),
+                quantity=self.rng.choice([1, 1, 1, 2, 3, 5]),
+                condition=self.rng.choice(['new', 'like_new', 'good', 'good', 'fair']),
+                status=self.pick(ITEM_STATUSES),
+                approx_location=self.rng.choice(PLACES),
+                created_at=created, updated_at=created,
+            )
+            posts.append(post)
+
+            has_reservation = post.status in ('reserved', 'completed') or (
+                post.status == 'available' and self.rng.random() < self.reservation_rate / 2
+            )
+            requester = active_member()
+            if not has_reservation or requester.pk == owner.pk:
+                continue
+            status = {'reserved': 'approved', 'completed': 'completed'}.get(post.status, 'pending')
+            reservation = ItemReservation(
+                id=self.uuid(), org=org, item_post=post, requester=requester,
+                status=status, message=self.sentence_body(1),
+                created_at=self.moment(created, timedelta(days=3)),
+            )
+            reservation.updated_at = reservation.created_at
+            if status != 'pending':
+                reservation.approved_at = self.moment(reservation.created_at, timedelta(days=1))
+                reservation.updated_at = reservation.approved_at
+                reservation.thread = self.generate_thread(
+                    org, 'item_reservation', reservation.id, post.title,
+                    [owner, requester], reservation.approved_at
+                )
+            if status == 'completed':
+                reservation.completed_at = self.moment(reservation.approved_at, timedelta(days=7))
+                reservation.updated_at = reservation.completed_at
+            reservations.append(reservation)
+
+        self._insert(ItemPost, posts)
+        self._flush_threads()
+        self._insert(ItemReservation, reservations)
+        return posts
+
+    def generate_thread(self, org, thread_type, ref_id, subject, users, opened):
+        """Queue a thread with its participants and a message history."""
+        thread = Thread(
+            id=self.uuid(), org=org, thread_type=thread_type, ref_id=ref_id,
+            subject=subject, created_at=opened,
+        )
+        sent = self.generate_messages(org, thread, users, opened, self.long_tail(self.messages))
+        thread.last_message_at = sent or None
+        thread.updated_at = sent or opened
+        self._threads.append(thread)
+        for user in users:
+            self._participants.append(ThreadParticipant(
+                id=self.uuid(), org=org, thread=thread, user=user, joined_at=opened,
+                last_read_at=self.moment(opened) if self.rng.random() < 0.8 else None,
+            ))
+        return thread
+
+    def generate_broadcast(self, org, admin):
+        """An announcement thread with messages spread over the whole history."""
+        thread = Thread(
+            id=self.uuid(), org=org, thread_type='broadcast',
+            subject='Community announcements', created_at=org.created_at,
+        )
+        sent = self.generate_messages(org, thread, [admin], self.start, self.months * 4)
+        thread.last_message_at = sent or None
+        thread.updated_at = sent or org.created_at
+        self._threads.append(thread)
+        self._flush_threads()
+
+    def generate_messages(self, org, thread, senders, after, count):
+        """
+        Queue count messages in a thread, most within days of `after`.
+
+        Returns:
+            The time of the last message, or None
+        """
+        sent = None
+        at = after
+        for _ in range(count):
+            # Conversations are bursty: mostly minutes apart, sometimes days
+            gap = self.rng.expovariate(1 / 1800) if self.rng.random() < 0.9 else self.rng.expovariate(1 / 172800)
+            at = at + timedelta(seconds=gap)
+            if at > self.now:
+                break
+            self._messages.append(Message(
+                id=self.uuid(), org=org, thread=thread,
+                sender_user=self.rng.choice(senders), message_type='user',
+                body=self.sentence_body(),
+                created_at=at, updated_at=at,
+            ))
+            sent = at
+        if len(self._messages) >= self.batch_size:
+            self._flush_messages()
+        return sent
+
+    def _flush_threads(self):
+        self._insert(Thread, self._threads)
+        self._insert(ThreadParticipant, self._participants)
+        self._threads, self._participants = [], []
+
+    def _flush_messages(self):
+        self._insert(Message, self._messages)
+        self._messages = []
+
+    def generate_reports(self, org, count, members, help_posts, item_posts):
+        """Reports against a mix of posts, messages and users."""
+        messages = list(
+            Message.objects.filter(org=org).values_list('id', flat=True)[:1000]
+        ) if count else []
+        targets = {
+            'help_post': [post.id for post in help_posts],
+            'item_post': [post.id for post in item_posts],
+            'message': messages,
+            'user': [user.id for user in members],
+        }
+        reports = []
+        for _ in range(count):
+            target_type = self.pick(REPORT_TARGETS)
+            if not targets[target_type]:
+                target_type = 'user'
+            created = self.moment()
+            status = self.pick(REPORT_STATUSES)
+            report = Report(
+                id=self.uuid(), org=org, reporter=self.rng.choice(members),
+                target_type=target_type,
+                target_id=self.rng.choice(targets[target_type]),
+                reason=self.rng.choice(['spam', 'harassment', 'inappropriate', 'fraud', 'safety', 'other']),
+                details=self.sentence_body(1),
+                status=status,
+                created_at=created, updated_at=created,
+            )
+            if status in ('resolved', 'dismissed'):
+                report.resolved_at = self.moment(created, timedelta(days=5))
+                report.resolved_by = members[0]
+                report.updated_at = report.resolved_at
+            reports.append(report)
+        self._insert(Report, reports)
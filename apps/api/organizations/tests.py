@@ -5,14 +5,24 @@
 Tests for Organization models and API.
 """
 
+from io import StringIO
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
 from django.test import TestCase
 from django.urls import reverse
 from rest_framework import status
 from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import RefreshToken
 
+from kapwanet.querybudget import QueryBudgetTestMixin
 from users.models import User
-from .models import Organization, OrgTheme, ThemePreset, Membership, Invite, DEFAULT_THEME
+from .cache import OrgLookupCache, filter_by_org, org_lookup_cache, resolve_org_id
+from .models import (
+    Organization, OrgTheme, ThemePreset, Membership, Invite, OrgPage, TemplateLibrary, DEFAULT_THEME
+)
 from .permissions import OrgMembershipPermission, OrgAdminPermission, OrgModeratorPermission
+from .synthetic import CommunityGenerator, flush
 
 
 class OrganizationModelTest(TestCase):
@@ -143,6 +153,87 @@ class OrganizationAPITest(APITestCase):
         )
 
 
+class OrgLookupCacheTest(TestCase):
+    """Test the organization slug/ID lookup cache."""
+
+    def setUp(self):
+        """Set up test data."""
+        org_lookup_cache.clear()
+        self.org = Organization.objects.create(
+            name='Cached Org',
+            slug='cached-org',
+        )
+
+    def test_resolve_by_id_and_slug(self):
+        """Test resolving an organization by UUID and by slug."""
+        self.assertEqual(resolve_org_id(str(self.org.id)), self.org.id)
+        self.assertEqual(resolve_org_id('cached-org'), self.org.id)
+        self.assertIsNone(resolve_org_id('missing-org'))
+
+    def test_second_lookup_hits_cache(self):
+        """Test that a slug lookup also primes the ID key."""
+        resolve_org_id('cached-org')
+        with self.assertNumQueries(0):
+            self.assertEqual(resolve_org_id('cached-org'), self.org.id)
+            self.assertEqual(resolve_org_id(self.org.id), self.org.id)
+
+    def test_save_invalidates_slug_change(self):
+        """Test that renaming a slug drops the stale mapping."""
+        resolve_org_id('cached-org')
+        self.org.slug = 'renamed-org'
+        self.org.save()
+        self.assertIsNone(resolve_org_id('cached-org'))
+        self.assertEqual(resolve_org_id('renamed-org'), self.org.id)
+
+    def test_require_active(self):
+        """Test that inactive organizations do not resolve when required."""
+        self.org.is_active = False
+        self.org.save()
+        self.assertEqual(resolve_org_id('cached-org'), self.org.id)
+        self.assertIsNone(resolve_org_id('cached-org', require_active=True))
+
+    def test_bounded_and_expiring(self):
+        """Test max entry eviction and TTL expiry."""
+        other = Organization.objects.create(name='Other Org', slug='other-org')
+        cache = OrgLookupCache(max_entries=2, ttl=300)
+        cache.get('cached-org')
+        cache.get('other-org')
+        self.assertEqual(len(cache._entries), 2)
+        self.assertEqual(cache.get('other-org').id, other.id)
+
+        cache = OrgLookupCache(max_entries=10, ttl=0)
+        cache.get('cached-org')
+        cache.get('cached-org')
+        self.assertEqual(cache.hits, 0)
+        self.assertEqual(cache.misses, 2)
+
+    def test_load_racing_invalidate_is_not_stored(self):
+        """Test that a row loaded before a concurrent save is not cached."""
+        cache = OrgLookupCache()
+        load = cache._load
+
+        def load_then_rename(key):
+            ref = load(key)
+            # Another thread saves the organization mid-lookup
+            Organization.objects.filter(pk=self.org.pk).update(slug='renamed-org')
+            cache.invalidate(org_id=self.org.id, slug='cached-org')
+            return ref
+
+        cache._load = load_then_rename
+        self.assertEqual(cache.get('cached-org').id, self.org.id)
+        self.assertEqual(cache._entries, {})
+
+    def test_filter_by_org(self):
+        """Test filtering a queryset by organization ID or slug."""
+        Membership.objects.create(org=self.org, user=User.objects.create_user(
+            email='member@example.com', password='testpass123'
+        ))
+        memberships = Membership.objects.all()
+        self.assertEqual(filter_by_org(memberships, 'cached-org').count(), 1)
+        self.assertEqual(filter_by_org(memberships, str(self.org.id)).count(), 1)
+        self.assertEqual(filter_by_org(memberships, 'missing-org').count(), 0)
+
+
 class ThemePresetModelTest(TestCase):
     """Test ThemePreset model."""
 
@@ -883,3 +974,140 @@ class InviteAPITest(APITestCase):
 
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(len(response.data), 2)
+
+
+class GenerateCommunityTests(TestCase):
+    """Tests for the synthetic community generator."""
+
+    def generate(self, *args):
+        call_command(
+            'generate_community', '--orgs', '3', '--members', '20', '--help-posts', '10',
+            '--item-posts', '10', '--messages', '5', '--reports', '3', *args,
+            stdout=StringIO()
+        )
+        return sorted(
+            Organization.objects.filter(slug__startswith='synthetic-')
+            .values_list('id', 'slug', 'memberships__user__email')
+        )
+
+    def test_generates_deterministic_community(self):
+        """Test that the same seed rebuilds the same dataset."""
+        from datetime import timedelta
+        from django.utils import timezone
+        from help.models import HelpPost
+        from messaging.models import Message
+
+        first = self.generate()
+        posts = sorted(HelpPost.objects.values_list('id', 'status', 'title'))
+        messages = Message.objects.count()
+
+        self.assertEqual(len({slug for _, slug, _ in first}), 3)
+        self.assertEqual(Membership.objects.filter(role='org_admin').count(), 3)
+        self.assertGreater(messages, 0)
+        # History is backdated rather than stamped with the current time
+        created = HelpPost.objects.values_list('created_at', flat=True)
+        self.assertLess(min(created), timezone.now() - timedelta(days=30))
+        self.assertGreater(len({value.date() for value in created}), 5)
+
+        self.assertEqual(self.generate('--flush'), first)
+        self.assertEqual(sorted(HelpPost.objects.values_list('id', 'status', 'title')), posts)
+        self.assertEqual(Message.objects.count(), messages)
+
+    def test_flush_keeps_real_orgs(self):
+        """Test that flushing skips real orgs whose slug shares the prefix."""
+        from help.models import HelpPost
+        from messaging.models import Message
+        from sync.models import SyncTombstone
+
+        self.generate()
+        real = Organization.objects.create(name='Synthetic Biology Club', slug='synthetic-biology')
+        member = User.objects.create_user(email='lab@example.com', password='testpass123')
+        Membership.objects.create(org=real, user=member, role='org_admin', status='active')
+        empty = Organization.objects.create(name='Synthetic Fibres', slug='synthetic-fibres')
+
+        deleted = flush('synthetic')
+
+        self.assertEqual(deleted, 3)
+        self.assertEqual(
+            set(Organization.objects.filter(slug__startswith='synthetic-').values_list('id', flat=True)),
+            {real.id, empty.id}
+        )
+        self.assertTrue(Membership.objects.filter(org=real, user=member).exists())
+        self.assertFalse(HelpPost.objects.exists())
+        self.assertFalse(Message.objects.exists())
+        self.assertFalse(User.objects.filter(email__endswith='@synthetic.example.org').exists())
+        # Raw deletes leave nothing for delta sync to report
+        self.assertFalse(SyncTombstone.objects.exists())
+
+    def test_refuses_to_generate_twice(self):
+        """Test that an existing community is not silently duplicated."""
+        self.generate()
+        with self.assertRaises(CommandError):
+            self.generate()
+
+    def test_threads_match_their_messages(self):
+        """Test that denormalized thread fields agree with the generated messages."""
+        from django.db.models import Max
+        from messaging.models import Thread
+
+        CommunityGenerator(orgs=1, members=10, help_posts=10, item_posts=0, messages=5, reports=0).generate()
+        for thread in Thread.objects.annotate(last=Max('messages__created_at')):
+            self.assertEqual(thread.last_message_at, thread.last)
+
+
+class OrganizationQueryBudgetTests(QueryBudgetTestMixin, APITestCase):
+    """Tests that organization endpoints stay within their query budgets."""
+
+    def setUp(self):
+        self.admin = User.objects.create_user(email='admin@example.com', password='testpass123')
+        self.org = Organization.objects.create(name='Test Organization', slug='test-org')
+        Membership.objects.create(org=self.org, user=self.admin, role='org_admin', status='active')
+        self.rows = 0
+        self.add_rows()
+        token = RefreshToken.for_user(self.admin).access_token
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+
+    def add_rows(self, count=3):
+        """Add orgs, members, invites, pages, presets and templates."""
+        for _ in range(count):
+            self.rows += 1
+            n = self.rows
+            org = Organization.objects.create(name=f'Org {n}', slug=f'org-{n}')
+            Membership.objects.create(org=org, user=self.admin, role='member', status='active')
+            member = User.objects.create_user(email=f'member{n}@example.com', password='testpass123')
+            Membership.objects.create(org=self.org, user=member, role='member', status='active')
+            Invite.create_for_email(
+                org=self.org, email=f'invite{n}@example.com', role='member', created_by=self.admin
+            )
+            OrgPage.objects.create(org=self.org, slug=f'page-{n}', title=f'Page {n}', blocks_json=[])
+            ThemePreset.objects.create(id=f'preset-{n}', name=f'Preset {n}', theme_json=DEFAULT_THEME)
+            TemplateLibrary.objects.create(id=f'template-{n}', name=f'Template {n}', blocks_json=[])
+
+    def test_organization_endpoints(self):
+        """Test the organization list, detail, slug lookup and theme."""
+        self.assertConstantQueries('/api/organizations/', grow=self.add_rows)
+        self.request_within_budget('get', f'/api/organizations/{self.org.id}/')
+        self.request_within_budget('get', '/api/organizations/by-slug/test-org/')
+        self.request_within_budget('get', f'/api/organizations/{self.org.id}/theme/')
+
+    def test_catalog_endpoints(self):
+        """Test theme presets, templates and pages."""
+        self.assertConstantQueries('/api/theme-presets/', grow=self.add_rows)
+        self.request_within_budget('get', '/api/theme-presets/preset-1/')
+        self.assertConstantQueries('/api/templates/', grow=self.add_rows)
+        self.request_within_budget('get', '/api/templates/template-1/')
+        self.assertConstantQueries(f'/api/pages/?org_id={self.org.id}', grow=self.add_rows)
+        page = OrgPage.objects.first()
+        self.request_within_budget('get', f'/api/pages/{page.id}/')
+
+    def test_membership_and_invite_endpoints(self):
+        """Test membership and invite lists and details."""
+        self.assertConstantQueries(f'/api/memberships/?org_id={self.org.id}', grow=self.add_rows)
+        self.assertConstantQueries('/api/memberships/my-memberships/', grow=self.add_rows)
+        membership = Membership.objects.filter(org=self.org).first()
+        self.request_within_budget('get', f'/api/memberships/{membership.id}/')
+
+        self.assertConstantQueries(f'/api/invites/?org_id={self.org.id}', grow=self.add_rows)
+        invite = Invite.objects.first()
+        self.request_within_budget('get', f'/api/invites/{invite.id}/')
+        self.request_within_budget('get', f'/api/invites/info/{invite.token}/')
@@ -9,6 +9,8 @@ from rest_framework import viewsets, permissions, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
 
+from kapwanet.mixins import ConditionalGetMixin
+
 from .models import Organization, OrgTheme, ThemePreset, TemplateLibrary, OrgPage, Membership, Invite
 from .serializers import (
     OrganizationSerializer,
@@ -48,6 +50,7 @@ class OrganizationViewSet(viewsets.ModelViewSet):
 
     queryset = Organization.objects.filter(is_active=True)
     serializer_class = OrganizationSerializer
+    query_budgets = {'list': 2, 'retrieve': 2, 'by_slug': 2, 'theme': 6}
     lookup_field = 'pk'
 
     def get_permissions(self):
@@ -159,6 +162,7 @@ class ThemePresetViewSet(viewsets.ReadOnlyModelViewSet):
 
     queryset = ThemePreset.objects.all()
     serializer_class = ThemePresetSerializer
+    query_budgets = {'list': 2, 'retrieve': 2}
     permission_classes = [permissions.AllowAny]
     lookup_field = 'pk'
 
@@ -179,6 +183,7 @@ class TemplateLibraryViewSet(viewsets.ReadOnlyModelViewSet):
 
     queryset = TemplateLibrary.objects.filter(is_active=True)
     serializer_class = TemplateLibrarySerializer
+    query_budgets = {'list': 2, 'retrieve': 2}
     permission_classes = [permissions.AllowAny]
     lookup_field = 'pk'
 
@@ -205,7 +210,7 @@ class TemplateLibraryViewSet(viewsets.ReadOnlyModelViewSet):
         return queryset
 
 
-class OrgPageViewSet(viewsets.ModelViewSet):
+class OrgPageViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
     """
     ViewSet for organization pages.
 
@@ -215,10 +220,13 @@ class OrgPageViewSet(viewsets.ModelViewSet):
     update: Update a page
     destroy: Delete a page
     from_template: Create a page from a template
+
+    list and retrieve support conditional requests (ETag / If-None-Match).
     """
 
     queryset = OrgPage.objects.all()
     serializer_class = OrgPageSerializer
+    query_budgets = {'list': 3, 'retrieve': 2}
     permission_classes = [permissions.IsAuthenticated]
     lookup_field = 'pk'
 
@@ -285,6 +293,7 @@ class MembershipViewSet(viewsets.ModelViewSet):
 
     queryset = Membership.objects.select_related('user', 'org')
     serializer_class = MembershipSerializer
+    query_budgets = {'list': 3, 'retrieve': 3, 'my_memberships': 2}
     lookup_field = 'pk'
 
     def get_permissions(self):
@@ -474,6 +483,7 @@ class InviteViewSet(viewsets.ModelViewSet):
 
     queryset = Invite.objects.select_related('org', 'created_by', 'accepted_by')
     serializer_class = InviteSerializer
+    query_budgets = {'list': 4, 'retrieve': 4, 'info': 2}
     lookup_field = 'pk'
 
     def get_permissions(self):
@@ -0,0 +1,36 @@
+# KapwaNet - Community Platform for Dignified Mutual Aid
+# SPDX-License-Identifier: AGPL-3.0-or-later
+
+"""
+Admin configuration for retention models.
+"""
+
+from django.contrib import admin
+
+from .models import RetentionPolicy, RetentionRun
+
+
+@admin.register(RetentionPolicy)
+class RetentionPolicyAdmin(admin.ModelAdmin):
+    """Admin configuration for RetentionPolicy model."""
+
+    list_display = [
+        'org', 'mode', 'is_enabled', 'help_post_days', 'help_match_days',
+        'item_post_days', 'item_reservation_days', 'message_days', 'updated_at'
+    ]
+    list_filter = ['mode', 'is_enabled']
+    search_fields = ['org__name', 'org__slug']
+    readonly_fields = ['created_at', 'updated_at']
+
+
+@admin.register(RetentionRun)
+class RetentionRunAdmin(admin.ModelAdmin):
+    """Admin configuration for RetentionRun model."""
+
+    list_display = ['org', 'mode', 'dry_run', 'status', 'total', 'started_at', 'finished_at']
+    list_filter = ['status', 'mode', 'dry_run']
+    search_fields = ['org__name', 'org__slug']
+    readonly_fields = [
+        'id', 'org', 'mode', 'dry_run', 'status', 'counts', 'error',
+        'started_at', 'finished_at'
+    ]
@@ -0,0 +1,17 @@
+# KapwaNet - Community Platform for Dignified Mutual Aid
+# SPDX-License-Identifier: AGPL-3.0-or-later
+
+"""
+App configuration for data retention.
+
+This module lets each organization limit how long closed posts, matches,
+reservations and messages are kept.
+"""
+
+from django.apps import AppConfig
+
+
+class RetentionConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'retention'
+    verbose_name = 'Data Retention'
@@ -0,0 +1,324 @@
+# KapwaNet - Community Platform for Dignified Mutual Aid
+# SPDX-License-Identifier: AGPL-3.0-or-later
+
+"""
+Retention engine: enforces RetentionPolicy for an organization.
+
+Each target (closed help posts, matches, item posts, reservations and
+messages) is processed in small chunks of primary keys read in keyset
+order (`pk > last_pk ORDER BY pk LIMIT n`). Messages are read in
+(created_at, id) order instead: the tables are partitioned on created_at,
+and the archived partitions have no index on the primary key alone. Each
+chunk is deleted or anonymized in its own short transaction, with a
+pause between chunks. Locks are held briefly, and the write-ahead log and
+replicas keep pace.
+
+Deleting a post, match or reservation also deletes the messaging
+threads created for it. Their messages are deleted first, in keyset
+chunks of their own, so a long thread never means one large delete.
+Anonymizing replaces their free-text content and clears those threads'
+messages instead, also in chunks.
+
+Messages older than the archive horizon live in archived partitions
+(messaging/partitions.py) rather than the messages table; the
+archived_messages target applies message_days to them too, and thread
+cleanup covers their archived messages.
+"""
+
+import time
+from datetime import timedelta
+
+from django.apps import apps
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import RetentionPolicy, RetentionRun
+
+# Replacement text for anonymized content
+REMOVED = '[removed]'
+
+# Keyset order for messages, live and archived (see the module docstring)
+MESSAGE_KEYSET = ('created_at', 'id')
+
+
+class RetentionTarget:
+    """
+    Describes one kind of record a retention policy expires.
+
+    Args:
+        name: Key used in RetentionRun.counts
+        model: Model label, e.g. 'help.HelpPost'
+        days_field: RetentionPolicy field holding the period in days
+        expired: Q matching records eligible once old enough (e.g. closed)
+        age_field: Timestamp compared against the cutoff
+        scrub: {field: value} written when anonymizing
+        thread_lookup: Lookup from the model to its messaging threads
+        available: Optional callable; the target is skipped when it
+            returns False (e.g. a table that only exists on PostgreSQL)
+        keyset: Fields the records are chunked in order of; must end
+            with a unique field
+    """
+
+    def __init__(self, name, model, days_field, scrub, expired=None,
+                 age_field='updated_at', thread_lookup=None, available=None,
+                 keyset=('pk',)):
+        self.name = name
+        self.model = model
+        self.days_field = days_field
+        self.scrub = scrub
+        self.expired = expired
+        self.age_field = age_field
+        self.thread_lookup = thread_lookup
+        self.available = available
+        self.keyset = keyset
+
+    def is_available(self):
+        return self.available is None or self.available()
+
+    def get_model(self):
+        return apps.get_model(self.model)
+
+    def get_queryset(self, org, cutoff, mode):
+        """Get the records of an org that have expired."""
+        queryset = self.get_model().objects.filter(
+            org=org, **{f'{self.age_field}__lt': cutoff}
+        )
+        if self.expired is not None:
+            queryset = queryset.filter(self.expired)
+        if mode == 'anonymize':
+            # Skip records already anonymized by an earlier run
+            queryset = queryset.exclude(**self.scrub)
+        return queryset
+
+    def get_thread_ids(self, ids):
+        """Get the threads belonging to a chunk of records."""
+        if not self.thread_lookup:
+            return []
+        thread_ids = self.get_model().objects.filter(
+            pk__in=ids, **{f'{self.thread_lookup}__isnull': False}
+        ).values_list(self.thread_lookup, flat=True)
+        return list(set(thread_ids))
+
+
+def archive_exists():
+    """Whether any message partitions have been archived."""
+    from messaging.partitions import archive_horizon
+
+    return archive_horizon() is not None
+
+
+RETENTION_TARGETS = [
+    RetentionTarget(
+        'help_matches',
+        'help.HelpMatch',
+        'help_match_days',
+        scrub={'message': ''},
+        expired=Q(status__in=['declined', 'withdrawn', 'closed']),
+        thread_lookup='thread',
+    ),
+    RetentionTarget(
+        'help_posts',
+        'help.HelpPost',
+        'help_post_days',
+        scrub={'title': REMOVED, 'description': '', 'approx_location': '', 'availability': ''},
+        expired=Q(status__in=['completed', 'cancelled']),
+        thread_lookup='matches__thread',
+    ),
+    RetentionTarget(
+        'item_reservations',
+        'items.ItemReservation',
+        'item_reservation_days',
+        scrub={'message': ''},
+        expired=Q(status__in=['rejected', 'cancelled', 'completed']),
+        thread_lookup='thread',
+    ),
+    RetentionTarget(
+        'item_posts',
+        'items.ItemPost',
+        'item_post_days',
+        scrub={
+            'title': REMOVED, 'description': '', 'approx_location': '',
+            'pickup_instructions': '', 'photos': [],
+        },
+        expired=Q(status__in=['completed', 'cancelled']),
+        thread_lookup='reservations__thread',
+    ),
+    RetentionTarget(
+        'messages',
+        'messaging.Message',
+        'message_days',
+        scrub={'body': REMOVED},
+        age_field='created_at',
+        keyset=MESSAGE_KEYSET,
+    ),
+    RetentionTarget(
+        'archived_messages',
+        'messaging.ArchivedMessage',
+        'message_days',
+        scrub={'body': REMOVED},
+        age_field='created_at',
+        available=archive_exists,
+        keyset=MESSAGE_KEYSET,
+    ),
+]
+
+
+
+def after_keyset(keyset, values):
+    """
+    Build a Q matching rows after the given values in keyset order.
+
+    For ('created_at', 'id') that is
+    `created_at > a OR (created_at = a AND id > b)`.
+    """
+    condition = Q()
+    for index in reversed(range(len(keyset))):
+        field, value = keyset[index], values[index]
+        later = Q(**{f'{field}__gt': value})
+        if condition:
+            later |= Q(**{field: value}) & condition
+        condition = later
+    return condition
+
+
+def iter_chunks(queryset, chunk_size, keyset=('pk',)):
+    """
+    Yield lists of primary keys from a queryset in keyset order.
+
+    Each chunk is read with `pk > last_pk ORDER BY pk LIMIT chunk_size`
+    (or the equivalent for a longer keyset), so it stays an index range
+    scan however far the purge has gone, and works whether or not earlier
+    chunks were deleted.
+    """
+    last = None
+    while True:
+        page = queryset.order_by(*keyset)
+        if last is not None:
+            page = page.filter(after_keyset(keyset, last))
+        rows = list(page.values_list('pk', *keyset)[:chunk_size])
+        if not rows:
+            return
+        yield [row[0] for row in rows]
+        last = rows[-1][1:]
+
+
+class RetentionEngine:
+    """
+    Applies one organization's retention policy.
+
+    Usage:
+        run = RetentionEngine(policy).run()
+        print(run.counts)
+    """
+
+    def __init__(self, policy, dry_run=False, chunk_size=None, pause=None, now=None):
+        self.policy = policy
+        self.dry_run = dry_run
+        self.chunk_size = chunk_size or settings.RETENTION_CHUNK_SIZE
+        self.pause = settings.RETENTION_CHUNK_PAUSE if pause is None else pause
+        self.now = now or timezone.now()
+
+    def run(self):
+        """Process every target with a retention period and record the run."""
+        run = RetentionRun.objects.create(
+            org=self.policy.org,
+            mode=self.policy.mode,
+            dry_run=self.dry_run,
+        )
+        try:
+            for target in RETENTION_TARGETS:
+                days = getattr(self.policy, target.days_field)
+                if days is None or not target.is_available():
+                    continue
+                cutoff = self.now - timedelta(days=days)
+                queryset = target.get_queryset(self.policy.org, cutoff, self.policy.mode)
+                if self.dry_run:
+                    run.counts[target.name] = queryset.count()
+                else:
+                    self.process(target, queryset, run.counts)
+        except Exception as e:
+            run.status = 'failed'
+            run.error = str(e)
+            run.finished_at = timezone.now()
+            run.save()
+            raise
+
+        run.status = 'completed'
+        run.finished_at = timezone.now()
+        run.save()
+        return run
+
+    def process(self, target, queryset, counts):
+        """Delete or anonymize a target's expired records chunk by chunk."""
+        counts.setdefault(target.name, 0)
+        for ids in iter_chunks(queryset, self.chunk_size, target.keyset):
+            thread_ids = target.get_thread_ids(ids)
+            if thread_ids:
+                self.process_thread_messages(thread_ids)
+            with transaction.atomic():
+                if self.policy.mode == 'anonymize':
+                    self.anonymize(target, ids, thread_ids)
+                else:
+                    self.delete(target, ids, thread_ids)
+            counts[target.name] += len(ids)
+            if thread_ids and self.policy.mode == 'delete':
+                counts['threads'] = counts.get('threads', 0) + len(thread_ids)
+            if self.pause:
+                time.sleep(self.pause)
+
+    def process_thread_messages(self, thread_ids):
+        """Delete or anonymize the messages of threads, live and archived, in chunks."""
+        from messaging.models import ArchivedMessage, Message
+
+        models = [Message, ArchivedMessage] if archive_exists() else [Message]
+        for model in models:
+            queryset = model.objects.filter(thread_id__in=thread_ids)
+            if self.policy.mode == 'anonymize':
+                queryset = queryset.exclude(body=REMOVED)
+            for ids in iter_chunks(queryset, self.chunk_size, MESSAGE_KEYSET):
+                with transaction.atomic():
+                    chunk = model.objects.filter(pk__in=ids)
+                    if self.policy.mode == 'anonymize':
+                        chunk.update(body=REMOVED, updated_at=timezone.now())
+                    else:
+                        chunk.delete()
+                if self.pause:
+                    time.sleep(self.pause)
+
+    def delete(self, target, ids, thread_ids):
+        from messaging.models import Thread
+
+        # Threads go first (their messages are already gone); deleting them
+        # removes participants and clears the thread link on
+        # matches/reservations
+        if thread_ids:
+            Thread.objects.filter(id__in=thread_ids).delete()
+        target.get_model().objects.filter(pk__in=ids).delete()
+
+    def anonymize(self, target, ids, thread_ids):
+        from messaging.models import Thread
+
+        # Bump updated_at so delta sync clients pick up the change
+        now = timezone.now()
+        target.get_model().objects.filter(pk__in=ids).update(updated_at=now, **target.scrub)
+        if thread_ids:
+            Thread.objects.filter(id__in=thread_ids).update(subject='', updated_at=now)
+
+
+def apply_retention(orgs=None, **options):
+    """
+    Apply every enabled retention policy.
+
+    Args:
+        orgs: Optional queryset or list of organizations to limit the run to
+        **options: Passed to RetentionEngine (dry_run, chunk_size, pause, now)
+
+    Returns:
+        List of RetentionRun records, one per organization
+    """
+    policies = RetentionPolicy.objects.filter(is_enabled=True).select_related('org')
+    if orgs is not None:
+        policies = policies.filter(org__in=orgs)
+    return [RetentionEngine(policy, **options).run() for policy in policies]
@@ -0,0 +1,65 @@
+# KapwaNet - Community Platform for Dignified Mutual Aid
+# SPDX-License-Identifier: AGPL-3.0-or-later
+
+"""
+Management command to enforce organization retention policies.
+
+Intended to run nightly, e.g. from cron.
+"""
+
+from django.core.management.base import BaseCommand
+
+from organizations.models import Organization
+from retention.engine import apply_retention
+
+
+class Command(BaseCommand):
+    help = 'Delete or anonymize records past their organization retention periods'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--org',
+            action='append',
+            dest='orgs',
+            help='Only process this organization slug (repeatable)',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Count expired records without changing them',
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            help='Records per chunk (default: RETENTION_CHUNK_SIZE)',
+        )
+        parser.add_argument(
+            '--pause',
+            type=float,
+            help='Seconds to pause between chunks (default: RETENTION_CHUNK_PAUSE)',
+        )
+
+    def handle(self, *args, **options):
+        orgs = None
+        if options['orgs']:
+            orgs = Organization.objects.filter(slug__in=options['orgs'])
+
+        runs = apply_retention(
+            orgs=orgs,
+            dry_run=options['dry_run'],
+            chunk_size=options['chunk_size'],
+            pause=options['pause'],
+        )
+
+        verb = 'Would process' if options['dry_run'] else 'Processed'
+        for run in runs:
+            details = ', '.join(f'{name}: {count}' for name, count in run.counts.items())
+            self.stdout.write(
+                self.style.SUCCESS(f'{verb} {run.org.slug} ({run.mode}): {details or "nothing due"}')
+            )
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'\nDone! {len(runs)} organizations, {sum(run.total for run in runs)} records.'
+            )
+        )
@@ -0,0 +1,59 @@
+# KapwaNet - Community Platform for Dignified Mutual Aid
+# SPDX-License-Identifier: AGPL-3.0-or-later
+
+import django.db.models.deletion
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('organizations', '0007_add_membership_is_banned'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RetentionPolicy',
+            fields=[
+                ('org', models.OneToOneField(help_text='The organization this policy belongs to', on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='retention_policy', serialize=False, to='organizations.organization')),
+                ('mode', models.CharField(choices=[('delete', 'Delete'), ('anonymize', 'Anonymize')], default='delete', help_text='Whether expired records are deleted or have their content removed', max_length=20)),
+                ('is_enabled', models.BooleanField(default=True, help_text='Whether this policy is enforced')),
+                ('help_post_days', models.PositiveIntegerField(blank=True, help_text='Days to keep completed or cancelled help posts', null=True)),
+                ('help_match_days', models.PositiveIntegerField(blank=True, help_text='Days to keep declined, withdrawn or closed help matches', null=True)),
+                ('item_post_days', models.PositiveIntegerField(blank=True, help_text='Days to keep completed or cancelled item posts', null=True)),
+                ('item_reservation_days', models.PositiveIntegerField(blank=True, help_text='Days to keep rejected, cancelled or completed reservations', null=True)),
+                ('message_days', models.PositiveIntegerField(blank=True, help_text='Days to keep messages', null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'retention policy',
+                'verbose_name_plural': 'retention policies',
+                'db_table': 'retention_policies',
+            },
+        ),
+        migrations.CreateModel(
+            name='RetentionRun',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('mode', models.CharField(choices=[('delete', 'Delete'), ('anonymize', 'Anonymize')], help_text='The policy mode at the time of the run', max_length=20)),
+                ('dry_run', models.BooleanField(default=False, help_text='Whether records were only counted')),
+                ('status', models.CharField(choices=[('running', 'Running'), ('completed', 'Completed'), ('failed', 'Failed')], default='running', max_length=20)),
+                ('counts', models.JSONField(default=dict, help_text='Records affected per target')),
+                ('error', models.TextField(blank=True, help_text='Error message if the run failed')),
+                ('started_at', models.DateTimeField(auto_now_add=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('org', models.ForeignKey(help_text='The organization the run applied to', on_delete=django.db.models.deletion.CASCADE, related_name='retention_runs', to='organizations.organization')),
+            ],
+            options={
+                'verbose_name': 'retention run',
+                'verbose_name_plural': 'retention runs',
+                'db_table': 'retention_runs',
+                'ordering': ['-started_at'],
+                'indexes': [models.Index(fields=['org', 'started_at'], name='retention_r_org_id_fdccf9_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,156 @@
+# KapwaNet - Community Platform for Dignified Mutual Aid
+# SPDX-License-Identifier: AGPL-3.0-or-later
+
+"""
+Models for per-organization data retention.
+
+A RetentionPolicy says how long an organization keeps closed help posts,
+matches, reservations and messages. `manage.py apply_retention` enforces
+the policies and records a RetentionRun with per-target counts.
+"""
+
+import uuid
+
+from django.db import models
+
+
+class RetentionPolicy(models.Model):
+    """
+    Retention settings for an organization.
+
+    Each period is the number of days a record is kept after it was last
+    updated (for closed posts, matches and reservations) or sent (for
+    messages). A blank period keeps those records forever.
+    """
+
+    MODE_CHOICES = [
+        ('delete', 'Delete'),
+        ('anonymize', 'Anonymize'),
+    ]
+
+    org = models.OneToOneField(
+        'organizations.Organization',
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='retention_policy',
+        help_text="The organization this policy belongs to"
+    )
+    mode = models.CharField(
+        max_length=20,
+        choices=MODE_CHOICES,
+        default='delete',
+        help_text="Whether expired records are deleted or have their content removed"
+    )
+    is_enabled = models.BooleanField(
+        default=True,
+        help_text="Whether this policy is enforced"
+    )
+
+    # Retention periods in days (blank keeps forever)
+    help_post_days = models.PositiveIntegerField(
+        null=True,
+        blank=True,
+        help_text="Days to keep completed or cancelled help posts"
+    )
+    help_match_days = models.PositiveIntegerField(
+        null=True,
+        blank=True,
+        help_text="Days to keep declined, withdrawn or closed help matches"
+    )
+    item_post_days = models.PositiveIntegerField(
+        null=True,
+        blank=True,
+        help_text="Days to keep completed or cancelled item posts"
+    )
+    item_reservation_days = models.PositiveIntegerField(
+        null=True,
+        blank=True,
+        help_text="Days to keep rejected, cancelled or completed reservations"
+    )
+    message_days = models.PositiveIntegerField(
+        null=True,
+        blank=True,
+        help_text="Days to keep messages"
+    )
+
+    # Timestamps
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'retention_policies'
+        verbose_name = 'retention policy'
+        verbose_name_plural = 'retention policies'
+
+    def __str__(self):
+        return f"Retention policy for {self.org}"
+
+
+class RetentionRun(models.Model):
+    """
+    Summary of one retention pass over an organization.
+
+    counts maps each target (e.g. 'help_posts') to the number of records
+    deleted or anonymized.
+    """
+
+    STATUS_CHOICES = [
+        ('running', 'Running'),
+        ('completed', 'Completed'),
+        ('failed', 'Failed'),
+    ]
+
+    id = models.UUIDField(
+        primary_key=True,
+        default=uuid.uuid4,
+        editable=False
+    )
+    org = models.ForeignKey(
+        'organizations.Organization',
+        on_delete=models.CASCADE,
+        related_name='retention_runs',
+        help_text="The organization the run applied to"
+    )
+    mode = models.CharField(
+        max_length=20,
+        choices=RetentionPolicy.MODE_CHOICES,
+        help_text="The policy mode at the time of the run"
+    )
+    dry_run = models.BooleanField(
+        default=False,
+        help_text="Whether records were only counted"
+    )
+    status = models.CharField(
+        max_length=20,
+        choices=STATUS_CHOICES,
+        default='running'
+    )
+    counts = models.JSONField(
+        default=dict,
+        help_text="Records affected per target"
+    )
+    error = models.TextField(
+        blank=True,
+        help_text="Error message if the run failed"
+    )
+
+    # Timestamps
+    started_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        db_table = 'retention_runs'
+        ordering = ['-started_at']
+        verbose_name = 'retention run'
+        verbose_name_plural = 'retention runs'
+        indexes = [
+            models.Index(fields=['org', 'started_at']),
+        ]
+
+    def __str__(self):
+        return f"Retention run for {self.org} at {self.started_at}"
+
+    @property
+    def total(self):
+        """Total records affected across all targets."""
+        return sum(self.counts.values())
@@ -0,0 +1,174 @@
+# KapwaNet - Community Platform for Dignified Mutual Aid
+# SPDX-License-Identifier: AGPL-3.0-or-later
+
+"""
+Tests for data retention.
+"""
+
+from datetime import timedelta
+from io import StringIO
+from unittest import skipUnless
+
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from help.models import HelpPost, HelpMatch
+from messaging import partitions
+from messaging.models import ArchivedMessage, Thread, Message
+from organizations.models import Organization, Membership
+from users.models import User
+from .engine import MESSAGE_KEYSET, REMOVED, RetentionEngine, iter_chunks
+from .models import RetentionPolicy, RetentionRun
+
+
+class RetentionEngineTests(TestCase):
+    """Tests for the retention engine."""
+
+    def setUp(self):
+        """Set up an org with one expired and one recent closed post."""
+        self.requester = User.objects.create_user(email='requester@example.com', password='testpass123')
+        self.helper = User.objects.create_user(email='helper@example.com', password='testpass123')
+        self.org = Organization.objects.create(name='Test Organization', slug='test-org')
+        self.other_org = Organization.objects.create(name='Other Organization', slug='other-org')
+        for user in (self.requester, self.helper):
+            Membership.objects.create(org=self.org, user=user, role='member', status='active')
+
+        self.old_post = self.create_matched_post('Old ride', 'completed')
+        self.recent_post = self.create_matched_post('Recent ride', 'completed')
+        self.open_post = self.create_matched_post('Open ride', 'open')
+
+        long_ago = timezone.now() - timedelta(days=400)
+        HelpPost.objects.filter(pk__in=[self.old_post.pk, self.open_post.pk]).update(updated_at=long_ago)
+
+    def create_matched_post(self, title, status):
+        post = HelpPost.objects.create(
+            org=self.org,
+            type='request',
+            category='transportation',
+            title=title,
+            description='Pickup at 12 Mabini Street',
+            status=status,
+            created_by=self.requester
+        )
+        thread = Thread.create_for_help_match(
+            org=self.org,
+            ref_id=post.id,
+            participants=[self.requester, self.helper],
+            subject=f'Help: {title}'
+        )
+        HelpMatch.objects.create(
+            org=self.org, help_post=post, helper_user=self.helper,
+            status='accepted', thread=thread
+        )
+        Message.send_user_message(thread, self.helper, 'On my way')
+        return post
+
+    def test_delete_expired_posts(self):
+        """Test that expired closed posts are deleted with their threads."""
+        policy = RetentionPolicy.objects.create(org=self.org, help_post_days=365)
+        old_thread_id = self.old_post.matches.get().thread_id
+
+        run = RetentionEngine(policy, chunk_size=1, pause=0).run()
+
+        self.assertEqual(run.status, 'completed')
+        self.assertEqual(run.counts, {'help_posts': 1, 'threads': 1})
+        self.assertFalse(HelpPost.objects.filter(pk=self.old_post.pk).exists())
+        self.assertFalse(Thread.objects.filter(pk=old_thread_id).exists())
+        self.assertFalse(Message.objects.filter(thread_id=old_thread_id).exists())
+        # Recent and still-open posts are kept
+        self.assertTrue(HelpPost.objects.filter(pk=self.recent_post.pk).exists())
+        self.assertTrue(HelpPost.objects.filter(pk=self.open_post.pk).exists())
+
+    def test_thread_messages_deleted_in_chunks(self):
+        """Test that a deleted thread's messages go in chunks before the thread."""
+        policy = RetentionPolicy.objects.create(org=self.org, help_post_days=365)
+        thread = self.old_post.matches.get().thread
+        for body in ('Thanks', 'See you', 'Done'):
+            Message.send_user_message(thread, self.requester, body)
+
+        with CaptureQueriesContext(connection) as queries:
+            RetentionEngine(policy, chunk_size=2, pause=0).run()
+
+        chunks = [
+            query['sql'] for query in queries.captured_queries
+            if query['sql'].startswith('DELETE FROM "messages" WHERE "messages"."id" IN')
+        ]
+        # 4 messages in chunks of 2, leaving nothing for the thread's cascade
+        self.assertEqual(len(chunks), 2)
+        self.assertFalse(Message.objects.filter(thread_id=thread.id).exists())
+
+    @skipUnless(partitions.is_supported(), 'Message archiving is PostgreSQL-specific')
+    def test_archived_messages_expire(self):
+        """Test that message_days also applies to archived partitions."""
+        now = timezone.now()
+        long_ago = now - timedelta(days=500)
+        partitions.ensure_partitions(months_ahead=20, now=long_ago)
+        thread = self.recent_post.matches.get().thread
+        old = Message.objects.create(org=self.org, thread=thread, sender_user=self.helper, body='Old')
+        Message.objects.filter(pk=old.pk).update(created_at=long_ago)
+        partitions.archive_partitions(partitions.month_start(now - timedelta(days=400)))
+        self.assertTrue(ArchivedMessage.objects.filter(pk=old.pk).exists())
+
+        policy = RetentionPolicy.objects.create(org=self.org, message_days=365)
+        run = RetentionEngine(policy, pause=0).run()
+
+        self.assertEqual(run.counts['archived_messages'], 1)
+        self.assertFalse(ArchivedMessage.objects.filter(pk=old.pk).exists())
+
+    def test_anonymize_expired_posts(self):
+        """Test that anonymizing scrubs content once and keeps the rows."""
+        policy = RetentionPolicy.objects.create(org=self.org, mode='anonymize', help_post_days=365)
+
+        run = RetentionEngine(policy, pause=0).run()
+
+        self.assertEqual(run.counts, {'help_posts': 1})
+        self.old_post.refresh_from_db()
+        self.assertEqual(self.old_post.title, REMOVED)
+        self.assertEqual(self.old_post.description, '')
+        thread = self.old_post.matches.get().thread
+        self.assertEqual(thread.subject, '')
+        self.assertEqual(set(thread.messages.values_list('body', flat=True)), {REMOVED})
+
+        # Already anonymized records are skipped
+        run = RetentionEngine(policy, pause=0).run()
+        self.assertEqual(run.counts, {'help_posts': 0})
+
+    def test_dry_run_counts_only(self):
+        """Test that a dry run changes nothing."""
+        policy = RetentionPolicy.objects.create(org=self.org, help_post_days=365, message_days=0)
+
+        run = RetentionEngine(policy, dry_run=True, pause=0).run()
+
+        self.assertTrue(run.dry_run)
+        self.assertEqual(run.counts, {'help_posts': 1, 'messages': 3})
+        self.assertEqual(HelpPost.objects.count(), 3)
+        self.assertEqual(Message.objects.count(), 3)
+
+    def test_iter_chunks_keyset(self):
+        """Test that chunks cover every row once, in primary key order."""
+        ids = sorted(Message.objects.values_list('pk', flat=True))
+        chunks = list(iter_chunks(Message.objects.all(), 2))
+        self.assertEqual([len(chunk) for chunk in chunks], [2, 1])
+        self.assertEqual(sum(chunks, []), ids)
+
+    def test_iter_chunks_compound_keyset(self):
+        """Test chunking in (created_at, id) order, including rows sharing a timestamp."""
+        Message.objects.update(created_at=timezone.now() - timedelta(days=1))
+        ids = sorted(Message.objects.values_list('pk', flat=True))
+        chunks = list(iter_chunks(Message.objects.all(), 2, MESSAGE_KEYSET))
+        self.assertEqual([len(chunk) for chunk in chunks], [2, 1])
+        self.assertEqual(sum(chunks, []), ids)
+
+    def test_command_runs_enabled_policies(self):
+        """Test that the command only applies enabled policies and reports runs."""
+        RetentionPolicy.objects.create(org=self.org, help_post_days=365)
+        RetentionPolicy.objects.create(org=self.other_org, help_post_days=1, is_enabled=False)
+
+        out = StringIO()
+        call_command('apply_retention', '--pause', '0', stdout=out)
+
+        self.assertIn('test-org (delete): help_posts: 1', out.getvalue())
+        self.assertEqual(RetentionRun.objects.count(), 1)
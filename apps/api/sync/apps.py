@@ -0,0 +1,47 @@
+# KapwaNet - Community Platform for Dignified Mutual Aid
+# SPDX-License-Identifier: AGPL-3.0-or-later
+
+"""
+App configuration for delta sync.
+
+This module lets offline-capable clients fetch only what changed since
+their last sync.
+"""
+
+from functools import partial
+
+from django.apps import AppConfig
+from django.db.models.signals import post_delete, post_save
+
+
+class SyncConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'sync'
+    verbose_name = 'Delta Sync'
+
+    def ready(self):
+        from messaging.models import ThreadParticipant
+        from organizations.models import Membership
+        from .signals import (
+            record_deleted, record_membership_deleted, record_membership_ended,
+            record_participant_removed,
+        )
+        from .views import SYNC_COLLECTIONS
+
+        for collection in SYNC_COLLECTIONS:
+            post_delete.connect(
+                partial(record_deleted, collection=collection.name),
+                sender=collection.model,
+                weak=False,
+                dispatch_uid=f'sync.deleted.{collection.name}',
+            )
+        post_delete.connect(
+            record_participant_removed, sender=ThreadParticipant,
+            dispatch_uid='sync.participant_removed',
+        )
+        post_save.connect(
+            record_membership_ended, sender=Membership, dispatch_uid='sync.membership_ended',
+        )
+        post_delete.connect(
+            record_membership_deleted, sender=Membership, dispatch_uid='sync.membership_deleted',
+        )
@@ -0,0 +1,35 @@
+# KapwaNet - Community Platform for Dignified Mutual Aid
+# SPDX-License-Identifier: AGPL-3.0-or-later
+
+import django.utils.timezone
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SyncTombstone',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('collection', models.CharField(help_text="Sync collection name, or 'orgs' for a whole organization", max_length=50)),
+                ('object_id', models.CharField(help_text='Primary key of the removed row', max_length=64)),
+                ('org_id', models.UUIDField(help_text='Organization the row belonged to')),
+                ('user_id', models.UUIDField(blank=True, help_text='The only user the removal applies to, if any', null=True)),
+                ('updated_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+            options={
+                'verbose_name': 'sync tombstone',
+                'verbose_name_plural': 'sync tombstones',
+                'db_table': 'sync_tombstones',
+                'ordering': ['updated_at', 'id'],
+                'indexes': [models.Index(fields=['org_id', 'updated_at', 'id'], name='sync_tombst_org_id_088fba_idx'), models.Index(fields=['user_id', 'updated_at', 'id'], name='sync_tombst_user_id_5b685a_idx')],
+            },
+        ),
+    ]
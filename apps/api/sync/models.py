@@ -0,0 +1,62 @@
+# KapwaNet - Community Platform for Dignified Mutual Aid
+# SPDX-License-Identifier: AGPL-3.0-or-later
+
+"""
+Models for delta sync.
+"""
+
+import uuid
+
+from django.db import models
+from django.utils import timezone
+
+
+class SyncTombstone(models.Model):
+    """
+    A synced row that was deleted, or that left one user's view.
+
+    Status tombstones (a cancelled post) are found by the sync scan
+    itself, but a hard-deleted row leaves nothing to scan, and a row a
+    user can no longer see (a thread they were removed from, an org whose
+    membership ended) is filtered out of their scan. Both are recorded
+    here and sent as removals. Tombstones without a user apply to every
+    member of the org.
+    """
+
+    id = models.UUIDField(
+        primary_key=True,
+        default=uuid.uuid4,
+        editable=False
+    )
+    collection = models.CharField(
+        max_length=50,
+        help_text="Sync collection name, or 'orgs' for a whole organization"
+    )
+    object_id = models.CharField(
+        max_length=64,
+        help_text="Primary key of the removed row"
+    )
+    org_id = models.UUIDField(
+        help_text="Organization the row belonged to"
+    )
+    # Not a foreign key: tombstones are written while users and orgs are
+    # being deleted
+    user_id = models.UUIDField(
+        null=True,
+        blank=True,
+        help_text="The only user the removal applies to, if any"
+    )
+    updated_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        db_table = 'sync_tombstones'
+        ordering = ['updated_at', 'id']
+        verbose_name = 'sync tombstone'
+        verbose_name_plural = 'sync tombstones'
+        indexes = [
+            models.Index(fields=['org_id', 'updated_at', 'id']),
+            models.Index(fields=['user_id', 'updated_at', 'id']),
+        ]
+
+    def __str__(self):
+        return f"{self.collection} {self.object_id} removed"
@@ -0,0 +1,40 @@
+# KapwaNet - Community Platform for Dignified Mutual Aid
+# SPDX-License-Identifier: AGPL-3.0-or-later
+
+"""
+Signal receivers recording sync tombstones.
+
+Connected in SyncConfig.ready() for the models behind SYNC_COLLECTIONS,
+thread participants and memberships.
+"""
+
+from .models import SyncTombstone
+
+
+def record_deleted(sender, instance, collection, **kwargs):
+    """Record a deleted row of a synced model."""
+    SyncTombstone.objects.create(
+        collection=collection, object_id=str(instance.pk), org_id=instance.org_id
+    )
+
+
+def record_participant_removed(sender, instance, **kwargs):
+    """Record that a user no longer sees a thread they were removed from."""
+    SyncTombstone.objects.create(
+        collection='threads', object_id=str(instance.thread_id),
+        org_id=instance.org_id, user_id=instance.user_id,
+    )
+
+
+def record_membership_ended(sender, instance, **kwargs):
+    """Record that a user no longer syncs an org whose membership is not active."""
+    if instance.status != 'active':
+        record_membership_deleted(sender, instance)
+
+
+def record_membership_deleted(sender, instance, **kwargs):
+    """Record that a user no longer syncs an org they left."""
+    SyncTombstone.objects.create(
+        collection='orgs', object_id=str(instance.org_id),
+        org_id=instance.org_id, user_id=instance.user_id,
+    )
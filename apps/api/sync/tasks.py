@@ -0,0 +1,39 @@
+# KapwaNet - Community Platform for Dignified Mutual Aid
+# SPDX-License-Identifier: AGPL-3.0-or-later
+
+"""
+Background tasks for delta sync.
+"""
+
+from datetime import timedelta
+
+from django.conf import settings
+from django.utils import timezone
+
+from jobs.queue import periodic
+
+from .models import SyncTombstone
+
+
+def prune_tombstones(limit=None):
+    """
+    Delete one chunk of tombstones older than SYNC_TOMBSTONE_DAYS.
+
+    Returns:
+        The number of tombstones deleted
+    """
+    cutoff = timezone.now() - timedelta(days=settings.SYNC_TOMBSTONE_DAYS)
+    ids = list(SyncTombstone.objects.filter(
+        updated_at__lt=cutoff
+    ).order_by().values_list('pk', flat=True)[:limit or settings.RETENTION_CHUNK_SIZE])
+    if not ids:
+        return 0
+    deleted, _ = SyncTombstone.objects.filter(pk__in=ids).delete()
+    return deleted
+
+
+@periodic(interval=settings.SYNC_PRUNE_INTERVAL)
+def prune_sync_tombstones():
+    """Delete tombstones no valid sync token can still need."""
+    while prune_tombstones():
+        pass
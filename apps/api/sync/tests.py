@@ -0,0 +1,221 @@
+# KapwaNet - Community Platform for Dignified Mutual Aid
+# SPDX-License-Identifier: AGPL-3.0-or-later
+
+"""
+Tests for delta sync API.
+"""
+
+from datetime import timedelta
+
+from django.test import override_settings
+from django.utils import timezone
+from rest_framework.test import APITestCase
+from rest_framework import status
+
+from users.models import User
+from organizations.models import Organization, Membership
+from help.models import HelpPost
+from messaging.models import Thread, Message, ThreadParticipant
+
+from .models import SyncTombstone
+from .tasks import prune_tombstones
+from .views import decode_sync_token, encode_sync_token
+
+
+@override_settings(SYNC_LAG=0)
+class SyncAPITests(APITestCase):
+    """Tests for the /api/sync/ endpoint."""
+
+    def setUp(self):
+        """Set up test data."""
+        self.user = User.objects.create_user(
+            email='test@example.com',
+            password='testpass123'
+        )
+        self.other_user = User.objects.create_user(
+            email='other@example.com',
+            password='testpass123'
+        )
+        self.org = Organization.objects.create(
+            name='Test Organization',
+            slug='test-org'
+        )
+        Membership.objects.create(org=self.org, user=self.user, role='member', status='active')
+        Membership.objects.create(org=self.org, user=self.other_user, role='member', status='active')
+
+    def get_token(self, user):
+        """Get JWT token for a user."""
+        response = self.client.post('/api/token/', {
+            'email': user.email,
+            'password': 'testpass123'
+        })
+        return response.data['access']
+
+    def create_post(self, title='Need a ride'):
+        """Create a help post by the test user."""
+        return HelpPost.objects.create(
+            org=self.org,
+            type='request',
+            category='transportation',
+            title=title,
+            description='Test',
+            created_by=self.user
+        )
+
+    def test_full_then_delta_sync(self):
+        """Test that a second sync only returns what changed."""
+        self.create_post('First')
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {self.get_token(self.user)}')
+
+        response = self.client.get('/api/sync/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data['collections']['help_posts']['changed']), 1)
+        self.assertFalse(response.data['has_more'])
+        token = response.data['next']
+
+        # Nothing changed
+        response = self.client.get(f'/api/sync/?since={token}')
+        self.assertEqual(response.data['collections']['help_posts']['changed'], [])
+
+        # A new post shows up on the next delta
+        self.create_post('Second')
+        response = self.client.get(f'/api/sync/?since={token}')
+        changed = response.data['collections']['help_posts']['changed']
+        self.assertEqual([p['title'] for p in changed], ['Second'])
+
+    def test_tombstones(self):
+        """Test that cancelled posts and hidden messages come back as removals."""
+        post = self.create_post()
+        thread, _ = Thread.get_or_create_direct(self.org, self.user, self.other_user)
+        message = Message.send_user_message(thread, self.other_user, 'Hello')
+
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {self.get_token(self.user)}')
+        token = self.client.get('/api/sync/').data['next']
+
+        post.cancel()
+        message.is_hidden = True
+        message.save(update_fields=['is_hidden', 'updated_at'])
+
+        response = self.client.get(f'/api/sync/?since={token}')
+        collections = response.data['collections']
+        self.assertEqual(collections['help_posts']['removed'], [str(post.id)])
+        self.assertEqual(collections['help_posts']['changed'], [])
+        self.assertEqual(collections['messages']['removed'], [str(message.id)])
+
+    def test_pagination_with_continuation(self):
+        """Test that pages are bounded and the token continues the scan."""
+        for i in range(3):
+            self.create_post(f'Post {i}')
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {self.get_token(self.user)}')
+
+        seen = []
+        url = '/api/sync/?limit=2'
+        while True:
+            response = self.client.get(url)
+            seen += [p['id'] for p in response.data['collections']['help_posts']['changed']]
+            if not response.data['has_more']:
+                break
+            url = f"/api/sync/?limit=2&since={response.data['next']}"
+
+        self.assertEqual(len(seen), 3)
+        self.assertEqual(len(set(seen)), 3)
+
+    def test_only_visible_threads(self):
+        """Test that threads the user is not in are not synced."""
+        third = User.objects.create_user(email='third@example.com', password='testpass123')
+        Membership.objects.create(org=self.org, user=third, role='member', status='active')
+        Thread.get_or_create_direct(self.org, self.other_user, third)
+
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {self.get_token(self.user)}')
+        response = self.client.get('/api/sync/')
+        self.assertEqual(response.data['collections']['threads']['changed'], [])
+        self.assertEqual(response.data['collections']['messages']['changed'], [])
+
+    def test_invalid_token(self):
+        """Test that a malformed token is rejected."""
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {self.get_token(self.user)}')
+        response = self.client.get('/api/sync/?since=not-a-token')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_invalid_limit(self):
+        """Test that a non-integer limit is rejected."""
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {self.get_token(self.user)}')
+        response = self.client.get('/api/sync/?limit=ten')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_hard_delete_tombstone(self):
+        """Test that a deleted post comes back as a removal."""
+        post = self.create_post()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {self.get_token(self.user)}')
+        token = self.client.get('/api/sync/').data['next']
+
+        post_id = str(post.id)
+        post.delete()
+
+        response = self.client.get(f'/api/sync/?since={token}')
+        self.assertEqual(response.data['collections']['help_posts']['removed'], [post_id])
+
+        # Sent once
+        response = self.client.get(f"/api/sync/?since={response.data['next']}")
+        self.assertEqual(response.data['collections']['help_posts']['removed'], [])
+
+    def test_scope_exit_tombstones(self):
+        """Test that leaving a thread or an org is sent to that user only."""
+        thread, _ = Thread.get_or_create_direct(self.org, self.user, self.other_user)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {self.get_token(self.user)}')
+        token = self.client.get('/api/sync/').data['next']
+        other_client = self.client_class()
+        other_client.credentials(HTTP_AUTHORIZATION=f'Bearer {self.get_token(self.other_user)}')
+        other_token = other_client.get('/api/sync/').data['next']
+
+        ThreadParticipant.objects.filter(thread=thread, user=self.user).delete()
+        membership = Membership.objects.get(org=self.org, user=self.user)
+        membership.status = 'suspended'
+        membership.save()
+
+        response = self.client.get(f'/api/sync/?since={token}')
+        self.assertEqual(response.data['collections']['threads']['removed'], [str(thread.id)])
+        self.assertEqual(response.data['removed_orgs'], [str(self.org.id)])
+
+        other = other_client.get(f'/api/sync/?since={other_token}')
+        self.assertEqual(other.data['collections']['threads']['removed'], [])
+        self.assertEqual(other.data['removed_orgs'], [])
+
+    @override_settings(SYNC_LAG=60)
+    def test_recent_writes_held_back(self):
+        """Test that rows newer than SYNC_LAG wait for a later sync."""
+        post = self.create_post()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {self.get_token(self.user)}')
+
+        response = self.client.get('/api/sync/')
+        self.assertEqual(response.data['collections']['help_posts']['changed'], [])
+        token = response.data['next']
+
+        HelpPost.objects.filter(pk=post.pk).update(
+            updated_at=timezone.now() - timedelta(seconds=120)
+        )
+        response = self.client.get(f'/api/sync/?since={token}')
+        changed = response.data['collections']['help_posts']['changed']
+        self.assertEqual([p['id'] for p in changed], [str(post.id)])
+
+    def test_expired_token(self):
+        """Test that a token older than the kept tombstones must start over."""
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {self.get_token(self.user)}')
+        cursors = decode_sync_token(self.client.get('/api/sync/').data['next'])
+        updated_at, last_id = cursors['removed']
+        cursors['removed'] = (updated_at - timedelta(days=31), last_id)
+
+        response = self.client.get(f'/api/sync/?since={encode_sync_token(cursors)}')
+        self.assertEqual(response.status_code, status.HTTP_410_GONE)
+
+    def test_prune_tombstones(self):
+        """Test that only tombstones past SYNC_TOMBSTONE_DAYS are pruned."""
+        old = SyncTombstone.objects.create(
+            collection='help_posts', object_id='1', org_id=self.org.id,
+            updated_at=timezone.now() - timedelta(days=31),
+        )
+        SyncTombstone.objects.create(collection='help_posts', object_id='2', org_id=self.org.id)
+
+        self.assertEqual(prune_tombstones(), 1)
+        self.assertFalse(SyncTombstone.objects.filter(pk=old.pk).exists())
+        self.assertEqual(SyncTombstone.objects.count(), 1)
@@ -0,0 +1,14 @@
+# KapwaNet - Community Platform for Dignified Mutual Aid
+# SPDX-License-Identifier: AGPL-3.0-or-later
+
+"""
+URL configuration for delta sync API.
+"""
+
+from django.urls import path
+
+from .views import SyncView
+
+urlpatterns = [
+    path('', SyncView.as_view(), name='sync'),
+]
@@ -0,0 +1,351 @@
+# KapwaNet - Community Platform for Dignified Mutual Aid
+# SPDX-License-Identifier: AGPL-3.0-or-later
+
+"""
+Views for delta sync API.
+
+GET /api/sync/?since=<token> returns the help posts, item posts, matches,
+reservations, threads and messages visible to the caller that changed
+since the token was issued. Each collection is scanned in
+(updated_at, id) order using the per-org updated_at indexes, so a
+reconnecting client only transfers what actually changed.
+
+Rows that the client should drop are returned as tombstones in
+`removed` instead of `changed`: cancelled posts and reservations,
+withdrawn matches and hidden messages are found by the scan itself, while
+hard-deleted rows, threads the caller was removed from and orgs whose
+membership ended are read from SyncTombstone (see signals.py). Clients
+apply `removed` before `changed`.
+
+Response:
+    {
+        "collections": {
+            "help_posts": {"changed": [...], "removed": ["<id>", ...]},
+            ...
+        },
+        "removed_orgs": ["<org id>", ...],
+        "next": "<token>",
+        "has_more": false
+    }
+
+Clients keep calling with `since=<next>` while `has_more` is true, then
+store `next` for the following sync. Omitting `since` starts a full
+(paged) download.
+
+Rows written in the last SYNC_LAG seconds are held back until the next
+sync: a transaction that commits after a later one would otherwise land
+behind a cursor that has already moved past its updated_at. Tombstones
+are kept for SYNC_TOMBSTONE_DAYS; an older token gets 410 and the client
+starts over with a full sync.
+"""
+
+import base64
+import binascii
+import json
+import uuid
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import BooleanField, Case, Q, Value, When
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from rest_framework import status
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from help.models import HelpPost, HelpMatch
+from help.serializers import HelpPostListSerializer, HelpMatchListSerializer
+from items.models import ItemPost, ItemReservation
+from items.serializers import ItemPostListSerializer, ItemReservationListSerializer
+from messaging.models import Thread, Message
+from messaging.serializers import ThreadListSerializer, MessageSerializer
+from organizations.cache import resolve_org_id
+from organizations.models import Membership
+from organizations.permissions import OrgMembershipPermission
+
+from .models import SyncTombstone
+
+# Token key of the SyncTombstone cursor
+REMOVED = 'removed'
+
+
+class SyncCollection:
+    """
+    Describes one collection returned by the sync endpoint.
+
+    Args:
+        name: Key used in the response and in the sync token
+        model: The model class to scan
+        serializer_class: Serializer used for changed rows
+        scope: Callable (user) -> Q restricting rows to those the user can see
+        tombstone: Optional Q matching rows that should be sent as removals
+        select_related: Relations the serializer reads
+        annotate: Optional callable (queryset, user) -> queryset adding the
+            annotations the serializer reads
+    """
+
+    def __init__(self, name, model, serializer_class, scope, tombstone=None,
+                 select_related=(), annotate=None):
+        self.name = name
+        self.model = model
+        self.serializer_class = serializer_class
+        self.scope = scope
+        self.tombstone = tombstone
+        self.select_related = select_related
+        self.annotate = annotate
+
+    def get_queryset(self, user, org_ids, cursor, horizon):
+        """Get visible rows changed after the cursor and up to the horizon, in keyset order."""
+        queryset = self.model.objects.filter(
+            org_id__in=org_ids, updated_at__lte=horizon
+        ).filter(self.scope(user)).select_related(*self.select_related)
+        if self.annotate is not None:
+            queryset = self.annotate(queryset, user)
+
+        queryset = after_cursor(queryset, cursor)
+
+        if self.tombstone is not None:
+            queryset = queryset.annotate(
+                is_tombstone=Case(
+                    When(self.tombstone, then=Value(True)),
+                    default=Value(False),
+                    output_field=BooleanField(),
+                )
+            )
+        else:
+            queryset = queryset.annotate(is_tombstone=Value(False))
+
+        return queryset.order_by('updated_at', 'id')
+
+
+SYNC_COLLECTIONS = [
+    SyncCollection(
+        name='help_posts',
+        model=HelpPost,
+        serializer_class=HelpPostListSerializer,
+        scope=lambda user: Q(),
+        tombstone=Q(status='cancelled'),
+        select_related=['created_by'],
+        annotate=lambda queryset, user: queryset.with_pending_match_count(),
+    ),
+    SyncCollection(
+        name='help_matches',
+        model=HelpMatch,
+        serializer_class=HelpMatchListSerializer,
+        scope=lambda user: Q(helper_user=user) | Q(help_post__created_by=user),
+        tombstone=Q(status='withdrawn'),
+        select_related=['help_post', 'helper_user'],
+    ),
+    SyncCollection(
+        name='item_posts',
+        model=ItemPost,
+        serializer_class=ItemPostListSerializer,
+        scope=lambda user: Q(),
+        tombstone=Q(status='cancelled'),
+        select_related=['created_by'],
+        annotate=lambda queryset, user: queryset.with_pending_reservation_count(),
+    ),
+    SyncCollection(
+        name='item_reservations',
+        model=ItemReservation,
+        serializer_class=ItemReservationListSerializer,
+        scope=lambda user: Q(requester=user) | Q(item_post__created_by=user),
+        tombstone=Q(status='cancelled'),
+        select_related=['item_post', 'requester'],
+    ),
+    SyncCollection(
+        name='threads',
+        model=Thread,
+        serializer_class=ThreadListSerializer,
+        scope=lambda user: Thread.visible_filter(user),
+        annotate=lambda queryset, user: queryset.for_list(user),
+    ),
+    SyncCollection(
+        name='messages',
+        model=Message,
+        serializer_class=MessageSerializer,
+        scope=lambda user: Q(thread__in=Thread.objects.filter(
+            Thread.visible_filter(user)
+        ).values('id')),
+        tombstone=Q(is_hidden=True),
+        select_related=['sender_user'],
+    ),
+]
+
+
+def after_cursor(queryset, cursor):
+    """Filter a queryset to rows after an (updated_at, id) cursor."""
+    if not cursor:
+        return queryset
+    updated_at, last_id = cursor
+    return queryset.filter(
+        Q(updated_at__gt=updated_at) |
+        Q(updated_at=updated_at, id__gt=last_id)
+    )
+
+
+def get_tombstones(user, org_ids, cursor, horizon):
+    """Get the caller's tombstones recorded after the cursor, in keyset order."""
+    queryset = SyncTombstone.objects.filter(
+        Q(user_id=user.pk) | Q(user_id__isnull=True, org_id__in=org_ids),
+        updated_at__lte=horizon,
+    )
+    return after_cursor(queryset, cursor).order_by('updated_at', 'id')
+
+
+def encode_sync_token(cursors):
+    """Encode per-collection (updated_at, id) cursors as an opaque token."""
+    payload = {
+        name: [updated_at.isoformat(), str(last_id)]
+        for name, (updated_at, last_id) in cursors.items()
+    }
+    raw = json.dumps(payload, separators=(',', ':')).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_sync_token(token):
+    """
+    Decode a sync token into per-collection cursors.
+
+    Raises ValueError if the token is malformed.
+    """
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (binascii.Error, UnicodeDecodeError, json.JSONDecodeError) as e:
+        raise ValueError("Invalid sync token.") from e
+
+    if not isinstance(payload, dict):
+        raise ValueError("Invalid sync token.")
+
+    cursors = {}
+    for name, value in payload.items():
+        if not isinstance(value, list) or len(value) != 2:
+            raise ValueError("Invalid sync token.")
+        try:
+            updated_at = parse_datetime(str(value[0]))
+            last_id = uuid.UUID(str(value[1]))
+        except ValueError as e:
+            raise ValueError("Invalid sync token.") from e
+        if updated_at is None:
+            raise ValueError("Invalid sync token.")
+        cursors[name] = (updated_at, last_id)
+    return cursors
+
+
+class SyncView(APIView):
+    """
+    Delta sync endpoint for offline-capable clients.
+
+    Query params:
+        since: Token from a previous response (omit for a full sync)
+        org: Optional organization ID or slug to restrict the sync to
+        limit: Max rows per collection (default SYNC_PAGE_SIZE)
+    """
+
+    permission_classes = [OrgMembershipPermission]
+
+    def get(self, request):
+        """Return changes since the given token."""
+        cursors = {}
+        since = request.query_params.get('since')
+        if since:
+            try:
+                cursors = decode_sync_token(since)
+            except ValueError as e:
+                return Response(
+                    {'detail': str(e)},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+
+        try:
+            limit = int(request.query_params.get('limit', settings.SYNC_PAGE_SIZE))
+        except ValueError:
+            return Response(
+                {'detail': "limit must be an integer."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        limit = max(1, min(limit, settings.SYNC_MAX_PAGE_SIZE))
+
+        now = timezone.now()
+        horizon = now - timedelta(seconds=settings.SYNC_LAG)
+        if since:
+            # Tokens from before tombstones were recorded have no cursor
+            # for them, and older ones may have missed pruned tombstones
+            expiry = now - timedelta(days=settings.SYNC_TOMBSTONE_DAYS)
+            if REMOVED not in cursors or cursors[REMOVED][0] < expiry:
+                return Response(
+                    {'detail': "Sync token expired; start a full sync."},
+                    status=status.HTTP_410_GONE
+                )
+        else:
+            # A full download has nothing to remove from before it started
+            cursors[REMOVED] = (horizon, uuid.UUID(int=0))
+
+        org_ids = self.get_org_ids(request)
+
+        has_more = False
+        tombstones = list(get_tombstones(
+            request.user, org_ids, cursors[REMOVED], horizon
+        )[:limit + 1])
+        if len(tombstones) > limit:
+            has_more = True
+            tombstones = tombstones[:limit]
+            cursors[REMOVED] = (tombstones[-1].updated_at, tombstones[-1].pk)
+        else:
+            # Everything up to the horizon has been sent; moving the cursor
+            # there keeps quiet clients' tokens from expiring
+            positions = [cursors[REMOVED], (horizon, uuid.UUID(int=0))]
+            if tombstones:
+                positions.append((tombstones[-1].updated_at, tombstones[-1].pk))
+            cursors[REMOVED] = max(positions)
+
+        collections = {}
+        for collection in SYNC_COLLECTIONS:
+            cursor = cursors.get(collection.name)
+            queryset = collection.get_queryset(request.user, org_ids, cursor, horizon)
+            rows = list(queryset[:limit + 1])
+
+            if len(rows) > limit:
+                has_more = True
+                rows = rows[:limit]
+
+            changed = [row for row in rows if not row.is_tombstone]
+            removed = [str(row.pk) for row in rows if row.is_tombstone]
+            removed += [
+                tombstone.object_id for tombstone in tombstones
+                if tombstone.collection == collection.name
+            ]
+            collections[collection.name] = {
+                'changed': collection.serializer_class(
+                    changed, many=True, context={'request': request}
+                ).data,
+                'removed': removed,
+            }
+
+            if rows:
+                cursor = (rows[-1].updated_at, str(rows[-1].pk))
+            if cursor:
+                cursors[collection.name] = cursor
+
+        return Response({
+            'collections': collections,
+            'removed_orgs': [
+                tombstone.object_id for tombstone in tombstones
+                if tombstone.collection == 'orgs'
+            ],
+            'next': encode_sync_token(cursors),
+            'has_more': has_more,
+        })
+
+    def get_org_ids(self, request):
+        """Get the organizations to sync: the requested one or all active memberships."""
+        org_param = request.query_params.get('org')
+        if org_param:
+            org_id = resolve_org_id(org_param)
+            return [org_id] if org_id else []
+
+        return list(Membership.objects.filter(
+            user=request.user,
+            status='active'
+        ).values_list('org_id', flat=True))
@@ -0,0 +1,87 @@
+# KapwaNet - Community Platform for Dignified Mutual Aid
+# SPDX-License-Identifier: AGPL-3.0-or-later
+
+"""
+Destination checks for webhook URLs.
+
+Subscriptions are created by org admins, so a webhook URL must not let
+them make the server send requests into its own network (loopback, the
+database or cache on a private address, cloud metadata on link-local
+addresses). check_url() is run when a subscription is saved and again
+before every send, since DNS can change in between. A send then connects
+to an address that was checked rather than resolving the host again, so
+a DNS answer that changes between the check and the connection (DNS
+rebinding) cannot redirect it. Deliveries never follow redirects.
+
+WEBHOOK_ALLOW_PRIVATE_URLS turns the address check off for local
+development and tests against a receiver on localhost.
+"""
+
+import ipaddress
+import socket
+from urllib.parse import urlsplit
+
+from django.conf import settings
+
+ALLOWED_SCHEMES = ('http', 'https')
+
+
+class UnsafeURL(Exception):
+    """A webhook URL points somewhere deliveries must not go."""
+
+
+def is_public(address):
+    """Whether an IP address is globally routable."""
+    ip = ipaddress.ip_address(address)
+    if ip.version == 6 and ip.ipv4_mapped:
+        ip = ip.ipv4_mapped
+    return ip.is_global and not ip.is_multicast
+
+
+def check_url(url):
+    """
+    Check that a webhook URL is http(s) and every address its host
+    resolves to is public.
+
+    Returns:
+        The checked addresses, or None when WEBHOOK_ALLOW_PRIVATE_URLS
+        skips the check
+
+    Raises:
+        UnsafeURL: with a message safe to show to the subscriber
+    """
+    parts = urlsplit(url)
+    if parts.scheme not in ALLOWED_SCHEMES:
+        raise UnsafeURL('Webhook URLs must use http or https.')
+    if not parts.hostname:
+        raise UnsafeURL('Webhook URL has no host.')
+    if settings.WEBHOOK_ALLOW_PRIVATE_URLS:
+        return None
+
+    try:
+        port = parts.port or (443 if parts.scheme == 'https' else 80)
+        infos = socket.getaddrinfo(parts.hostname, port, proto=socket.IPPROTO_TCP)
+        addresses = list(dict.fromkeys(info[4][0].split('%', 1)[0] for info in infos))
+    except (OSError, ValueError):
+        raise UnsafeURL('Webhook host could not be resolved.')
+    if not addresses or not all(is_public(address) for address in addresses):
+        raise UnsafeURL('Webhook host resolves to a private or reserved address.')
+    return addresses
+
+
+def pin_url(url, address):
+    """
+    Point a URL at a checked IP address.
+
+    Returns:
+        A tuple of (URL with the address as its host, the original Host
+        header value)
+    """
+    parts = urlsplit(url)
+    userinfo, _, netloc = parts.netloc.rpartition('@')
+    host = f'[{address}]' if ':' in address else address
+    if parts.port:
+        host = f'{host}:{parts.port}'
+    if userinfo:
+        host = f'{userinfo}@{host}'
+    return parts._replace(netloc=host).geturl(), netloc
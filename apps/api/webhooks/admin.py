@@ -0,0 +1,32 @@
+# KapwaNet - Community Platform for Dignified Mutual Aid
+# SPDX-License-Identifier: AGPL-3.0-or-later
+
+"""
+Admin configuration for webhooks.
+"""
+
+from django.contrib import admin
+
+from .models import WebhookSubscription, WebhookDelivery
+
+
+@admin.register(WebhookSubscription)
+class WebhookSubscriptionAdmin(admin.ModelAdmin):
+    """Admin configuration for WebhookSubscription model."""
+
+    list_display = ['url', 'org', 'is_active', 'created_at']
+    list_filter = ['is_active', 'org']
+    search_fields = ['url', 'description']
+    readonly_fields = ['id', 'secret', 'created_by', 'created_at', 'updated_at']
+
+
+@admin.register(WebhookDelivery)
+class WebhookDeliveryAdmin(admin.ModelAdmin):
+    """Admin configuration for WebhookDelivery model."""
+
+    list_display = ['id', 'subscription', 'status', 'event_count', 'attempts', 'response_status', 'created_at']
+    list_filter = ['status']
+    readonly_fields = [
+        'id', 'subscription', 'payload', 'event_count', 'status', 'attempts',
+        'next_attempt_at', 'response_status', 'last_error', 'created_at', 'delivered_at'
+    ]
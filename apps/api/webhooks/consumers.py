@@ -0,0 +1,16 @@
+# KapwaNet - Community Platform for Dignified Mutual Aid
+# SPDX-License-Identifier: AGPL-3.0-or-later
+
+"""
+Outbox consumers for webhooks.
+"""
+
+from events.outbox import consumer
+
+from .delivery import schedule_deliveries
+
+
+@consumer('webhooks')
+def fan_out(events):
+    """Record webhook deliveries for a batch of events."""
+    schedule_deliveries(events)
@@ -0,0 +1,266 @@
+# KapwaNet - Community Platform for Dignified Mutual Aid
+# SPDX-License-Identifier: AGPL-3.0-or-later
+
+"""
+Webhook fan-out and delivery.
+
+The `webhooks` outbox consumer (consumers.py) groups each batch of events
+by subscription and records one WebhookDelivery per subscription, so a
+partner receives many events per POST. It then queues a job that sends
+the new deliveries concurrently from a thread pool sharing one pooled
+HTTP session.
+
+Each request carries:
+
+    X-KapwaNet-Delivery: <delivery id>
+    X-KapwaNet-Signature: t=<unix time>,v1=<hex HMAC-SHA256 of "<t>.<body>">
+
+Receivers should recompute the signature with their secret and reject
+stale timestamps. Redirects are not followed, and the URL's addresses are
+checked again before each send, which connects to a checked address with
+the URL's host kept for the Host header, SNI and certificate checks (see
+addresses.py).
+
+Non-2xx responses and network errors are retried with exponential
+backoff, up to WEBHOOK_MAX_ATTEMPTS. Retries do not get a job of their
+own: workers periodically send every pending delivery that is due
+(retry_due_deliveries), which also works with JOBS_SYNC. Only the status
+code or the kind of network error is recorded, never the response body.
+"""
+
+import hashlib
+import hmac
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from urllib.parse import urlsplit
+
+import requests
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.utils import timezone
+
+from jobs.queue import enqueue
+from .addresses import UnsafeURL, check_url, pin_url
+from .models import WebhookDelivery, WebhookSubscription
+
+# Longest wait between attempts
+MAX_RETRY_DELAY = 6 * 60 * 60
+
+# How long a claimed retry is hidden from other workers' sweeps
+RETRY_LEASE = timedelta(minutes=5)
+
+_session = None
+_session_lock = threading.Lock()
+
+
+class PinnedHostAdapter(requests.adapters.HTTPAdapter):
+    """
+    HTTPAdapter for URLs pinned to an IP address by addresses.pin_url.
+
+    For https, TLS uses the name in the Host header for SNI and the
+    certificate check instead of the address in the URL.
+    """
+
+    def build_connection_pool_key_attributes(self, request, verify, cert=None):
+        host_params, pool_kwargs = super().build_connection_pool_key_attributes(request, verify, cert)
+        host = request.headers.get('Host')
+        if host and host_params['scheme'] == 'https':
+            hostname = urlsplit(f'//{host}').hostname
+            pool_kwargs['server_hostname'] = hostname
+            pool_kwargs['assert_hostname'] = hostname
+        return host_params, pool_kwargs
+
+
+def get_session():
+    """Get the shared HTTP session, with a connection pool per host."""
+    global _session
+    with _session_lock:
+        if _session is None:
+            session = requests.Session()
+            adapter = PinnedHostAdapter(
+                pool_connections=settings.WEBHOOK_CONCURRENCY,
+                pool_maxsize=settings.WEBHOOK_CONCURRENCY,
+            )
+            session.mount('http://', adapter)
+            session.mount('https://', adapter)
+            session.headers['User-Agent'] = 'KapwaNet-Webhooks/1.0'
+            _session = session
+        return _session
+
+
+def sign(secret, timestamp, body):
+    """Compute the signature header value for a request body."""
+    message = f'{timestamp}.'.encode() + body
+    digest = hmac.new(secret.encode(), message, hashlib.sha256).hexdigest()
+    return f't={timestamp},v1={digest}'
+
+
+def serialize_event(event):
+    """Render an outbox event for a webhook body."""
+    return {
+        'id': event.id,
+        'type': event.event_type,
+        'org': event.org_id,
+        'object_type': event.aggregate_type,
+        'object_id': event.aggregate_id,
+        'created_at': event.created_at,
+        'data': event.payload,
+    }
+
+
+def schedule_deliveries(events):
+    """
+    Record deliveries of a batch of outbox events and queue sending them.
+
+    Returns:
+        The created WebhookDelivery records
+    """
+    org_ids = {event.org_id for event in events if event.org_id}
+    if not org_ids:
+        return []
+
+    size = settings.WEBHOOK_MAX_EVENTS_PER_DELIVERY
+    deliveries = []
+    subscriptions = WebhookSubscription.objects.filter(org_id__in=org_ids, is_active=True)
+    for subscription in subscriptions:
+        matching = [event for event in events if subscription.accepts(event)]
+        for start in range(0, len(matching), size):
+            chunk = matching[start:start + size]
+            deliveries.append(WebhookDelivery(
+                subscription=subscription,
+                payload={'events': [serialize_event(event) for event in chunk]},
+                event_count=len(chunk),
+            ))
+
+    if deliveries:
+        WebhookDelivery.objects.bulk_create(deliveries)
+        job = ('webhooks.deliver_webhooks', {
+            'delivery_ids': [str(delivery.id) for delivery in deliveries],
+        })
+        if settings.JOBS_SYNC:
+            # The job would send inline, inside the relay's transaction and
+            # while it holds the consumer's offset lock
+            transaction.on_commit(lambda: enqueue(*job))
+        else:
+            enqueue(*job)
+    return deliveries
+
+
+def post_delivery(delivery):
+    """
+    Send one delivery. Runs in a pool thread, so it does not touch the database.
+
+    Returns:
+        A tuple of (response status or None, error message)
+    """
+    url = delivery.subscription.url
+    try:
+        addresses = check_url(url)
+    except UnsafeURL as e:
+        return None, str(e)
+
+    body = json.dumps(
+        {'delivery_id': str(delivery.id), **delivery.payload},
+        cls=DjangoJSONEncoder,
+        separators=(',', ':'),
+    ).encode()
+    headers = {
+        'Content-Type': 'application/json',
+        'X-KapwaNet-Delivery': str(delivery.id),
+        'X-KapwaNet-Signature': sign(delivery.subscription.secret, int(time.time()), body),
+    }
+    if addresses:
+        # Connect to the address just checked; resolving again could give another
+        url, headers['Host'] = pin_url(url, addresses[0])
+    try:
+        response = get_session().post(
+            url,
+            data=body,
+            headers=headers,
+            timeout=settings.WEBHOOK_TIMEOUT,
+            allow_redirects=False,
+        )
+    except requests.RequestException as e:
+        return None, f'Request failed ({type(e).__name__})'
+    if 200 <= response.status_code < 300:
+        return response.status_code, ''
+    return response.status_code, f'HTTP {response.status_code}'
+
+
+def record_attempt(delivery, response_status, error):
+    """Store the outcome of an attempt, scheduling a retry if needed."""
+    delivery.attempts += 1
+    delivery.response_status = response_status
+    delivery.last_error = error
+
+    if response_status is not None and 200 <= response_status < 300:
+        delivery.status = 'succeeded'
+        delivery.delivered_at = timezone.now()
+    elif delivery.attempts >= settings.WEBHOOK_MAX_ATTEMPTS:
+        delivery.status = 'failed'
+    else:
+        delay = min(settings.WEBHOOK_RETRY_DELAY * 2 ** (delivery.attempts - 1), MAX_RETRY_DELAY)
+        delivery.next_attempt_at = timezone.now() + timedelta(seconds=delay)
+
+    delivery.save(update_fields=[
+        'attempts', 'response_status', 'last_error', 'status',
+        'delivered_at', 'next_attempt_at',
+    ])
+
+
+def send(deliveries):
+    """Send deliveries concurrently and record the outcomes."""
+    if not deliveries:
+        return 0
+
+    workers = min(settings.WEBHOOK_CONCURRENCY, len(deliveries))
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        results = list(pool.map(post_delivery, deliveries))
+
+    for delivery, (response_status, error) in zip(deliveries, results):
+        record_attempt(delivery, response_status, error)
+    return len(deliveries)
+
+
+def claim(deliveries, limit=None):
+    """
+    Claim the due, pending deliveries among a queryset for sending.
+
+    next_attempt_at is pushed forward by RETRY_LEASE in the claiming
+    transaction and rows another worker is claiming are skipped, so the
+    initial send job and retry sweeps never send a delivery twice.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        ids = list(
+            deliveries.filter(status='pending', next_attempt_at__lte=now)
+            .select_for_update(skip_locked=True)
+            .order_by('next_attempt_at')
+            .values_list('id', flat=True)[:limit]
+        )
+        WebhookDelivery.objects.filter(id__in=ids).update(next_attempt_at=now + RETRY_LEASE)
+    return list(WebhookDelivery.objects.filter(id__in=ids).select_related('subscription'))
+
+
+def deliver(delivery_ids):
+    """
+    Send the due, pending deliveries among delivery_ids concurrently.
+
+    Returns:
+        The number of deliveries attempted
+    """
+    return send(claim(WebhookDelivery.objects.filter(id__in=delivery_ids)))
+
+
+def retry_due_deliveries(limit=100):
+    """
+    Send up to limit pending deliveries whose next attempt is due.
+
+    Returns:
+        The number of deliveries attempted
+    """
+    return send(claim(WebhookDelivery.objects.all(), limit))
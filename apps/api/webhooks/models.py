@@ -0,0 +1,151 @@
+# KapwaNet - Community Platform for Dignified Mutual Aid
+# SPDX-License-Identifier: AGPL-3.0-or-later
+
+"""
+Models for outbound webhooks.
+"""
+
+import secrets
+import uuid
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import models
+from django.utils import timezone
+
+
+def generate_secret():
+    """Generate a webhook signing secret."""
+    return secrets.token_hex(32)
+
+
+class WebhookSubscription(models.Model):
+    """
+    An organization's subscription to domain events.
+
+    Matching events are POSTed to url in batches, signed with secret.
+    """
+
+    id = models.UUIDField(
+        primary_key=True,
+        default=uuid.uuid4,
+        editable=False
+    )
+    org = models.ForeignKey(
+        'organizations.Organization',
+        on_delete=models.CASCADE,
+        related_name='webhook_subscriptions',
+        help_text="The organization whose events are delivered"
+    )
+    url = models.URLField(
+        max_length=500,
+        help_text="Endpoint events are POSTed to"
+    )
+    secret = models.CharField(
+        max_length=64,
+        default=generate_secret,
+        help_text="Key used to sign deliveries (HMAC-SHA256)"
+    )
+    event_types = models.JSONField(
+        default=list,
+        blank=True,
+        help_text="Event types to deliver (empty for all)"
+    )
+    filters = models.JSONField(
+        default=dict,
+        blank=True,
+        help_text="Payload conditions, e.g. {\"urgency\": [\"high\", \"urgent\"]}"
+    )
+    description = models.CharField(max_length=255, blank=True)
+    is_active = models.BooleanField(default=True)
+    created_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='+'
+    )
+
+    # Timestamps
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'webhook_subscriptions'
+        ordering = ['-created_at']
+        verbose_name = 'webhook subscription'
+        verbose_name_plural = 'webhook subscriptions'
+        indexes = [
+            models.Index(fields=['org', 'is_active']),
+        ]
+
+    def __str__(self):
+        return f"Webhook {self.url} for {self.org}"
+
+    def accepts(self, event):
+        """Check whether an outbox event should be delivered to this subscription."""
+        if event.org_id != self.org_id or event.created_at < self.created_at:
+            return False
+        if self.event_types and event.event_type not in self.event_types:
+            return False
+        for key, allowed in self.filters.items():
+            allowed = allowed if isinstance(allowed, list) else [allowed]
+            if event.payload.get(key) not in allowed:
+                return False
+        return True
+
+
+class WebhookDelivery(models.Model):
+    """
+    One POST of a batch of events to a subscription, and its outcome.
+    """
+
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('succeeded', 'Succeeded'),
+        ('failed', 'Failed'),
+    ]
+
+    id = models.UUIDField(
+        primary_key=True,
+        default=uuid.uuid4,
+        editable=False
+    )
+    subscription = models.ForeignKey(
+        WebhookSubscription,
+        on_delete=models.CASCADE,
+        related_name='deliveries'
+    )
+    payload = models.JSONField(
+        encoder=DjangoJSONEncoder,
+        help_text="Request body"
+    )
+    event_count = models.PositiveIntegerField(default=0)
+    status = models.CharField(
+        max_length=20,
+        choices=STATUS_CHOICES,
+        default='pending'
+    )
+
+    # Attempts
+    attempts = models.PositiveIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    response_status = models.PositiveIntegerField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
+
+    # Timestamps
+    created_at = models.DateTimeField(auto_now_add=True)
+    delivered_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        db_table = 'webhook_deliveries'
+        ordering = ['-created_at']
+        verbose_name = 'webhook delivery'
+        verbose_name_plural = 'webhook deliveries'
+        indexes = [
+            models.Index(fields=['subscription', 'created_at']),
+            models.Index(fields=['status', 'next_attempt_at']),
+        ]
+
+    def __str__(self):
+        return f"Delivery {self.id} ({self.status})"
@@ -0,0 +1,82 @@
+# KapwaNet - Community Platform for Dignified Mutual Aid
+# SPDX-License-Identifier: AGPL-3.0-or-later
+
+"""
+Serializers for webhooks API.
+"""
+
+from rest_framework import serializers
+
+from events.outbox import EVENT_TYPES
+from .addresses import UnsafeURL, check_url
+from .models import WebhookSubscription, WebhookDelivery
+
+
+class WebhookSubscriptionSerializer(serializers.ModelSerializer):
+    """Serializer for webhook subscriptions (the secret is never listed)."""
+
+    class Meta:
+        model = WebhookSubscription
+        fields = [
+            'id',
+            'org',
+            'url',
+            'event_types',
+            'filters',
+            'description',
+            'is_active',
+            'created_at',
+            'updated_at',
+        ]
+        read_only_fields = ['id', 'created_at', 'updated_at']
+
+    def validate_url(self, value):
+        """Validate that the URL is http(s) and resolves to public addresses."""
+        try:
+            check_url(value)
+        except UnsafeURL as e:
+            raise serializers.ValidationError(str(e))
+        return value
+
+    def validate_event_types(self, value):
+        """Validate that every event type is published."""
+        if not isinstance(value, list):
+            raise serializers.ValidationError("Expected a list of event types.")
+        unknown = [event_type for event_type in value if event_type not in EVENT_TYPES]
+        if unknown:
+            raise serializers.ValidationError(
+                f"Unknown event types: {', '.join(map(str, unknown))}. "
+                f"Valid types: {', '.join(EVENT_TYPES)}"
+            )
+        return value
+
+    def validate_filters(self, value):
+        """Validate that filters map payload keys to values."""
+        if not isinstance(value, dict):
+            raise serializers.ValidationError("Expected an object of payload conditions.")
+        return value
+
+    def validate_org(self, value):
+        """Prevent moving a subscription to another organization."""
+        if self.instance and value.pk != self.instance.org_id:
+            raise serializers.ValidationError("A subscription's organization cannot be changed.")
+        return value
+
+
+class WebhookDeliverySerializer(serializers.ModelSerializer):
+    """Serializer for the webhook delivery log."""
+
+    class Meta:
+        model = WebhookDelivery
+        fields = [
+            'id',
+            'status',
+            'event_count',
+            'attempts',
+            'response_status',
+            'last_error',
+            'next_attempt_at',
+            'created_at',
+            'delivered_at',
+        ]
+        read_only_fields = fields
@@ -0,0 +1,25 @@
+# KapwaNet - Community Platform for Dignified Mutual Aid
+# SPDX-License-Identifier: AGPL-3.0-or-later
+
+"""
+Background tasks for webhooks.
+"""
+
+from django.conf import settings
+
+from jobs.queue import periodic, task
+
+from .delivery import deliver, retry_due_deliveries
+
+
+@task(max_attempts=1)
+def deliver_webhooks(delivery_ids):
+    """Send newly recorded webhook deliveries."""
+    deliver(delivery_ids)
+
+
+@periodic(interval=settings.WEBHOOK_RETRY_SWEEP_INTERVAL)
+def retry_webhooks():
+    """Send failed deliveries whose next attempt is due."""
+    while retry_due_deliveries():
+        pass
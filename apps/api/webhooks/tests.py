@@ -0,0 +1,370 @@
+# KapwaNet - Community Platform for Dignified Mutual Aid
+# SPDX-License-Identifier: AGPL-3.0-or-later
+
+"""
+Tests for outbound webhooks.
+"""
+
+import hashlib
+import hmac
+import json
+import socket
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest import mock
+
+import requests
+
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from events.outbox import relay_consumer
+from help.models import HelpPost
+from jobs.queue import run_periodic
+from kapwanet.querybudget import QueryBudgetTestMixin
+from organizations.models import Organization, Membership
+from users.models import User
+from .addresses import UnsafeURL, check_url, pin_url
+from .delivery import PinnedHostAdapter
+from .models import WebhookSubscription, WebhookDelivery
+
+
+class Receiver:
+    """A local HTTP server standing in for a partner's webhook endpoint."""
+
+    def __init__(self):
+        self.requests = []
+        self.status = 200
+        receiver = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers['Content-Length']))
+                receiver.requests.append((dict(self.headers), body))
+                self.send_response(receiver.status)
+                self.send_header('Location', 'http://169.254.169.254/latest/meta-data/')
+                self.end_headers()
+                self.wfile.write(b'internal details')
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.url = f'http://127.0.0.1:{self.server.server_port}/hook'
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+_getaddrinfo = socket.getaddrinfo
+
+
+def resolve_public(host, port, *args, **kwargs):
+    """getaddrinfo stand-in resolving partner.example.org without DNS."""
+    if host == 'partner.example.org':
+        return [(socket.AF_INET, socket.SOCK_STREAM, socket.IPPROTO_TCP, '', ('93.184.215.14', port))]
+    return _getaddrinfo(host, port, *args, **kwargs)
+
+
+@override_settings(
+    JOBS_SYNC=True, EVENTS_RELAY_LAG=0, WEBHOOK_RETRY_DELAY=60, WEBHOOK_ALLOW_PRIVATE_URLS=True
+)
+class WebhookDeliveryTests(TestCase):
+    """Tests for fan-out and delivery."""
+
+    def setUp(self):
+        self.receiver = Receiver()
+        self.addCleanup(self.receiver.close)
+        self.user = User.objects.create_user(email='user@example.com', password='testpass123')
+        self.org = Organization.objects.create(name='Test Organization', slug='test-org')
+        Membership.objects.create(org=self.org, user=self.user, role='member', status='active')
+        self.subscription = WebhookSubscription.objects.create(
+            org=self.org,
+            url=self.receiver.url,
+            event_types=['help_post.created'],
+            filters={'urgency': ['high', 'urgent']},
+        )
+
+    def relay(self):
+        """Relay events to the webhooks consumer, running its after-commit sends."""
+        with self.captureOnCommitCallbacks(execute=True):
+            relay_consumer('webhooks')
+
+    def create_post(self, urgency):
+        return HelpPost.objects.create(
+            org=self.org, type='request', category='transportation', urgency=urgency,
+            title=f'{urgency} ride', description='To the clinic', created_by=self.user
+        )
+
+    def test_batched_signed_delivery(self):
+        """Test that matching events arrive in one signed POST."""
+        urgent = [self.create_post('high'), self.create_post('urgent')]
+        self.create_post('low')
+
+        self.relay()
+
+        self.assertEqual(len(self.receiver.requests), 1)
+        headers, body = self.receiver.requests[0]
+        data = json.loads(body)
+        self.assertEqual(
+            [event['object_id'] for event in data['events']],
+            [str(post.id) for post in urgent]
+        )
+        self.assertEqual(data['events'][0]['type'], 'help_post.created')
+
+        timestamp, signature = [part.split('=', 1)[1] for part in headers['X-KapwaNet-Signature'].split(',')]
+        expected = hmac.new(
+            self.subscription.secret.encode(), f'{timestamp}.'.encode() + body, hashlib.sha256
+        ).hexdigest()
+        self.assertEqual(signature, expected)
+
+        delivery = WebhookDelivery.objects.get()
+        self.assertEqual(delivery.status, 'succeeded')
+        self.assertEqual(delivery.event_count, 2)
+        self.assertEqual(delivery.response_status, 200)
+
+    def test_failed_delivery_backs_off(self):
+        """Test that a failing endpoint leaves the delivery pending for a later retry."""
+        self.receiver.status = 500
+        self.create_post('high')
+
+        self.relay()
+
+        delivery = WebhookDelivery.objects.get()
+        self.assertEqual(delivery.status, 'pending')
+        self.assertEqual(delivery.attempts, 1)
+        self.assertEqual(delivery.response_status, 500)
+        self.assertGreater((delivery.next_attempt_at - timezone.now()).total_seconds(), 50)
+        # The retry is not due yet, so nothing else was sent
+        self.assertEqual(len(self.receiver.requests), 1)
+        self.assertEqual(delivery.last_error, 'HTTP 500')
+
+    def test_failed_delivery_is_retried(self):
+        """Test that the periodic sweep sends a failed delivery once it is due."""
+        self.receiver.status = 500
+        self.create_post('high')
+        self.relay()
+
+        # Not due yet
+        run_periodic(force=True)
+        self.assertEqual(len(self.receiver.requests), 1)
+
+        self.receiver.status = 200
+        WebhookDelivery.objects.update(next_attempt_at=timezone.now())
+        run_periodic(force=True)
+
+        delivery = WebhookDelivery.objects.get()
+        self.assertEqual(delivery.status, 'succeeded')
+        self.assertEqual(delivery.attempts, 2)
+        self.assertEqual(delivery.last_error, '')
+        self.assertEqual(len(self.receiver.requests), 2)
+
+    def test_redirects_not_followed(self):
+        """Test that a redirect counts as a failure and the body is not stored."""
+        self.receiver.status = 302
+        self.create_post('high')
+
+        self.relay()
+
+        delivery = WebhookDelivery.objects.get()
+        self.assertEqual(delivery.status, 'pending')
+        self.assertEqual(delivery.response_status, 302)
+        self.assertEqual(delivery.last_error, 'HTTP 302')
+
+    def test_private_address_blocked_at_send_time(self):
+        """Test that a URL resolving to a private address is not sent to."""
+        self.create_post('high')
+
+        with override_settings(WEBHOOK_ALLOW_PRIVATE_URLS=False):
+            self.relay()
+
+        delivery = WebhookDelivery.objects.get()
+        self.assertEqual(self.receiver.requests, [])
+        self.assertIsNone(delivery.response_status)
+        self.assertIn('private or reserved', delivery.last_error)
+
+    def test_sends_to_checked_address(self):
+        """Test that a send connects to the checked address, not a fresh DNS answer."""
+        answers = iter(['127.0.0.1'])
+
+        def rebinding(host, port, *args, **kwargs):
+            if host == 'receiver.test':
+                # First answer passes the check; later ones point elsewhere
+                address = next(answers, '127.0.0.2')
+                return [(socket.AF_INET, socket.SOCK_STREAM, socket.IPPROTO_TCP, '', (address, port))]
+            return _getaddrinfo(host, port, *args, **kwargs)
+
+        port = self.receiver.server.server_port
+        self.subscription.url = f'http://receiver.test:{port}/hook'
+        self.subscription.save()
+        self.create_post('high')
+
+        with override_settings(WEBHOOK_ALLOW_PRIVATE_URLS=False), \
+                mock.patch('webhooks.addresses.is_public', return_value=True), \
+                mock.patch('webhooks.addresses.socket.getaddrinfo', rebinding):
+            self.relay()
+
+        self.assertEqual(WebhookDelivery.objects.get().status, 'succeeded')
+        headers, _ = self.receiver.requests[0]
+        self.assertEqual(headers['Host'], f'receiver.test:{port}')
+
+    def test_sync_sends_after_commit(self):
+        """Test that JOBS_SYNC sends only once the relay's transaction commits."""
+        self.create_post('high')
+        with self.captureOnCommitCallbacks() as callbacks:
+            relay_consumer('webhooks')
+        self.assertEqual(self.receiver.requests, [])
+
+        for callback in callbacks:
+            callback()
+        self.assertEqual(len(self.receiver.requests), 1)
+
+    def test_events_before_subscription_are_skipped(self):
+        """Test that a new subscription does not receive older events."""
+        self.create_post('high')
+        WebhookSubscription.objects.filter(pk=self.subscription.pk).update(
+            created_at=timezone.now()
+        )
+        self.relay()
+        self.assertFalse(WebhookDelivery.objects.exists())
+
+
+class WebhookURLTests(SimpleTestCase):
+    """Tests for webhook destination checks."""
+
+    def test_unsafe_urls(self):
+        """Test that non-http schemes and internal addresses are rejected."""
+        for url in [
+            'ftp://partner.example.org/hooks',
+            'http://127.0.0.1:8000/admin/',
+            'http://localhost/',
+            'http://169.254.169.254/latest/meta-data/',
+            'http://10.0.0.5/',
+            'http://[::1]/',
+            'http://[::ffff:192.168.1.1]/',
+            'http://0.0.0.0/',
+        ]:
+            with self.subTest(url=url):
+                with self.assertRaises(UnsafeURL):
+                    check_url(url)
+
+    @mock.patch('webhooks.addresses.socket.getaddrinfo', resolve_public)
+    def test_public_url(self):
+        """Test that a host resolving to public addresses is accepted."""
+        self.assertEqual(check_url('https://partner.example.org/hooks'), ['93.184.215.14'])
+
+    def test_pinned_url_keeps_host_for_tls(self):
+        """Test that a pinned https URL verifies and sends SNI for the original host."""
+        url, host = pin_url('https://partner.example.org:8443/hooks?x=1', '2001:db8::5')
+        self.assertEqual(url, 'https://[2001:db8::5]:8443/hooks?x=1')
+        self.assertEqual(host, 'partner.example.org:8443')
+
+        request = requests.Request('POST', url, headers={'Host': host}).prepare()
+        host_params, pool_kwargs = PinnedHostAdapter().build_connection_pool_key_attributes(
+            request, verify=True
+        )
+        self.assertEqual(host_params['host'], '2001:db8::5')
+        self.assertEqual(pool_kwargs['server_hostname'], 'partner.example.org')
+        self.assertEqual(pool_kwargs['assert_hostname'], 'partner.example.org')
+
+
+class WebhookAPITests(APITestCase):
+    """Tests for the webhooks API."""
+
+    def setUp(self):
+        patcher = mock.patch('webhooks.addresses.socket.getaddrinfo', resolve_public)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.admin = User.objects.create_user(email='admin@example.com', password='testpass123')
+        self.member = User.objects.create_user(email='member@example.com', password='testpass123')
+        self.org = Organization.objects.create(name='Test Organization', slug='test-org')
+        Membership.objects.create(org=self.org, user=self.admin, role='org_admin', status='active')
+        Membership.objects.create(org=self.org, user=self.member, role='member', status='active')
+
+    def authenticate(self, user):
+        token = RefreshToken.for_user(user).access_token
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+
+    def test_admin_creates_subscription(self):
+        """Test that the secret is returned on create but not when listing."""
+        self.authenticate(self.admin)
+        response = self.client.post('/api/webhooks/', {
+            'org': str(self.org.id),
+            'url': 'https://partner.example.org/hooks',
+            'event_types': ['help_post.created', 'item_reservation.completed'],
+        }, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(len(response.data['secret']), 64)
+
+        response = self.client.get('/api/webhooks/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn(b'partner.example.org', response.content)
+        self.assertNotIn(b'"secret"', response.content)
+
+    def test_unknown_event_type_rejected(self):
+        """Test validation of event types."""
+        self.authenticate(self.admin)
+        response = self.client.post('/api/webhooks/', {
+            'org': str(self.org.id),
+            'url': 'https://partner.example.org/hooks',
+            'event_types': ['help_post.deleted'],
+        }, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_internal_url_rejected(self):
+        """Test that subscriptions cannot target internal addresses."""
+        self.authenticate(self.admin)
+        response = self.client.post('/api/webhooks/', {
+            'org': str(self.org.id),
+            'url': 'http://169.254.169.254/latest/meta-data/',
+            'event_types': ['help_post.created'],
+        }, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('url', response.data)
+
+    def test_member_cannot_create_subscription(self):
+        """Test that only org admins manage webhooks."""
+        self.authenticate(self.member)
+        response = self.client.post('/api/webhooks/', {
+            'org': str(self.org.id),
+            'url': 'https://partner.example.org/hooks',
+        }, format='json')
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+
+class WebhookQueryBudgetTests(QueryBudgetTestMixin, APITestCase):
+    """Tests that webhook endpoints stay within their query budgets."""
+
+    def setUp(self):
+        self.admin = User.objects.create_user(email='admin@example.com', password='testpass123')
+        self.org = Organization.objects.create(name='Test Organization', slug='test-org')
+        Membership.objects.create(org=self.org, user=self.admin, role='org_admin', status='active')
+        self.subscription = self.add_subscription()
+        token = RefreshToken.for_user(self.admin).access_token
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+
+    def add_subscription(self):
+        subscription = WebhookSubscription.objects.create(
+            org=self.org, url='https://partner.example.org/hooks', event_types=['help_post.created']
+        )
+        for _ in range(3):
+            WebhookDelivery.objects.create(subscription=subscription, payload={}, event_count=0)
+        return subscription
+
+    def test_endpoints(self):
+        """Test subscription list, detail and deliveries."""
+        self.assertConstantQueries('/api/webhooks/', grow=self.add_subscription)
+        self.request_within_budget('get', f'/api/webhooks/{self.subscription.id}/')
+        self.assertConstantQueries(
+            f'/api/webhooks/{self.subscription.id}/deliveries/',
+            grow=lambda: WebhookDelivery.objects.create(
+                subscription=self.subscription, payload={}, event_count=0
+            )
+        )
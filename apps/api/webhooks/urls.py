@@ -0,0 +1,18 @@
+# KapwaNet - Community Platform for Dignified Mutual Aid
+# SPDX-License-Identifier: AGPL-3.0-or-later
+
+"""
+URL configuration for webhooks API.
+"""
+
+from django.urls import path, include
+from rest_framework.routers import DefaultRouter
+
+from .views import WebhookSubscriptionViewSet
+
+router = DefaultRouter()
+router.register(r'', WebhookSubscriptionViewSet, basename='webhook')
+
+urlpatterns = [
+    path('', include(router.urls)),
+]
@@ -0,0 +1,77 @@
+# KapwaNet - Community Platform for Dignified Mutual Aid
+# SPDX-License-Identifier: AGPL-3.0-or-later
+
+"""
+Views for webhooks API.
+"""
+
+from rest_framework import viewsets, status
+from rest_framework.decorators import action
+from rest_framework.response import Response
+
+from organizations.cache import filter_by_org
+from organizations.models import Membership
+from organizations.permissions import OrgAdminPermission
+
+from .models import WebhookSubscription, generate_secret
+from .serializers import WebhookSubscriptionSerializer, WebhookDeliverySerializer
+
+
+class WebhookSubscriptionViewSet(viewsets.ModelViewSet):
+    """
+    ViewSet for managing an organization's webhook subscriptions.
+
+    Only org admins can access this endpoint. The signing secret is only
+    returned when a subscription is created or its secret is rotated.
+
+    Endpoints:
+        GET /api/webhooks/ - List subscriptions
+        POST /api/webhooks/ - Create a subscription
+        GET/PATCH/DELETE /api/webhooks/{id}/ - Manage a subscription
+        GET /api/webhooks/{id}/deliveries/ - Recent deliveries
+        POST /api/webhooks/{id}/rotate-secret/ - Issue a new secret
+    """
+
+    permission_classes = [OrgAdminPermission]
+    serializer_class = WebhookSubscriptionSerializer
+    query_budgets = {'list': 2, 'retrieve': 4, 'deliveries': 5}
+
+    def get_queryset(self):
+        """Get subscriptions of orgs the user administers."""
+        admin_orgs = Membership.objects.filter(
+            user=self.request.user,
+            role='org_admin',
+            status='active'
+        ).values_list('org_id', flat=True)
+        queryset = WebhookSubscription.objects.filter(org_id__in=admin_orgs)
+
+        org_param = self.request.query_params.get('org')
+        if org_param:
+            queryset = filter_by_org(queryset, org_param)
+
+        return queryset
+
+    def create(self, request, *args, **kwargs):
+        """Create a subscription, returning its secret once."""
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        subscription = serializer.save(created_by=request.user)
+        return Response(
+            {**serializer.data, 'secret': subscription.secret},
+            status=status.HTTP_201_CREATED
+        )
+
+    @action(detail=True, methods=['get'])
+    def deliveries(self, request, pk=None):
+        """Get the 50 most recent deliveries."""
+        subscription = self.get_object()
+        deliveries = subscription.deliveries.order_by('-created_at')[:50]
+        return Response(WebhookDeliverySerializer(deliveries, many=True).data)
+
+    @action(detail=True, methods=['post'], url_path='rotate-secret')
+    def rotate_secret(self, request, pk=None):
+        """Replace the signing secret."""
+        subscription = self.get_object()
+        subscription.secret = generate_secret()
+        subscription.save(update_fields=['secret', 'updated_at'])
+        return Response({'secret': subscription.secret})